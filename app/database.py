@@ -1,16 +1,230 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""Database engines and sessions.
+
+Two backends: SQLite (default, ``DB_PATH``) or PostgreSQL (``DATABASE_URL``).
+Each has a sync engine (worker, background tasks, not-yet-ported routers)
+and an async engine (aiosqlite / asyncpg) behind ``get_async_db`` for
+``async def`` handlers, so queries there don't block the event loop.
+
+SQLite is shared by the API process, ``app/worker.py`` and background
+pipeline tasks, so every connection is tuned on connect:
+
+    journal_mode=WAL      readers never block the writer (or vice versa)
+    synchronous=NORMAL    fsync at checkpoints, not every commit (safe with WAL)
+    busy_timeout          wait for another process' write lock instead of failing
+    mmap_size/cache_size  serve hot pages from memory
+    temp_store=MEMORY     sorts/temp tables off disk
+
+Within a process, sessions route statements between two engines:
+    - a read pool (``query_only`` connections, many in parallel)
+    - a single writer connection, so this process' writes queue on the pool
+      instead of racing each other for SQLite's lock and hitting
+      "database is locked"
+
+Once a transaction has written, the rest of it stays on the writer so it
+reads its own changes. The writer is released at commit/rollback, so commit
+promptly after writing (don't hold a flushed session across awaits).
+
+Async sessions open their own connections, so on SQLite their writes are
+serialized with the sync writer by SQLite's lock (WAL + busy_timeout).
+
+Usage:
+    from app.database import SessionLocal, get_async_db, get_pool_stats
+
+    db = SessionLocal()
+    jobs = db.query(Job).all()        # read pool
+    db.add(job); db.commit()          # writer
+
+    @router.get("/jobs")
+    async def list_jobs(db: AsyncSession = Depends(get_async_db)):
+        jobs = (await db.execute(select(Job))).scalars().all()
+
+    get_pool_stats()                  # {"writer": {...}, "reader": {...}, "async": {...}}
+"""
+
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import Select, create_engine, event, inspect, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.schema import CreateColumn
 
 from app.config import settings
 
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{settings.db_path}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
+def _database_urls() -> Tuple[URL, URL]:
+    """(sync URL, async URL) for the configured backend."""
+    if settings.is_postgres:
+        url = make_url(settings.database_url)
+        return url.set(drivername="postgresql+psycopg"), url.set(drivername="postgresql+asyncpg")
+    return (
+        make_url(f"sqlite:///{settings.db_path}"),
+        make_url(f"sqlite+aiosqlite:///{settings.db_path}"),
+    )
+
+
+SQLALCHEMY_DATABASE_URL, ASYNC_DATABASE_URL = _database_urls()
+
+_IS_SQLITE = not settings.is_postgres
+_IN_MEMORY = _IS_SQLITE and settings.db_path in ("", ":memory:")
+
+
+def _sqlite_pragmas(read_only: bool):
+    """Connect hook applying the tuning pragmas (and query_only for readers)."""
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not _IN_MEMORY:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute(f"PRAGMA mmap_size={settings.db_mmap_size_mb * 1024 * 1024}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={settings.db_busy_timeout_ms}")
+            cursor.execute(f"PRAGMA cache_size=-{settings.db_cache_size_mb * 1024}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+class PoolMetrics:
+    """Checkout counters, connection hold times and lock errors for one engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self.max_hold_seconds = 0.0
+        self.locked_errors = 0
+
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.monotonic()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held = time.monotonic() - started
+        with self._lock:
+            self.checked_out -= 1
+            self.total_hold_seconds += held
+            self.max_hold_seconds = max(self.max_hold_seconds, held)
+
+    def _on_error(self, context):
+        if "database is locked" in str(context.original_exception):
+            with self._lock:
+                self.locked_errors += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "avg_hold_ms": round(
+                    self.total_hold_seconds / self.checkouts * 1000, 2
+                ) if self.checkouts else 0.0,
+                "max_hold_ms": round(self.max_hold_seconds * 1000, 2),
+                "locked_errors": self.locked_errors,
+            }
+
+
+if _IS_SQLITE:
+    write_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.db_writer_pool_timeout_seconds,
+    )
+    event.listen(write_engine, "connect", _sqlite_pragmas(read_only=False))
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, pool_size=settings.db_read_pool_size, max_overflow=0
+    )
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas(read_only=False))
+else:
+    # PostgreSQL handles concurrent writers itself: one pooled engine each
+    write_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+    )
+
+if _IN_MEMORY or not _IS_SQLITE:
+    # In-memory: each connection is its own database, nothing to split
+    read_engine = write_engine
+else:
+    read_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.db_read_pool_size,
+        max_overflow=settings.db_read_pool_size,
+    )
+    event.listen(read_engine, "connect", _sqlite_pragmas(read_only=True))
+
+# Kept for callers that need "the" engine (DDL, raw connections)
+engine = write_engine
+
+_writer_metrics = PoolMetrics(write_engine)
+_reader_metrics = (
+    _writer_metrics if read_engine is write_engine else PoolMetrics(read_engine)
+)
+_async_metrics = PoolMetrics(async_engine.sync_engine)
+
+_WROTE = "_routing_wrote"
+
+
+class RoutingSession(Session):
+    """Session sending SELECTs to the read pool and everything else to the writer."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get(_WROTE):
+            return write_engine
+        if isinstance(clause, Select) and clause._for_update_arg is None and not self._flushing:
+            return read_engine
+        self.info[_WROTE] = True
+        return write_engine
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WROTE, None)
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=write_engine
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -24,6 +238,45 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency that provides an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool metrics for the writer, read and async pools."""
+    return {
+        "backend": "postgresql" if settings.is_postgres else "sqlite",
+        "writer": _writer_metrics.get_stats(),
+        "reader": _reader_metrics.get_stats(),
+        "async": _async_metrics.get_stats(),
+    }
+
+
+def _add_missing_columns():
+    """
+    Add model columns missing from existing tables (create_all won't).
+
+    Only for additive changes: new columns must be nullable or have a
+    server default.
+    """
+    preparer = engine.dialect.identifier_preparer
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}"))
+
+
 def init_db():
     """Create all database tables."""
     from app.models import (  # noqa: F401 - imports needed for SQLAlchemy table creation
@@ -31,6 +284,7 @@ def init_db():
         ImageJob,
         Pipeline,
         PipelineStep,
+        MediaAsset,
         UploadCache,
         User,
         ModelProfile,
@@ -38,6 +292,16 @@ def init_db():
         BatchJob,
         BatchJobItem,
         Template,
+        R2Object,
+        R2ContentAlias,
+        ModelRuntimeStat,
+        PromptEnhancement,
     )
 
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
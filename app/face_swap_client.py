@@ -11,6 +11,7 @@ from tenacity import (
 )
 
 from app.config import settings
+from app.http_client import get_http_client
 
 logger = structlog.get_logger()
 
@@ -126,26 +127,30 @@ async def submit_face_swap_job(
         target_url=target_image_url[:50],
     )
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            config["submit_url"],
-            headers=_get_headers(),
-            json=payload,
-        )
+    from app.services.rate_limiter import provider_governor  # app.services imports this module
+
+    client = get_http_client(config["submit_url"])
+    response = await provider_governor.request(
+        "fal",
+        client.post,
+        config["submit_url"],
+        headers=_get_headers(),
+        json=payload,
+    )
 
-        if response.status_code >= 400:
-            error_msg = f"Fal API error: {response.status_code} - {response.text}"
-            logger.error(error_msg, model=model)
-            raise FaceSwapAPIError(error_msg)
+    if response.status_code >= 400:
+        error_msg = f"Fal API error: {response.status_code} - {response.text}"
+        logger.error(error_msg, model=model)
+        raise FaceSwapAPIError(error_msg)
 
-        data = response.json()
-        request_id = data.get("request_id")
+    data = response.json()
+    request_id = data.get("request_id")
 
-        if not request_id:
-            raise FaceSwapAPIError("No request_id in Fal response")
+    if not request_id:
+        raise FaceSwapAPIError("No request_id in Fal response")
 
-        logger.info("Face swap job submitted to Fal", model=model, request_id=request_id)
-        return request_id
+    logger.info("Face swap job submitted to Fal", model=model, request_id=request_id)
+    return request_id
 
 
 @retry(
@@ -170,15 +175,19 @@ async def get_face_swap_result(
     config = FACE_SWAP_MODELS[model]
     url = f"{config['status_url']}/requests/{request_id}/status"
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.get(url, headers=_get_headers())
+    from app.services.rate_limiter import provider_governor  # app.services imports this module
 
-        if response.status_code >= 400:
-            error_msg = f"Fal API error: {response.status_code} - {response.text}"
-            logger.error(error_msg, model=model, request_id=request_id)
-            raise FaceSwapAPIError(error_msg)
+    client = get_http_client(url)
+    response = await provider_governor.request(
+        "fal", client.get, url, headers=_get_headers()
+    )
+
+    if response.status_code >= 400:
+        error_msg = f"Fal API error: {response.status_code} - {response.text}"
+        logger.error(error_msg, model=model, request_id=request_id)
+        raise FaceSwapAPIError(error_msg)
 
-        data = response.json()
+    data = response.json()
 
     # Map Fal statuses to our internal statuses
     fal_status = data.get("status", "").upper()
@@ -199,42 +208,44 @@ async def get_face_swap_result(
     if status == "completed":
         # Get the actual result
         result_url = f"{config['status_url']}/requests/{request_id}"
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            result_response = await client.get(result_url, headers=_get_headers())
-            logger.debug("Face swap result response", status_code=result_response.status_code)
-
-            if result_response.status_code == 200:
-                result_data = result_response.json()
-                logger.debug(
-                    "Face swap result data",
-                    keys=list(result_data.keys()),
-                )
-
-                # Output format: {"image": {"url": "...", ...}}
-                image_data = result_data.get("image", {})
-                if isinstance(image_data, dict) and image_data.get("url"):
-                    result["image_url"] = image_data["url"]
-                elif isinstance(image_data, str):
-                    result["image_url"] = image_data
-
-                # Fallback formats
-                if not result["image_url"]:
-                    for key in ["url", "output", "result_url"]:
-                        if key in result_data:
-                            val = result_data[key]
-                            if isinstance(val, str):
-                                result["image_url"] = val
-                                break
-                            elif isinstance(val, dict) and val.get("url"):
-                                result["image_url"] = val["url"]
-                                break
-
-                logger.debug("Parsed face swap URL", url=result["image_url"][:50] if result["image_url"] else None)
-            else:
-                logger.error(
-                    "Failed to fetch face swap result",
-                    status_code=result_response.status_code,
-                )
+        client = get_http_client(result_url)
+        result_response = await provider_governor.request(
+            "fal", client.get, result_url, headers=_get_headers()
+        )
+        logger.debug("Face swap result response", status_code=result_response.status_code)
+
+        if result_response.status_code == 200:
+            result_data = result_response.json()
+            logger.debug(
+                "Face swap result data",
+                keys=list(result_data.keys()),
+            )
+
+            # Output format: {"image": {"url": "...", ...}}
+            image_data = result_data.get("image", {})
+            if isinstance(image_data, dict) and image_data.get("url"):
+                result["image_url"] = image_data["url"]
+            elif isinstance(image_data, str):
+                result["image_url"] = image_data
+
+            # Fallback formats
+            if not result["image_url"]:
+                for key in ["url", "output", "result_url"]:
+                    if key in result_data:
+                        val = result_data[key]
+                        if isinstance(val, str):
+                            result["image_url"] = val
+                            break
+                        elif isinstance(val, dict) and val.get("url"):
+                            result["image_url"] = val["url"]
+                            break
+
+            logger.debug("Parsed face swap URL", url=result["image_url"][:50] if result["image_url"] else None)
+        else:
+            logger.error(
+                "Failed to fetch face swap result",
+                status_code=result_response.status_code,
+            )
 
     elif status == "failed":
         result["error_message"] = data.get("error", "Unknown error from Fal")
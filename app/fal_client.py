@@ -9,6 +9,7 @@ from tenacity import (
 )
 
 from app.config import settings
+from app.http_client import get_http_client
 
 logger = structlog.get_logger()
 
@@ -170,6 +171,20 @@ def _get_headers() -> dict:
     }
 
 
+def get_webhook_url() -> str | None:
+    """
+    Callback URL Fal should POST completions to, or None if webhooks are off.
+
+    Enabled by setting FAL_WEBHOOK_BASE_URL to this API's public base URL.
+    """
+    if not settings.fal_webhook_base_url:
+        return None
+    url = f"{settings.fal_webhook_base_url.rstrip('/')}/api/webhooks/fal"
+    if settings.fal_webhook_secret:
+        url += f"?token={settings.fal_webhook_secret}"
+    return url
+
+
 def _build_payload(
     model: ModelType,
     image_url: str,
@@ -319,6 +334,38 @@ def _build_payload(
         raise ValueError(f"Unknown model: {model}")
 
 
+def extract_video_url(result_data: dict) -> str | None:
+    """Find the video URL in a Fal result payload (formats vary by model)."""
+    # Try multiple possible locations for video URL
+    video_url = None
+
+    # Format 1: {"video": {"url": "..."}}
+    if "video" in result_data:
+        video_data = result_data["video"]
+        if isinstance(video_data, dict):
+            video_url = video_data.get("url")
+        elif isinstance(video_data, str):
+            video_url = video_data
+
+    # Format 2: {"output": {"video_url": "..."}} or {"output": {"video": {"url": "..."}}}
+    if not video_url and "output" in result_data:
+        output = result_data["output"]
+        if isinstance(output, dict):
+            video_url = output.get("video_url") or output.get("url")
+            if not video_url and "video" in output:
+                video_url = (
+                    output["video"].get("url")
+                    if isinstance(output["video"], dict)
+                    else output["video"]
+                )
+
+    # Format 3: {"video_url": "..."} (direct)
+    if not video_url:
+        video_url = result_data.get("video_url")
+
+    return video_url
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=1, max=4),
@@ -332,10 +379,14 @@ async def submit_job(
     duration_sec: int,
     negative_prompt: str | None = None,
     enable_audio: bool = False,
+    fal_webhook: str | None = None,
 ) -> str:
     """
     Submit a job to Fal's queue.
 
+    If a webhook URL is given (or configured via FAL_WEBHOOK_BASE_URL), Fal
+    POSTs the result to it on completion; polling remains as a fallback.
+
     Returns the request_id for polling.
     """
     if model not in MODELS:
@@ -359,26 +410,33 @@ async def submit_job(
         payload_audio=payload.get("enable_audio"),
     )
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            config["submit_url"],
-            headers=_get_headers(),
-            json=payload,
-        )
+    webhook_url = fal_webhook or get_webhook_url()
+
+    from app.services.rate_limiter import provider_governor  # app.services imports this module
+
+    client = get_http_client(config["submit_url"])
+    response = await provider_governor.request(
+        "fal",
+        client.post,
+        config["submit_url"],
+        headers=_get_headers(),
+        json=payload,
+        params={"fal_webhook": webhook_url} if webhook_url else None,
+    )
 
-        if response.status_code >= 400:
-            error_msg = f"Fal API error: {response.status_code} - {response.text}"
-            logger.error(error_msg, model=model)
-            raise FalAPIError(error_msg)
+    if response.status_code >= 400:
+        error_msg = f"Fal API error: {response.status_code} - {response.text}"
+        logger.error(error_msg, model=model)
+        raise FalAPIError(error_msg)
 
-        data = response.json()
-        request_id = data.get("request_id")
+    data = response.json()
+    request_id = data.get("request_id")
 
-        if not request_id:
-            raise FalAPIError("No request_id in Fal response")
+    if not request_id:
+        raise FalAPIError("No request_id in Fal response")
 
-        logger.info("Job submitted to Fal", model=model, request_id=request_id)
-        return request_id
+    logger.info("Job submitted to Fal", model=model, request_id=request_id)
+    return request_id
 
 
 @retry(
@@ -401,15 +459,19 @@ async def get_job_result(model: ModelType, request_id: str) -> dict:
     config = MODELS[model]
     url = f"{config['status_url']}/requests/{request_id}/status"
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.get(url, headers=_get_headers())
+    from app.services.rate_limiter import provider_governor  # app.services imports this module
+
+    client = get_http_client(url)
+    response = await provider_governor.request(
+        "fal", client.get, url, headers=_get_headers()
+    )
 
-        if response.status_code >= 400:
-            error_msg = f"Fal API error: {response.status_code} - {response.text}"
-            logger.error(error_msg, model=model, request_id=request_id)
-            raise FalAPIError(error_msg)
+    if response.status_code >= 400:
+        error_msg = f"Fal API error: {response.status_code} - {response.text}"
+        logger.error(error_msg, model=model, request_id=request_id)
+        raise FalAPIError(error_msg)
 
-        data = response.json()
+    data = response.json()
 
     # Map Fal statuses to our internal statuses
     fal_status = data.get("status", "").upper()
@@ -431,56 +493,32 @@ async def get_job_result(model: ModelType, request_id: str) -> dict:
         # Get the actual result
         result_url = f"{config['status_url']}/requests/{request_id}"
         logger.debug("Fetching result", url=result_url)
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            result_response = await client.get(result_url, headers=_get_headers())
-            logger.debug("Result response", status_code=result_response.status_code)
-            if result_response.status_code == 200:
-                result_data = result_response.json()
-                logger.debug(
-                    "Fal result data",
-                    model=model,
-                    keys=list(result_data.keys()),
-                    data=str(result_data)[:500],
-                )
-
-                # Try multiple possible locations for video URL
-                video_url = None
-
-                # Format 1: {"video": {"url": "..."}}
-                if "video" in result_data:
-                    video_data = result_data["video"]
-                    if isinstance(video_data, dict):
-                        video_url = video_data.get("url")
-                    elif isinstance(video_data, str):
-                        video_url = video_data
-
-                # Format 2: {"output": {"video_url": "..."}} or {"output": {"video": {"url": "..."}}}
-                if not video_url and "output" in result_data:
-                    output = result_data["output"]
-                    if isinstance(output, dict):
-                        video_url = output.get("video_url") or output.get("url")
-                        if not video_url and "video" in output:
-                            video_url = (
-                                output["video"].get("url")
-                                if isinstance(output["video"], dict)
-                                else output["video"]
-                            )
-
-                # Format 3: {"video_url": "..."} (direct)
-                if not video_url:
-                    video_url = result_data.get("video_url")
-
-                result["video_url"] = video_url
-                logger.debug(
-                    "Extracted video URL",
-                    video_url=video_url[:50] if video_url else None,
-                )
-            else:
-                logger.error(
-                    "Failed to fetch result",
-                    status_code=result_response.status_code,
-                    text=result_response.text[:200],
-                )
+        client = get_http_client(result_url)
+        result_response = await provider_governor.request(
+            "fal", client.get, result_url, headers=_get_headers()
+        )
+        logger.debug("Result response", status_code=result_response.status_code)
+        if result_response.status_code == 200:
+            result_data = result_response.json()
+            logger.debug(
+                "Fal result data",
+                model=model,
+                keys=list(result_data.keys()),
+                data=str(result_data)[:500],
+            )
+
+            video_url = extract_video_url(result_data)
+            result["video_url"] = video_url
+            logger.debug(
+                "Extracted video URL",
+                video_url=video_url[:50] if video_url else None,
+            )
+        else:
+            logger.error(
+                "Failed to fetch result",
+                status_code=result_response.status_code,
+                text=result_response.text[:200],
+            )
 
     elif status == "failed":
         result["error_message"] = data.get("error", "Unknown error from Fal")
@@ -0,0 +1,182 @@
+"""Process-wide, per-host connection-pooled HTTP clients.
+
+Every outbound call (Fal queue submit/poll, Fal CDN downloads, R2, SwarmUI
+asset fetches, URL reachability checks) goes through a shared
+``httpx.AsyncClient`` instead of opening a new client per request. This keeps
+TCP+TLS connections alive between polls, which dominates the cost of the
+worker loop when hundreds of requests are polled every few seconds.
+
+Provider hosts (POOLED_HOST_SUFFIXES and the configured SwarmUI/RunPod/
+Pinokio URLs) get a client each; every other host, e.g. user-supplied image
+URLs, shares one fallback client, so the registry cannot grow without bound.
+
+HTTP/2 is negotiated via ALPN when the optional ``h2`` package is installed;
+hosts that don't support it transparently fall back to HTTP/1.1.
+
+Usage:
+    from app.http_client import get_http_client
+
+    client = get_http_client(url)
+    response = await client.get(url, headers=headers)
+
+    # On shutdown (FastAPI lifespan / worker exit)
+    await close_http_clients()
+"""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+import structlog
+
+from app.config import settings
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+DEFAULT_TIMEOUT = 60.0
+
+# Per-host timeouts (seconds), matched by host suffix.
+# Queue endpoints answer quickly; CDN/R2 transfers move large media files.
+HOST_TIMEOUTS: Dict[str, float] = {
+    "queue.fal.run": 60.0,
+    "fal.run": 60.0,
+    "fal.media": 120.0,
+    "r2.cloudflarestorage.com": 120.0,
+    "r2.dev": 120.0,
+}
+
+# Hosts (suffix match) that get their own client
+POOLED_HOST_SUFFIXES: Tuple[str, ...] = (*HOST_TIMEOUTS, "fal.ai", "api.anthropic.com")
+
+# Registry key of the client shared by all other hosts
+FALLBACK_KEY = "*"
+
+# host -> (client, owning event loop)
+_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+
+def _host_key(url_or_host: str) -> str:
+    """Normalize a URL or bare host into a registry key (scheme://host[:port])."""
+    if "://" not in url_or_host:
+        url_or_host = f"https://{url_or_host}"
+    parsed = urlparse(url_or_host)
+    return f"{parsed.scheme or 'https'}://{parsed.netloc.lower()}"
+
+
+def _matches_suffix(host: str, suffix: str) -> bool:
+    return host == suffix or host.endswith(f".{suffix}")
+
+
+def get_host_timeout(url_or_host: str) -> float:
+    """Return the configured timeout for a host (suffix match), or the default."""
+    host = urlparse(_host_key(url_or_host)).hostname or ""
+    for suffix, timeout in HOST_TIMEOUTS.items():
+        if _matches_suffix(host, suffix):
+            return timeout
+    return DEFAULT_TIMEOUT
+
+
+def _registry_key(url_or_host: str) -> str:
+    """Registry key for a URL: its host if pooled, else FALLBACK_KEY."""
+    key = _host_key(url_or_host)
+    host = urlparse(key).hostname or ""
+    configured = (settings.swarmui_url, settings.runpod_pod_url, settings.pinokio_wan_url)
+    if any(url and urlparse(_host_key(url)).hostname == host for url in configured):
+        return key
+    if any(_matches_suffix(host, suffix) for suffix in POOLED_HOST_SUFFIXES):
+        return key
+    return FALLBACK_KEY
+
+
+def _build_client(key: str) -> httpx.AsyncClient:
+    """Create a pooled client for one host."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    http2 = HTTP2_AVAILABLE and settings.http_http2_enabled
+    logger.debug("Creating pooled HTTP client", host=key, http2=http2)
+    timeout = DEFAULT_TIMEOUT if key == FALLBACK_KEY else get_host_timeout(key)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=10.0),
+        limits=limits,
+        http2=http2,
+        follow_redirects=True,
+    )
+
+
+def _retire(key: str, client: httpx.AsyncClient, owner_loop: Optional[asyncio.AbstractEventLoop]):
+    """Close a replaced client on the loop that owns it, if that loop still runs."""
+    if client.is_closed or owner_loop is None or owner_loop.is_closed():
+        return  # A closed loop took its connections with it
+    if owner_loop.is_running():
+        owner_loop.call_soon_threadsafe(lambda: owner_loop.create_task(client.aclose()))
+    else:
+        logger.debug("Dropping HTTP client of an idle event loop", host=key)
+
+
+def get_http_client(url_or_host: str) -> httpx.AsyncClient:
+    """
+    Get the shared pooled client for the host of ``url_or_host``.
+
+    Provider hosts get their own client; any other host gets the shared
+    fallback client. Clients are bound to the event loop that created them;
+    if called from a different loop (e.g. a fresh ``asyncio.run`` in a script
+    or test), a new client is created for that loop and the old one closed.
+
+    Callers must NOT close the returned client or use it as a context manager.
+    Per-request timeouts can still be passed to ``client.get(..., timeout=...)``.
+    """
+    key = _registry_key(url_or_host)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    entry = _clients.get(key)
+    if entry is not None:
+        client, owner_loop = entry
+        if not client.is_closed and owner_loop is loop:
+            return client
+        _retire(key, client, owner_loop)
+
+    client = _build_client(key)
+    _clients[key] = (client, loop)
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close every pooled client owned by the running event loop."""
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    for key, (client, owner_loop) in list(_clients.items()):
+        if owner_loop is not loop and owner_loop is not None and not owner_loop.is_closed():
+            continue
+        _clients.pop(key, None)
+        if owner_loop is loop and not client.is_closed:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning("Failed to close HTTP client", host=key, error=str(e))
+
+    logger.info("Closed pooled HTTP clients")
+
+
+def get_http_client_stats() -> dict:
+    """Return registry stats for health/status endpoints."""
+    return {
+        "http2_available": HTTP2_AVAILABLE,
+        "hosts": sorted(key for key, (client, _) in _clients.items() if not client.is_closed),
+    }
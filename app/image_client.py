@@ -11,6 +11,8 @@ from tenacity import (
 )
 
 from app.config import settings
+from app.fal_client import get_webhook_url
+from app.http_client import get_http_client
 
 logger = structlog.get_logger()
 
@@ -532,6 +534,52 @@ def _build_ideogram_payload(
     }
 
 
+def extract_image_urls(result_data: dict) -> list[str]:
+    """Find the image URLs in a Fal result payload (formats vary by model)."""
+    image_urls = []
+
+    # Format 1: {"images": [{"url": "..."}, ...]}
+    images = result_data.get("images", [])
+    if images:
+        for img in images:
+            if isinstance(img, dict) and img.get("url"):
+                image_urls.append(img["url"])
+            elif isinstance(img, str):
+                image_urls.append(img)
+
+    # Format 2: {"output": [...]} or {"output": {"url": "..."}}
+    if not image_urls and "output" in result_data:
+        output = result_data["output"]
+        if isinstance(output, list):
+            for item in output:
+                if isinstance(item, dict) and item.get("url"):
+                    image_urls.append(item["url"])
+                elif isinstance(item, str):
+                    image_urls.append(item)
+        elif isinstance(output, dict) and output.get("url"):
+            image_urls.append(output["url"])
+
+    # Format 3: {"data": {"images": [...]}} (nested)
+    if not image_urls and "data" in result_data:
+        data_obj = result_data["data"]
+        if isinstance(data_obj, dict):
+            nested_images = data_obj.get("images", [])
+            for img in nested_images:
+                if isinstance(img, dict) and img.get("url"):
+                    image_urls.append(img["url"])
+                elif isinstance(img, str):
+                    image_urls.append(img)
+
+    # Format 4: Direct URLs in result (some models)
+    if not image_urls:
+        for key in ["image_url", "url", "result_url"]:
+            if key in result_data and result_data[key]:
+                image_urls.append(result_data[key])
+                break
+
+    return image_urls
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=1, max=4),
@@ -558,6 +606,7 @@ async def submit_image_job(
     flux_enable_prompt_expansion: bool | None = None,  # dev, flex only
     flux_safety_tolerance: str | None = None,  # pro, flex, max only ("1"-"5")
     flux_acceleration: str | None = None,  # dev only ("none", "regular", "high")
+    fal_webhook: str | None = None,
 ) -> str:
     """
     Submit an image generation job to Fal's queue.
@@ -569,6 +618,9 @@ async def submit_image_job(
     - flux-2-max: zero-config (only safety_tolerance)
     - flux-kontext-dev/pro: configurable (guidance_scale, steps)
 
+    If a webhook URL is given (or configured via FAL_WEBHOOK_BASE_URL), Fal
+    POSTs the result to it on completion; polling remains as a fallback.
+
     Returns the request_id for polling.
     """
     if model not in IMAGE_MODELS:
@@ -655,26 +707,33 @@ async def submit_image_job(
                 guidance=payload.get("guidance_scale"),
                 all_keys=list(payload.keys()))
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            config["submit_url"],
-            headers=_get_headers(),
-            json=payload,
-        )
+    webhook_url = fal_webhook or get_webhook_url()
 
-        if response.status_code >= 400:
-            error_msg = f"Fal API error: {response.status_code} - {response.text}"
-            logger.error(error_msg, model=model)
-            raise ImageAPIError(error_msg)
+    from app.services.rate_limiter import provider_governor  # app.services imports this module
 
-        data = response.json()
-        request_id = data.get("request_id")
+    client = get_http_client(config["submit_url"])
+    response = await provider_governor.request(
+        "fal",
+        client.post,
+        config["submit_url"],
+        headers=_get_headers(),
+        json=payload,
+        params={"fal_webhook": webhook_url} if webhook_url else None,
+    )
 
-        if not request_id:
-            raise ImageAPIError("No request_id in Fal response")
+    if response.status_code >= 400:
+        error_msg = f"Fal API error: {response.status_code} - {response.text}"
+        logger.error(error_msg, model=model)
+        raise ImageAPIError(error_msg)
 
-        logger.info("Image job submitted to Fal", model=model, request_id=request_id)
-        return request_id
+    data = response.json()
+    request_id = data.get("request_id")
+
+    if not request_id:
+        raise ImageAPIError("No request_id in Fal response")
+
+    logger.info("Image job submitted to Fal", model=model, request_id=request_id)
+    return request_id
 
 
 @retry(
@@ -697,15 +756,19 @@ async def get_image_result(model: ImageModelType, request_id: str) -> dict:
     config = IMAGE_MODELS[model]
     url = f"{config['status_url']}/requests/{request_id}/status"
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.get(url, headers=_get_headers())
+    from app.services.rate_limiter import provider_governor  # app.services imports this module
 
-        if response.status_code >= 400:
-            error_msg = f"Fal API error: {response.status_code} - {response.text}"
-            logger.error(error_msg, model=model, request_id=request_id)
-            raise ImageAPIError(error_msg)
+    client = get_http_client(url)
+    response = await provider_governor.request(
+        "fal", client.get, url, headers=_get_headers()
+    )
 
-        data = response.json()
+    if response.status_code >= 400:
+        error_msg = f"Fal API error: {response.status_code} - {response.text}"
+        logger.error(error_msg, model=model, request_id=request_id)
+        raise ImageAPIError(error_msg)
+
+    data = response.json()
 
     # Map Fal statuses to our internal statuses
     fal_status = data.get("status", "").upper()
@@ -726,73 +789,36 @@ async def get_image_result(model: ImageModelType, request_id: str) -> dict:
     if status == "completed":
         # Get the actual result
         result_url = f"{config['status_url']}/requests/{request_id}"
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            result_response = await client.get(result_url, headers=_get_headers())
+        client = get_http_client(result_url)
+        result_response = await provider_governor.request(
+            "fal", client.get, result_url, headers=_get_headers()
+        )
+        logger.debug(
+            "Image result response", status_code=result_response.status_code
+        )
+        if result_response.status_code == 200:
+            result_data = result_response.json()
             logger.debug(
-                "Image result response", status_code=result_response.status_code
+                "Image result data",
+                model=model,
+                keys=list(result_data.keys()),
+                data=str(result_data)[:500],
+            )
+
+            image_urls = extract_image_urls(result_data)
+
+            result["image_urls"] = image_urls if image_urls else None
+            logger.debug(
+                "Parsed image URLs",
+                count=len(image_urls) if image_urls else 0,
+                urls=image_urls[:2] if image_urls else None,
+            )
+        else:
+            logger.error(
+                "Failed to fetch image result",
+                status_code=result_response.status_code,
+                text=result_response.text[:200],
             )
-            if result_response.status_code == 200:
-                result_data = result_response.json()
-                logger.debug(
-                    "Image result data",
-                    model=model,
-                    keys=list(result_data.keys()),
-                    data=str(result_data)[:500],
-                )
-
-                image_urls = []
-
-                # Format 1: {"images": [{"url": "..."}, ...]}
-                images = result_data.get("images", [])
-                if images:
-                    for img in images:
-                        if isinstance(img, dict) and img.get("url"):
-                            image_urls.append(img["url"])
-                        elif isinstance(img, str):
-                            image_urls.append(img)
-
-                # Format 2: {"output": [...]} or {"output": {"url": "..."}}
-                if not image_urls and "output" in result_data:
-                    output = result_data["output"]
-                    if isinstance(output, list):
-                        for item in output:
-                            if isinstance(item, dict) and item.get("url"):
-                                image_urls.append(item["url"])
-                            elif isinstance(item, str):
-                                image_urls.append(item)
-                    elif isinstance(output, dict) and output.get("url"):
-                        image_urls.append(output["url"])
-
-                # Format 3: {"data": {"images": [...]}} (nested)
-                if not image_urls and "data" in result_data:
-                    data_obj = result_data["data"]
-                    if isinstance(data_obj, dict):
-                        nested_images = data_obj.get("images", [])
-                        for img in nested_images:
-                            if isinstance(img, dict) and img.get("url"):
-                                image_urls.append(img["url"])
-                            elif isinstance(img, str):
-                                image_urls.append(img)
-
-                # Format 4: Direct URLs in result (some models)
-                if not image_urls:
-                    for key in ["image_url", "url", "result_url"]:
-                        if key in result_data and result_data[key]:
-                            image_urls.append(result_data[key])
-                            break
-
-                result["image_urls"] = image_urls if image_urls else None
-                logger.debug(
-                    "Parsed image URLs",
-                    count=len(image_urls) if image_urls else 0,
-                    urls=image_urls[:2] if image_urls else None,
-                )
-            else:
-                logger.error(
-                    "Failed to fetch image result",
-                    status_code=result_response.status_code,
-                    text=result_response.text[:200],
-                )
 
     elif status == "failed":
         result["error_message"] = data.get("error", "Unknown error from Fal")
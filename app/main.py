@@ -1,5 +1,6 @@
 from contextlib import asynccontextmanager
 from typing import Optional, List
+import json
 import os
 import structlog
 import tempfile
@@ -11,15 +12,18 @@ from app.config import settings
 if settings.fal_api_key:
     os.environ["FAL_KEY"] = settings.fal_api_key
 
-from fastapi import FastAPI, Depends, HTTPException, Query, UploadFile, File, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import traceback
 import time
 import uuid
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db, init_db
+from app.database import get_async_db, get_pool_stats, init_db
+from app.http_client import close_http_clients
 from app.models import Job, ImageJob
 from app.schemas import (
     JobCreate,
@@ -47,8 +51,15 @@ from app.routers.auth import router as auth_router
 from app.routers.credits import router as credits_router
 from app.routers.batch_jobs import router as batch_jobs_router
 from app.routers.templates import router as templates_router
-from app.services.batch_queue import init_batch_queue
+from app.routers.webhooks import router as webhooks_router
+from app.routers.runtime_stats import router as runtime_stats_router
+from app.services.batch_queue import get_batch_queue, init_batch_queue
+from app.services.runtime_stats import runtime_stats
+from app.services.rate_limiter import provider_governor
+from app.services.cache import response_cache
 from app.services.generation_service import dispatch_generation
+from app.services.job_notify import notify_jobs
+from app.services.pagination import COUNT_MODE_PATTERN, InvalidCursor, paginate_async
 
 logger = structlog.get_logger()
 
@@ -122,6 +133,11 @@ async def lifespan(app: FastAPI):
     )
     init_db()
 
+    # Per-model runtime statistics (ETAs, poll intervals, timeout budgets)
+    await runtime_stats.start()
+    # Hear 429 back-offs from the worker processes
+    await provider_governor.start()
+
     # Initialize the batch queue with the real generation function
     logger.info("Initializing batch job queue...")
     await init_batch_queue(
@@ -142,76 +158,55 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Failed to recover jobs on startup", error=str(e))
 
-    # Auto-generate thumbnails for existing images that don't have them
+    # Populate media_assets from existing steps on first run after upgrade
     try:
         import asyncio
+        from app.services.media_assets import ensure_media_assets_backfilled
 
-        asyncio.create_task(_generate_missing_thumbnails())
+        asyncio.create_task(ensure_media_assets_backfilled())
     except Exception as e:
-        logger.warning("Failed to start thumbnail generation", error=str(e))
-
-    yield
-
-    # Shutdown
-    logger.info("Shutting down i2v service")
+        logger.warning("Failed to start media asset backfill", error=str(e))
 
+    # Resume the checkpointed thumbnail backfill for images that don't have them
+    try:
+        from app.services.thumbnail_backfill import thumbnail_backfill
 
-async def _generate_missing_thumbnails():
-    """Background task to generate thumbnails for images that don't have them."""
-    import asyncio
-    from app.database import SessionLocal
-    from app.models import PipelineStep, StepStatus
-    from app.services.thumbnail import generate_thumbnails_batch
-
-    # Wait a bit for app to fully start
-    await asyncio.sleep(2)
-
-    logger.info("Starting background thumbnail generation for existing images")
+        if settings.thumbnail_backfill_on_startup:
+            thumbnail_backfill.start()
+    except Exception as e:
+        logger.warning("Failed to start thumbnail backfill", error=str(e))
 
-    db = SessionLocal()
+    # Keep the local R2 key index in sync with the bucket (skips HEAD per lookup)
     try:
-        # Get all i2i steps
-        steps = (
-            db.query(PipelineStep)
-            .filter(PipelineStep.step_type == "i2i")
-            .filter(PipelineStep.status == StepStatus.COMPLETED.value)
-            .all()
-        )
-
-        processed = 0
-        for step in steps:
-            outputs = step.get_outputs()
-            if not outputs or not outputs.get("image_urls"):
-                continue
+        import asyncio
+        from app.services.r2_cache import get_s3_client, run_r2_index_reconciliation
 
-            # Skip if thumbnails already exist
-            existing_thumbs = outputs.get("thumbnail_urls", [])
-            image_urls = outputs["image_urls"]
-            if existing_thumbs and len(existing_thumbs) == len(image_urls):
-                continue
+        if get_s3_client():
+            app.state.r2_index_task = asyncio.create_task(run_r2_index_reconciliation())
+    except Exception as e:
+        logger.warning("Failed to start R2 key index reconciliation", error=str(e))
 
-            # Generate thumbnails
-            try:
-                thumbnail_urls = await generate_thumbnails_batch(image_urls)
-                outputs["thumbnail_urls"] = thumbnail_urls
-                step.set_outputs(outputs)
-                db.commit()
-                processed += 1
-
-                # Don't overwhelm the system
-                if processed % 10 == 0:
-                    logger.info(f"Generated thumbnails for {processed} steps so far...")
-                    await asyncio.sleep(0.5)
-            except Exception as e:
-                logger.warning(f"Failed to generate thumbnail for step {step.id}: {e}")
-                continue
-
-        logger.info(f"Thumbnail generation complete. Processed {processed} steps.")
+    yield
 
-    except Exception as e:
-        logger.error(f"Thumbnail generation failed: {e}")
-    finally:
-        db.close()
+    # Shutdown
+    logger.info("Shutting down i2v service")
+    from app.services.poll_scheduler import fal_poll_scheduler
+    from app.services.r2_cache import r2_storage
+    from app.services.thumbnail import thumbnail_engine
+    from app.services.thumbnail_backfill import thumbnail_backfill
+
+    # Release in-flight batch items so the next process resumes them immediately
+    await get_batch_queue().stop()
+    r2_index_task = getattr(app.state, "r2_index_task", None)
+    if r2_index_task is not None:
+        r2_index_task.cancel()
+    await thumbnail_backfill.stop()
+    await fal_poll_scheduler.shutdown()
+    await runtime_stats.stop()
+    await provider_governor.stop()
+    await close_http_clients()
+    r2_storage.shutdown()
+    thumbnail_engine.shutdown()
 
 
 app = FastAPI(
@@ -238,6 +233,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Add request logging middleware (logs all requests/responses)
@@ -296,6 +292,8 @@ app.include_router(batch_jobs_router, prefix="/api")  # Batch jobs: /api/batch-j
 app.include_router(templates_router, prefix="/api")  # Templates: /api/templates
 app.include_router(pipelines_router, prefix="/api")
 app.include_router(nsfw_router, prefix="/api")
+app.include_router(webhooks_router, prefix="/api")  # Webhooks: /api/webhooks/fal
+app.include_router(runtime_stats_router, prefix="/api")  # Runtime stats: /api/runtime-stats
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -311,7 +309,7 @@ async def api_health_check():
 
 
 @app.get("/api/status")
-async def get_api_status(db: Session = Depends(get_db)):
+async def get_api_status(db: AsyncSession = Depends(get_async_db)):
     """Get service status with job counts by status."""
     # Get orchestrator stats for production hardening visibility
     try:
@@ -321,28 +319,32 @@ async def get_api_status(db: Session = Depends(get_db)):
     except Exception:
         orchestrator_stats = None
 
+    job_counts = dict(
+        (await db.execute(select(Job.wan_status, func.count()).group_by(Job.wan_status))).all()
+    )
+    image_job_counts = dict(
+        (await db.execute(select(ImageJob.status, func.count()).group_by(ImageJob.status))).all()
+    )
+
     return {
         "status": "ok",
         "jobs": {
-            "pending": db.query(Job).filter(Job.wan_status == "pending").count(),
-            "submitted": db.query(Job).filter(Job.wan_status == "submitted").count(),
-            "running": db.query(Job).filter(Job.wan_status == "running").count(),
-            "completed": db.query(Job).filter(Job.wan_status == "completed").count(),
-            "failed": db.query(Job).filter(Job.wan_status == "failed").count(),
+            name: job_counts.get(name, 0)
+            for name in ("pending", "claimed", "submitted", "running", "completed", "failed")
         },
         "image_jobs": {
-            "pending": db.query(ImageJob).filter(ImageJob.status == "pending").count(),
-            "completed": db.query(ImageJob)
-            .filter(ImageJob.status == "completed")
-            .count(),
-            "failed": db.query(ImageJob).filter(ImageJob.status == "failed").count(),
+            name: image_job_counts.get(name, 0)
+            for name in ("pending", "claimed", "completed", "failed")
         },
         "hardening": orchestrator_stats,
+        "providers": provider_governor.get_stats(),
+        "cache": response_cache.get_stats(),
+        "database": get_pool_stats(),
     }
 
 
 @app.post("/jobs", response_model=JobResponse, status_code=201)
-async def create_job(job_data: JobCreate, db: Session = Depends(get_db)):
+async def create_job(job_data: JobCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new video generation job."""
     job = Job(
         image_url=job_data.image_url,
@@ -351,21 +353,23 @@ async def create_job(job_data: JobCreate, db: Session = Depends(get_db)):
         resolution=job_data.resolution,
         duration_sec=job_data.duration_sec,
         model=job_data.model,
-        provider=job_data.provider,
+        provider=job_data.get_provider(),
         wan_status="pending",
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
+
+    await notify_jobs("video")
 
     logger.info("Job created", job_id=job.id, provider=job.provider, status=job.wan_status)
     return job
 
 
 @app.get("/jobs/{job_id}", response_model=JobResponse)
-async def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific job by ID."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
@@ -373,25 +377,50 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
 
 @app.get("/jobs", response_model=List[JobResponse])
 async def list_jobs(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by wan_status"),
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    offset: int = Query(0, ge=0, description="Legacy offset (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    count: str = Query("none", pattern=COUNT_MODE_PATTERN, description="Total count mode"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List all jobs with optional filtering and pagination."""
-    query = db.query(Job)
+    """List all jobs with optional filtering and keyset pagination.
 
-    if status:
-        valid_statuses = ["pending", "submitted", "running", "completed", "failed"]
-        if status not in valid_statuses:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid status. Must be one of: {valid_statuses}",
-            )
-        query = query.filter(Job.wan_status == status)
+    The next page's cursor is returned in the ``X-Next-Cursor`` header and
+    the total (when requested) in ``X-Total-Count``.
+    """
+    valid_statuses = ["pending", "claimed", "submitted", "running", "completed", "failed"]
+    if status and status not in valid_statuses:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Must be one of: {valid_statuses}",
+        )
+
+    def build_query(session: Session):
+        query = session.query(Job)
+        if status:
+            query = query.filter(Job.wan_status == status)
+        return query
+
+    try:
+        page = await paginate_async(
+            db,
+            build_query,
+            order=[(Job.created_at, True), (Job.id, True)],
+            limit=limit,
+            cursor=cursor,
+            count=count,
+            offset=offset,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    jobs = query.order_by(Job.created_at.desc()).offset(offset).limit(limit).all()
-    return jobs
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+    return page.items
 
 
 # ============== Image Generation Endpoints ==============
@@ -400,11 +429,16 @@ async def list_jobs(
 @app.get("/images/models", response_model=ImageModelsResponse)
 async def get_image_models():
     """List available image generation models with pricing."""
-    return {"models": list_image_models()}
+
+    async def load():
+        return {"models": list_image_models()}
+
+    # Built from constants: nothing to share or invalidate across processes
+    return await response_cache.get_or_set("image-models", load, ttl=3600, shared=False)
 
 
 @app.post("/images", response_model=ImageJobResponse, status_code=201)
-async def create_image_job(job_data: ImageJobCreate, db: Session = Depends(get_db)):
+async def create_image_job(job_data: ImageJobCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new image generation job."""
     job = ImageJob(
         source_image_url=job_data.source_image_url,
@@ -417,17 +451,19 @@ async def create_image_job(job_data: ImageJobCreate, db: Session = Depends(get_d
         status="pending",
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
+
+    await notify_jobs("image")
 
     logger.info("Image job created", job_id=job.id, model=job.model, status=job.status)
     return job
 
 
 @app.get("/images/{job_id}", response_model=ImageJobResponse)
-async def get_image_job(job_id: int, db: Session = Depends(get_db)):
+async def get_image_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific image job by ID."""
-    job = db.query(ImageJob).filter(ImageJob.id == job_id).first()
+    job = await db.get(ImageJob, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Image job not found")
     return job
@@ -439,25 +475,25 @@ async def list_image_jobs(
     model: Optional[str] = Query(None, description="Filter by model"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all image jobs with optional filtering and pagination."""
-    query = db.query(ImageJob)
+    query = select(ImageJob)
 
     if status:
-        valid_statuses = ["pending", "submitted", "running", "completed", "failed"]
+        valid_statuses = ["pending", "claimed", "submitted", "running", "completed", "failed"]
         if status not in valid_statuses:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid status. Must be one of: {valid_statuses}",
             )
-        query = query.filter(ImageJob.status == status)
+        query = query.where(ImageJob.status == status)
 
     if model:
-        query = query.filter(ImageJob.model == model)
+        query = query.where(ImageJob.model == model)
 
-    jobs = query.order_by(ImageJob.created_at.desc()).offset(offset).limit(limit).all()
-    return jobs
+    query = query.order_by(ImageJob.created_at.desc()).offset(offset).limit(limit)
+    return (await db.execute(query)).scalars().all()
 
 
 # ============== Face Swap Endpoints ==============
@@ -578,16 +614,8 @@ async def upload_file(file: UploadFile = File(...)):
 # ============== Prompt Generator Endpoints ==============
 
 
-@app.post("/api/generate-prompts", response_model=PromptGeneratorResponse)
-async def generate_prompts_endpoint(request: PromptGeneratorRequest):
-    """
-    Generate i2i prompts with on-screen captions for Instagram/TikTok style photos.
-
-    Uses Claude to generate prompts based on style (cosplay or cottagecore)
-    and location (outdoor, indoor, or mixed).
-    """
-    from app.services.prompt_generator import generate_prompts
-
+def _prompt_generator_args(request: PromptGeneratorRequest) -> dict:
+    """Validate a prompt generator request and return generate_prompts kwargs."""
     # Check for API key
     api_key = settings.anthropic_api_key
     if not api_key:
@@ -603,17 +631,32 @@ async def generate_prompts_endpoint(request: PromptGeneratorRequest):
             detail="Count must be between 1 and 50",
         )
 
+    return dict(
+        api_key=api_key,
+        count=request.count,
+        style=request.style,
+        location=request.location,
+        bust_size=request.bust_size,
+        preserve_identity=request.preserve_identity,
+        framing=request.framing,
+        realism_preset=request.realism_preset,
+    )
+
+
+@app.post("/api/generate-prompts", response_model=PromptGeneratorResponse)
+async def generate_prompts_endpoint(request: PromptGeneratorRequest):
+    """
+    Generate i2i prompts with on-screen captions for Instagram/TikTok style photos.
+
+    Uses Claude to generate prompts based on style (cosplay or cottagecore)
+    and location (outdoor, indoor, or mixed).
+    """
+    from app.services.prompt_generator import generate_prompts
+
+    kwargs = _prompt_generator_args(request)
+
     try:
-        prompts = await generate_prompts(
-            api_key=api_key,
-            count=request.count,
-            style=request.style,
-            location=request.location,
-            bust_size=request.bust_size,
-            preserve_identity=request.preserve_identity,
-            framing=request.framing,
-            realism_preset=request.realism_preset,
-        )
+        prompts = await generate_prompts(**kwargs)
 
         return PromptGeneratorResponse(
             prompts=prompts,
@@ -630,3 +673,47 @@ async def generate_prompts_endpoint(request: PromptGeneratorRequest):
             status_code=500,
             detail=f"Prompt generation failed: {str(e)}",
         )
+
+
+@app.post("/api/generate-prompts/stream")
+async def generate_prompts_stream_endpoint(request: PromptGeneratorRequest):
+    """
+    Server-sent events variant of /api/generate-prompts.
+
+    Emits a ``prompt`` event ({"index", "prompt"}) as each prompt completes,
+    then ``done`` (the PromptGeneratorResponse fields minus ``prompts``), or
+    ``error`` ({"detail"}) if generation fails part-way.
+    """
+    from app.services.prompt_generator import stream_prompts
+
+    kwargs = _prompt_generator_args(request)
+
+    def event(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    async def events():
+        count = 0
+        try:
+            async for prompt in stream_prompts(**kwargs):
+                yield event("prompt", {"index": count, "prompt": prompt})
+                count += 1
+        except Exception as e:
+            logger.error("Prompt generation failed", error=str(e))
+            yield event("error", {"detail": f"Prompt generation failed: {str(e)}"})
+            return
+        yield event(
+            "done",
+            {
+                "count": count,
+                "style": request.style,
+                "location": request.location,
+                "framing": request.framing,
+                "realism_preset": request.realism_preset,
+            },
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
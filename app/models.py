@@ -8,6 +8,7 @@ from sqlalchemy import (
     Numeric,
     ForeignKey,
     Boolean,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -194,6 +195,7 @@ class CreditTransaction(Base):
         Index("idx_credit_tx_user", "user_id"),
         Index("idx_credit_tx_source", "source"),
         Index("idx_credit_tx_created", "created_at"),
+        Index("idx_credit_tx_user_created", "user_id", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -335,6 +337,7 @@ class BatchJobItemStatus(str, enum.Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELED = "canceled"
 
 
 class BatchJobItem(Base):
@@ -364,6 +367,11 @@ class BatchJobItem(Base):
     finished_at = Column(DateTime, nullable=True)
     duration_ms = Column(Integer, nullable=True)
 
+    # Queue lease (see app.services.batch_queue)
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # UTC; running: reclaimable, pending: retry at
+    claim_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Timestamps
     created_at = Column(DateTime, default=func.now(), nullable=False)
 
@@ -374,6 +382,7 @@ class BatchJobItem(Base):
         Index("idx_batch_item_job", "batch_job_id"),
         Index("idx_batch_item_status", "status"),
         Index("idx_batch_item_index", "batch_job_id", "item_index"),
+        Index("idx_batch_item_status_lease", "status", "lease_expires_at"),
     )
 
     def __repr__(self) -> str:
@@ -474,6 +483,7 @@ class Template(Base):
         Index("idx_template_active", "is_active"),
         Index("idx_template_featured", "is_featured"),
         Index("idx_template_tier", "tier_required"),
+        Index("idx_template_listing", "is_active", "is_featured", "usage_count", "id"),
     )
 
     def __repr__(self) -> str:
@@ -628,6 +638,7 @@ class Pipeline(Base):
         Index("idx_pipeline_favorite", "is_favorite"),
         Index("idx_pipeline_hidden", "is_hidden"),
         Index("idx_pipeline_created", "created_at"),
+        Index("idx_pipeline_listing", "is_hidden", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -755,6 +766,58 @@ class PipelineStep(Base):
         }
 
 
+class MediaAsset(Base):
+    """One generated image or video, normalized out of ``PipelineStep.outputs``.
+
+    Rows are written when a step completes (see ``app.services.media_assets``)
+    so the image library, counts and per-pipeline output counts are indexed
+    SQL queries instead of JSON parsing per step.
+    """
+
+    __tablename__ = "media_assets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pipeline_id = Column(
+        Integer, ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False
+    )
+    step_id = Column(
+        Integer, ForeignKey("pipeline_steps.id", ondelete="CASCADE"), nullable=False
+    )
+    output_index = Column(Integer, nullable=False, default=0)
+    kind = Column(String(10), nullable=False)  # image, video
+    url = Column(Text, nullable=False)
+    thumbnail_url = Column(Text, nullable=True)
+    source_image_url = Column(Text, nullable=True)
+    model = Column(String(100), nullable=True)
+    prompt = Column(Text, nullable=True)
+    prompt_hash = Column(String(64), nullable=True)  # sha256 of the prompt
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_media_step_output", "step_id", "output_index", unique=True),
+        Index("idx_media_kind_created", "kind", "created_at", "id"),
+        Index("idx_media_pipeline_kind", "pipeline_id", "kind"),
+        Index("idx_media_prompt_hash", "prompt_hash"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<MediaAsset(id={self.id}, kind={self.kind}, step_id={self.step_id})>"
+
+    def to_library_dict(self) -> dict:
+        """Shape used by the image library endpoint."""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "thumbnail_url": self.thumbnail_url,
+            "step_id": self.step_id,
+            "pipeline_id": self.pipeline_id,
+            "source_image": self.source_image_url,
+            "prompt": self.prompt,
+            "model": self.model or "unknown",
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
 class UploadCache(Base):
     """Cache for uploaded images to Fal CDN."""
 
@@ -796,12 +859,23 @@ class Job(Base):
     local_video_path = Column(String, nullable=True)  # Path to downloaded video
     error_message = Column(String, nullable=True)
 
+    # Worker claim lease (see app.services.job_claims)
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # UTC; reclaimable once passed
+    claim_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Timestamps
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(
         DateTime, default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    __table_args__ = (
+        Index("idx_job_created", "created_at", "id"),
+        Index("idx_job_status_created", "wan_status", "created_at", "id"),
+        Index("idx_job_status_lease", "wan_status", "lease_expires_at"),
+    )
+
     def __repr__(self) -> str:
         return (
             f"<Job(id={self.id}, status={self.wan_status}, created={self.created_at})>"
@@ -847,12 +921,21 @@ class ImageJob(Base):
     local_image_paths = Column(String, nullable=True)  # JSON array of local paths
     error_message = Column(String, nullable=True)
 
+    # Worker claim lease (see app.services.job_claims)
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # UTC; reclaimable once passed
+    claim_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Timestamps
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(
         DateTime, default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    __table_args__ = (
+        Index("idx_image_job_status_lease", "status", "lease_expires_at"),
+    )
+
     def __repr__(self) -> str:
         return f"<ImageJob(id={self.id}, model={self.model}, status={self.status})>"
 
@@ -881,3 +964,91 @@ class ImageJob(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+# ============== Storage Models ==============
+
+
+class R2Object(Base):
+    """Local index of object keys known to exist in the R2 bucket.
+
+    Lets cache lookups skip a HEAD request per object. Updated on every
+    successful upload and reconciled periodically against a bucket listing.
+    """
+
+    __tablename__ = "r2_objects"
+
+    key = Column(String(512), primary_key=True)
+    size_bytes = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<R2Object(key={self.key}, size={self.size_bytes})>"
+
+
+class R2ContentAlias(Base):
+    """Maps a source URL to the content-addressed R2 object holding its bytes.
+
+    Media is stored once per SHA-256 of its content; every source URL that
+    produced those bytes gets an alias row, so repeat lookups by URL (or by
+    content hash) resolve without downloading or hashing again.
+    """
+
+    __tablename__ = "r2_content_aliases"
+
+    url_hash = Column(String(64), primary_key=True)  # sha256 of the source URL
+    content_hash = Column(String(64), nullable=False, index=True)
+    content_key = Column(String(512), nullable=False)
+    size_bytes = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<R2ContentAlias(url_hash={self.url_hash[:12]}, key={self.content_key})>"
+
+
+class ModelRuntimeStat(Base):
+    """Streaming latency histogram for one model/kind/resolution/duration.
+
+    Maintained by app.services.runtime_stats; ``histogram`` is the JSON form
+    of a log-bucketed, decaying LatencyHistogram in seconds. Unset
+    resolution/duration are stored as "" and 0 so the key stays unique.
+    """
+
+    __tablename__ = "model_runtime_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    model = Column(String(100), nullable=False)
+    kind = Column(String(30), nullable=False)  # video, image, batch-<output_type>, ...
+    resolution = Column(String(20), nullable=False, default="")
+    duration_sec = Column(Integer, nullable=False, default=0)
+    samples = Column(Integer, nullable=False, default=0)  # Observations ever recorded
+    histogram = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("model", "kind", "resolution", "duration_sec", name="uq_model_runtime_key"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ModelRuntimeStat(model={self.model}, kind={self.kind}, samples={self.samples})>"
+
+
+class PromptEnhancement(Base):
+    """Durable store for Claude prompt enhancements.
+
+    Keyed by PromptEnhancer's cache digest, so a hit survives restarts and
+    the short in-process cache TTL when no Redis is configured.
+    ``variations`` is the JSON list returned by Claude.
+    """
+
+    __tablename__ = "prompt_enhancements"
+
+    cache_key = Column(String(100), primary_key=True)  # "prompt-enhance:<sha256>"
+    variations = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<PromptEnhancement(key={self.cache_key[:12]}, expires_at={self.expires_at})>"
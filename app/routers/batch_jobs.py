@@ -4,10 +4,11 @@ from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, BatchJob, BatchJobItem, BatchJobStatus
 from app.core.security import get_current_user
 from app.services.batch_queue import get_batch_queue, JobState
@@ -127,7 +128,7 @@ async def create_batch_job(
     request: CreateBatchJobRequest,
     background_tasks: BackgroundTasks,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new batch generation job.
@@ -155,7 +156,7 @@ async def create_batch_job(
         )
 
         # Fetch the created job
-        job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
+        job = await db.scalar(select(BatchJob).where(BatchJob.job_id == job_id))
         if not job:
             raise HTTPException(status_code=500, detail="Job created but not found")
 
@@ -198,16 +199,20 @@ async def list_batch_jobs(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all batch jobs for the current user."""
-    query = db.query(BatchJob).filter(BatchJob.user_id == user.id)
+    query = select(BatchJob).where(BatchJob.user_id == user.id)
 
     if status_filter:
-        query = query.filter(BatchJob.status == status_filter)
+        query = query.where(BatchJob.status == status_filter)
 
-    total = query.count()
-    jobs = query.order_by(BatchJob.created_at.desc()).offset(offset).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    jobs = (
+        await db.scalars(
+            query.order_by(BatchJob.created_at.desc()).offset(offset).limit(limit)
+        )
+    ).all()
 
     return BatchJobListResponse(
         jobs=[
@@ -241,10 +246,10 @@ async def list_batch_jobs(
 async def get_batch_job(
     job_id: str,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get details of a specific batch job."""
-    job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
+    job = await db.scalar(select(BatchJob).where(BatchJob.job_id == job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -290,22 +295,24 @@ async def get_batch_job_items(
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get items for a specific batch job."""
-    job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
+    job = await db.scalar(select(BatchJob).where(BatchJob.job_id == job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     if job.user_id != user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    query = db.query(BatchJobItem).filter(BatchJobItem.batch_job_id == job.id)
+    query = select(BatchJobItem).where(BatchJobItem.batch_job_id == job.id)
 
     if status_filter:
-        query = query.filter(BatchJobItem.status == status_filter)
+        query = query.where(BatchJobItem.status == status_filter)
 
-    items = query.order_by(BatchJobItem.item_index).offset(offset).limit(limit).all()
+    items = (
+        await db.scalars(query.order_by(BatchJobItem.item_index).offset(offset).limit(limit))
+    ).all()
 
     return [
         BatchJobItemResponse(
@@ -4,15 +4,17 @@ from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
-from app.database import get_db
-from app.models import User, CreditTransaction
+from app.database import get_async_db
+from app.models import User
 from app.core.security import get_current_user, require_role
+from app.services.cache import response_cache
+from app.services.pagination import COUNT_MODE_PATTERN, InvalidCursor
 from app.services.credits import (
     get_balance,
-    get_transaction_history,
+    get_transaction_page,
     add_credits,
     deduct_credits,
     calculate_job_cost,
@@ -47,7 +49,8 @@ class TransactionResponse(BaseModel):
 class TransactionListResponse(BaseModel):
     """Response for transaction list."""
     transactions: List[TransactionResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless requested
+    next_cursor: Optional[str] = None
 
 
 class CostEstimateRequest(BaseModel):
@@ -94,25 +97,29 @@ async def get_my_balance(user: User = Depends(get_current_user)):
 @router.get("/transactions", response_model=TransactionListResponse)
 async def get_my_transactions(
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Legacy offset (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description="Total mode (default: first page only)"
+    ),
     source: Optional[str] = Query(None, description="Filter by source: payment, job, manual, promo, refund"),
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get current user's credit transaction history."""
-    transactions = get_transaction_history(
-        db=db,
-        user_id=user.id,
-        limit=limit,
-        offset=offset,
-        source=source,
-    )
-
-    # Get total count for pagination
-    total_query = db.query(CreditTransaction).filter(CreditTransaction.user_id == user.id)
-    if source:
-        total_query = total_query.filter(CreditTransaction.source == source)
-    total = total_query.count()
+    try:
+        page = await db.run_sync(
+            get_transaction_page,
+            user_id=user.id,
+            limit=limit,
+            offset=offset,
+            source=source,
+            cursor=cursor,
+            count=count,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    transactions = page.items
 
     return TransactionListResponse(
         transactions=[
@@ -127,7 +134,8 @@ async def get_my_transactions(
             )
             for t in transactions
         ],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
 
 
@@ -158,7 +166,12 @@ async def estimate_cost(
 @router.get("/pricing", response_model=PricingResponse)
 async def get_pricing():
     """Get current pricing table (public endpoint)."""
-    return PricingResponse(pricing=PRICING)
+
+    async def load():
+        return PricingResponse(pricing=PRICING).model_dump(mode="json")
+
+    # Built from constants: nothing to share or invalidate across processes
+    return await response_cache.get_or_set("pricing", load, ttl=3600, shared=False)
 
 
 # ============== Admin Endpoints ==============
@@ -168,11 +181,11 @@ async def get_pricing():
 async def admin_adjust_credits(
     request: AdminCreditAdjustRequest,
     admin: User = Depends(require_role("admin")),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin endpoint to manually adjust user credits."""
     # Check target user exists
-    target_user = db.query(User).filter(User.id == request.user_id).first()
+    target_user = await db.get(User, request.user_id)
     if not target_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -181,8 +194,8 @@ async def admin_adjust_credits(
 
     try:
         if request.amount > 0:
-            transaction = add_credits(
-                db=db,
+            transaction = await db.run_sync(
+                add_credits,
                 user_id=request.user_id,
                 amount=request.amount,
                 description=f"Admin adjustment: {request.description}",
@@ -190,8 +203,8 @@ async def admin_adjust_credits(
                 reference_id=f"admin:{admin.id}",
             )
         else:
-            transaction = deduct_credits(
-                db=db,
+            transaction = await db.run_sync(
+                deduct_credits,
                 user_id=request.user_id,
                 amount=abs(request.amount),
                 description=f"Admin adjustment: {request.description}",
@@ -226,10 +239,10 @@ async def admin_adjust_credits(
 async def admin_get_user_balance(
     user_id: int,
     admin: User = Depends(require_role("admin")),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin endpoint to view any user's credit balance."""
-    target_user = db.query(User).filter(User.id == user_id).first()
+    target_user = await db.get(User, user_id)
     if not target_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -248,26 +261,34 @@ async def admin_get_user_balance(
 async def admin_get_user_transactions(
     user_id: int,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Legacy offset (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description="Total mode (default: first page only)"
+    ),
     admin: User = Depends(require_role("admin")),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin endpoint to view any user's transaction history."""
-    target_user = db.query(User).filter(User.id == user_id).first()
+    target_user = await db.get(User, user_id)
     if not target_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    transactions = get_transaction_history(
-        db=db,
-        user_id=user_id,
-        limit=limit,
-        offset=offset,
-    )
-
-    total = db.query(CreditTransaction).filter(CreditTransaction.user_id == user_id).count()
+    try:
+        page = await db.run_sync(
+            get_transaction_page,
+            user_id=user_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count=count,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    transactions = page.items
 
     return TransactionListResponse(
         transactions=[
@@ -282,5 +303,6 @@ async def admin_get_user_transactions(
             )
             for t in transactions
         ],
-        total=total,
+        total=page.total,
+        next_cursor=page.next_cursor,
     )
@@ -3,14 +3,16 @@
 from typing import Optional, List
 from decimal import Decimal
 import structlog
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session, load_only
-from sqlalchemy import func
-
-from app.database import get_db
-from app.models import Pipeline, PipelineStep, PipelineStatus, StepStatus
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy import delete, func, select
+
+from app.config import settings
+from app.database import get_async_db, get_db
+from app.http_client import get_http_client
+from app.models import MediaAsset, Pipeline, PipelineStep, PipelineStatus, StepStatus
 from app.schemas import (
     PipelineCreate,
     PipelineUpdate,
@@ -32,14 +34,23 @@ from app.schemas import (
 )
 from app.services.prompt_enhancer import prompt_enhancer
 from app.services.cost_calculator import cost_calculator
-from app.services.pipeline_executor import pipeline_executor
+from app.services.pipeline_executor import pipeline_executor, provider_for_model
+from app.services.rate_limiter import provider_governor
 from app.services.generation_service import generate_image, generate_video
 from app.services.thumbnail import generate_thumbnails_batch
+from app.services.thumbnail_backfill import thumbnail_backfill
+from app.services.media_assets import sync_step_assets
+from app.services.job_notify import notify_jobs
+from app.services.pagination import (
+    COUNT_MODE_PATTERN,
+    InvalidCursor,
+    paginate,
+    paginate_async,
+)
 from app.services.cache import (
-    cache_get,
-    cache_set,
     invalidate_pipelines_cache,
     make_cache_key,
+    response_cache,
 )
 
 logger = structlog.get_logger()
@@ -50,6 +61,19 @@ router = APIRouter(prefix="/pipelines", tags=["pipelines"])
 # ============== Pipeline CRUD ==============
 
 
+async def _load_pipeline(db: AsyncSession, pipeline_id: int) -> Pipeline:
+    """Fetch a pipeline with its steps eagerly loaded (async sessions can't lazy-load)."""
+    pipeline = await db.scalar(
+        select(Pipeline)
+        .options(selectinload(Pipeline.steps))
+        .where(Pipeline.id == pipeline_id)
+        .execution_options(populate_existing=True)
+    )
+    if not pipeline:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return pipeline
+
+
 @router.post("", response_model=PipelineResponse, status_code=201)
 async def create_pipeline(
     pipeline_data: PipelineCreate,
@@ -95,40 +119,32 @@ async def create_pipeline(
     db.refresh(pipeline)
 
     await invalidate_pipelines_cache()
+    await notify_jobs("pipeline")
     logger.info("Pipeline created", pipeline_id=pipeline.id, steps=len(pipeline.steps))
     return pipeline
 
 
-@router.get("", response_model=PipelineSummaryListResponse)
-async def list_pipelines(
-    status: Optional[str] = Query(None, description="Filter by status"),
-    tag: Optional[str] = Query(None, description="Filter by tag"),
-    search: Optional[str] = Query(None, description="Search by name or prompt"),
-    favorites: bool = Query(False, description="Show only favorites"),
-    hidden: bool = Query(False, description="Include hidden pipelines"),
-    limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+def _pipeline_summary_page(
+    db: Session,
+    status: Optional[str],
+    tag: Optional[str],
+    search: Optional[str],
+    favorites: bool,
+    hidden: bool,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    count: Optional[str],
 ):
-    """List all pipelines with lightweight summaries (no steps/outputs loaded)."""
-    import json
+    """
+    One page of pipelines plus per-pipeline step summaries.
 
-    # Check Redis cache first (skip cache if searching)
-    cache_key = make_cache_key(
-        "pipelines",
-        status=status,
-        tag=tag,
-        search=search,
-        favorites=favorites,
-        hidden=hidden,
-        limit=limit,
-        offset=offset,
-    )
-    cached = await cache_get(cache_key)
-    if cached:
-        logger.debug("Cache hit", key=cache_key)
-        return json.loads(cached)
+    Sync ORM code; ``list_pipelines`` runs it on its async session via
+    ``run_sync``.
 
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
     # Base query - only load pipeline columns, NOT relationships
     query = db.query(Pipeline).options(
         load_only(
@@ -144,12 +160,6 @@ async def list_pipelines(
     )
 
     if status:
-        valid_statuses = ["pending", "running", "paused", "completed", "failed"]
-        if status not in valid_statuses:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid status. Must be one of: {valid_statuses}",
-            )
         query = query.filter(Pipeline.status == status)
 
     # Filter by tag (search in JSON array)
@@ -169,19 +179,21 @@ async def list_pipelines(
     if not hidden:
         query = query.filter(Pipeline.is_hidden == 0)
 
-    total = query.count()
-    pipelines = (
-        query.order_by(Pipeline.created_at.desc()).offset(offset).limit(limit).all()
+    page = paginate(
+        query,
+        order=[(Pipeline.created_at, True), (Pipeline.id, True)],
+        limit=limit,
+        cursor=cursor,
+        count=count,
+        offset=offset,
     )
+    pipelines = page.items
 
     # Get step counts and summary info efficiently
     pipeline_ids = [p.id for p in pipelines]
 
     step_summaries = {}
     if pipeline_ids:
-        # Query step counts, cost, and output counts using SQLite JSON function
-        from sqlalchemy import text
-
         # Step counts and costs (fast aggregation)
         step_query = (
             db.query(
@@ -201,23 +213,16 @@ async def list_pipelines(
                 "output_count": 0,
             }
 
-        # Count outputs using SQL JSON function (much faster than loading all JSON)
-        # Use raw connection for SQLite-specific JSON functions
-        # Note: pipeline_ids are integers from DB query, safe to format directly
-        # Using numbered params for explicit parameterization
-        params = {f"id_{i}": pid for i, pid in enumerate(pipeline_ids)}
-        placeholders = ",".join([f":id_{i}" for i in range(len(pipeline_ids))])
-        output_count_sql = f"""
-            SELECT pipeline_id,
-                   SUM(COALESCE(json_array_length(json_extract(outputs, '$.items')), 0)) as output_count
-            FROM pipeline_steps
-            WHERE pipeline_id IN ({placeholders}) AND outputs IS NOT NULL
-            GROUP BY pipeline_id
-        """
-        output_counts = db.execute(text(output_count_sql), params).fetchall()
-        for row in output_counts:
-            if row[0] in step_summaries:
-                step_summaries[row[0]]["output_count"] = row[1] or 0
+        # Count outputs from media_assets (indexed on pipeline_id, kind)
+        output_counts = (
+            db.query(MediaAsset.pipeline_id, func.count(MediaAsset.id))
+            .filter(MediaAsset.pipeline_id.in_(pipeline_ids))
+            .group_by(MediaAsset.pipeline_id)
+            .all()
+        )
+        for pipeline_id, output_count in output_counts:
+            if pipeline_id in step_summaries:
+                step_summaries[pipeline_id]["output_count"] = output_count
 
         # Get ONLY first step (step_order == 0) for model/prompt/thumbnail - single query
         first_steps = (
@@ -283,33 +288,89 @@ async def list_pipelines(
                 }
             )
 
-    # Build lightweight response
-    summaries = []
-    for p in pipelines:
-        summary_data = step_summaries.get(p.id, {})
-        summaries.append(
-            PipelineSummary(
-                id=p.id,
-                name=p.name,
-                status=p.status,
-                created_at=p.created_at,
-                updated_at=p.updated_at,
-                tags=json.loads(p.tags) if p.tags else None,
-                is_favorite=bool(p.is_favorite),
-                is_hidden=bool(p.is_hidden),
-                step_count=summary_data.get("step_count", 0),
-                total_cost=summary_data.get("total_cost"),
-                model_info=summary_data.get("model_info"),
-                first_prompt=summary_data.get("first_prompt"),
-                first_thumbnail_url=summary_data.get("first_thumbnail_url"),
-                output_count=summary_data.get("output_count", 0),
-            )
+    return page, step_summaries
+
+
+@router.get("", response_model=PipelineSummaryListResponse)
+async def list_pipelines(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    tag: Optional[str] = Query(None, description="Filter by tag"),
+    search: Optional[str] = Query(None, description="Search by name or prompt"),
+    favorites: bool = Query(False, description="Show only favorites"),
+    hidden: bool = Query(False, description="Include hidden pipelines"),
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Legacy offset (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description="Total mode (default: first page only)"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List all pipelines with lightweight summaries (no steps/outputs loaded)."""
+    import json
+
+    valid_statuses = ["pending", "running", "paused", "completed", "failed"]
+    if status and status not in valid_statuses:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Must be one of: {valid_statuses}",
         )
 
-    # Cache response before returning
-    response = {"pipelines": summaries, "total": total}
-    await cache_set(cache_key, json.dumps(response, default=str))
-    return response
+    async def load():
+        try:
+            page, step_summaries = await db.run_sync(
+                _pipeline_summary_page,
+                status=status,
+                tag=tag,
+                search=search,
+                favorites=favorites,
+                hidden=hidden,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                count=count,
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        pipelines = page.items
+
+        # Build lightweight response
+        summaries = []
+        for p in pipelines:
+            summary_data = step_summaries.get(p.id, {})
+            summaries.append(
+                PipelineSummary(
+                    id=p.id,
+                    name=p.name,
+                    status=p.status,
+                    created_at=p.created_at,
+                    updated_at=p.updated_at,
+                    tags=json.loads(p.tags) if p.tags else None,
+                    is_favorite=bool(p.is_favorite),
+                    is_hidden=bool(p.is_hidden),
+                    step_count=summary_data.get("step_count", 0),
+                    total_cost=summary_data.get("total_cost"),
+                    model_info=summary_data.get("model_info"),
+                    first_prompt=summary_data.get("first_prompt"),
+                    first_thumbnail_url=summary_data.get("first_thumbnail_url"),
+                    output_count=summary_data.get("output_count", 0),
+                ).model_dump(mode="json")
+            )
+        return {"pipelines": summaries, "total": page.total, "next_cursor": page.next_cursor}
+
+    cache_key = make_cache_key(
+        "pipelines",
+        status=status,
+        tag=tag,
+        search=search,
+        favorites=favorites,
+        hidden=hidden,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        count=count,
+    )
+    return await response_cache.get_or_set(cache_key, load, tags=["pipelines"])
 
 
 # ============== Download Proxy ==============
@@ -334,20 +395,23 @@ async def download_file(url: str = Query(..., description="URL of file to downlo
 
     filename = parsed.path.split("/")[-1] or "download"
 
+    # Shared pooled client - keeps the CDN connection warm across downloads
+    client = get_http_client(url)
+
     async def stream_response():
         """Stream bytes from source URL to client."""
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream("GET", url) as response:
-                response.raise_for_status()
-                async for chunk in response.aiter_bytes(chunk_size=65536):
-                    yield chunk
+        async with client.stream(
+            "GET", url, timeout=120.0, follow_redirects=False
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_size=65536):
+                yield chunk
 
     # Get content type with a HEAD request first (fast)
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            head_response = await client.head(url)
-            content_type = head_response.headers.get("content-type", "application/octet-stream")
-            content_length = head_response.headers.get("content-length")
+        head_response = await client.head(url, timeout=10.0, follow_redirects=False)
+        content_type = head_response.headers.get("content-type", "application/octet-stream")
+        content_length = head_response.headers.get("content-length")
     except Exception:
         content_type = "application/octet-stream"
         content_length = None
@@ -426,13 +490,20 @@ async def restart_server():
 @router.get("/{pipeline_id}", response_model=PipelineResponse)
 async def get_pipeline(
     pipeline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get a specific pipeline by ID."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
-    return pipeline
+
+    async def load():
+        pipeline = await _load_pipeline(db, pipeline_id)
+        return PipelineResponse.model_validate(pipeline).model_dump(mode="json")
+
+    return await response_cache.get_or_set(
+        f"pipeline:{pipeline_id}",
+        load,
+        ttl=settings.cache_pipeline_ttl_seconds,
+        tags=[f"pipeline:{pipeline_id}"],
+    )
 
 
 @router.put("/{pipeline_id}", response_model=PipelineResponse)
@@ -467,81 +538,75 @@ async def update_pipeline(
     db.commit()
     db.refresh(pipeline)
 
-    await invalidate_pipelines_cache()
+    await invalidate_pipelines_cache(pipeline_id)
     return pipeline
 
 
 @router.put("/{pipeline_id}/favorite", response_model=PipelineResponse)
 async def toggle_favorite(
     pipeline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Toggle favorite status for a pipeline."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
+    pipeline = await _load_pipeline(db, pipeline_id)
 
     pipeline.is_favorite = 0 if pipeline.is_favorite else 1
-    db.commit()
-    db.refresh(pipeline)
+    await db.commit()
 
-    await invalidate_pipelines_cache()
-    return pipeline
+    await invalidate_pipelines_cache(pipeline_id)
+    return await _load_pipeline(db, pipeline_id)
 
 
 @router.put("/{pipeline_id}/hide", response_model=PipelineResponse)
 async def toggle_hidden(
     pipeline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Toggle hidden status for a pipeline."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
+    pipeline = await _load_pipeline(db, pipeline_id)
 
     pipeline.is_hidden = 0 if pipeline.is_hidden else 1
-    db.commit()
-    db.refresh(pipeline)
+    await db.commit()
 
-    await invalidate_pipelines_cache()
-    return pipeline
+    await invalidate_pipelines_cache(pipeline_id)
+    return await _load_pipeline(db, pipeline_id)
 
 
 @router.put("/{pipeline_id}/tags", response_model=PipelineResponse)
 async def update_tags(
     pipeline_id: int,
     tags: List[str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update tags for a pipeline."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
+    pipeline = await _load_pipeline(db, pipeline_id)
 
     pipeline.set_tags(tags)
-    db.commit()
-    db.refresh(pipeline)
+    await db.commit()
 
-    await invalidate_pipelines_cache()
-    return pipeline
+    await invalidate_pipelines_cache(pipeline_id)
+    return await _load_pipeline(db, pipeline_id)
 
 
 @router.delete("/{pipeline_id}", status_code=204)
 async def delete_pipeline(
     pipeline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a pipeline and all its steps."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
+    pipeline = await _load_pipeline(db, pipeline_id)
 
     if pipeline.status == PipelineStatus.RUNNING.value:
         raise HTTPException(status_code=400, detail="Cannot delete a running pipeline")
 
-    db.delete(pipeline)
-    db.commit()
-    await invalidate_pipelines_cache()
+    await db.execute(
+        delete(MediaAsset)
+        .where(MediaAsset.pipeline_id == pipeline_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.delete(pipeline)
+    await db.commit()
+    await invalidate_pipelines_cache(pipeline_id)
 
     logger.info("Pipeline deleted", pipeline_id=pipeline_id)
 
@@ -625,6 +690,7 @@ async def _execute_pipeline_task(pipeline_id: int):
         if pipeline:
             pipeline.status = PipelineStatus.FAILED.value
             db.commit()
+            await invalidate_pipelines_cache(pipeline_id)
     finally:
         db.close()
 
@@ -649,6 +715,7 @@ async def run_pipeline(
     # Update status immediately
     pipeline.status = PipelineStatus.RUNNING.value
     db.commit()
+    await invalidate_pipelines_cache(pipeline_id)
 
     logger.info("Pipeline execution starting", pipeline_id=pipeline_id)
 
@@ -667,6 +734,7 @@ async def pause_pipeline(
     """Pause a running pipeline at the next checkpoint."""
     try:
         pipeline = await pipeline_executor.pause_pipeline(db, pipeline_id)
+        await invalidate_pipelines_cache(pipeline_id)
         return pipeline
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -680,6 +748,7 @@ async def cancel_pipeline(
     """Cancel a running or paused pipeline."""
     try:
         pipeline = await pipeline_executor.cancel_pipeline(db, pipeline_id)
+        await invalidate_pipelines_cache(pipeline_id)
         return pipeline
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -691,12 +760,10 @@ async def cancel_pipeline(
 @router.get("/{pipeline_id}/steps", response_model=List[PipelineStepResponse])
 async def list_steps(
     pipeline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all steps for a pipeline."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
+    pipeline = await _load_pipeline(db, pipeline_id)
 
     steps = sorted(pipeline.steps, key=lambda s: s.step_order)
     return steps
@@ -706,13 +773,13 @@ async def list_steps(
 async def get_step(
     pipeline_id: int,
     step_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get a specific step."""
-    step = (
-        db.query(PipelineStep)
-        .filter(PipelineStep.id == step_id, PipelineStep.pipeline_id == pipeline_id)
-        .first()
+    step = await db.scalar(
+        select(PipelineStep).where(
+            PipelineStep.id == step_id, PipelineStep.pipeline_id == pipeline_id
+        )
     )
 
     if not step:
@@ -752,6 +819,7 @@ async def update_step(
     db.commit()
     db.refresh(step)
 
+    await invalidate_pipelines_cache(pipeline_id)
     return step
 
 
@@ -775,6 +843,7 @@ async def approve_step(
 
     try:
         step = await pipeline_executor.approve_step(db, step_id)
+        await response_cache.invalidate("pipelines", f"pipeline:{pipeline_id}", "library")
         return step
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -800,6 +869,7 @@ async def retry_step(
 
     try:
         step = await pipeline_executor.retry_step(db, step_id)
+        await invalidate_pipelines_cache(pipeline_id)
         return step
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -831,6 +901,7 @@ async def enhance_prompts(
             mode=request.mode,
             categories=request.categories,
             intensity=request.intensity,
+            use_cache=not request.fresh,
         )
 
         total_count = sum(len(variations) for variations in enhanced)
@@ -1130,7 +1201,7 @@ async def create_bulk_pipeline(
     # Create I2V steps (only if we have video prompts)
     if has_i2v:
         if request.i2i_config and request.i2i_config.enabled:
-            # I2V steps will be created dynamically after I2I completes
+            # I2V steps are created as each I2I step finishes its images
             # Store the config for the executor to use
             pipeline.set_checkpoints(
                 []
@@ -1172,6 +1243,8 @@ async def create_bulk_pipeline(
 
     db.commit()
     db.refresh(pipeline)
+    await invalidate_pipelines_cache()
+    await notify_jobs("pipeline")
 
     logger.info(
         "Bulk pipeline created", pipeline_id=pipeline.id, steps=len(pipeline.steps)
@@ -1206,13 +1279,19 @@ async def create_bulk_pipeline(
 
 
 async def _execute_bulk_pipeline_task(pipeline_id: int, request: BulkPipelineCreate):
-    """Background task to execute a bulk pipeline with concurrency control."""
+    """
+    Background task to execute a bulk pipeline with concurrency control.
+
+    I2I and I2V overlap: as soon as an I2I step's images generate, its I2V
+    steps are created and queued (before its thumbnails render), and I2V
+    workers drain that bounded queue while other images are still
+    generating. A full queue holds back further I2I hand-offs.
+    """
     from app.database import SessionLocal
     import asyncio
+    import itertools
 
     db = SessionLocal()
-    MAX_CONCURRENT = 20
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
 
     try:
         pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
@@ -1229,14 +1308,65 @@ async def _execute_bulk_pipeline_task(pipeline_id: int, request: BulkPipelineCre
         i2i_steps = [s for s in steps if s.step_type == "i2i"]
         i2v_steps = [s for s in steps if s.step_type == "i2v"]
 
-        async def execute_step_with_semaphore(step: PipelineStep):
-            async with semaphore:
-                step.status = StepStatus.RUNNING.value
-                db.commit()
+        i2v_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max(1, settings.pipeline_stream_queue_size)
+        )
+        step_orders = itertools.count(len(steps))
 
-                try:
-                    config = step.get_config()
-                    inputs = step.get_inputs()
+        async def hand_off_to_i2v(i2i_step: PipelineStep, image_urls: list):
+            """Create the I2V steps for an I2I step's images and queue them."""
+            if not request.i2v_config:
+                return
+
+            src_idx = i2i_step.get_inputs().get("source_image_index", 0)
+            new_steps = []
+            for output_url in image_urls:
+                for prompt_idx, prompt in enumerate(request.i2v_config.prompts):
+                    step = PipelineStep(
+                        pipeline_id=pipeline.id,
+                        step_type="i2v",
+                        step_order=next(step_orders),
+                        status=StepStatus.PENDING.value,
+                    )
+                    step.set_config(
+                        {
+                            "model": request.i2v_config.model,
+                            "videos_per_image": 1,
+                            "resolution": request.i2v_config.resolution,
+                            "duration_sec": request.i2v_config.duration_sec,
+                            "negative_prompt": request.i2v_config.negative_prompt,
+                            "enable_audio": request.i2v_config.enable_audio,
+                        }
+                    )
+                    step.set_inputs(
+                        {
+                            "image_urls": [output_url],
+                            "prompts": [prompt],
+                            "source_image_index": src_idx,
+                            "prompt_index": prompt_idx,
+                            "from_i2i_step": i2i_step.id,
+                        }
+                    )
+
+                    cost_info = cost_calculator.calculate_i2v_cost(step.get_config(), 1)
+                    step.cost_estimate = cost_info["total"]
+
+                    db.add(step)
+                    new_steps.append(step)
+            db.commit()
+
+            for step in new_steps:
+                await i2v_queue.put(step)
+
+        async def execute_bulk_step(step: PipelineStep):
+            try:
+                config = step.get_config()
+                inputs = step.get_inputs()
+
+                # Generations in flight are capped (and adapted) per provider
+                async with provider_governor.slot(provider_for_model(config["model"])):
+                    step.status = StepStatus.RUNNING.value
+                    db.commit()
 
                     # Log extracted config for debugging
                     if step.step_type == "i2i":
@@ -1277,19 +1407,6 @@ async def _execute_bulk_pipeline_task(pipeline_id: int, request: BulkPipelineCre
                             flux_safety_tolerance=config.get("flux_safety_tolerance"),
                             flux_acceleration=config.get("flux_acceleration"),
                         )
-                        image_urls = result if isinstance(result, list) else [result]
-                        # Generate thumbnails for fast library loading
-                        thumbnail_urls = await generate_thumbnails_batch(image_urls)
-                        step.set_outputs(
-                            {
-                                "image_urls": image_urls,
-                                "thumbnail_urls": thumbnail_urls,
-                                "items": [
-                                    {"url": url, "type": "image"} for url in image_urls
-                                ],
-                                "count": len(image_urls),
-                            }
-                        )
 
                     elif step.step_type == "i2v":
                         result = await generate_video(
@@ -1301,90 +1418,80 @@ async def _execute_bulk_pipeline_task(pipeline_id: int, request: BulkPipelineCre
                             negative_prompt=config.get("negative_prompt"),
                             enable_audio=config.get("enable_audio", False),
                         )
-                        step.set_outputs(
-                            {
-                                "video_urls": [result],
-                                "items": [{"url": result, "type": "video"}],
-                                "count": 1,
-                            }
-                        )
 
-                    step.status = StepStatus.COMPLETED.value
+                if step.step_type == "i2i":
+                    image_urls = result if isinstance(result, list) else [result]
+                    # Videos start before this step's thumbnails render
+                    await hand_off_to_i2v(step, image_urls)
+                    # Generate thumbnails for fast library loading. The videos now depend
+                    # on these images, so a thumbnail failure must not fail the step
+                    try:
+                        thumbnail_urls = await generate_thumbnails_batch(image_urls)
+                    except Exception as e:
+                        logger.warning("Thumbnail generation failed", step_id=step.id, error=str(e))
+                        thumbnail_urls = []
+                    step.set_outputs(
+                        {
+                            "image_urls": image_urls,
+                            "thumbnail_urls": thumbnail_urls,
+                            "items": [
+                                {"url": url, "type": "image"} for url in image_urls
+                            ],
+                            "count": len(image_urls),
+                        }
+                    )
+
+                elif step.step_type == "i2v":
+                    step.set_outputs(
+                        {
+                            "video_urls": [result],
+                            "items": [{"url": result, "type": "video"}],
+                            "count": 1,
+                        }
+                    )
+
+                step.status = StepStatus.COMPLETED.value
+                sync_step_assets(db, step)
 
-                    # Calculate actual cost
-                    if step.step_type == "i2i":
-                        cost_info = cost_calculator.calculate_i2i_cost(config, 1)
-                    else:
-                        cost_info = cost_calculator.calculate_i2v_cost(config, 1)
-                    step.cost_actual = cost_info["total"]
-
-                except Exception as e:
-                    step.status = StepStatus.FAILED.value
-                    step.error_message = str(e)
-                    logger.error("Step failed", step_id=step.id, error=str(e))
-
-                db.commit()
-                return step
-
-        # Execute I2I steps concurrently
-        if i2i_steps:
-            await asyncio.gather(*[execute_step_with_semaphore(s) for s in i2i_steps])
-
-            # If there are I2I steps and I2V config, create I2V steps for each I2I output
-            if request.i2v_config:
-                step_order = len(i2i_steps)
-                for i2i_step in i2i_steps:
-                    if i2i_step.status != StepStatus.COMPLETED.value:
-                        continue
-
-                    outputs = i2i_step.get_outputs()
-                    inputs = i2i_step.get_inputs()
-                    src_idx = inputs.get("source_image_index", 0)
-
-                    for output_url in outputs.get("image_urls", []):
-                        for prompt_idx, prompt in enumerate(request.i2v_config.prompts):
-                            step = PipelineStep(
-                                pipeline_id=pipeline.id,
-                                step_type="i2v",
-                                step_order=step_order,
-                                status=StepStatus.PENDING.value,
-                            )
-                            step.set_config(
-                                {
-                                    "model": request.i2v_config.model,
-                                    "videos_per_image": 1,
-                                    "resolution": request.i2v_config.resolution,
-                                    "duration_sec": request.i2v_config.duration_sec,
-                                    "negative_prompt": request.i2v_config.negative_prompt,
-                                    "enable_audio": request.i2v_config.enable_audio,
-                                }
-                            )
-                            step.set_inputs(
-                                {
-                                    "image_urls": [output_url],
-                                    "prompts": [prompt],
-                                    "source_image_index": src_idx,
-                                    "prompt_index": prompt_idx,
-                                    "from_i2i_step": i2i_step.id,
-                                }
-                            )
-
-                            cost_info = cost_calculator.calculate_i2v_cost(
-                                step.get_config(), 1
-                            )
-                            step.cost_estimate = cost_info["total"]
-
-                            db.add(step)
-                            step_order += 1
-
-                db.commit()
-
-                # Get newly created I2V steps
-                i2v_steps = [s for s in pipeline.steps if s.step_type == "i2v"]
-
-        # Execute I2V steps concurrently
-        if i2v_steps:
-            await asyncio.gather(*[execute_step_with_semaphore(s) for s in i2v_steps])
+                # Calculate actual cost
+                if step.step_type == "i2i":
+                    cost_info = cost_calculator.calculate_i2i_cost(config, 1)
+                else:
+                    cost_info = cost_calculator.calculate_i2v_cost(config, 1)
+                step.cost_actual = cost_info["total"]
+
+            except Exception as e:
+                step.status = StepStatus.FAILED.value
+                step.error_message = str(e)
+                logger.error("Step failed", step_id=step.id, error=str(e))
+
+            db.commit()
+            await response_cache.invalidate(f"pipeline:{pipeline_id}", "library")
+            return step
+
+        async def i2v_worker():
+            while (step := await i2v_queue.get()) is not None:
+                await execute_bulk_step(step)
+
+        # I2V workers run for the whole task, fed by the I2I steps as they finish;
+        # the provider governor decides how many of them generate at once
+        worker_count = 0
+        if request.i2v_config:
+            i2v_provider = provider_for_model(request.i2v_config.model)
+            worker_count = provider_governor.get(i2v_provider).limits.max_in_flight
+        i2v_workers = [asyncio.create_task(i2v_worker()) for _ in range(worker_count)]
+        try:
+            for step in i2v_steps:  # Created up front when there is no I2I stage
+                await i2v_queue.put(step)
+
+            await asyncio.gather(*[execute_bulk_step(s) for s in i2i_steps])
+
+            for _ in i2v_workers:
+                await i2v_queue.put(None)
+            await asyncio.gather(*i2v_workers)
+        finally:
+            for worker in i2v_workers:
+                worker.cancel()
 
         # Check if all steps completed
         db.refresh(pipeline)
@@ -1407,17 +1514,16 @@ async def _execute_bulk_pipeline_task(pipeline_id: int, request: BulkPipelineCre
             db.commit()
     finally:
         db.close()
+        await invalidate_pipelines_cache(pipeline_id)
 
 
 @router.get("/bulk/{pipeline_id}", response_model=BulkPipelineResponse)
 async def get_bulk_pipeline(
     pipeline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get bulk pipeline status with grouped outputs."""
-    pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
-    if not pipeline:
-        raise HTTPException(status_code=404, detail="Pipeline not found")
+    pipeline = await _load_pipeline(db, pipeline_id)
 
     # Group outputs by source image
     groups: dict = {}
@@ -1542,6 +1648,7 @@ async def animate_selected_images(
     # Start execution in background
     pipeline.status = PipelineStatus.RUNNING.value
     db.commit()
+    await invalidate_pipelines_cache()
 
     pipeline_id = pipeline.id
 
@@ -1557,10 +1664,9 @@ async def animate_selected_images(
 
             steps = [s for s in pipeline.steps if s.step_type == "i2v"]
 
-            semaphore = asyncio.Semaphore(20)  # Max 20 concurrent
-
             async def execute_step(step):
-                async with semaphore:
+                model = step.get_config()["model"]
+                async with provider_governor.slot(provider_for_model(model)):
                     try:
                         step.status = StepStatus.RUNNING.value
                         session.commit()
@@ -1581,6 +1687,7 @@ async def animate_selected_images(
                         if result.get("video_url"):
                             step.set_outputs({"video_urls": [result["video_url"]]})
                             step.status = StepStatus.COMPLETED.value
+                            sync_step_assets(session, step)
                             step.cost_actual = Decimal(str(result.get("cost", 0)))
                         else:
                             step.status = StepStatus.FAILED.value
@@ -1594,6 +1701,7 @@ async def animate_selected_images(
                         )
                     finally:
                         session.commit()
+                        await response_cache.invalidate(f"pipeline:{pipeline_id}")
 
             await asyncio.gather(*[execute_step(s) for s in steps])
 
@@ -1617,6 +1725,7 @@ async def animate_selected_images(
                 session.commit()
         finally:
             session.close()
+            await invalidate_pipelines_cache(pipeline_id)
 
     background_tasks.add_task(asyncio.create_task, execute_animate())
 
@@ -1652,124 +1761,70 @@ async def animate_selected_images(
 @router.get("/images/library")
 async def get_image_library(
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    offset: int = Query(0, ge=0, description="Legacy offset (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description="Total mode (default: first page only)"
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get recently generated images from i2i steps.
 
     Returns a list of images that can be selected for video generation.
+    Paginated per image (not per step) from the indexed media_assets table.
     """
-    # Get all completed i2i steps with outputs
-    steps = (
-        db.query(PipelineStep)
-        .filter(PipelineStep.step_type == "i2i")
-        .filter(PipelineStep.status == StepStatus.COMPLETED.value)
-        .order_by(PipelineStep.updated_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
 
-    images = []
-    for step in steps:
-        outputs = step.get_outputs()
-        inputs = step.get_inputs()
-        config = step.get_config()
-
-        if outputs and outputs.get("image_urls"):
-            image_urls = outputs["image_urls"]
-            thumbnail_urls = outputs.get("thumbnail_urls", [])
-
-            for i, url in enumerate(image_urls):
-                # Get corresponding thumbnail if available
-                thumbnail_url = thumbnail_urls[i] if i < len(thumbnail_urls) else None
+    async def load():
+        try:
+            page = await paginate_async(
+                db,
+                lambda session: session.query(MediaAsset).filter(MediaAsset.kind == "image"),
+                order=[(MediaAsset.created_at, True), (MediaAsset.id, True)],
+                limit=limit,
+                cursor=cursor,
+                count=count,
+                offset=offset,
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-                images.append(
-                    {
-                        "url": url,
-                        "thumbnail_url": thumbnail_url,
-                        "step_id": step.id,
-                        "pipeline_id": step.pipeline_id,
-                        "source_image": (
-                            inputs.get("image_urls", [""])[0]
-                            if inputs.get("image_urls")
-                            else None
-                        ),
-                        "prompt": (
-                            inputs.get("prompts", [""])[0]
-                            if inputs.get("prompts")
-                            else None
-                        ),
-                        "model": config.get("model", "unknown"),
-                        "created_at": (
-                            step.updated_at.isoformat() if step.updated_at else None
-                        ),
-                    }
-                )
+        return {
+            "images": [asset.to_library_dict() for asset in page.items],
+            "total": page.total,
+            "next_cursor": page.next_cursor,
+            "limit": limit,
+            "offset": offset,
+        }
 
-    # Get total count
-    total = (
-        db.query(PipelineStep)
-        .filter(PipelineStep.step_type == "i2i")
-        .filter(PipelineStep.status == StepStatus.COMPLETED.value)
-        .count()
+    return await response_cache.get_or_set(
+        make_cache_key("library", limit=limit, offset=offset, cursor=cursor, count=count),
+        load,
+        ttl=settings.cache_library_ttl_seconds,
+        tags=["library"],
     )
 
-    return {
-        "images": images,
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
-
 
 @router.post("/images/library/generate-thumbnails")
 async def generate_library_thumbnails(
-    limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    restart: bool = Query(False, description="Rescan from the first step"),
 ):
     """
-    Generate thumbnails for existing images that don't have them.
+    Start (or resume) the background thumbnail backfill.
 
-    Call this to backfill thumbnails for images created before thumbnail support.
+    Backfills thumbnails for images created before thumbnail support. The
+    scan is checkpointed and throttled; poll the status endpoint for progress.
     """
-    # Get i2i steps that have images but no thumbnails
-    steps = (
-        db.query(PipelineStep)
-        .filter(PipelineStep.step_type == "i2i")
-        .filter(PipelineStep.status == StepStatus.COMPLETED.value)
-        .order_by(PipelineStep.updated_at.desc())
-        .limit(limit)
-        .all()
-    )
-
-    processed = 0
-    skipped = 0
-
-    for step in steps:
-        outputs = step.get_outputs()
-        if not outputs or not outputs.get("image_urls"):
-            continue
-
-        # Skip if thumbnails already exist
-        existing_thumbs = outputs.get("thumbnail_urls", [])
-        if existing_thumbs and len(existing_thumbs) == len(outputs["image_urls"]):
-            skipped += 1
-            continue
-
-        # Generate thumbnails
-        image_urls = outputs["image_urls"]
-        thumbnail_urls = await generate_thumbnails_batch(image_urls)
-
-        # Update outputs
-        outputs["thumbnail_urls"] = thumbnail_urls
-        step.set_outputs(outputs)
-        db.commit()
-        processed += 1
-
+    started = thumbnail_backfill.start(restart=restart)
+    progress = thumbnail_backfill.progress()
     return {
-        "processed": processed,
-        "skipped": skipped,
-        "message": f"Generated thumbnails for {processed} steps, skipped {skipped} (already had thumbnails)",
+        **progress,
+        "started": started,
+        "message": "Thumbnail backfill started" if started else "Thumbnail backfill already running",
     }
+
+
+@router.get("/images/library/generate-thumbnails/status")
+async def get_library_thumbnails_status():
+    """Get progress of the background thumbnail backfill."""
+    return thumbnail_backfill.progress()
@@ -0,0 +1,74 @@
+"""Per-model runtime statistics (latency percentiles) router."""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+from app.services.runtime_stats import runtime_stats
+
+router = APIRouter(prefix="/runtime-stats", tags=["runtime-stats"])
+
+
+# ============== Schemas ==============
+
+
+class RuntimeStatResponse(BaseModel):
+    """Latency percentiles for one model/kind/resolution/duration."""
+    model: str
+    kind: str
+    resolution: Optional[str]
+    duration_sec: Optional[int]
+    samples: int
+    mean_seconds: Optional[float]
+    p50_seconds: Optional[float]
+    p95_seconds: Optional[float]
+    p99_seconds: Optional[float]
+    min_seconds: Optional[float]
+    max_seconds: Optional[float]
+
+
+class RuntimeEstimateResponse(BaseModel):
+    """What the schedulers currently assume for a request."""
+    model: str
+    kind: str
+    resolution: Optional[str]
+    duration_sec: Optional[int]
+    samples: int  # Behind the estimate (the model/kind aggregate while the exact key is sparse)
+    p50_seconds: Optional[float]
+    p95_seconds: Optional[float]
+    timeout_seconds: Optional[float]  # None until enough samples; callers use their default
+
+
+# ============== Endpoints ==============
+
+
+@router.get("", response_model=List[RuntimeStatResponse])
+async def list_runtime_stats(
+    model: Optional[str] = Query(None, description="Only this model"),
+    kind: Optional[str] = Query(None, description="Only this kind (video, image, batch-<output_type>)"),
+):
+    """Observed runtimes per model, kind, resolution and duration."""
+    return runtime_stats.snapshot(model=model, kind=kind)
+
+
+@router.get("/estimate", response_model=RuntimeEstimateResponse)
+async def estimate_runtime(
+    model: str = Query(..., description="Model key"),
+    kind: str = Query("video", description="video, image or batch-<output_type>"),
+    resolution: Optional[str] = Query(None),
+    duration_sec: Optional[int] = Query(None, ge=1),
+):
+    """Typical runtime and timeout budget used for a request with these parameters."""
+    histogram = runtime_stats.histogram(model, kind, resolution, duration_sec)
+    timeout = runtime_stats.timeout_budget(model, kind, default=-1, resolution=resolution, duration_sec=duration_sec)
+    return RuntimeEstimateResponse(
+        model=model,
+        kind=kind,
+        resolution=resolution,
+        duration_sec=duration_sec,
+        samples=histogram.samples if histogram else 0,
+        p50_seconds=round(histogram.percentile(0.5), 2) if histogram else None,
+        p95_seconds=round(histogram.percentile(0.95), 2) if histogram else None,
+        timeout_seconds=None if timeout < 0 else round(timeout, 2),
+    )
@@ -10,6 +10,8 @@ import structlog
 from app.database import get_db
 from app.models import User, Template, TemplateCategory, TemplateOutputType
 from app.core.security import get_current_user, require_role
+from app.services.cache import make_cache_key, response_cache
+from app.services.pagination import COUNT_MODE_PATTERN, InvalidCursor, paginate
 
 logger = structlog.get_logger()
 
@@ -107,7 +109,8 @@ class TemplateResponse(BaseModel):
 class TemplateListResponse(BaseModel):
     """Response for template list."""
     templates: List[TemplateResponse]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless requested
+    next_cursor: Optional[str] = None
 
 
 class TemplateSummary(BaseModel):
@@ -136,7 +139,11 @@ async def list_templates(
     nsfw: Optional[bool] = Query(None, description="Filter by NSFW status"),
     search: Optional[str] = Query(None, description="Search in name/description"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Legacy offset (ignored with cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description="Total mode (default: first page only)"
+    ),
     user: Optional[User] = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -147,66 +154,98 @@ async def list_templates(
     - Only shows active templates
     - Respects user tier for access
     """
-    query = db.query(Template).filter(Template.is_active == 1)
-
-    # Apply filters
-    if category:
-        query = query.filter(Template.category == category)
-    if output_type:
-        query = query.filter(Template.output_type == output_type)
-    if featured is not None:
-        query = query.filter(Template.is_featured == (1 if featured else 0))
-    if nsfw is not None:
-        query = query.filter(Template.is_nsfw == (1 if nsfw else 0))
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Template.name.ilike(search_term)) |
-            (Template.description.ilike(search_term))
-        )
-
-    # Filter by user tier if authenticated
-    if user:
-        tier_order = {"free": 0, "starter": 1, "pro": 2, "agency": 3}
-        user_tier_level = tier_order.get(user.tier, 1)
-        # Show templates up to user's tier
-        allowed_tiers = [t for t, level in tier_order.items() if level <= user_tier_level]
-        query = query.filter(Template.tier_required.in_(allowed_tiers))
-
-    total = query.count()
-    templates = query.order_by(Template.is_featured.desc(), Template.usage_count.desc()).offset(offset).limit(limit).all()
-
-    return TemplateListResponse(
-        templates=[
-            TemplateResponse(
-                id=t.id,
-                name=t.name,
-                description=t.description,
-                category=t.category,
-                output_type=t.output_type,
-                base_prompt=t.base_prompt,
-                negative_prompt=t.negative_prompt,
-                variables=t.get_variables(),
-                caption_templates=t.get_caption_templates(),
-                recommended_model=t.recommended_model,
-                video_model=t.video_model,
-                aspect_ratio=t.aspect_ratio,
-                duration_sec=t.duration_sec,
-                quality=t.quality,
-                slides=t.get_slides(),
-                tier_required=t.tier_required,
-                is_nsfw=bool(t.is_nsfw),
-                is_active=bool(t.is_active),
-                is_featured=bool(t.is_featured),
-                usage_count=t.usage_count,
-                tags=t.get_tags(),
-                created_at=t.created_at.isoformat(),
-                updated_at=t.updated_at.isoformat(),
+
+    async def load():
+        query = db.query(Template).filter(Template.is_active == 1)
+
+        # Apply filters
+        if category:
+            query = query.filter(Template.category == category)
+        if output_type:
+            query = query.filter(Template.output_type == output_type)
+        if featured is not None:
+            query = query.filter(Template.is_featured == (1 if featured else 0))
+        if nsfw is not None:
+            query = query.filter(Template.is_nsfw == (1 if nsfw else 0))
+        if search:
+            search_term = f"%{search}%"
+            query = query.filter(
+                (Template.name.ilike(search_term)) |
+                (Template.description.ilike(search_term))
+            )
+
+        # Filter by user tier if authenticated
+        if user:
+            tier_order = {"free": 0, "starter": 1, "pro": 2, "agency": 3}
+            user_tier_level = tier_order.get(user.tier, 1)
+            # Show templates up to user's tier
+            allowed_tiers = [t for t, level in tier_order.items() if level <= user_tier_level]
+            query = query.filter(Template.tier_required.in_(allowed_tiers))
+
+        try:
+            page = paginate(
+                query,
+                order=[
+                    (Template.is_featured, True),
+                    (Template.usage_count, True),
+                    (Template.id, True),
+                ],
+                limit=limit,
+                cursor=cursor,
+                count=count,
+                offset=offset,
             )
-            for t in templates
-        ],
-        total=total,
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        templates = page.items
+
+        return TemplateListResponse(
+            templates=[
+                TemplateResponse(
+                    id=t.id,
+                    name=t.name,
+                    description=t.description,
+                    category=t.category,
+                    output_type=t.output_type,
+                    base_prompt=t.base_prompt,
+                    negative_prompt=t.negative_prompt,
+                    variables=t.get_variables(),
+                    caption_templates=t.get_caption_templates(),
+                    recommended_model=t.recommended_model,
+                    video_model=t.video_model,
+                    aspect_ratio=t.aspect_ratio,
+                    duration_sec=t.duration_sec,
+                    quality=t.quality,
+                    slides=t.get_slides(),
+                    tier_required=t.tier_required,
+                    is_nsfw=bool(t.is_nsfw),
+                    is_active=bool(t.is_active),
+                    is_featured=bool(t.is_featured),
+                    usage_count=t.usage_count,
+                    tags=t.get_tags(),
+                    created_at=t.created_at.isoformat(),
+                    updated_at=t.updated_at.isoformat(),
+                )
+                for t in templates
+            ],
+            total=page.total,
+            next_cursor=page.next_cursor,
+        ).model_dump(mode="json")
+
+    cache_key = make_cache_key(
+        "templates",
+        category=category,
+        output_type=output_type,
+        featured=featured,
+        nsfw=nsfw,
+        search=search,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        count=count,
+        tier=user.tier if user else None,
     )
+    return await response_cache.get_or_set(cache_key, load, tags=["templates"])
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
@@ -216,49 +255,55 @@ async def get_template(
     db: Session = Depends(get_db),
 ):
     """Get a specific template by ID."""
-    template = db.query(Template).filter(Template.id == template_id).first()
-    if not template:
-        raise HTTPException(status_code=404, detail="Template not found")
 
-    if not template.is_active:
-        raise HTTPException(status_code=404, detail="Template not found")
+    async def load():
+        template = db.query(Template).filter(Template.id == template_id).first()
+        if not template:
+            raise HTTPException(status_code=404, detail="Template not found")
+
+        if not template.is_active:
+            raise HTTPException(status_code=404, detail="Template not found")
+
+        return TemplateResponse(
+            id=template.id,
+            name=template.name,
+            description=template.description,
+            category=template.category,
+            output_type=template.output_type,
+            base_prompt=template.base_prompt,
+            negative_prompt=template.negative_prompt,
+            variables=template.get_variables(),
+            caption_templates=template.get_caption_templates(),
+            recommended_model=template.recommended_model,
+            video_model=template.video_model,
+            aspect_ratio=template.aspect_ratio,
+            duration_sec=template.duration_sec,
+            quality=template.quality,
+            slides=template.get_slides(),
+            tier_required=template.tier_required,
+            is_nsfw=bool(template.is_nsfw),
+            is_active=bool(template.is_active),
+            is_featured=bool(template.is_featured),
+            usage_count=template.usage_count,
+            tags=template.get_tags(),
+            created_at=template.created_at.isoformat(),
+            updated_at=template.updated_at.isoformat(),
+        ).model_dump(mode="json")
+
+    template = await response_cache.get_or_set(f"template:{template_id}", load, tags=["templates"])
 
     # Check tier access
     if user:
         tier_order = {"free": 0, "starter": 1, "pro": 2, "agency": 3}
         user_tier = tier_order.get(user.tier, 1)
-        template_tier = tier_order.get(template.tier_required, 1)
+        template_tier = tier_order.get(template["tier_required"], 1)
         if user_tier < template_tier:
             raise HTTPException(
                 status_code=403,
-                detail=f"This template requires {template.tier_required} tier or higher"
+                detail=f"This template requires {template['tier_required']} tier or higher"
             )
 
-    return TemplateResponse(
-        id=template.id,
-        name=template.name,
-        description=template.description,
-        category=template.category,
-        output_type=template.output_type,
-        base_prompt=template.base_prompt,
-        negative_prompt=template.negative_prompt,
-        variables=template.get_variables(),
-        caption_templates=template.get_caption_templates(),
-        recommended_model=template.recommended_model,
-        video_model=template.video_model,
-        aspect_ratio=template.aspect_ratio,
-        duration_sec=template.duration_sec,
-        quality=template.quality,
-        slides=template.get_slides(),
-        tier_required=template.tier_required,
-        is_nsfw=bool(template.is_nsfw),
-        is_active=bool(template.is_active),
-        is_featured=bool(template.is_featured),
-        usage_count=template.usage_count,
-        tags=template.get_tags(),
-        created_at=template.created_at.isoformat(),
-        updated_at=template.updated_at.isoformat(),
-    )
+    return template
 
 
 @router.get("/categories/list")
@@ -319,6 +364,7 @@ async def create_template(
     db.add(template)
     db.commit()
     db.refresh(template)
+    await response_cache.invalidate("templates")
 
     logger.info("Template created", template_id=template.id, admin_id=admin.id)
 
@@ -380,6 +426,7 @@ async def update_template(
 
     db.commit()
     db.refresh(template)
+    await response_cache.invalidate("templates")
 
     logger.info("Template updated", template_id=template_id, admin_id=admin.id)
 
@@ -424,6 +471,7 @@ async def delete_template(
     # Soft delete - just deactivate
     template.is_active = 0
     db.commit()
+    await response_cache.invalidate("templates")
 
     logger.info("Template deleted", template_id=template_id, admin_id=admin.id)
     return {"success": True, "message": "Template deactivated"}
@@ -0,0 +1,55 @@
+"""Inbound webhooks from generation providers."""
+
+import json
+from typing import Optional
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.services.fal_webhooks import apply_fal_webhook, verify_fal_webhook
+from app.services.job_notify import notify_jobs
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+@router.post("/fal")
+async def fal_webhook(
+    request: Request,
+    token: Optional[str] = Query(None, description="Shared webhook token"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Receive a Fal queue completion callback.
+
+    Verifies the callback, updates the matching Job/ImageJob rows and wakes
+    any waiters in this process. Unknown request IDs and rows that already
+    finished are acknowledged (and left as they are) so Fal doesn't retry
+    them. Auto-download is left to the worker's downloads
+    lane, which is signalled here.
+    """
+    body = await request.body()
+    headers = {k.lower(): v for k, v in request.headers.items()}
+
+    if not await verify_fal_webhook(headers, body, token):
+        logger.warning("Rejected unverified Fal webhook")
+        raise HTTPException(status_code=401, detail="Webhook verification failed")
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    try:
+        outcome = await apply_fal_webhook(db, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if outcome["status"] == "completed" and (
+        outcome["job_id"] is not None or outcome["image_job_id"] is not None
+    ):
+        await notify_jobs("completed")
+
+    return {"ok": True, **outcome}
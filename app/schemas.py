@@ -1,5 +1,5 @@
 from typing import Literal, Optional, List
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 import json
 
@@ -350,6 +350,7 @@ class I2IConfig(BaseModel):
     flux_enable_prompt_expansion: Optional[bool] = None  # dev/flex only
     flux_safety_tolerance: Optional[Literal["1", "2", "3", "4", "5"]] = None  # pro/flex/max
     flux_acceleration: Optional[Literal["none", "regular", "high"]] = None  # dev only
+    max_concurrency: Optional[int] = Field(None, ge=1)  # Generations at once; default PIPELINE_STEP_CONCURRENCY
 
 
 class I2VConfig(BaseModel):
@@ -384,6 +385,7 @@ class I2VConfig(BaseModel):
     videos_per_image: int = 1
     resolution: Literal["480p", "576p", "580p", "720p", "1080p"] = "1080p"
     duration_sec: Literal[5, 10, 15] = 5  # 15s supported by Wan 2.6
+    max_concurrency: Optional[int] = Field(None, ge=1)  # Generations at once; default PIPELINE_STEP_CONCURRENCY
 
     @field_validator("resolution")
     @classmethod
@@ -545,7 +547,8 @@ class PipelineSummaryListResponse(BaseModel):
     """Schema for listing pipelines with lightweight summaries."""
 
     pipelines: List[PipelineSummary]
-    total: int
+    total: Optional[int] = None  # Omitted on cursor pages unless requested
+    next_cursor: Optional[str] = None
 
 
 # ============== Prompt Enhancement Schemas ==============
@@ -565,6 +568,7 @@ class PromptEnhanceRequest(BaseModel):
         None  # e.g., ["camera_movement", "motion_intensity"]
     )
     intensity: Literal["subtle", "moderate", "wild"] = "moderate"
+    fresh: bool = False  # Skip cached variations and ask for new ones
 
 
 class PromptEnhanceResponse(BaseModel):
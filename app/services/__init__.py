@@ -85,6 +85,8 @@ from app.services.cooldown_manager import (
 from app.services.rate_limiter import (
     SlidingWindowRateLimiter,
     TokenBucketRateLimiter,
+    RedisSlidingWindowRateLimiter,
+    RedisTokenBucketRateLimiter,
     MultiRateLimiter,
     RateLimitExceeded,
     rate_limit,
@@ -93,6 +95,12 @@ from app.services.rate_limiter import (
     api_rate_limiter,
 )
 
+# Fal status polling
+from app.services.poll_scheduler import (
+    FalPollScheduler,
+    fal_poll_scheduler,
+)
+
 # Production Hardening - Orchestration
 from app.services.job_orchestrator import (
     JobOrchestrator,
@@ -109,6 +117,7 @@ from app.services.job_worker import (
     WorkerStats,
     start_worker,
 )
+from app.services.job_claims import claim_jobs, renew_leases
 
 __all__ = [
     # Pipeline services
@@ -162,12 +171,17 @@ __all__ = [
     # Rate Limiting
     "SlidingWindowRateLimiter",
     "TokenBucketRateLimiter",
+    "RedisSlidingWindowRateLimiter",
+    "RedisTokenBucketRateLimiter",
     "MultiRateLimiter",
     "RateLimitExceeded",
     "rate_limit",
     "rate_limit_sync",
     "fal_rate_limiter",
     "api_rate_limiter",
+    # Fal status polling
+    "FalPollScheduler",
+    "fal_poll_scheduler",
     # Orchestration
     "JobOrchestrator",
     "JobResult",
@@ -179,4 +193,6 @@ __all__ = [
     "JobWorker",
     "WorkerStats",
     "start_worker",
+    "claim_jobs",
+    "renew_leases",
 ]
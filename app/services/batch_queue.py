@@ -1,17 +1,43 @@
-"""In-memory async batch queue for bulk content generation.
-
-MVP implementation using asyncio. Can be swapped to Redis/Celery later.
+"""Durable async batch queue for bulk content generation.
+
+``batch_job_items`` is the queue. Nothing about a batch lives only in
+memory: a fixed pool of consumer coroutines (``max_concurrency`` of them)
+claims one item at a time with an atomic leased UPDATE, the same pattern
+as ``app.services.job_claims``, so memory stays flat however large a batch
+is and every API process can drain the same batches.
+
+- Visibility timeout: a claimed item is ``running`` with a lease
+  (BATCH_ITEM_LEASE_SECONDS) that is renewed while it generates. If the
+  process dies, the lease lapses and any consumer reclaims the item.
+- Retries: a retryable failure (per ``error_classifier``) puts the item
+  back to ``pending``, hidden until ``lease_expires_at`` (the backoff),
+  until it has been claimed BATCH_ITEM_MAX_ATTEMPTS times.
+- Resume: batches survive restarts and deploys. On ``stop()`` in-flight
+  items are released for immediate pickup; on ``start()`` batches whose
+  items all finished before a crash are finalized.
+
+- Progress: finished items are coalesced by a ProgressAggregator and
+  written, with job counters and ETAs, in one transaction every
+  BATCH_PROGRESS_FLUSH_ITEMS outcomes or BATCH_PROGRESS_FLUSH_MS; a job is
+  finalized only after all of its outcomes are written.
+
+Delivery is at-least-once: an item whose process dies mid-generation is
+generated again.
 """
 
 import asyncio
+import os
+import socket
 import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, Callable, Awaitable
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Set, Tuple
 from dataclasses import dataclass, field
 import structlog
 
+from sqlalchemy import and_, case, or_, select, update
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import SessionLocal
 from app.models import (
     BatchJob,
@@ -21,9 +47,98 @@ from app.models import (
     User,
 )
 from app.services.credits import deduct_credits, refund_credits, InsufficientCreditsError
+from app.services.error_classifier import error_classifier
+from app.services.job_claims import hold_leases
+from app.services.runtime_stats import RuntimeKey, runtime_stats
 
 logger = structlog.get_logger()
 
+ACTIVE_JOB_STATUSES = (BatchJobStatus.QUEUED.value, BatchJobStatus.RUNNING.value)
+CANCELED_ITEM_MESSAGE = "Canceled"
+
+
+def _utcnow() -> datetime:
+    """Naive UTC, matching the lease columns used by job_claims."""
+    return datetime.utcnow()
+
+
+def _seconds_until(moment: Optional[datetime]) -> Optional[int]:
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int((moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def claim_batch_items(
+    db: Session,
+    worker_id: str,
+    limit: int,
+    lease_seconds: Optional[float] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Atomically claim up to ``limit`` items of active batches (oldest batch first).
+
+    Claimable items are pending ones whose retry delay has passed and
+    running ones whose lease expired (or that predate leases). Queued
+    batches that get an item claimed move to running. Commits.
+
+    Returns:
+        (item id, batch job id) pairs
+    """
+    if limit <= 0:
+        return []
+
+    now = _utcnow()
+    seconds = settings.batch_item_lease_seconds if lease_seconds is None else lease_seconds
+    active_jobs = select(BatchJob.id).where(BatchJob.status.in_(ACTIVE_JOB_STATUSES))
+    candidates = (
+        select(BatchJobItem.id)
+        .where(
+            BatchJobItem.batch_job_id.in_(active_jobs),
+            or_(
+                and_(
+                    BatchJobItem.status == BatchJobItemStatus.PENDING.value,
+                    or_(BatchJobItem.lease_expires_at.is_(None), BatchJobItem.lease_expires_at <= now),
+                ),
+                and_(
+                    BatchJobItem.status == BatchJobItemStatus.RUNNING.value,
+                    or_(BatchJobItem.lease_expires_at.is_(None), BatchJobItem.lease_expires_at < now),
+                ),
+            ),
+        )
+        .order_by(BatchJobItem.batch_job_id, BatchJobItem.item_index)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claim = (
+        update(BatchJobItem)
+        .where(BatchJobItem.id.in_(candidates))
+        .values(
+            status=BatchJobItemStatus.RUNNING.value,
+            claimed_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=seconds),
+            claim_count=BatchJobItem.claim_count + 1,
+            started_at=now,
+        )
+        .returning(BatchJobItem.id, BatchJobItem.batch_job_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    claimed = [tuple(row) for row in db.execute(claim)]
+    if claimed:
+        db.execute(
+            update(BatchJob)
+            .where(
+                BatchJob.id.in_({batch_job_id for _, batch_job_id in claimed}),
+                BatchJob.status == BatchJobStatus.QUEUED.value,
+            )
+            .values(status=BatchJobStatus.RUNNING.value, started_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return claimed
+
 
 @dataclass
 class JobState:
@@ -39,8 +154,101 @@ class JobState:
     avg_duration_ms: Optional[int] = None
 
 
+@dataclass
+class ItemOutcome:
+    """A finished item waiting to be written by the progress aggregator."""
+    item_id: int
+    job_id: str
+    success: bool
+    values: Dict[str, Any]  # Terminal column values for the item row
+    runtime_key: Optional[RuntimeKey] = None  # Runtime statistics behind the job's ETA
+
+
+class ProgressAggregator:
+    """Coalesces item outcomes into one write transaction per flush.
+
+    Outcomes are flushed every ``flush_items`` outcomes or ``flush_interval``
+    seconds after the first unflushed one, whichever comes first. ``write_fn``
+    is awaited with the whole batch; a failed write is retried with the next
+    flush. ``stop()`` flushes whatever is left.
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[[List[ItemOutcome]], Awaitable[None]],
+        flush_items: int = 20,
+        flush_interval: float = 0.5,
+    ):
+        self.write_fn = write_fn
+        self.flush_items = max(1, flush_items)
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        self._outcomes: List[ItemOutcome] = []
+        self._has_outcomes = asyncio.Event()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
+
+    def pending_for(self, job_id: str) -> List[ItemOutcome]:
+        """Unflushed outcomes of one job."""
+        return [outcome for outcome in self._outcomes if outcome.job_id == job_id]
+
+    def record(self, outcome: ItemOutcome):
+        self._outcomes.append(outcome)
+        self._has_outcomes.set()
+        if len(self._outcomes) >= self.flush_items:
+            self._full.set()
+
+    def start(self):
+        self._closed = False
+        self._task = asyncio.create_task(self._run(), name="batch-progress")
+
+    async def stop(self):
+        """Write every recorded outcome, then stop flushing."""
+        self._closed = True
+        self._has_outcomes.set()
+        self._full.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._closed:
+            await self._has_outcomes.wait()
+            if not self._closed:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def flush(self):
+        """Write all recorded outcomes now."""
+        async with self._lock:
+            batch, self._outcomes = self._outcomes, []
+            self._has_outcomes.clear()
+            self._full.clear()
+            if not batch:
+                return
+            try:
+                await self.write_fn(batch)
+                self.flushes += 1
+            except Exception as e:
+                logger.error("Batch progress flush failed", outcomes=len(batch), error=str(e))
+                self._outcomes[:0] = batch
+                self._has_outcomes.set()
+                if self._closed:
+                    return
+                await asyncio.sleep(self.flush_interval)
+
+
 class BatchQueue:
-    """Async batch job queue with in-memory state tracking.
+    """Durable batch job queue drained by a fixed pool of consumer coroutines.
 
     Usage:
         queue = BatchQueue(max_concurrency=10)
@@ -56,31 +264,56 @@ class BatchQueue:
         self,
         max_concurrency: int = 10,
         generation_fn: Optional[Callable[[BatchJobItem, dict], Awaitable[str]]] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        worker_id: Optional[str] = None,
     ):
         """
         Args:
-            max_concurrency: Max concurrent item generations
+            max_concurrency: Consumer coroutines, i.e. max concurrent item generations
             generation_fn: Async function to generate a single item.
                            Signature: async def fn(item: BatchJobItem, config: dict) -> result_url: str
+            session_factory: Sessions for queue bookkeeping (default: SessionLocal)
+            worker_id: Recorded in ``claimed_by`` on claimed items (default: host-pid)
         """
         self.max_concurrency = max_concurrency
         self.generation_fn = generation_fn or self._default_generation
-        self._semaphore = asyncio.Semaphore(max_concurrency)
-        self._jobs: Dict[str, JobState] = {}
-        self._running_tasks: Dict[str, asyncio.Task] = {}
-        self._model_durations: Dict[str, list] = {}  # model_type -> [duration_ms, ...]
+        self.session_factory = session_factory or SessionLocal
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-batch"
+        self._jobs: Dict[str, JobState] = {}  # Active jobs only; finished jobs are read from the DB
+        self._consumers: List[asyncio.Task] = []
+        self._item_tasks: Dict[str, Set[asyncio.Task]] = {}  # job_id -> in-flight generations
+        self._progress = ProgressAggregator(
+            self._flush_progress,
+            flush_items=settings.batch_progress_flush_items,
+            flush_interval=settings.batch_progress_flush_ms / 1000,
+        )
+        self._wake = asyncio.Event()
         self._started = False
 
     async def start(self):
-        """Start the batch queue."""
+        """Finalize batches left complete by a crash and start the consumer pool."""
+        if self._started:
+            return
         self._started = True
-        logger.info("BatchQueue started", max_concurrency=self.max_concurrency)
+        try:
+            await asyncio.to_thread(self._finalize_ready_jobs)
+        except Exception as e:
+            logger.warning("Batch resume check failed", error=str(e))
+        self._progress.start()
+        self._consumers = [
+            asyncio.create_task(self._consume(), name=f"batch-consumer-{i}")
+            for i in range(self.max_concurrency)
+        ]
+        logger.info("BatchQueue started", max_concurrency=self.max_concurrency, worker_id=self.worker_id)
 
     async def stop(self):
-        """Stop the batch queue and cancel running jobs."""
+        """Stop the consumers; in-flight items are released for the next start (or another process)."""
         self._started = False
-        for task in self._running_tasks.values():
+        for task in self._consumers:
             task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        await self._progress.stop()
         logger.info("BatchQueue stopped")
 
     def get_state(self, job_id: str) -> Optional[JobState]:
@@ -121,7 +354,7 @@ class BatchQueue:
         """
         job_id = str(uuid.uuid4())
 
-        db = SessionLocal()
+        db = self.session_factory()
         try:
             # Check user and tier limits
             user = db.query(User).filter(User.id == user_id).first()
@@ -206,9 +439,8 @@ class BatchQueue:
                 credits_charged=credits_needed,
             )
 
-            # Start processing in background
-            task = asyncio.create_task(self._process_job(job_id))
-            self._running_tasks[job_id] = task
+            # Idle consumers pick the items up right away
+            self._wake.set()
 
             return job_id
 
@@ -229,9 +461,13 @@ class BatchQueue:
         Returns:
             True if cancelled, False if job not found or already finished
         """
-        db = SessionLocal()
+        # Write this process's finished items first so they are not refunded
+        if self._progress.pending_for(job_id):
+            await self._progress.flush()
+
+        db = self.session_factory()
         try:
-            job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
+            job = db.query(BatchJob).filter(BatchJob.job_id == job_id).with_for_update().first()
             if not job:
                 return False
 
@@ -241,18 +477,33 @@ class BatchQueue:
             if job.status in [BatchJobStatus.COMPLETED.value, BatchJobStatus.FAILED.value, BatchJobStatus.CANCELED.value]:
                 return False
 
-            # Cancel the asyncio task
-            if job_id in self._running_tasks:
-                self._running_tasks[job_id].cancel()
-                del self._running_tasks[job_id]
-
-            # Update job status
+            # Update job status (consumers stop claiming its items)
             job.status = BatchJobStatus.CANCELED.value
             job.finished_at = datetime.now(timezone.utc)
 
-            # Calculate refund for incomplete items
-            if job.pending_items > 0 and job.credits_charged > 0:
-                refund_amount = int(job.credits_charged * (job.pending_items / job.quantity))
+            # Cancel every unfinished item in the same transaction. Running items
+            # are included: their consumers (in any process) settle only running
+            # rows, so a result that lands later is discarded, not charged twice
+            canceled = db.execute(
+                update(BatchJobItem)
+                .where(
+                    BatchJobItem.batch_job_id == job.id,
+                    BatchJobItem.status.in_(
+                        [BatchJobItemStatus.PENDING.value, BatchJobItemStatus.RUNNING.value]
+                    ),
+                )
+                .values(
+                    status=BatchJobItemStatus.CANCELED.value,
+                    error_message=CANCELED_ITEM_MESSAGE,
+                    lease_expires_at=None,
+                    finished_at=datetime.now(timezone.utc),
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            # Refund the canceled items, counted from the item rows (job counters lag)
+            if canceled > 0 and job.credits_charged > 0:
+                refund_amount = int(job.credits_charged * (canceled / job.quantity))
                 if refund_amount > 0:
                     refund_credits(
                         db=db,
@@ -265,9 +516,10 @@ class BatchQueue:
 
             db.commit()
 
-            # Update in-memory state
-            if job_id in self._jobs:
-                self._jobs[job_id].status = BatchJobStatus.CANCELED.value
+            # Stop this process's in-flight generations; other processes' finish on their own
+            for task in self._item_tasks.get(job_id, ()):
+                task.cancel()
+            self._jobs.pop(job_id, None)
 
             logger.info("Batch job cancelled", job_id=job_id, refunded=job.credits_refunded)
             return True
@@ -279,195 +531,337 @@ class BatchQueue:
         finally:
             db.close()
 
-    async def _process_job(self, job_id: str):
-        """Process all items in a batch job."""
-        db = SessionLocal()
-        try:
-            job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
-            if not job:
-                logger.error("Job not found for processing", job_id=job_id)
-                return
-
-            # Update status to running
-            job.status = BatchJobStatus.RUNNING.value
-            job.started_at = datetime.now(timezone.utc)
-            db.commit()
-
-            if job_id in self._jobs:
-                self._jobs[job_id].status = BatchJobStatus.RUNNING.value
-
-            config = job.get_config()
-            items = db.query(BatchJobItem).filter(BatchJobItem.batch_job_id == job.id).all()
-
-            # Process items with concurrency control
-            tasks = []
-            for item in items:
-                task = asyncio.create_task(self._process_item(job_id, item.id, config))
-                tasks.append(task)
-
-            # Wait for all items
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Finalize job
-            await self._finalize_job(job_id)
-
-        except asyncio.CancelledError:
-            logger.info("Job processing cancelled", job_id=job_id)
-        except Exception as e:
-            logger.error("Job processing failed", job_id=job_id, error=str(e))
-            await self._mark_job_failed(job_id, str(e))
-        finally:
-            db.close()
-            if job_id in self._running_tasks:
-                del self._running_tasks[job_id]
-
-    async def _process_item(self, job_id: str, item_id: int, config: dict):
-        """Process a single item with semaphore-controlled concurrency."""
-        async with self._semaphore:
-            db = SessionLocal()
+    async def _consume(self):
+        """Consumer loop: claim one item, generate it, repeat; idle until woken or the poll interval."""
+        while self._started:
+            self._wake.clear()
             try:
-                item = db.query(BatchJobItem).filter(BatchJobItem.id == item_id).first()
-                if not item:
-                    return
-
-                # Mark as running
-                item.status = BatchJobItemStatus.RUNNING.value
-                item.started_at = datetime.now(timezone.utc)
-                db.commit()
-
-                start_time = datetime.now(timezone.utc)
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error("Batch item claim failed", error=str(e))
+                claimed = []
 
+            if not claimed:
                 try:
-                    # Call generation function
-                    result_url = await self.generation_fn(item, config)
-
-                    # Mark as completed
-                    item.status = BatchJobItemStatus.COMPLETED.value
-                    item.result_url = result_url
-                    item.finished_at = datetime.now(timezone.utc)
-                    item.duration_ms = int((item.finished_at - start_time).total_seconds() * 1000)
-                    db.commit()
-
-                    # Update job progress
-                    await self._update_progress(job_id, success=True, duration_ms=item.duration_ms, model_type=config.get("model"))
-
-                except Exception as e:
-                    # Mark as failed
-                    item.status = BatchJobItemStatus.FAILED.value
-                    item.error_message = str(e)[:500]
-                    item.finished_at = datetime.now(timezone.utc)
-                    db.commit()
-
-                    await self._update_progress(job_id, success=False)
-                    logger.warning("Item generation failed", job_id=job_id, item_id=item_id, error=str(e))
+                    await asyncio.wait_for(
+                        self._wake.wait(), timeout=settings.batch_queue_poll_interval_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
 
+            item_id, _ = claimed[0]
+            try:
+                await self._process_item(item_id)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error("Item processing error", job_id=job_id, item_id=item_id, error=str(e))
-            finally:
-                db.close()
+                # The lease lapses and the item is retried; keep the consumer alive
+                logger.error("Item processing error", item_id=item_id, error=str(e))
 
-    async def _update_progress(
-        self,
-        job_id: str,
-        success: bool,
-        duration_ms: Optional[int] = None,
-        model_type: Optional[str] = None,
-    ):
-        """Update job progress and ETA."""
-        db = SessionLocal()
+    def _claim(self) -> List[Tuple[int, int]]:
+        db = self.session_factory()
         try:
-            job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
-            if not job:
-                return
-
-            if success:
-                job.completed_items += 1
-            else:
-                job.failed_items += 1
-            job.pending_items = job.quantity - job.completed_items - job.failed_items
-
-            # Update moving average duration
-            if duration_ms and model_type:
-                if model_type not in self._model_durations:
-                    self._model_durations[model_type] = []
-                self._model_durations[model_type].append(duration_ms)
-                # Keep last 50 samples
-                self._model_durations[model_type] = self._model_durations[model_type][-50:]
-                avg_duration = sum(self._model_durations[model_type]) / len(self._model_durations[model_type])
-                job.avg_item_duration_ms = int(avg_duration)
-
-                # Calculate ETA
-                if job.pending_items > 0 and job.avg_item_duration_ms:
-                    eta_ms = job.pending_items * job.avg_item_duration_ms
-                    job.estimated_completion = datetime.now(timezone.utc) + timedelta(milliseconds=eta_ms)
-
-            db.commit()
-
-            # Update in-memory state
-            if job_id in self._jobs:
-                state = self._jobs[job_id]
-                state.completed = job.completed_items
-                state.failed = job.failed_items
-                state.pending = job.pending_items
-                state.avg_duration_ms = job.avg_item_duration_ms
-                if job.estimated_completion:
-                    state.eta_seconds = int((job.estimated_completion - datetime.now(timezone.utc)).total_seconds())
-                state.last_update = datetime.now(timezone.utc)
-
-        except Exception as e:
-            logger.error("Progress update failed", job_id=job_id, error=str(e))
+            return claim_batch_items(db, self.worker_id, limit=1)
         finally:
             db.close()
 
-    async def _finalize_job(self, job_id: str):
-        """Mark job as completed or failed based on item results."""
-        db = SessionLocal()
+    def _settle_statement(self, item_id: int, values: Dict[str, Any]):
+        """UPDATE moving an item out of running, matching only while this worker holds it."""
+        return (
+            update(BatchJobItem)
+            .where(
+                BatchJobItem.id == item_id,
+                BatchJobItem.status == BatchJobItemStatus.RUNNING.value,
+                BatchJobItem.claimed_by == self.worker_id,
+            )
+            .values(**{"lease_expires_at": None, **values})
+            .execution_options(synchronize_session=False)
+        )
+
+    def _settle(self, db: Session, item_id: int, **values) -> bool:
+        """Move an item this worker holds out of running now. False if its lease was lost to another worker."""
+        result = db.execute(self._settle_statement(item_id, values))
+        db.commit()
+        return result.rowcount == 1
+
+    async def _process_item(self, item_id: int):
+        """Generate one claimed item, renewing its lease, and record the outcome."""
+        db = self.session_factory()
         try:
-            job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
-            if not job:
+            item = db.get(BatchJobItem, item_id)
+            if not item:
                 return
+            job = item.batch_job
+            job_id = job.job_id
+            config = job.get_config()
+            start_time = datetime.now(timezone.utc)
 
-            job.finished_at = datetime.now(timezone.utc)
-
-            if job.failed_items == job.quantity:
-                job.status = BatchJobStatus.FAILED.value
-            else:
-                job.status = BatchJobStatus.COMPLETED.value
-
-            db.commit()
+            generation = asyncio.ensure_future(self.generation_fn(item, config))
+            in_flight = self._item_tasks.setdefault(job_id, set())
+            in_flight.add(generation)
+            try:
+                async with hold_leases(
+                    [item_id],
+                    self.worker_id,
+                    lease_seconds=settings.batch_item_lease_seconds,
+                    model=BatchJobItem,
+                    session_factory=self.session_factory,
+                ):
+                    result_url = await generation
+            except asyncio.CancelledError:
+                if self._started:
+                    # cancel_job() stopped this generation and already canceled the item
+                    return
+                # Shutting down: hand the item straight back to the queue
+                self._settle(db, item_id, status=BatchJobItemStatus.PENDING.value)
+                raise
+            except Exception as e:
+                self._record_failure(db, job_id, item, e)
+                return
+            finally:
+                in_flight.discard(generation)
+                if not in_flight:
+                    self._item_tasks.pop(job_id, None)
+
+            finished_at = datetime.now(timezone.utc)
+            duration_ms = int((finished_at - start_time).total_seconds() * 1000)
+            runtime_key = RuntimeKey(
+                model=config.get("model") or "unknown",
+                kind=f"batch-{job.output_type}",
+                resolution=config.get("resolution") or "",
+                duration_sec=int(config.get("duration_sec") or 0) if job.output_type == "video" else 0,
+            )
+            runtime_stats.record(
+                runtime_key.model,
+                runtime_key.kind,
+                duration_ms / 1000,
+                runtime_key.resolution,
+                runtime_key.duration_sec,
+            )
+            self._record_outcome(
+                ItemOutcome(
+                    item_id=item_id,
+                    job_id=job_id,
+                    success=True,
+                    values={
+                        "status": BatchJobItemStatus.COMPLETED.value,
+                        "result_url": result_url,
+                        "error_message": None,
+                        "finished_at": finished_at,
+                        "duration_ms": duration_ms,
+                    },
+                    runtime_key=runtime_key,
+                )
+            )
+        finally:
+            db.close()
 
-            if job_id in self._jobs:
-                self._jobs[job_id].status = job.status
+    def _record_failure(self, db: Session, job_id: str, item: BatchJobItem, error: Exception):
+        """Schedule a retry for retryable errors with attempts left; otherwise fail the item."""
+        attempt = item.claim_count
+        if error_classifier.is_retryable(error) and attempt < settings.batch_item_max_attempts:
+            delay = error_classifier.get_retry_delay(error, attempt=attempt)
+            # A pending item stays hidden until its lease passes: that is the backoff
+            self._settle(
+                db,
+                item.id,
+                status=BatchJobItemStatus.PENDING.value,
+                error_message=str(error)[:500],
+                lease_expires_at=_utcnow() + timedelta(seconds=delay),
+            )
+            logger.warning(
+                "Item generation failed, will retry",
+                job_id=job_id,
+                item_id=item.id,
+                attempt=attempt,
+                retry_in=delay,
+                error=str(error),
+            )
+            return
 
-            logger.info(
-                "Batch job finalized",
+        logger.warning("Item generation failed", job_id=job_id, item_id=item.id, attempt=attempt, error=str(error))
+        self._record_outcome(
+            ItemOutcome(
+                item_id=item.id,
                 job_id=job_id,
-                status=job.status,
-                completed=job.completed_items,
-                failed=job.failed_items,
+                success=False,
+                values={
+                    "status": BatchJobItemStatus.FAILED.value,
+                    "error_message": str(error)[:500],
+                    "finished_at": datetime.now(timezone.utc),
+                },
             )
+        )
+
+    def _record_outcome(self, outcome: ItemOutcome):
+        """Hand a finished item to the aggregator; in-memory state reflects it right away."""
+        self._progress.record(outcome)
+        state = self._jobs.get(outcome.job_id)
+        if state:
+            if outcome.success:
+                state.completed += 1
+            else:
+                state.failed += 1
+            state.pending = max(state.pending - 1, 0)
+            state.last_update = datetime.now(timezone.utc)
+
+    async def _flush_progress(self, outcomes: List[ItemOutcome]):
+        # (mean, median) item seconds per job, read on the loop that records them
+        estimates: Dict[str, Tuple[float, float]] = {}
+        for outcome in outcomes:
+            key = outcome.runtime_key
+            if key is None or outcome.job_id in estimates:
+                continue
+            histogram = runtime_stats.histogram(key.model, key.kind, key.resolution, key.duration_sec)
+            if histogram:
+                estimates[outcome.job_id] = (histogram.mean, histogram.percentile(0.5))
+
+        for snapshot in await asyncio.to_thread(self._write_progress, outcomes, estimates):
+            self._sync_state(snapshot)
+
+    def _write_progress(
+        self,
+        outcomes: List[ItemOutcome],
+        estimates: Optional[Dict[str, Tuple[float, float]]] = None,
+    ) -> List[JobState]:
+        """Write item outcomes, job counters and ETAs in one transaction, then finalize finished jobs.
+
+        Runs in a worker thread. ``estimates`` maps job_id to (mean, median)
+        item seconds from the runtime statistics; the ETA is pending items
+        times the median. Returns the written job rows. Each item is only
+        settled if this worker still holds its lease, and only settled items
+        are counted, so the counters stay exact when leases are lost.
+        """
+        estimates = estimates or {}
+        db = self.session_factory()
+        try:
+            counts: Dict[str, List[int]] = {}  # job_id -> [completed, failed]
+            for outcome in outcomes:
+                settled = db.execute(self._settle_statement(outcome.item_id, outcome.values)).rowcount
+                if not settled:
+                    logger.warning(
+                        "Batch item lease lost; result discarded",
+                        job_id=outcome.job_id,
+                        item_id=outcome.item_id,
+                    )
+                    continue
+                job_counts = counts.setdefault(outcome.job_id, [0, 0])
+                job_counts[0 if outcome.success else 1] += 1
+
+            # Counters are incremented in SQL: consumers in other processes update the same rows
+            for job_id, (completed, failed) in counts.items():
+                db.execute(
+                    update(BatchJob)
+                    .where(BatchJob.job_id == job_id)
+                    .values(
+                        completed_items=BatchJob.completed_items + completed,
+                        failed_items=BatchJob.failed_items + failed,
+                        pending_items=BatchJob.pending_items - completed - failed,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
 
-        except Exception as e:
-            logger.error("Job finalization failed", job_id=job_id, error=str(e))
+            jobs = db.query(BatchJob).filter(BatchJob.job_id.in_(list(counts))).all() if counts else []
+            now = datetime.now(timezone.utc)
+            for job in jobs:
+                if job.job_id in estimates:
+                    mean, median = estimates[job.job_id]
+                    job.avg_item_duration_ms = int(mean * 1000)
+                    # Calculate ETA
+                    if job.pending_items > 0:
+                        job.estimated_completion = now + timedelta(seconds=job.pending_items * median)
+            db.commit()
+
+            snapshots = [
+                JobState(
+                    job_id=job.job_id,
+                    status=job.status,
+                    quantity=job.quantity,
+                    completed=job.completed_items,
+                    failed=job.failed_items,
+                    pending=job.pending_items,
+                    avg_duration_ms=job.avg_item_duration_ms,
+                    eta_seconds=_seconds_until(job.estimated_completion),
+                )
+                for job in jobs
+            ]
+            # Every outcome of these jobs is written, so their counters are exact here
+            for snapshot in snapshots:
+                if snapshot.pending <= 0:
+                    self._finalize(db, snapshot.job_id)
+            return snapshots
+        except Exception:
+            db.rollback()
+            raise
         finally:
             db.close()
 
-    async def _mark_job_failed(self, job_id: str, error: str):
-        """Mark job as failed with error message."""
-        db = SessionLocal()
+    def _sync_state(self, snapshot: JobState):
+        """Refresh in-memory state from a flushed job row plus outcomes recorded since."""
+        state = self._jobs.get(snapshot.job_id)
+        if not state:
+            return
+        unflushed = self._progress.pending_for(snapshot.job_id)
+        succeeded = sum(outcome.success for outcome in unflushed)
+        state.status = snapshot.status
+        state.completed = snapshot.completed + succeeded
+        state.failed = snapshot.failed + len(unflushed) - succeeded
+        state.pending = max(snapshot.pending - len(unflushed), 0)
+        state.avg_duration_ms = snapshot.avg_duration_ms
+        state.eta_seconds = snapshot.eta_seconds
+        state.last_update = datetime.now(timezone.utc)
+
+    def _finalize(self, db: Session, job_id: str) -> bool:
+        """Mark a running job whose items have all finished as completed (or failed if every item failed).
+
+        Conditional, so exactly one consumer across all processes finalizes a job.
+        """
+        result = db.execute(
+            update(BatchJob)
+            .where(
+                BatchJob.job_id == job_id,
+                BatchJob.status == BatchJobStatus.RUNNING.value,
+                BatchJob.pending_items <= 0,
+            )
+            .values(
+                status=case(
+                    (BatchJob.failed_items >= BatchJob.quantity, BatchJobStatus.FAILED.value),
+                    else_=BatchJobStatus.COMPLETED.value,
+                ),
+                finished_at=datetime.now(timezone.utc),
+                estimated_completion=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        self._jobs.pop(job_id, None)
+        if result.rowcount != 1:
+            return False
+
+        job = db.query(BatchJob).filter(BatchJob.job_id == job_id).populate_existing().first()
+        logger.info(
+            "Batch job finalized",
+            job_id=job_id,
+            status=job.status,
+            completed=job.completed_items,
+            failed=job.failed_items,
+        )
+        return True
+
+    def _finalize_ready_jobs(self) -> int:
+        """Finalize jobs whose last item finished right before a crash. Returns jobs finalized."""
+        db = self.session_factory()
         try:
-            job = db.query(BatchJob).filter(BatchJob.job_id == job_id).first()
-            if job:
-                job.status = BatchJobStatus.FAILED.value
-                job.error_message = error[:500]
-                job.finished_at = datetime.now(timezone.utc)
-                db.commit()
-
-            if job_id in self._jobs:
-                self._jobs[job_id].status = BatchJobStatus.FAILED.value
-
-        except Exception as e:
-            logger.error("Failed to mark job as failed", job_id=job_id, error=str(e))
+            job_ids = list(
+                db.scalars(
+                    select(BatchJob.job_id).where(
+                        BatchJob.status == BatchJobStatus.RUNNING.value,
+                        BatchJob.pending_items <= 0,
+                    )
+                )
+            )
+            return sum(self._finalize(db, job_id) for job_id in job_ids)
         finally:
             db.close()
 
@@ -1,36 +1,344 @@
-"""Redis caching service for API responses."""
+"""Two-tier response cache: an in-process LRU in front of Redis.
 
+Reads check a bounded per-process LRU first, then Redis (shared by every
+process), then call the loader. Concurrent misses for one key share a
+single load (single-flight), so an expired hot key costs one query per
+process instead of one per request.
+
+Entries carry tags; ``invalidate(*tags)`` drops every entry with one of
+them. Redis keeps a set of keys per tag, so invalidation deletes exactly
+those keys instead of scanning with KEYS. Other processes' LRU tiers only
+notice when their (short) local TTL runs out, so local entries live at
+most CACHE_LOCAL_TTL_SECONDS.
+
+Without Redis (REDIS_URL empty, unreachable, or no ``redis`` package) the
+LRU tier still works on its own; Redis is retried every
+REDIS_RETRY_SECONDS.
+
+Values must be JSON-serializable; they are stored (and returned) as their
+JSON round trip, so callers get plain dicts/lists and must not mutate them.
+
+Usage:
+    data = await response_cache.get_or_set(
+        make_cache_key("templates", category=category),
+        load_templates,          # async () -> JSON-serializable value
+        ttl=300,
+        tags=["templates"],
+    )
+    await response_cache.invalidate("templates")
+"""
+
+import asyncio
+import json
 import os
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
 import structlog
 
+from app.config import settings
+
 logger = structlog.get_logger()
 
-# Redis client - initialized lazily
+# Redis client - initialized lazily, one per event loop (connections are loop-bound)
 _redis_client = None
+_redis_loop: Optional[asyncio.AbstractEventLoop] = None
+_redis_retry_at = 0.0
+_redis_error: Optional[str] = "not connected yet"
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes default
+REDIS_RETRY_SECONDS = 30.0  # After a failed connect, don't retry for this long
+
+TAG_KEY_PREFIX = "cache-tag:"
+TAG_TTL_SECONDS = 24 * 3600  # Tag key sets outlive the entries they list
 
 
 async def get_redis():
-    """Get or create Redis client."""
-    global _redis_client
-    if _redis_client is None:
+    """Get or create Redis client (None while Redis is unavailable)."""
+    global _redis_client, _redis_loop, _redis_retry_at, _redis_error
+    loop = asyncio.get_running_loop()
+    if _redis_client is not None and _redis_loop is not loop:
+        _redis_client = None  # Created on another (possibly closed) loop
+    if _redis_client is None and time.monotonic() >= _redis_retry_at:
+        if not REDIS_URL:
+            _redis_error = "REDIS_URL is empty"
+            _redis_retry_at = float("inf")
+            return None
         try:
-            import aioredis
-
-            _redis_client = await aioredis.from_url(
-                REDIS_URL, encoding="utf-8", decode_responses=True
-            )
-            await _redis_client.ping()
-            logger.info("Redis connected", url=REDIS_URL)
+            import redis.asyncio as aioredis
+        except ImportError:
+            _redis_error = "redis package not installed"
+            _redis_retry_at = float("inf")
+            logger.warning("Redis client not installed, caching in process only")
+            return None
+        client = aioredis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+        try:
+            await client.ping()
         except Exception as e:
-            logger.warning("Redis not available, caching disabled", error=str(e))
-            _redis_client = None
+            _redis_error = f"unreachable: {e}"
+            _redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.warning("Redis not available, caching in process only", error=str(e))
+            await client.aclose()
+            return None
+        _redis_client, _redis_loop, _redis_error = client, loop, None
+        logger.info("Redis connected", url=REDIS_URL)
     return _redis_client
 
 
+def get_redis_status() -> dict:
+    """Whether Redis is connected and, if not, why."""
+    return {"connected": _redis_client is not None, "error": _redis_error}
+
+
+class _LocalTier:
+    """Bounded LRU of (expires_at, value, tags) with a tag -> keys index."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            self.delete(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, tags: Tuple[str, ...]):
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        self.delete(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self.delete(next(iter(self._entries)))
+            self.evictions += 1
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tag: str) -> int:
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._tags.clear()
+
+
+class ResponseCache:
+    """In-process LRU + Redis cache with tags, single-flight loads and hit/miss stats."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        redis_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        self.local = _LocalTier(
+            settings.cache_local_max_entries if max_entries is None else max_entries
+        )
+        self.local_ttl = settings.cache_local_ttl_seconds if local_ttl is None else local_ttl
+        self._redis_factory = redis_factory or get_redis
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bumped by every invalidation: loads that started before it don't store
+        self._generation = 0
+
+        # Stats
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def _redis(self):
+        try:
+            return await self._redis_factory()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Redis unavailable", error=str(e))
+            return None
+
+    async def get(self, key: str, shared: bool = True) -> Tuple[bool, Any]:
+        """(found, value) from the local tier, else Redis (when ``shared``)."""
+        found, value = self.local.get(key)
+        if found:
+            self.local_hits += 1
+            return True, value
+        if shared:
+            redis = await self._redis()
+            if redis is not None:
+                try:
+                    raw = await redis.get(key)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning("Cache get failed", key=key, error=str(e))
+                    raw = None
+                if raw is not None:
+                    self.shared_hits += 1
+                    value = json.loads(raw)
+                    self.local.set(key, value, self.local_ttl, ())
+                    return True, value
+        return False, None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float = CACHE_TTL,
+        tags: Iterable[str] = (),
+        shared: bool = True,
+    ) -> Any:
+        """Store ``value``; returns it as cached (its JSON round trip)."""
+        tags = tuple(tags)
+        encoded = json.dumps(value, default=str)
+        value = json.loads(encoded)
+        self.local.set(key, value, min(ttl, self.local_ttl) if shared else ttl, tags)
+        if shared:
+            await self._store_shared(key, encoded, ttl, tags)
+        return value
+
+    async def _store_shared(self, key: str, encoded: str, ttl: float, tags: Tuple[str, ...]):
+        redis = await self._redis()
+        if redis is None:
+            return
+        try:
+            pipe = redis.pipeline(transaction=True)
+            pipe.setex(key, max(1, int(ttl)), encoded)
+            for tag in tags:
+                pipe.sadd(TAG_KEY_PREFIX + tag, key)
+                pipe.expire(TAG_KEY_PREFIX + tag, TAG_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Cache set failed", key=key, error=str(e))
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float = CACHE_TTL,
+        tags: Iterable[str] = (),
+        shared: bool = True,
+    ) -> Any:
+        """
+        Cached value for ``key``, else ``await loader()`` (stored unless it raises).
+
+        Concurrent callers missing the same key wait for one loader call. If
+        the loader raises, every waiter gets the exception and nothing is stored.
+        """
+        while True:
+            found, value = self.local.get(key)
+            if found:
+                self.local_hits += 1
+                return value
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.coalesced += 1
+            await asyncio.wait([inflight])
+            if not inflight.cancelled():
+                return inflight.result()
+            # The loading request was cancelled: try again (possibly loading ourselves)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader, ttl, tuple(tags), shared)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved: waiters (if any) re-raise it
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    async def _load(self, key, loader, ttl, tags, shared) -> Any:
+        if shared:
+            found, value = await self.get(key)
+            if found:
+                return value
+
+        self.misses += 1
+        generation = self._generation
+        value = await loader()
+        if generation != self._generation:
+            # Invalidated while loading: the value may predate the change
+            return json.loads(json.dumps(value, default=str))
+        return await self.set(key, value, ttl=ttl, tags=tags, shared=shared)
+
+    async def invalidate(self, *tags: str) -> int:
+        """Drop every entry tagged with any of ``tags``; returns Redis keys deleted."""
+        self._generation += 1
+        self.invalidations += 1
+        for tag in tags:
+            self.local.invalidate(tag)
+
+        redis = await self._redis()
+        if redis is None:
+            return 0
+        deleted = 0
+        for tag in tags:
+            try:
+                # Read and drop the set atomically: keys tagged after this start a new set
+                pipe = redis.pipeline(transaction=True)
+                pipe.smembers(TAG_KEY_PREFIX + tag)
+                pipe.delete(TAG_KEY_PREFIX + tag)
+                keys, _ = await pipe.execute()
+                if keys:
+                    deleted += await redis.delete(*keys)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Cache invalidation failed", tag=tag, error=str(e))
+        return deleted
+
+    def clear(self):
+        """Drop the local tier (Redis entries expire or are invalidated by tag)."""
+        self.local.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "local_entries": len(self.local),
+            "local_max_entries": self.local.max_entries,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.shared_hits) / lookups, 3) if lookups else None,
+            "coalesced": self.coalesced,
+            "evictions": self.local.evictions,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "redis": get_redis_status(),  # {"connected", "error": why not}
+        }
+
+
 async def cache_get(key: str) -> Optional[str]:
     """Get value from cache."""
     redis = await get_redis()
@@ -57,23 +365,24 @@ async def cache_set(key: str, value: str, ttl: int = CACHE_TTL) -> bool:
 
 
 async def cache_delete(pattern: str) -> int:
-    """Delete keys matching pattern."""
+    """Delete keys matching pattern (incremental SCAN; prefer tags for hot paths)."""
     redis = await get_redis()
     if redis is None:
         return 0
     try:
-        keys = await redis.keys(pattern)
-        if keys:
-            return await redis.delete(*keys)
-        return 0
+        deleted = 0
+        async for key in redis.scan_iter(match=pattern, count=500):
+            deleted += await redis.delete(key)
+        return deleted
     except Exception as e:
         logger.warning("Cache delete failed", pattern=pattern, error=str(e))
         return 0
 
 
-async def invalidate_pipelines_cache():
-    """Invalidate all pipeline list caches."""
-    deleted = await cache_delete("pipelines:*")
+async def invalidate_pipelines_cache(pipeline_id: Optional[int] = None):
+    """Invalidate pipeline list caches (and one pipeline's detail, if given)."""
+    tags = ["pipelines"] if pipeline_id is None else ["pipelines", f"pipeline:{pipeline_id}"]
+    deleted = await response_cache.invalidate(*tags)
     if deleted:
         logger.info("Invalidated pipeline caches", count=deleted)
 
@@ -85,3 +394,7 @@ def make_cache_key(prefix: str, **kwargs) -> str:
         if v is not None:
             parts.append(f"{k}={v}")
     return ":".join(parts)
+
+
+# Shared by the read-mostly API endpoints
+response_cache = ResponseCache()
@@ -137,8 +137,11 @@ class CheckpointManager:
 
     def _load_index(self):
         """Load or rebuild the index from checkpoint file."""
-        # Try loading cached index first
-        if self.index_file.exists():
+        # Try loading cached index first (unless entries were appended since it was saved)
+        if self.index_file.exists() and not (
+            self.checkpoint_file.exists()
+            and self.checkpoint_file.stat().st_mtime > self.index_file.stat().st_mtime
+        ):
             try:
                 with open(self.index_file, "r") as f:
                     data = json.load(f)
@@ -261,16 +264,12 @@ class CheckpointManager:
 
     def _append_line(self, line: str):
         """Append a line to the checkpoint file."""
-        if ATOMICWRITES_AVAILABLE and os.name != "nt":
-            # Use atomic append on Unix
-            with atomic_write(self.checkpoint_file, mode="a", overwrite=False) as f:
-                f.write(line)
-        else:
-            # Standard append (still safe for single process)
-            with open(self.checkpoint_file, "a") as f:
-                f.write(line)
-                f.flush()
-                os.fsync(f.fileno())  # Ensure written to disk
+        # atomicwrites can't append to an existing file; a single O_APPEND
+        # write plus fsync is durable, and writers are serialized by the lock
+        with open(self.checkpoint_file, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())  # Ensure written to disk
 
     def read(self, id: str) -> Optional[CheckpointEntry]:
         """
@@ -446,10 +445,16 @@ class CheckpointManager:
         if removed > 0:
             # Rewrite checkpoint file
             with FileLock(f"checkpoint_{self.name}", timeout=30):
-                with open(self.checkpoint_file, "w") as f:
-                    for entry in latest.values():
-                        line = json.dumps(entry) + "\n"
-                        f.write(line)
+                if ATOMICWRITES_AVAILABLE:
+                    # Rewrite via temp file + rename so a crash can't truncate the log
+                    with atomic_write(self.checkpoint_file, mode="w", overwrite=True) as f:
+                        for entry in latest.values():
+                            f.write(json.dumps(entry) + "\n")
+                else:
+                    with open(self.checkpoint_file, "w") as f:
+                        for entry in latest.values():
+                            line = json.dumps(entry) + "\n"
+                            f.write(line)
 
                 # Update index
                 self._rebuild_index()
@@ -9,6 +9,7 @@ from sqlalchemy import select
 import structlog
 
 from app.models import User, CreditTransaction
+from app.services.pagination import Page, paginate
 
 logger = structlog.get_logger()
 
@@ -164,6 +165,7 @@ def get_transaction_history(
     limit: int = 50,
     offset: int = 0,
     source: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> list[CreditTransaction]:
     """Get credit transaction history for a user.
 
@@ -171,22 +173,48 @@ def get_transaction_history(
         db: Database session
         user_id: User ID
         limit: Max results to return
-        offset: Offset for pagination
+        offset: Offset for pagination (ignored when cursor is given)
         source: Optional filter by source type
+        cursor: Keyset cursor from a previous page
 
     Returns:
         List of CreditTransaction records
     """
-    query = (
-        db.query(CreditTransaction)
-        .filter(CreditTransaction.user_id == user_id)
-        .order_by(CreditTransaction.created_at.desc())
-    )
+    return get_transaction_page(
+        db, user_id, limit=limit, offset=offset, source=source, cursor=cursor, count="none"
+    ).items
+
+
+def get_transaction_page(
+    db: Session,
+    user_id: int,
+    limit: int = 50,
+    offset: int = 0,
+    source: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: Optional[str] = None,
+) -> Page:
+    """Get one keyset page of a user's transactions, newest first.
+
+    Uses the (user_id, created_at, id) index. See ``paginate`` for the
+    count modes.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    query = db.query(CreditTransaction).filter(CreditTransaction.user_id == user_id)
 
     if source:
         query = query.filter(CreditTransaction.source == source)
 
-    return query.offset(offset).limit(limit).all()
+    return paginate(
+        query,
+        order=[(CreditTransaction.created_at, True), (CreditTransaction.id, True)],
+        limit=limit,
+        cursor=cursor,
+        count=count,
+        offset=offset,
+    )
 
 
 def refund_credits(
@@ -194,6 +194,12 @@ class ErrorClassifier:
         # Default to unknown
         return ErrorType.UNKNOWN
 
+    def classify_status(self, status_code: int) -> Optional[ErrorType]:
+        """Error type of an HTTP response status, or None for a success."""
+        if status_code < 400:
+            return None
+        return self.STATUS_CODE_MAP.get(status_code, ErrorType.TRANSIENT)
+
     def _extract_status_code(self, error: Exception) -> Optional[int]:
         """Extract HTTP status code from various error types."""
         # httpx HTTPStatusError
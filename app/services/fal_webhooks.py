@@ -0,0 +1,260 @@
+"""Fal webhook completion handling.
+
+When FAL_WEBHOOK_BASE_URL is set, jobs are submitted with a ``fal_webhook``
+callback and Fal POSTs one completion per request to
+``/api/webhooks/fal``. This module verifies those callbacks, updates the
+matching ``Job``/``ImageJob`` rows and wakes any in-process waiters through
+the shared poll scheduler (pipeline and batch steps are updated by their
+woken executors). Polling stays enabled as a slow sweeper for missed
+callbacks.
+
+Verification:
+    - Shared token: if FAL_WEBHOOK_SECRET is set, the callback URL carries
+      ``?token=<secret>`` which must match.
+    - Signature: Fal signs callbacks with ED25519 (X-Fal-Webhook-* headers);
+      public keys come from Fal's JWKS endpoint and are cached.
+
+Usage:
+    verified = await verify_fal_webhook(headers, body, token)
+    outcome = await apply_fal_webhook(db, payload)  # db: AsyncSession
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.fal_client import extract_video_url
+from app.http_client import get_http_client
+from app.image_client import extract_image_urls
+from app.models import Job, ImageJob
+from app.services.poll_scheduler import TERMINAL_STATUSES, fal_poll_scheduler
+
+try:
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+    from cryptography.exceptions import InvalidSignature
+
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+FAL_JWKS_URL = "https://rest.alpha.fal.ai/.well-known/jwks.json"
+JWKS_CACHE_SECONDS = 24 * 3600
+MAX_TIMESTAMP_SKEW_SECONDS = 300
+
+_jwks_cache: Dict[str, Any] = {"keys": [], "fetched_at": 0.0}
+
+
+async def _get_fal_public_keys() -> List[bytes]:
+    """Fetch (and cache) Fal's ED25519 webhook public keys."""
+    if _jwks_cache["keys"] and time.time() - _jwks_cache["fetched_at"] < JWKS_CACHE_SECONDS:
+        return _jwks_cache["keys"]
+
+    client = get_http_client(FAL_JWKS_URL)
+    response = await client.get(FAL_JWKS_URL, timeout=10.0)
+    response.raise_for_status()
+
+    keys = []
+    for jwk in response.json().get("keys", []):
+        x = jwk.get("x")
+        if x:
+            keys.append(base64.urlsafe_b64decode(x + "=" * (-len(x) % 4)))
+
+    _jwks_cache["keys"] = keys
+    _jwks_cache["fetched_at"] = time.time()
+    return keys
+
+
+async def verify_fal_signature(headers: Dict[str, str], body: bytes) -> bool:
+    """Verify Fal's ED25519 webhook signature for a raw request body."""
+    if not CRYPTOGRAPHY_AVAILABLE:
+        logger.warning("cryptography not installed, cannot verify Fal webhook signature")
+        return False
+
+    request_id = headers.get("x-fal-webhook-request-id")
+    user_id = headers.get("x-fal-webhook-user-id")
+    timestamp = headers.get("x-fal-webhook-timestamp")
+    signature = headers.get("x-fal-webhook-signature")
+    if not all([request_id, user_id, timestamp, signature]):
+        return False
+
+    try:
+        if abs(time.time() - int(timestamp)) > MAX_TIMESTAMP_SKEW_SECONDS:
+            logger.warning("Fal webhook timestamp outside allowed skew", request_id=request_id)
+            return False
+        signature_bytes = bytes.fromhex(signature)
+    except ValueError:
+        return False
+
+    message = "\n".join(
+        [request_id, user_id, timestamp, hashlib.sha256(body).hexdigest()]
+    ).encode("utf-8")
+
+    try:
+        public_keys = await _get_fal_public_keys()
+    except Exception as e:
+        logger.error("Failed to fetch Fal webhook keys", error=str(e))
+        return False
+
+    for key_bytes in public_keys:
+        try:
+            Ed25519PublicKey.from_public_bytes(key_bytes).verify(signature_bytes, message)
+            return True
+        except (InvalidSignature, ValueError):
+            continue
+    return False
+
+
+async def verify_fal_webhook(
+    headers: Dict[str, str], body: bytes, token: Optional[str]
+) -> bool:
+    """
+    Check a webhook against every configured verification method.
+
+    Returns False if no method is configured, so an open endpoint can't be
+    used to inject results.
+    """
+    checks = 0
+
+    if settings.fal_webhook_secret:
+        checks += 1
+        if not token or not hmac.compare_digest(token, settings.fal_webhook_secret):
+            return False
+
+    if settings.fal_webhook_verify_signature:
+        checks += 1
+        if not await verify_fal_signature(headers, body):
+            return False
+
+    return checks > 0
+
+
+def parse_fal_webhook(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a Fal webhook body into the result dict shape used by pollers.
+
+    Fal sends ``{"request_id", "status": "OK"|"ERROR", "payload", "error"}``.
+    The result carries both ``video_url`` and ``image_urls`` so it resolves
+    video and image waiters alike.
+    """
+    result_data = payload.get("payload") or {}
+    ok = payload.get("status") == "OK" and not payload.get("payload_error")
+
+    result: Dict[str, Any] = {
+        "status": "completed" if ok else "failed",
+        "video_url": None,
+        "image_urls": None,
+        "error_message": None,
+    }
+
+    if ok and isinstance(result_data, dict):
+        result["video_url"] = extract_video_url(result_data)
+        result["image_urls"] = extract_image_urls(result_data) or None
+    else:
+        error = payload.get("error") or payload.get("payload_error")
+        if not error and isinstance(result_data, dict):
+            error = result_data.get("detail")
+        result["error_message"] = str(error) if error else "Unknown error from Fal"
+
+    return result
+
+
+async def _update_unfinished(
+    db: AsyncSession, model, request_column, status_column, request_id: str, values: Dict[str, Any]
+) -> Optional[int]:
+    """
+    Set ``values`` on the request's row unless it is already terminal.
+
+    Conditional in SQL, so a redelivered webhook or one racing the worker's
+    poller never overwrites a finished row. Returns the updated row's id.
+    """
+    result = await db.execute(
+        update(model)
+        .where(request_column == request_id, status_column.not_in(TERMINAL_STATUSES))
+        .values(**values)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalars().first()
+
+
+async def apply_fal_webhook(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a verified Fal completion: update Job/ImageJob rows and wake waiters.
+
+    Rows that are already completed or failed are left untouched (reported
+    under ``skipped``). Returns a summary of what was matched.
+    """
+    request_id = payload.get("request_id") or payload.get("gateway_request_id")
+    if not request_id:
+        raise ValueError("Fal webhook missing request_id")
+
+    result = parse_fal_webhook(payload)
+    matched: List[str] = []
+    skipped: List[str] = []
+
+    job_values: Dict[str, Any] = {"wan_status": result["status"]}
+    if result["video_url"]:
+        job_values["wan_video_url"] = result["video_url"]
+    if result["error_message"]:
+        job_values["error_message"] = result["error_message"]
+    job_id = await _update_unfinished(
+        db, Job, Job.wan_request_id, Job.wan_status, request_id, job_values
+    )
+
+    image_values: Dict[str, Any] = {"status": result["status"]}
+    if result["image_urls"]:
+        image_values["result_image_urls"] = json.dumps(result["image_urls"])
+    if result["error_message"]:
+        image_values["error_message"] = result["error_message"]
+    image_job_id = await _update_unfinished(
+        db, ImageJob, ImageJob.request_id, ImageJob.status, request_id, image_values
+    )
+    await db.commit()
+
+    if job_id is not None:
+        matched.append(f"job:{job_id}")
+    else:
+        skipped.extend(
+            f"job:{row_id}"
+            for row_id in await db.scalars(select(Job.id).where(Job.wan_request_id == request_id))
+        )
+    if image_job_id is not None:
+        matched.append(f"image_job:{image_job_id}")
+    else:
+        skipped.extend(
+            f"image_job:{row_id}"
+            for row_id in await db.scalars(
+                select(ImageJob.id).where(ImageJob.request_id == request_id)
+            )
+        )
+
+    woke_waiter = fal_poll_scheduler.resolve(request_id, result)
+
+    logger.info(
+        "Fal webhook applied",
+        request_id=request_id,
+        status=result["status"],
+        matched=matched,
+        skipped=skipped,
+        woke_waiter=woke_waiter,
+    )
+
+    return {
+        "request_id": request_id,
+        "status": result["status"],
+        "matched": matched,
+        "skipped": skipped,
+        "woke_waiter": woke_waiter,
+        "job_id": job_id,
+        "image_job_id": image_job_id,
+    }
@@ -2,12 +2,13 @@
 Service to dispatch generation jobs to the correct provider (Fal, Vast.ai, Pinokio).
 Provider is determined automatically based on model selection.
 """
-import asyncio
 from typing import Optional, List
 import structlog
 
 from app.models import BatchJobItem
 from app.services.vastai_orchestrator import get_vastai_orchestrator
+from app.services.poll_scheduler import fal_poll_scheduler
+from app.services.runtime_stats import runtime_stats
 from app import fal_client
 from app import image_client
 from app.schemas import is_vastai_model, is_pinokio_model
@@ -70,24 +71,26 @@ async def generate_image(
             flux_acceleration=flux_acceleration,
         )
 
-        # Poll for completion (5 min max)
-        for _ in range(60):
-            await asyncio.sleep(5)
-            result = await image_client.get_image_result(model=model, request_id=request_id)
-
-            if result["status"] == "completed":
-                urls = result.get("image_urls", [])
-                if urls:
-                    logger.info("Image generation completed", model=model, count=len(urls))
-                    return urls
-                else:
-                    raise Exception("Image generation completed but no URLs returned")
-
-            elif result["status"] == "failed":
-                error_msg = result.get("error_message", "Unknown error")
-                raise Exception(f"Image generation failed: {error_msg}")
-
-        raise TimeoutError("Image generation timed out after 5 minutes")
+        # Wait for completion via the shared poll scheduler, within the model's
+        # timeout budget (5 min until its runtime statistics say otherwise)
+        timeout = runtime_stats.timeout_budget(model, "image", default=300)
+        try:
+            result = await fal_poll_scheduler.wait(
+                request_id, model, kind="image", timeout=timeout
+            )
+        except TimeoutError:
+            raise TimeoutError(f"Image generation timed out after {timeout:.0f}s")
+
+        if result["status"] == "completed":
+            urls = result.get("image_urls", [])
+            if urls:
+                logger.info("Image generation completed", model=model, count=len(urls))
+                return urls
+            else:
+                raise Exception("Image generation completed but no URLs returned")
+
+        error_msg = result.get("error_message", "Unknown error")
+        raise Exception(f"Image generation failed: {error_msg}")
 
     except Exception as e:
         logger.error("Image generation failed", model=model, error=str(e))
@@ -122,24 +125,33 @@ async def generate_video(
             enable_audio=enable_audio,
         )
 
-        # Poll for completion (10 min max)
-        for _ in range(120):
-            await asyncio.sleep(5)
-            result = await fal_client.get_job_result(model=model, request_id=request_id)
-
-            if result["status"] == "completed":
-                video_url = result.get("video_url")
-                if video_url:
-                    logger.info("Video generation completed", model=model, url=video_url[:50])
-                    return video_url
-                else:
-                    raise Exception("Video generation completed but no URL returned")
-
-            elif result["status"] == "failed":
-                error_msg = result.get("error_message", "Unknown error")
-                raise Exception(f"Video generation failed: {error_msg}")
-
-        raise TimeoutError("Video generation timed out after 10 minutes")
+        # Wait for completion via the shared poll scheduler, within the model's
+        # timeout budget (10 min until its runtime statistics say otherwise)
+        timeout = runtime_stats.timeout_budget(
+            model, "video", default=600, resolution=resolution, duration_sec=duration_sec
+        )
+        try:
+            result = await fal_poll_scheduler.wait(
+                request_id,
+                model,
+                kind="video",
+                timeout=timeout,
+                resolution=resolution,
+                duration_sec=duration_sec,
+            )
+        except TimeoutError:
+            raise TimeoutError(f"Video generation timed out after {timeout:.0f}s")
+
+        if result["status"] == "completed":
+            video_url = result.get("video_url")
+            if video_url:
+                logger.info("Video generation completed", model=model, url=video_url[:50])
+                return video_url
+            else:
+                raise Exception("Video generation completed but no URL returned")
+
+        error_msg = result.get("error_message", "Unknown error")
+        raise Exception(f"Video generation failed: {error_msg}")
 
     except Exception as e:
         logger.error("Video generation failed", model=model, error=str(e))
@@ -183,23 +195,31 @@ async def _run_fal_job_and_wait(item: BatchJobItem, config: dict) -> str:
             enable_audio=enable_audio,
         )
 
-        # Poll for completion
-        for _ in range(120):  # Max wait time of 10 minutes (120 * 5s)
-            await asyncio.sleep(5)
-            result = await fal_client.get_job_result(model=model, request_id=request_id)
-            
-            if result["status"] == "completed":
-                if result.get("video_url"):
-                    logger.info("Fal.ai job completed", item_id=item.id, video_url=result["video_url"])
-                    return result["video_url"]
-                else:
-                    raise Exception("Fal.ai job completed but no video URL was returned.")
-            
-            elif result["status"] == "failed":
-                error_message = result.get("error_message", "Unknown error from Fal.ai")
-                raise Exception(f"Fal.ai job failed: {error_message}")
-        
-        raise TimeoutError("Fal.ai job timed out after 10 minutes.")
+        # Wait for completion via the shared poll scheduler, within the model's timeout budget
+        timeout = runtime_stats.timeout_budget(
+            model, "video", default=600, resolution=resolution, duration_sec=duration_sec
+        )
+        try:
+            result = await fal_poll_scheduler.wait(
+                request_id,
+                model,
+                kind="video",
+                timeout=timeout,
+                resolution=resolution,
+                duration_sec=duration_sec,
+            )
+        except TimeoutError:
+            raise TimeoutError(f"Fal.ai job timed out after {timeout:.0f}s.")
+
+        if result["status"] == "completed":
+            if result.get("video_url"):
+                logger.info("Fal.ai job completed", item_id=item.id, video_url=result["video_url"])
+                return result["video_url"]
+            else:
+                raise Exception("Fal.ai job completed but no video URL was returned.")
+
+        error_message = result.get("error_message", "Unknown error from Fal.ai")
+        raise Exception(f"Fal.ai job failed: {error_message}")
 
     except Exception as e:
         logger.error("Fal.ai job processing failed", item_id=item.id, error=str(e))
@@ -38,6 +38,8 @@ from urllib.parse import urlparse
 import structlog
 import httpx
 
+from app.http_client import get_http_client
+
 logger = structlog.get_logger()
 
 
@@ -340,8 +342,7 @@ class InputValidator:
         check_content_type: bool = False,
     ):
         """Check if a URL is reachable via HEAD request."""
-        client = self._http_client or httpx.AsyncClient()
-        close_client = self._http_client is None
+        client = self._http_client or get_http_client(url)
 
         try:
             response = await client.head(
@@ -382,9 +383,6 @@ class InputValidator:
                 value=url,
                 code="connection_error",
             )
-        finally:
-            if close_client:
-                await client.aclose()
 
     def validate_required_fields(
         self,
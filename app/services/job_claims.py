@@ -0,0 +1,254 @@
+"""Atomic, leased job claiming shared by every worker process.
+
+A claim is one statement:
+
+    UPDATE jobs SET wan_status='claimed', claimed_by=:worker, lease_expires_at=:until
+    WHERE id IN (SELECT id FROM jobs WHERE <claimable>
+                 ORDER BY created_at, id LIMIT :n FOR UPDATE SKIP LOCKED)
+    RETURNING id
+
+On PostgreSQL, ``SKIP LOCKED`` lets concurrent workers (on any machine)
+claim disjoint rows without waiting on each other. SQLite renders no
+``FOR UPDATE`` and instead runs the whole statement under its single write
+lock, so the select-and-mark is still atomic. No file lock or shared
+``.locks`` directory is involved. Video jobs (``jobs``) and image jobs
+(``image_jobs``) are claimed the same way.
+
+Claims carry a lease. A job stuck in ``claimed`` past ``lease_expires_at``
+(its worker crashed or hung) is claimable again, so work is never lost;
+workers renew the lease while they hold a job. Jobs a worker runs itself
+(SwarmUI generations) keep the lease in ``running`` and are renewed by
+``hold_leases`` for as long as the generation lasts. Once a job has a Fal
+request id, the poller owns it and it is never reclaimed. Delivery is
+therefore at-least-once: a worker that dies after submitting but before
+recording the request id can cause a resubmission.
+
+Usage:
+    from app.services.job_claims import claim_jobs, claim_image_jobs, hold_leases
+
+    jobs = claim_jobs(db, worker_id="host-1234", limit=5)
+    for job in jobs:
+        async with hold_leases([job.id], "host-1234"):
+            ...  # long-running work
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+import structlog
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import BatchJobItem, ImageJob, Job
+
+logger = structlog.get_logger()
+
+CLAIMED_STATUS = "claimed"
+RUNNING_STATUS = "running"
+LEASED_STATUSES = (CLAIMED_STATUS, RUNNING_STATUS)
+
+# (status column, Fal request id column) per leased model. Batch items are
+# claimed by app.services.batch_queue and only use the lease helpers here.
+_COLUMNS = {
+    Job: ("wan_status", "wan_request_id"),
+    ImageJob: ("status", "request_id"),
+    BatchJobItem: ("status", None),
+}
+
+
+def _columns(model):
+    status, request_id = _COLUMNS[model]
+    return getattr(model, status), getattr(model, request_id) if request_id else None
+
+
+def _lease_until(lease_seconds: Optional[float]) -> datetime:
+    seconds = settings.job_claim_lease_seconds if lease_seconds is None else lease_seconds
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+def claimable_filter(now: Optional[datetime] = None, model=Job):
+    """Pending jobs, plus claimed/running jobs without a Fal request whose lease expired."""
+    now = now or datetime.utcnow()
+    status, request_id = _columns(model)
+    return or_(
+        status == "pending",
+        and_(
+            status.in_(LEASED_STATUSES),
+            request_id.is_(None),
+            model.lease_expires_at < now,
+        ),
+    )
+
+
+def claim_jobs(
+    db: Session,
+    worker_id: str,
+    limit: int,
+    lease_seconds: Optional[float] = None,
+    exclude_ids: Iterable[int] = (),
+    extra_filter=None,
+    model=Job,
+) -> List[Job]:
+    """
+    Atomically claim up to ``limit`` jobs for ``worker_id`` (oldest first).
+
+    Commits the claim before returning, so the write lock (SQLite) or row
+    locks (PostgreSQL) are held only for the one statement.
+
+    Args:
+        db: Database session
+        worker_id: Recorded in ``claimed_by``; needed to renew the lease
+        limit: Maximum jobs to claim
+        lease_seconds: Lease length (default: JOB_CLAIM_LEASE_SECONDS)
+        exclude_ids: Job ids to skip (e.g. jobs in cooldown)
+        extra_filter: Optional additional WHERE clause on the model
+        model: Job (default) or ImageJob
+
+    Returns:
+        Claimed job objects, oldest first
+    """
+    if limit <= 0:
+        return []
+
+    status, _ = _columns(model)
+    candidates = select(model.id).where(claimable_filter(model=model))
+    exclude_ids = [int(job_id) for job_id in exclude_ids]
+    if exclude_ids:
+        candidates = candidates.where(model.id.notin_(exclude_ids))
+    if extra_filter is not None:
+        candidates = candidates.where(extra_filter)
+    candidates = (
+        candidates.order_by(model.created_at, model.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    claim = (
+        update(model)
+        .where(model.id.in_(candidates))
+        .values(
+            {
+                status: CLAIMED_STATUS,
+                model.claimed_by: worker_id,
+                model.lease_expires_at: _lease_until(lease_seconds),
+                model.claim_count: model.claim_count + 1,
+            }
+        )
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+
+    job_ids = list(db.execute(claim).scalars())
+    db.commit()
+    if not job_ids:
+        return []
+
+    logger.info(
+        "Jobs claimed",
+        table=model.__tablename__,
+        worker_id=worker_id,
+        count=len(job_ids),
+        job_ids=job_ids,
+    )
+    return (
+        db.query(model)
+        .filter(model.id.in_(job_ids))
+        .order_by(model.created_at, model.id)
+        .populate_existing()
+        .all()
+    )
+
+
+def claim_image_jobs(
+    db: Session,
+    worker_id: str,
+    limit: int,
+    lease_seconds: Optional[float] = None,
+) -> List[ImageJob]:
+    """``claim_jobs`` for image jobs."""
+    return claim_jobs(db, worker_id, limit, lease_seconds=lease_seconds, model=ImageJob)
+
+
+def renew_leases(
+    db: Session,
+    job_ids: Iterable[int],
+    worker_id: str,
+    lease_seconds: Optional[float] = None,
+    model=Job,
+) -> int:
+    """
+    Extend the lease on jobs this worker still holds (claimed or running). Commits.
+
+    Returns the number of leases renewed; jobs reclaimed by another worker
+    after an expired lease are not renewed.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+
+    status, _ = _columns(model)
+    result = db.execute(
+        update(model)
+        .where(
+            model.id.in_(job_ids),
+            status.in_(LEASED_STATUSES),
+            model.claimed_by == worker_id,
+        )
+        .values(lease_expires_at=_lease_until(lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+@asynccontextmanager
+async def hold_leases(
+    job_ids: Iterable[int],
+    worker_id: str,
+    lease_seconds: Optional[float] = None,
+    model=Job,
+    session_factory=None,
+):
+    """
+    Keep renewing leases in the background while the block runs.
+
+    Renews every third of the lease, in a worker thread with its own
+    session, so a multi-minute generation never lets its lease lapse.
+    """
+    job_ids = list(job_ids)
+    seconds = settings.job_claim_lease_seconds if lease_seconds is None else lease_seconds
+
+    def renew() -> int:
+        if session_factory is None:
+            from app.database import SessionLocal
+
+            db = SessionLocal()
+        else:
+            db = session_factory()
+        try:
+            return renew_leases(db, job_ids, worker_id, seconds, model=model)
+        finally:
+            db.close()
+
+    async def keep_renewing():
+        while True:
+            await asyncio.sleep(max(seconds / 3, 1.0))
+            try:
+                renewed = await asyncio.to_thread(renew)
+            except Exception as e:
+                logger.warning("Lease renewal failed", job_ids=job_ids, error=str(e))
+                continue
+            if renewed < len(job_ids):
+                logger.warning(
+                    "Lost job lease", job_ids=job_ids, worker_id=worker_id, renewed=renewed
+                )
+
+    task = asyncio.create_task(keep_renewing())
+    try:
+        yield
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
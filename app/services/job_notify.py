@@ -0,0 +1,252 @@
+"""Cross-process job notifications: wake the worker when work appears.
+
+The API signals a kind of work after committing it, and the worker lanes
+subscribed to that kind run their cycle right away instead of waiting for
+their next DB scan (which remains as a slow safety sweep for missed
+signals).
+
+Kinds:
+    "video"      a Job became pending (fal-video and swarmui lanes)
+    "image"      an ImageJob became pending (fal-image lane)
+    "completed"  outputs are ready to download (downloads lane)
+    "pipeline"   a Pipeline was created; pipelines execute in the API
+                 process, so no worker lane subscribes, but external
+                 consumers (dashboards, other runners) can LISTEN for it
+
+Backends (``JOB_NOTIFY_BACKEND``):
+    postgres  LISTEN/NOTIFY on the job database; works across hosts
+    socket    Unix datagram sockets in a temp dir keyed by DB_PATH; one
+              socket per listener, so every local worker process is woken
+    none      no signals; lanes scan the DB every WORKER_POLL_INTERVAL_SECONDS
+    auto      postgres with DATABASE_URL, else socket where AF_UNIX exists
+
+Signals carry no data and may be dropped or coalesced; a wake-up only
+means "scan now".
+
+Usage:
+    await notify_jobs("video")              # async callers (API handlers)
+    notify_jobs_sync("completed")           # sync callers (worker)
+
+    listener = JobNotificationListener(["video"], on_notify)  # on_notify(kind)
+    await listener.start()
+    ...
+    await listener.stop()
+"""
+
+import asyncio
+import hashlib
+import itertools
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import structlog
+from sqlalchemy import text
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+CHANNEL = "i2v_jobs"
+KINDS = ("video", "image", "completed", "pipeline")
+
+PG_KEEPALIVE_SECONDS = 30.0
+PG_RECONNECT_MAX_SECONDS = 60.0
+
+_listener_ids = itertools.count()
+
+
+def get_backend() -> str:
+    """The active backend: "postgres", "socket" or "none"."""
+    backend = settings.job_notify_backend
+    if backend == "auto":
+        if settings.is_postgres:
+            return "postgres"
+        return "socket" if hasattr(socket, "AF_UNIX") else "none"
+    return backend
+
+
+def is_enabled() -> bool:
+    return get_backend() != "none"
+
+
+def _socket_dir() -> Path:
+    """Per-database socket directory (keeps unrelated DBs from waking each other)."""
+    key = hashlib.sha1(str(Path(settings.db_path).resolve()).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"i2v-notify-{key}"
+
+
+def _send_datagrams(kind: str) -> int:
+    """Send one datagram to every local listener for ``kind``; returns listeners reached."""
+    directory = _socket_dir()
+    if not directory.is_dir():
+        return 0
+
+    sent = 0
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        for path in directory.glob(f"{kind}.*.sock"):
+            try:
+                sock.sendto(b"1", str(path))
+                sent += 1
+            except BlockingIOError:
+                sent += 1  # Listener's buffer is full: a wake-up is already pending
+            except (ConnectionRefusedError, FileNotFoundError):
+                path.unlink(missing_ok=True)  # Listener process is gone
+            except OSError as e:
+                logger.debug("Job notification send failed", path=str(path), error=str(e))
+    finally:
+        sock.close()
+    return sent
+
+
+def _check_kind(kind: str):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown job notification kind: {kind}. Choose from {KINDS}")
+
+
+async def notify_jobs(kind: str) -> None:
+    """Signal listeners that ``kind`` work exists. Call after committing it."""
+    _check_kind(kind)
+    backend = get_backend()
+    try:
+        if backend == "postgres":
+            from app.database import async_engine
+
+            async with async_engine.connect() as conn:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :kind)"), {"channel": CHANNEL, "kind": kind}
+                )
+                await conn.commit()
+        elif backend == "socket":
+            _send_datagrams(kind)
+    except Exception as e:
+        # Never fail the caller: the worker's safety sweep picks the work up
+        logger.warning("Job notification failed", kind=kind, error=str(e))
+
+
+def notify_jobs_sync(kind: str) -> None:
+    """Blocking variant of ``notify_jobs`` for sync code."""
+    _check_kind(kind)
+    backend = get_backend()
+    try:
+        if backend == "postgres":
+            from app.database import engine
+
+            with engine.connect() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :kind)"), {"channel": CHANNEL, "kind": kind}
+                )
+                conn.commit()
+        elif backend == "socket":
+            _send_datagrams(kind)
+    except Exception as e:
+        logger.warning("Job notification failed", kind=kind, error=str(e))
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, kind: str, callback: Callable[[str], None]):
+        self.kind = kind
+        self.callback = callback
+
+    def datagram_received(self, data, addr):
+        self.callback(self.kind)
+
+
+class JobNotificationListener:
+    """
+    Receives job notifications for some kinds and calls ``callback(kind)``.
+
+    The callback runs on the event loop and must not block.
+    """
+
+    def __init__(self, kinds: Iterable[str], callback: Callable[[str], None]):
+        self.kinds = list(dict.fromkeys(kinds))
+        for kind in self.kinds:
+            _check_kind(kind)
+        self.callback = callback
+        self.backend = get_backend()
+        self.received = 0
+        self._transports: List[asyncio.DatagramTransport] = []
+        self._paths: List[Path] = []
+        self._pg_task: Optional[asyncio.Task] = None
+
+    def _deliver(self, kind: str):
+        if kind in self.kinds:
+            self.received += 1
+            self.callback(kind)
+
+    async def start(self):
+        if not self.kinds or self.backend == "none":
+            return
+        if self.backend == "postgres":
+            self._pg_task = asyncio.create_task(self._run_pg_listener())
+        elif self.backend == "socket":
+            await self._bind_sockets()
+        logger.info("Listening for job notifications", backend=self.backend, kinds=self.kinds)
+
+    async def _bind_sockets(self):
+        directory = _socket_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        listener_id = f"{os.getpid()}-{next(_listener_ids)}"
+        for kind in self.kinds:
+            path = directory / f"{kind}.{listener_id}.sock"
+            path.unlink(missing_ok=True)
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda kind=kind: _DatagramProtocol(kind, self._deliver),
+                local_addr=str(path),
+                family=socket.AF_UNIX,
+            )
+            self._transports.append(transport)
+            self._paths.append(path)
+
+    async def _run_pg_listener(self):
+        """Hold a LISTEN connection, reconnecting with backoff when it drops."""
+        import asyncpg
+        from app.database import ASYNC_DATABASE_URL
+
+        dsn = ASYNC_DATABASE_URL.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+
+        def on_notify(connection, pid, channel, payload):
+            self._deliver(payload)
+
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                await conn.add_listener(CHANNEL, on_notify)
+                backoff = 1.0
+                # Work may have been created while we were disconnected
+                for kind in self.kinds:
+                    self._deliver(kind)
+                while True:
+                    await asyncio.sleep(PG_KEEPALIVE_SECONDS)
+                    await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job notification listener lost", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, PG_RECONNECT_MAX_SECONDS)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+    async def stop(self):
+        if self._pg_task is not None:
+            self._pg_task.cancel()
+            await asyncio.gather(self._pg_task, return_exceptions=True)
+            self._pg_task = None
+        for transport in self._transports:
+            transport.close()
+        for path in self._paths:
+            path.unlink(missing_ok=True)
+        self._transports.clear()
+        self._paths.clear()
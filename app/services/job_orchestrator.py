@@ -34,7 +34,6 @@ Usage:
     recovered = await orchestrator.recover_interrupted_jobs()
 """
 
-import asyncio
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 import structlog
@@ -46,6 +45,7 @@ from app.services.flow_logger import JobFlowLogger
 from app.services.cooldown_manager import JobCooldownManager
 from app.services.rate_limiter import SlidingWindowRateLimiter
 from app.services.input_validator import InputValidator, ValidationError
+from app.services.poll_scheduler import fal_poll_scheduler
 
 logger = structlog.get_logger()
 
@@ -355,25 +355,24 @@ class JobOrchestrator:
         poll_interval: float = 5.0,
     ) -> JobResult:
         """
-        Poll for job completion.
+        Wait for job completion.
 
-        Polls the Fal API until job completes or fails, with:
-        - Intelligent retry on network errors
-        - Progress logging
+        Status polling is delegated to the shared Fal poll scheduler
+        (batched, adaptive intervals, network-error backoff); this adds:
+        - Flow logging
         - Checkpoint updates
 
         Args:
             job_id: Internal job ID
             request_id: Fal request ID
             model: Model used for the job
-            max_polls: Maximum polling attempts
-            poll_interval: Seconds between polls
+            max_polls: Legacy poll budget; max wait is max_polls * poll_interval
+            poll_interval: Legacy poll interval used to derive the max wait
 
         Returns:
             JobResult with final status
         """
         from time import time
-        from app.fal_client import get_job_result
 
         start_time = time()
         flow = JobFlowLogger(job_id, model=model)
@@ -387,77 +386,64 @@ class JobOrchestrator:
         )
 
         try:
-            for poll_num in range(max_polls):
-                flow.log_poll(f"poll_{poll_num}")
-
-                # Poll with retry
-                async def poll_operation():
-                    return await get_job_result(model, request_id)
-
-                retry_config = RetryConfig(
-                    max_attempts=3,
-                    base_delay_seconds=1.0,
-                    retryable_errors={ErrorType.NETWORK, ErrorType.TRANSIENT},
-                )
-
-                poll_result = await self.retry_manager.execute_with_retry(
-                    operation=poll_operation,
-                    config=retry_config,
+            flow.log_poll("scheduled")
+
+            # The shared poll scheduler owns the request_id; we only wait on it.
+            # Tracking continues after a timeout so short-window callers
+            # (e.g. JobWorker with max_polls=1) pick the result up next cycle.
+            try:
+                status_data = await fal_poll_scheduler.wait(
+                    request_id,
+                    model,
+                    kind="video",
+                    timeout=max_polls * poll_interval,
+                    keep_tracking=True,
                 )
+            except TimeoutError:
+                status_data = None
 
-                if not poll_result.success:
-                    continue  # Try next poll
+            if status_data is None:
+                # Max wait exceeded
+                latest = fal_poll_scheduler.latest(request_id) or {}
+                flow.log_poll(latest.get("status") or "pending")
+                flow.log_error(Exception("Polling timeout"))
+                flow.end("timeout")
 
-                status_data = poll_result.value
-                status = status_data.get("status", "pending")
-
-                if status == "completed":
-                    video_url = status_data.get("video_url")
-                    flow.log_complete(video_url=video_url)
-                    flow.end("success")
-
-                    self.checkpoint.mark_complete(
-                        job_id,
-                        result={"video_url": video_url, "request_id": request_id},
-                    )
-                    self.cooldown.job_succeeded(job_id)
-
-                    result.success = True
-                    result.video_url = video_url
-                    result.total_time_seconds = time() - start_time
-                    self._stats["jobs_completed"] += 1
+                result.error_message = f"Polling timeout after {max_polls} attempts"
+                result.error_type = ErrorType.TRANSIENT
+                result.total_time_seconds = time() - start_time
 
-                    return result
+                return result
 
-                elif status == "failed":
-                    error_msg = status_data.get("error_message", "Job failed")
-                    flow.log_error(Exception(error_msg))
-                    flow.end("failed")
+            if status_data.get("status") == "completed":
+                video_url = status_data.get("video_url")
+                flow.log_complete(video_url=video_url)
+                flow.end("success")
 
-                    self.checkpoint.mark_failed(job_id, error_msg)
-                    self.cooldown.job_failed(job_id, error_msg)
+                self.checkpoint.mark_complete(
+                    job_id,
+                    result={"video_url": video_url, "request_id": request_id},
+                )
+                self.cooldown.job_succeeded(job_id)
 
-                    result.error_message = error_msg
-                    result.error_type = ErrorType.PERMANENT
-                    result.total_time_seconds = time() - start_time
-                    self._stats["jobs_failed"] += 1
+                result.success = True
+                result.video_url = video_url
+                result.total_time_seconds = time() - start_time
+                self._stats["jobs_completed"] += 1
 
-                    return result
+                return result
 
-                # Still running - wait and continue
-                flow.log_progress(
-                    progress_pct=(poll_num / max_polls) * 100,
-                    message=f"Status: {status}",
-                )
-                await asyncio.sleep(poll_interval)
+            error_msg = status_data.get("error_message", "Job failed")
+            flow.log_error(Exception(error_msg))
+            flow.end("failed")
 
-            # Max polls exceeded
-            flow.log_error(Exception("Polling timeout"))
-            flow.end("timeout")
+            self.checkpoint.mark_failed(job_id, error_msg)
+            self.cooldown.job_failed(job_id, error_msg)
 
-            result.error_message = f"Polling timeout after {max_polls} attempts"
-            result.error_type = ErrorType.TRANSIENT
+            result.error_message = error_msg
+            result.error_type = ErrorType.PERMANENT
             result.total_time_seconds = time() - start_time
+            self._stats["jobs_failed"] += 1
 
             return result
 
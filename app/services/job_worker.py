@@ -1,8 +1,4 @@
-"""Job worker with file-based locking for safe concurrency.
-
-Principle 4: File-Based Locking
-Use file locks to prevent concurrent access to shared resources.
-Database locks are unreliable (especially SQLite). File locks work.
+"""Job worker with atomic, leased job claiming for safe concurrency.
 
 Critical Race Condition Fixed:
     Before (UNSAFE):
@@ -12,9 +8,13 @@ Critical Race Condition Fixed:
             job.status = "submitted"
 
     After (SAFE):
-        with JobLock():
-            pending_jobs = claim_pending_jobs(limit=N, worker_id=MY_ID)
-        # Only one worker can claim at a time
+        pending_jobs = claim_jobs(db, worker_id=MY_ID, limit=N)
+        # One UPDATE ... RETURNING (FOR UPDATE SKIP LOCKED on PostgreSQL)
+        # marks and returns the rows; no two workers get the same job
+
+Claims are leased (see ``app.services.job_claims``), so any number of
+worker processes, on any number of machines, can share the database, and
+jobs held by a crashed worker are reclaimed when the lease expires.
 
 Usage:
     worker = JobWorker(worker_id="worker-1")
@@ -33,10 +33,9 @@ from typing import Optional, List, Any, Dict
 from dataclasses import dataclass
 import structlog
 
-from app.services.file_lock import JobLock, LockAcquisitionError
-from app.services.checkpoint_manager import job_checkpoint
 from app.services.flow_logger import FlowLogger
 from app.services.cooldown_manager import job_cooldown
+from app.services.job_claims import claim_jobs, renew_leases
 from app.services.job_orchestrator import job_orchestrator, JobResult
 
 logger = structlog.get_logger()
@@ -59,8 +58,8 @@ class JobWorker:
     """
     Production-hardened job worker.
 
-    Uses file-based locking to safely claim jobs without race conditions.
-    Integrates with the orchestrator for reliable processing.
+    Claims jobs atomically with a lease, so it can run alongside other
+    workers. Integrates with the orchestrator for reliable processing.
 
     Attributes:
         worker_id: Unique identifier for this worker
@@ -71,17 +70,17 @@ class JobWorker:
     def __init__(
         self,
         worker_id: Optional[str] = None,
-        lock_timeout: float = 30.0,
+        lease_seconds: Optional[float] = None,
     ):
         """
         Initialize job worker.
 
         Args:
             worker_id: Unique ID for this worker (generates UUID if not provided)
-            lock_timeout: Timeout for acquiring job lock
+            lease_seconds: Claim lease length (default: JOB_CLAIM_LEASE_SECONDS)
         """
         self.worker_id = worker_id or f"worker-{uuid.uuid4().hex[:8]}"
-        self.lock_timeout = lock_timeout
+        self.lease_seconds = lease_seconds
         self.orchestrator = job_orchestrator
 
         self._running = False
@@ -100,10 +99,9 @@ class JobWorker:
         limit: int = 5,
     ) -> List[Any]:
         """
-        Safely claim pending jobs with file lock.
+        Atomically claim pending jobs (and jobs with expired leases).
 
-        This is the critical section - only one worker can execute this
-        at a time to prevent race conditions.
+        Jobs in cooldown are excluded in the claim statement itself.
 
         Args:
             db_session: SQLAlchemy database session
@@ -112,67 +110,19 @@ class JobWorker:
         Returns:
             List of claimed Job objects
         """
-        from app.models import Job
-
-        claimed = []
-
-        try:
-            # Acquire lock before querying
-            with JobLock(timeout=self.lock_timeout):
-                logger.debug(
-                    "Job lock acquired",
-                    worker_id=self.worker_id,
-                    limit=limit,
-                )
-
-                # Query pending jobs that are not in cooldown
-                pending_jobs = (
-                    db_session.query(Job)
-                    .filter(Job.wan_status == "pending")
-                    .order_by(Job.created_at)
-                    .limit(limit * 2)  # Get extra to filter cooldowns
-                    .all()
-                )
-
-                # Filter out jobs in cooldown
-                job_ids = [str(job.id) for job in pending_jobs]
-                eligible_ids = job_cooldown.get_processable_jobs(job_ids)
-
-                # Claim eligible jobs up to limit
-                for job in pending_jobs:
-                    if str(job.id) in eligible_ids and len(claimed) < limit:
-                        # Mark as claimed by this worker
-                        job.wan_status = "claimed"
-                        job.error_message = f"Claimed by {self.worker_id}"
-                        claimed.append(job)
-
-                        # Write checkpoint
-                        job_checkpoint.write(
-                            id=str(job.id),
-                            status="claimed",
-                            worker_id=self.worker_id,
-                            model=job.model,
-                        )
-
-                        self.stats.jobs_claimed += 1
-
-                # Commit claims
-                if claimed:
-                    db_session.commit()
-                    logger.info(
-                        "Jobs claimed",
-                        worker_id=self.worker_id,
-                        count=len(claimed),
-                        job_ids=[j.id for j in claimed],
-                    )
-
-        except LockAcquisitionError:
-            logger.warning(
-                "Could not acquire job lock",
-                worker_id=self.worker_id,
-                timeout=self.lock_timeout,
-            )
-
+        cooling_down = [
+            state.entity_id
+            for state in job_cooldown.get_all_in_cooldown()
+            if state.entity_id.isdigit()
+        ]
+        claimed = claim_jobs(
+            db_session,
+            worker_id=self.worker_id,
+            limit=limit,
+            lease_seconds=self.lease_seconds,
+            exclude_ids=cooling_down,
+        )
+        self.stats.jobs_claimed += len(claimed)
         return claimed
 
     async def process_job(
@@ -289,7 +239,6 @@ class JobWorker:
         Returns:
             List of JobResult for processed jobs
         """
-        # Claim jobs with lock
         claimed = await self.claim_pending_jobs(db_session, limit=limit)
 
         if not claimed:
@@ -299,6 +248,10 @@ class JobWorker:
         # Process each claimed job
         results = []
         for job in claimed:
+            # Earlier jobs may have taken a while: keep the claim alive
+            if not renew_leases(db_session, [job.id], self.worker_id, self.lease_seconds):
+                logger.warning("Lost claim on job", worker_id=self.worker_id, job_id=job.id)
+                continue
             result = await self.process_job(job, db_session)
             results.append(result)
 
@@ -0,0 +1,180 @@
+"""Normalized media outputs (one ``MediaAsset`` row per generated image/video).
+
+``PipelineStep.outputs`` stays the source of truth for the step itself, but
+read-heavy views (image library, counts, per-pipeline output counts) query
+``media_assets`` instead of parsing JSON per step. Rows are (re)written
+whenever a step completes or its outputs change; existing databases are
+backfilled at startup (completed steps that have no assets yet) or with
+``scripts/backfill_media_assets.py``.
+
+Usage:
+    step.set_outputs(outputs)
+    step.status = StepStatus.COMPLETED.value
+    sync_step_assets(db, step)
+    db.commit()
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import MediaAsset, PipelineStep, StepStatus
+
+logger = structlog.get_logger()
+
+ASSET_STEP_TYPES = ("i2i", "i2v")
+
+
+def prompt_hash(prompt: Optional[str]) -> Optional[str]:
+    """Stable hash of a prompt for grouping identical prompts."""
+    if not prompt:
+        return None
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def extract_step_assets(step: PipelineStep) -> List[Dict[str, Any]]:
+    """Build MediaAsset column dicts from a completed step's outputs."""
+    if step.step_type not in ASSET_STEP_TYPES:
+        return []
+
+    outputs = step.get_outputs()
+    inputs = step.get_inputs()
+    config = step.get_config()
+
+    if outputs.get("image_urls"):
+        kind, urls = "image", outputs["image_urls"]
+    elif outputs.get("video_urls"):
+        kind, urls = "video", outputs["video_urls"]
+    else:
+        items = outputs.get("items") or []
+        kind = "video" if step.step_type == "i2v" else "image"
+        urls = [item.get("url") for item in items]
+
+    thumbnail_urls = outputs.get("thumbnail_urls") or []
+    prompts = inputs.get("prompts") or []
+    source_images = inputs.get("image_urls") or []
+    prompt = prompts[0] if prompts else None
+    created_at = step.updated_at or datetime.utcnow()
+
+    return [
+        {
+            "pipeline_id": step.pipeline_id,
+            "step_id": step.id,
+            "output_index": i,
+            "kind": kind,
+            "url": url,
+            "thumbnail_url": thumbnail_urls[i] if i < len(thumbnail_urls) else None,
+            "source_image_url": source_images[0] if source_images else None,
+            "model": config.get("model"),
+            "prompt": prompt,
+            "prompt_hash": prompt_hash(prompt),
+            "created_at": created_at,
+        }
+        for i, url in enumerate(urls)
+        if url
+    ]
+
+
+def sync_step_assets(db: Session, step: PipelineStep) -> int:
+    """
+    Replace a step's MediaAsset rows to match its current outputs.
+
+    Steps that are not completed have no assets. Does not commit; call it
+    before the commit that persists the step. Returns the number of rows.
+    """
+    if step.id is None:
+        db.flush()
+
+    db.query(MediaAsset).filter(MediaAsset.step_id == step.id).delete(
+        synchronize_session=False
+    )
+    if step.status != StepStatus.COMPLETED.value:
+        return 0
+
+    rows = extract_step_assets(step)
+    for row in rows:
+        db.add(MediaAsset(**row))
+    return len(rows)
+
+
+def _steps_missing_assets(db: Session):
+    """Completed i2i/i2v steps without any MediaAsset row (anti-join)."""
+    return (
+        db.query(PipelineStep)
+        .filter(PipelineStep.step_type.in_(ASSET_STEP_TYPES))
+        .filter(PipelineStep.status == StepStatus.COMPLETED.value)
+        .filter(~exists().where(MediaAsset.step_id == PipelineStep.id))
+    )
+
+
+def backfill_media_assets(
+    session_factory=None, chunk_size: int = 500, missing_only: bool = False
+) -> int:
+    """
+    Populate media_assets from every completed i2i/i2v step.
+
+    Walks steps in keyset-paginated chunks (committing per chunk), so it is
+    safe to rerun and memory stays flat. With ``missing_only`` only steps
+    that have no assets yet are visited. Returns the number of assets written.
+    """
+    session_factory = session_factory or SessionLocal
+    cursor = 0
+    written = 0
+
+    while True:
+        db = session_factory()
+        try:
+            if missing_only:
+                query = _steps_missing_assets(db)
+            else:
+                query = (
+                    db.query(PipelineStep)
+                    .filter(PipelineStep.step_type.in_(ASSET_STEP_TYPES))
+                    .filter(PipelineStep.status == StepStatus.COMPLETED.value)
+                )
+            steps = (
+                query
+                .filter(PipelineStep.id > cursor)
+                .order_by(PipelineStep.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not steps:
+                break
+            for step in steps:
+                written += sync_step_assets(db, step)
+            db.commit()
+            cursor = steps[-1].id
+        finally:
+            db.close()
+
+    logger.info("Backfilled media assets", assets=written, last_step_id=cursor)
+    return written
+
+
+async def ensure_media_assets_backfilled(session_factory=None) -> int:
+    """
+    Backfill, off the event loop, completed steps that have no assets.
+
+    Catches up after an upgrade and after a backfill interrupted part way,
+    which an "is media_assets empty" check would skip forever. Returns the
+    number of assets written.
+    """
+    session_factory = session_factory or SessionLocal
+    db = session_factory()
+    try:
+        missing = _steps_missing_assets(db).with_entities(PipelineStep.id).first() is not None
+    finally:
+        db.close()
+
+    if not missing:
+        return 0
+    return await asyncio.to_thread(
+        backfill_media_assets, session_factory=session_factory, missing_only=True
+    )
@@ -0,0 +1,221 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Offset pagination makes the database walk and discard every skipped row,
+so deep pages get linearly slower. Keyset pagination instead filters on the
+sort key of the last row already seen (``(created_at, id) < (:c, :i)``),
+which an index on the same columns answers directly at any depth.
+
+Cursors are opaque URL-safe strings encoding the sort-key values of the
+last row of a page (the last sort column must be the primary key). While
+that anchor row still exists, the filter compares against its stored column
+values via scalar subqueries rather than re-bound Python values, so
+timestamps match exactly whatever format the backend stored them in (SQLite
+``CURRENT_TIMESTAMP`` rows have no microseconds). Totals are optional:
+counting is a second full scan, so by default only the first page is
+counted.
+
+Usage:
+    from app.services.pagination import paginate
+
+    page = paginate(
+        db.query(Job),
+        order=[(Job.created_at, True), (Job.id, True)],  # (column, descending)
+        limit=100,
+        cursor=cursor,
+    )
+    page.items, page.next_cursor, page.total
+
+    # AsyncSession: build the query on the sync session inside run_sync
+    page = await paginate_async(
+        db, lambda session: session.query(Job), order=..., limit=100, cursor=cursor
+    )
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select, text
+
+# Count modes: exact count, cheap estimate, no count. None = exact on the first page only.
+COUNT_MODES = ("exact", "approximate", "none")
+COUNT_MODE_PATTERN = "^(exact|approximate|none)$"
+
+# Approximate counts on SQLite count at most this many rows
+APPROX_COUNT_CAP = 10_000
+
+OrderSpec = Sequence[Tuple[Any, bool]]
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor can't be decoded for the requested ordering."""
+
+
+@dataclass
+class Page:
+    """One page of keyset-paginated results."""
+
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_is_approximate: bool = False
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort-key values into an opaque cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: OrderSpec) -> List[Any]:
+    """Decode a cursor back into sort-key values typed like the order columns."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(order):
+        raise InvalidCursor("Cursor does not match this listing")
+
+    decoded = []
+    for value, (column, _) in zip(values, order):
+        try:
+            if value is not None and column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+        except (NotImplementedError, TypeError, ValueError) as e:
+            raise InvalidCursor("Malformed cursor") from e
+        decoded.append(value)
+    return decoded
+
+
+def keyset_filter(order: OrderSpec, values: Sequence[Any]):
+    """
+    Rows strictly after ``values`` in the given ordering.
+
+    Expands to ``(a < :a) OR (a = :a AND b < :b) OR ...`` so mixed sort
+    directions work on every backend.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        equal_prefix = [order[j][0] == values[j] for j in range(i)]
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def _anchor_values(query, order: OrderSpec, values: List[Any]) -> List[Any]:
+    """
+    Sort-key values to page after: the anchor row's stored values when it
+    still exists (compared column-to-column), else the decoded cursor values.
+    """
+    pk = order[-1][0]
+    session = query.session
+    if session.query(pk).filter(pk == values[-1]).first() is None:
+        return values
+    return [
+        select(column).where(pk == values[-1]).scalar_subquery()
+        for column, _ in order[:-1]
+    ] + [values[-1]]
+
+
+def approximate_count(query) -> Tuple[int, bool]:
+    """
+    Cheap row count for a query. Returns (count, is_approximate).
+
+    PostgreSQL uses the planner's row estimate; other backends count at most
+    ``APPROX_COUNT_CAP`` rows.
+    """
+    session = query.session
+    if session.bind.dialect.name == "postgresql":
+        compiled = query.statement.compile(
+            dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+
+    capped = query.order_by(None).limit(APPROX_COUNT_CAP + 1).subquery()
+    count = session.execute(select(func.count()).select_from(capped)).scalar() or 0
+    if count > APPROX_COUNT_CAP:
+        return APPROX_COUNT_CAP, True
+    return count, False
+
+
+def paginate(
+    query,
+    order: OrderSpec,
+    limit: int,
+    cursor: Optional[str] = None,
+    count: Optional[str] = None,
+    offset: int = 0,
+) -> Page:
+    """
+    Fetch one keyset page.
+
+    Args:
+        query: Filtered SQLAlchemy query (no ordering/limit applied)
+        order: (column, descending) pairs; must end in the primary key
+        limit: Page size
+        cursor: ``next_cursor`` from the previous page
+        count: "exact", "approximate" or "none"; None counts the first page only
+        offset: Legacy offset, only honored when no cursor is given
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    page_query = query
+    if cursor:
+        page_query = page_query.filter(
+            keyset_filter(order, _anchor_values(query, order, decode_cursor(cursor, order)))
+        )
+    page_query = page_query.order_by(*[c.desc() if d else c.asc() for c, d in order])
+    if offset and not cursor:
+        page_query = page_query.offset(offset)
+
+    rows = page_query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in order])
+
+    if count is None:
+        count = "none" if cursor else "exact"
+
+    total, approximate = None, False
+    if count == "exact":
+        total = query.order_by(None).count()
+    elif count == "approximate":
+        total, approximate = approximate_count(query)
+
+    return Page(
+        items=rows,
+        next_cursor=next_cursor,
+        total=total,
+        total_is_approximate=approximate,
+    )
+
+
+async def paginate_async(
+    db,
+    build_query: Callable[[Any], Any],
+    order: OrderSpec,
+    limit: int,
+    **kwargs: Any,
+) -> Page:
+    """
+    ``paginate`` for an ``AsyncSession``.
+
+    ``build_query(session)`` receives the sync session behind ``db`` and
+    returns the filtered query; it runs via ``run_sync``, so the database
+    I/O is awaited on the async driver.
+    """
+    return await db.run_sync(
+        lambda session: paginate(build_query(session), order, limit, **kwargs)
+    )
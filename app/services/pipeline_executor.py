@@ -1,13 +1,24 @@
 """Pipeline execution engine."""
 
-from typing import Optional, Callable, Awaitable
+import asyncio
+import hashlib
+import json
+import time
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union,
+)
 import structlog
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models import Pipeline, PipelineStep, PipelineStatus, StepStatus, StepType
+from app.schemas import is_pinokio_model, is_vastai_model
 from app.services.prompt_enhancer import prompt_enhancer
+from app.services.rate_limiter import ProviderGovernor, provider_governor
 from app.services.cost_calculator import cost_calculator
+from app.services.cache import invalidate_pipelines_cache, response_cache
 from app.services.thumbnail import generate_thumbnails_batch
+from app.services.media_assets import sync_step_assets
 from app.services.r2_cache import cache_videos_batch, cache_images_batch
 
 logger = structlog.get_logger()
@@ -16,19 +27,144 @@ logger = structlog.get_logger()
 # Type for broadcast callback
 BroadcastCallback = Callable[[int, str, dict], Awaitable[None]]
 
+# One generation call within a step: (order key, resume key, generate_fn kwargs)
+GenerationUnit = Tuple[tuple, str, Dict[str, Any]]
+
+
+def provider_for_model(model: str) -> str:
+    """Provider that serves a model: "vastai", "pinokio" or "fal"."""
+    if is_vastai_model(model):
+        return "vastai"
+    if is_pinokio_model(model):
+        return "pinokio"
+    return "fal"
+
+
+def _unit_key(*parts) -> str:
+    """Stable key for a generation unit (its position plus what it generates)."""
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+
+async def _as_async(units):
+    """Iterate a list or an async stream of units alike."""
+    if hasattr(units, "__aiter__"):
+        async for unit in units:
+            yield unit
+    else:
+        for unit in units:
+            yield unit
+
+
+class StepProgress:
+    """
+    Persists a running step's finished generations as they complete.
+
+    They are kept in the step's outputs under ``partial_results`` (replaced
+    by the real outputs when the step completes), so a failed or
+    interrupted step that is retried only generates what is missing.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        step: PipelineStep,
+        broadcast: Callable[[dict], Awaitable[None]],
+        flush_seconds: Optional[float] = None,
+    ):
+        self.db = db
+        self.step = step
+        self.broadcast = broadcast
+        self.flush_seconds = (
+            settings.pipeline_progress_flush_seconds if flush_seconds is None else flush_seconds
+        )
+        self.results: Dict[str, list] = dict(step.get_outputs().get("partial_results") or {})
+        self._previous: Dict[str, list] = {}
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def start(self):
+        """Begin a fan-out; units are counted as they are added."""
+        self._previous, self.results = self.results, {}
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+
+    def add(self, key: str) -> Optional[list]:
+        """Count a unit; returns its results if a previous run finished it."""
+        self.total += 1
+        finished = self._previous.get(key)
+        if finished is not None:
+            self.results[key] = finished
+            self.completed += 1
+        return finished
+
+    @property
+    def progress_pct(self) -> int:
+        if not self.total:
+            return 0
+        return int(100 * (self.completed + self.failed) / self.total)
+
+    async def record(self, key: str, urls: list):
+        self.results[key] = urls
+        self.completed += 1
+        await self._changed()
+
+    async def record_failure(self):
+        self.failed += 1
+        await self._changed()
+
+    async def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.persist()
+            await self.broadcast(
+                {
+                    "step_id": self.step.id,
+                    "status": "running",
+                    "progress_pct": self.progress_pct,
+                    "completed": self.completed,
+                    "failed": self.failed,
+                    "total": self.total,
+                }
+            )
+
+    def persist(self):
+        """Write finished generations to the step (no-op when nothing changed)."""
+        self._last_flush = time.monotonic()
+        if not self._dirty:
+            return
+        self.step.set_outputs(
+            {
+                "partial_results": self.results,
+                "completed_units": self.completed,
+                "failed_units": self.failed,
+                "total_units": self.total,
+            }
+        )
+        self.db.commit()
+        self._dirty = False
+
 
 class PipelineExecutor:
     """Service for executing pipelines."""
 
-    def __init__(self):
+    def __init__(self, governor: Optional[ProviderGovernor] = None):
         self._broadcast_callback: Optional[BroadcastCallback] = None
+        self.governor = governor or provider_governor
 
     def set_broadcast_callback(self, callback: BroadcastCallback):
         """Set callback for broadcasting status updates."""
         self._broadcast_callback = callback
 
     async def _broadcast(self, pipeline_id: int, event: str, data: dict):
-        """Broadcast event if callback is set."""
+        """Broadcast event if callback is set (events follow commits, so drop cached views too)."""
+        if event == "step_progress":
+            await response_cache.invalidate(f"pipeline:{pipeline_id}")
+        else:
+            await invalidate_pipelines_cache(pipeline_id)
         if self._broadcast_callback:
             try:
                 await self._broadcast_callback(pipeline_id, event, data)
@@ -123,82 +259,27 @@ class PipelineExecutor:
                         )
                         return pipeline
 
-                # Execute step
-                step.status = StepStatus.RUNNING.value
-                db.commit()
-
-                await self._broadcast(
-                    pipeline_id,
-                    "step_progress",
-                    {
-                        "step_id": step.id,
-                        "status": "running",
-                        "progress_pct": 0,
-                    },
-                )
+                # An I2V step right after an I2I step consumes its images as they finish
+                next_step = self._get_next_step(steps, step)
+                if self._can_stream(pipeline, step, next_step, checkpoints, generate_videos_fn):
+                    await self._execute_streamed(
+                        db, pipeline_id, steps, step, next_step,
+                        generate_images_fn, generate_videos_fn,
+                    )
+                    continue
 
+                # Execute step
+                progress = await self._start_step(db, pipeline_id, step)
                 try:
                     outputs = await self._execute_step(
                         step,
                         generate_images_fn,
                         generate_videos_fn,
+                        progress,
                     )
-
-                    step.set_outputs(outputs)
-                    step.status = StepStatus.COMPLETED.value
-
-                    # Calculate actual cost
-                    cost_info = self._calculate_step_cost(step)
-                    step.cost_actual = cost_info["total"]
-
-                    db.commit()
-
-                    await self._broadcast(
-                        pipeline_id,
-                        "step_progress",
-                        {
-                            "step_id": step.id,
-                            "status": "completed",
-                            "progress_pct": 100,
-                            "outputs_count": (
-                                len(outputs.get("items", []))
-                                if isinstance(outputs, dict)
-                                else 0
-                            ),
-                        },
-                    )
-
-                    await self._broadcast(
-                        pipeline_id,
-                        "output_ready",
-                        {
-                            "step_id": step.id,
-                            "output_type": step.step_type,
-                            "outputs": outputs,
-                        },
-                    )
-
-                    # Chain outputs to next step's inputs
-                    next_step = self._get_next_step(steps, step)
-                    if next_step:
-                        self._chain_outputs_to_inputs(step, next_step)
-                        db.commit()
-
+                    await self._complete_step(db, pipeline_id, steps, step, outputs)
                 except Exception as e:
-                    step.status = StepStatus.FAILED.value
-                    step.error_message = str(e)
-                    db.commit()
-
-                    await self._broadcast(
-                        pipeline_id,
-                        "error",
-                        {
-                            "step_id": step.id,
-                            "error_message": str(e),
-                            "retryable": True,
-                        },
-                    )
-
+                    await self._fail_step(db, pipeline_id, step, progress, e)
                     raise
 
             # All steps completed
@@ -235,11 +316,196 @@ class PipelineExecutor:
             logger.error("Pipeline failed", pipeline_id=pipeline_id, error=str(e))
             raise
 
+    async def _start_step(self, db: Session, pipeline_id: int, step: PipelineStep) -> StepProgress:
+        """Mark a step running; returns the tracker for its incremental outputs."""
+        step.status = StepStatus.RUNNING.value
+        db.commit()
+
+        await self._broadcast(
+            pipeline_id,
+            "step_progress",
+            {
+                "step_id": step.id,
+                "status": "running",
+                "progress_pct": 0,
+            },
+        )
+
+        async def broadcast_progress(data: dict):
+            await self._broadcast(pipeline_id, "step_progress", data)
+
+        return StepProgress(db, step, broadcast_progress)
+
+    async def _complete_step(
+        self,
+        db: Session,
+        pipeline_id: int,
+        steps: list,
+        step: PipelineStep,
+        outputs: dict,
+    ):
+        """Store a step's outputs, mark it completed and chain them to the next step."""
+        step.set_outputs(outputs)
+        step.status = StepStatus.COMPLETED.value
+        sync_step_assets(db, step)
+
+        # Calculate actual cost
+        cost_info = self._calculate_step_cost(step)
+        step.cost_actual = cost_info["total"]
+
+        db.commit()
+        await response_cache.invalidate("library")
+
+        await self._broadcast(
+            pipeline_id,
+            "step_progress",
+            {
+                "step_id": step.id,
+                "status": "completed",
+                "progress_pct": 100,
+                "outputs_count": (
+                    len(outputs.get("items", []))
+                    if isinstance(outputs, dict)
+                    else 0
+                ),
+            },
+        )
+
+        await self._broadcast(
+            pipeline_id,
+            "output_ready",
+            {
+                "step_id": step.id,
+                "output_type": step.step_type,
+                "outputs": outputs,
+            },
+        )
+
+        # Chain outputs to next step's inputs
+        next_step = self._get_next_step(steps, step)
+        if next_step:
+            self._chain_outputs_to_inputs(step, next_step)
+            db.commit()
+
+    async def _fail_step(
+        self,
+        db: Session,
+        pipeline_id: int,
+        step: PipelineStep,
+        progress: StepProgress,
+        error: Exception,
+    ):
+        progress.persist()  # Keep what finished for the retry
+        step.status = StepStatus.FAILED.value
+        step.error_message = str(error)
+        db.commit()
+
+        await self._broadcast(
+            pipeline_id,
+            "error",
+            {
+                "step_id": step.id,
+                "error_message": str(error),
+                "retryable": True,
+            },
+        )
+
+    def _can_stream(
+        self,
+        pipeline: Pipeline,
+        step: PipelineStep,
+        next_step: Optional[PipelineStep],
+        checkpoints: list,
+        generate_videos_fn: Optional[Callable],
+    ) -> bool:
+        """Whether ``next_step`` can consume ``step``'s outputs while it runs."""
+        return (
+            settings.pipeline_stream_stages
+            and generate_videos_fn is not None
+            and next_step is not None
+            and step.step_type == StepType.I2I.value
+            and next_step.step_type == StepType.I2V.value
+            and next_step.status != StepStatus.COMPLETED.value
+            # A checkpoint before I2V means the images need approval first
+            and not (pipeline.mode == "checkpoint" and StepType.I2V.value in checkpoints)
+        )
+
+    async def _execute_streamed(
+        self,
+        db: Session,
+        pipeline_id: int,
+        steps: list,
+        i2i_step: PipelineStep,
+        i2v_step: PipelineStep,
+        generate_images_fn: Optional[Callable],
+        generate_videos_fn: Callable,
+    ):
+        """
+        Run an I2I step and the I2V step after it as one stage.
+
+        Each finished image is handed to I2V through a bounded queue
+        (``settings.pipeline_stream_queue_size`` videos waiting at most;
+        image generation blocks when it is full), so videos generate while
+        the remaining images are still running.
+        """
+        if not generate_images_fn:
+            raise ValueError("No image generation function provided")
+
+        i2i_progress = await self._start_step(db, pipeline_id, i2i_step)
+        i2v_progress = await self._start_step(db, pipeline_id, i2v_step)
+        i2v_config = i2v_step.get_config()
+        i2v_inputs = i2v_step.get_inputs()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.pipeline_stream_queue_size))
+
+        async def hand_off(order: tuple, urls: list, image_keys: list):
+            for k, (url, image_key) in enumerate(zip(urls, image_keys)):
+                for unit in self._i2v_units(i2v_config, i2v_inputs, url, image_key, (*order, k)):
+                    await queue.put(unit)
+
+        async def streamed_units():
+            while (unit := await queue.get()) is not None:
+                yield unit
+
+        logger.info("Streaming step into next", step_id=i2i_step.id, next_step_id=i2v_step.id)
+        videos = asyncio.create_task(
+            self._execute_i2v(
+                i2v_config, i2v_inputs, generate_videos_fn, i2v_progress, units=streamed_units()
+            )
+        )
+        try:
+            i2i_outputs = await self._execute_i2i(
+                i2i_step.get_config(),
+                i2i_step.get_inputs(),
+                generate_images_fn,
+                i2i_progress,
+                on_result=hand_off,
+            )
+            await self._complete_step(db, pipeline_id, steps, i2i_step, i2i_outputs)
+        except BaseException as e:
+            videos.cancel()
+            await asyncio.gather(videos, return_exceptions=True)
+            # The videos wait for the images again; keep those already generated
+            i2v_progress.persist()
+            i2v_step.status = StepStatus.PENDING.value
+            db.commit()
+            if isinstance(e, Exception):
+                await self._fail_step(db, pipeline_id, i2i_step, i2i_progress, e)
+            raise
+
+        await queue.put(None)
+        try:
+            i2v_outputs = await videos
+            await self._complete_step(db, pipeline_id, steps, i2v_step, i2v_outputs)
+        except Exception as e:
+            await self._fail_step(db, pipeline_id, i2v_step, i2v_progress, e)
+            raise
+
     async def _execute_step(
         self,
         step: PipelineStep,
         generate_images_fn: Optional[Callable],
         generate_videos_fn: Optional[Callable],
+        progress: Optional[StepProgress] = None,
     ) -> dict:
         """Execute a single pipeline step."""
         config = step.get_config()
@@ -253,12 +519,12 @@ class PipelineExecutor:
         elif step.step_type == StepType.I2I.value:
             if not generate_images_fn:
                 raise ValueError("No image generation function provided")
-            return await self._execute_i2i(config, inputs, generate_images_fn)
+            return await self._execute_i2i(config, inputs, generate_images_fn, progress)
 
         elif step.step_type == StepType.I2V.value:
             if not generate_videos_fn:
                 raise ValueError("No video generation function provided")
-            return await self._execute_i2v(config, inputs, generate_videos_fn)
+            return await self._execute_i2v(config, inputs, generate_videos_fn, progress)
 
         else:
             raise ValueError(f"Unknown step type: {step.step_type}")
@@ -302,8 +568,17 @@ class PipelineExecutor:
         config: dict,
         inputs: dict,
         generate_fn: Callable,
+        progress: Optional[StepProgress] = None,
+        on_result: Optional[Callable[[tuple, list, list], Awaitable[None]]] = None,
     ) -> dict:
-        """Execute I2I generation step with full FLUX.2 parameter support."""
+        """
+        Execute I2I generation step with full FLUX.2 parameter support.
+
+        ``on_result(order, urls, image_keys)`` receives each generation's
+        images as it finishes (a streamed I2V step consumes them from there).
+        ``image_keys`` (also returned, parallel to ``image_urls``) identify
+        each image by the generation that made it, independent of its URL.
+        """
         logger.info("_execute_i2i called",
                     config_keys=list(config.keys()),
                     inputs_keys=list(inputs.keys()),
@@ -360,49 +635,70 @@ class PipelineExecutor:
         if set_mode.get("enabled"):
             effective_prompts = self._expand_prompts_for_set_mode(prompts, set_mode)
 
-        # Generate all combinations
-        results = []
-        for image_url in image_urls:
-            for prompt in effective_prompts:
-                # Call the generation function - payload builder filters params per model
-                result = await generate_fn(
-                    source_image_url=image_url,
-                    prompt=prompt,
-                    model=model,
-                    num_images=images_per,
-                    aspect_ratio=aspect_ratio,
-                    quality=quality,
-                    negative_prompt=negative_prompt,
-                    # FLUX.1 params
-                    flux_strength=flux_strength,
-                    flux_scheduler=flux_scheduler,
-                    # FLUX.2 & Kontext params
-                    flux_guidance_scale=flux_guidance_scale,
-                    flux_num_inference_steps=flux_num_inference_steps,
-                    flux_seed=flux_seed,
-                    flux_image_urls=flux_image_urls,
-                    flux_output_format=flux_output_format,
-                    flux_enable_safety_checker=flux_enable_safety_checker,
-                    flux_enable_prompt_expansion=flux_enable_prompt_expansion,
-                    flux_safety_tolerance=flux_safety_tolerance,
-                    flux_acceleration=flux_acceleration,
-                )
-                results.extend(result if isinstance(result, list) else [result])
+        # One generation per image x prompt - payload builder filters params per model
+        shared = dict(
+            model=model,
+            num_images=images_per,
+            aspect_ratio=aspect_ratio,
+            quality=quality,
+            negative_prompt=negative_prompt,
+            # FLUX.1 params
+            flux_strength=flux_strength,
+            flux_scheduler=flux_scheduler,
+            # FLUX.2 & Kontext params
+            flux_guidance_scale=flux_guidance_scale,
+            flux_num_inference_steps=flux_num_inference_steps,
+            flux_seed=flux_seed,
+            flux_image_urls=flux_image_urls,
+            flux_output_format=flux_output_format,
+            flux_enable_safety_checker=flux_enable_safety_checker,
+            flux_enable_prompt_expansion=flux_enable_prompt_expansion,
+            flux_safety_tolerance=flux_safety_tolerance,
+            flux_acceleration=flux_acceleration,
+        )
+        units: List[GenerationUnit] = []
+        for i, image_url in enumerate(image_urls):
+            for j, prompt in enumerate(effective_prompts):
+                units.append((
+                    (i, j),
+                    _unit_key(i, j, image_url, prompt, model, images_per),
+                    {"source_image_url": image_url, "prompt": prompt, **shared},
+                ))
+        unit_keys = {order: key for order, key, _ in units}
+
+        def image_keys(order: tuple, count: int) -> list:
+            return [f"{unit_keys[order]}/{k}" for k in range(count)]
+
+        # Cache each unit's images to R2 and render thumbnails as soon as it finishes
+        caching: Dict[tuple, asyncio.Task] = {}
+
+        async def finished(order: tuple, urls: list):
+            caching[order] = asyncio.create_task(self._cache_images(urls))
+            if on_result is not None:
+                await on_result(order, urls, image_keys(order, len(urls)))
 
-        # Cache full-res images to R2 for fast loading
-        cached_image_urls = await cache_images_batch(results, prefix="images")
-        final_image_urls = [
-            cached or orig for cached, orig in zip(cached_image_urls, results)
+        try:
+            outputs, errors = await self._fan_out(
+                units, generate_fn, config, model, progress, on_result=finished
+            )
+            cached = [await caching[order] for order in sorted(outputs)]
+        finally:
+            for task in caching.values():
+                task.cancel()
+
+        final_image_urls = [url for images, _ in cached for url in images]
+        thumbnail_urls = [url for _, thumbnails in cached for url in thumbnails]
+        final_image_keys = [
+            key for order in sorted(outputs) for key in image_keys(order, len(outputs[order]))
         ]
 
-        # Generate thumbnails for grid preview (also goes to R2)
-        thumbnail_urls = await generate_thumbnails_batch(results)
-
         return {
             "image_urls": final_image_urls,  # Full resolution cached on R2
+            "image_keys": final_image_keys,  # Resume identity of each image (see _i2v_units)
             "thumbnail_urls": thumbnail_urls,  # Smaller previews for grid
             "items": [{"url": url, "type": "image"} for url in final_image_urls],
             "count": len(final_image_urls),
+            **errors,
         }
 
     async def _execute_i2v(
@@ -410,46 +706,181 @@ class PipelineExecutor:
         config: dict,
         inputs: dict,
         generate_fn: Callable,
+        progress: Optional[StepProgress] = None,
+        units: Optional[AsyncIterator[GenerationUnit]] = None,
     ) -> dict:
-        """Execute I2V generation step."""
-        image_urls = inputs.get("image_urls", [])
-        prompts = inputs.get("prompts", [])
+        """
+        Execute I2V generation step.
 
-        if not image_urls:
-            raise ValueError("No input images provided")
+        ``units`` streams the generations instead of deriving them from
+        ``inputs["image_urls"]`` (images handed over by a running I2I step).
+        """
+        if units is None:
+            image_urls = inputs.get("image_urls", [])
+            if not image_urls:
+                raise ValueError("No input images provided")
+            image_keys = inputs.get("image_keys") or []
+            if len(image_keys) != len(image_urls):
+                # Uploaded images (or chained before image keys existed)
+                image_keys = [f"{i}/{image_url}" for i, image_url in enumerate(image_urls)]
+            units = [
+                unit
+                for i, (image_url, image_key) in enumerate(zip(image_urls, image_keys))
+                for unit in self._i2v_units(config, inputs, image_url, image_key, (i,))
+            ]
+
+        caching: Dict[tuple, asyncio.Task] = {}
+
+        async def finished(order: tuple, urls: list):
+            caching[order] = asyncio.create_task(cache_videos_batch(urls))
 
-        model = config.get("model", "kling")
-        videos_per = config.get("videos_per_image", 1)
-        resolution = config.get("resolution", "1080p")
-        duration = config.get("duration_sec", 5)
-        enable_audio = config.get("enable_audio", False)
-
-        # Generate videos
-        results = []
-        for image_url in image_urls:
-            prompt = prompts[0] if prompts else ""
-            for _ in range(videos_per):
-                result = await generate_fn(
-                    image_url=image_url,
-                    motion_prompt=prompt,
-                    model=model,
-                    resolution=resolution,
-                    duration_sec=duration,
-                    enable_audio=enable_audio,
+        try:
+            outputs, errors = await self._fan_out(
+                units, generate_fn, config, config.get("model", "kling"), progress,
+                on_result=finished,
+            )
+            # Use cached URL if available, otherwise original
+            final_urls = []
+            for order in sorted(outputs):
+                cached_urls = await caching[order]
+                final_urls.extend(
+                    cached or orig for cached, orig in zip(cached_urls, outputs[order])
                 )
-                results.append(result)
-
-        # Cache videos to R2 for fast loading
-        cached_urls = await cache_videos_batch(results)
-        # Use cached URL if available, otherwise original
-        final_urls = [cached or orig for cached, orig in zip(cached_urls, results)]
+        finally:
+            for task in caching.values():
+                task.cancel()
 
         return {
             "video_urls": final_urls,
             "items": [{"url": url, "type": "video"} for url in final_urls],
             "count": len(final_urls),
+            **errors,
         }
 
+    def _i2v_units(
+        self, config: dict, inputs: dict, image_url: str, image_key: str, position: tuple
+    ) -> List[GenerationUnit]:
+        """
+        The videos_per_image generations for one image at ``position``.
+
+        Resume keys use ``image_key`` rather than the URL or position: a
+        streamed step sees the provider URL at position (i, j, k), a
+        non-streamed one the R2 copy at (i,), and both must find the same
+        finished videos.
+        """
+        prompts = inputs.get("prompts", [])
+        prompt = prompts[0] if prompts else ""
+        model = config.get("model", "kling")
+        resolution = config.get("resolution", "1080p")
+        duration = config.get("duration_sec", 5)
+        return [
+            (
+                (*position, n),
+                _unit_key(image_key, n, prompt, model, resolution, duration),
+                {
+                    "image_url": image_url,
+                    "motion_prompt": prompt,
+                    "model": model,
+                    "resolution": resolution,
+                    "duration_sec": duration,
+                    "enable_audio": config.get("enable_audio", False),
+                },
+            )
+            for n in range(config.get("videos_per_image", 1))
+        ]
+
+    async def _cache_images(self, urls: list) -> Tuple[list, list]:
+        """R2 copies (or the originals) and thumbnails for finished images."""
+        cached_urls, thumbnail_urls = await asyncio.gather(
+            cache_images_batch(urls, prefix="images"),
+            generate_thumbnails_batch(urls),
+        )
+        return [cached or orig for cached, orig in zip(cached_urls, urls)], thumbnail_urls
+
+    async def _fan_out(
+        self,
+        units: Union[Iterable[GenerationUnit], AsyncIterator[GenerationUnit]],
+        generate_fn: Callable,
+        config: dict,
+        model: str,
+        progress: Optional[StepProgress] = None,
+        on_result: Optional[Callable[[tuple, list], Awaitable[None]]] = None,
+    ) -> Tuple[Dict[tuple, list], dict]:
+        """
+        Run a step's generations concurrently.
+
+        At most ``config["max_concurrency"]`` (default
+        ``settings.pipeline_step_concurrency``) run for this step, and at most
+        the provider's adaptive in-flight limit (``provider_governor``) across
+        all steps; a streamed ``units`` is only read while a slot is free.
+        Returns each finished unit's URLs by its
+        order key (callers assemble them in that order) and
+        ``{"failed_count", "errors"}`` for failed units; the step fails only
+        if every unit did. Units already in ``progress`` (a retried step) are
+        not generated again. ``on_result(order, urls)`` runs as each unit
+        finishes.
+        """
+        provider = provider_for_model(model)
+        step_limit = config.get("max_concurrency") or settings.pipeline_step_concurrency
+        step_slots = asyncio.Semaphore(max(1, int(step_limit)))
+        provider_limits = self.governor.get(provider)
+        outputs: Dict[tuple, list] = {}
+        failures: Dict[tuple, Exception] = {}
+        tasks: List[asyncio.Task] = []
+
+        if progress is not None:
+            progress.start()
+
+        async def run(order: tuple, key: str, kwargs: dict):
+            try:
+                finished = progress.add(key) if progress is not None else None
+                if finished is None:
+                    async with provider_limits.slot():
+                        try:
+                            result = await generate_fn(**kwargs)
+                        except Exception as e:
+                            logger.warning(
+                                "Pipeline generation failed",
+                                provider=provider, model=model, unit=order, error=str(e),
+                            )
+                            failures[order] = e
+                            if progress is not None:
+                                await progress.record_failure()
+                            return
+                    finished = result if isinstance(result, list) else [result]
+                    if progress is not None:
+                        await progress.record(key, finished)
+                outputs[order] = finished
+            finally:
+                step_slots.release()
+            if on_result is not None:
+                await on_result(order, finished)
+
+        try:
+            async for order, key, kwargs in _as_async(units):
+                await step_slots.acquire()
+                tasks.append(asyncio.create_task(run(order, key, kwargs)))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        if failures and not outputs:
+            raise failures[min(failures)]
+
+        errors = {}
+        if failures:
+            errors = {
+                "failed_count": len(failures),
+                "errors": [
+                    {"unit": list(order), "error": str(failures[order])}
+                    for order in sorted(failures)
+                ],
+            }
+        return outputs, errors
+
     def _expand_prompts_for_set_mode(self, prompts: list, set_mode: dict) -> list:
         """Expand prompts with set mode variations."""
         variations = set_mode.get("variations", [])
@@ -510,11 +941,12 @@ class PipelineExecutor:
             )
 
         elif from_step.step_type == StepType.I2I.value:
-            # Pass image URLs to next step
+            # Pass image URLs (and their resume keys) to next step
             to_step.set_inputs(
                 {
                     **to_step.get_inputs(),
                     "image_urls": outputs.get("image_urls", []),
+                    "image_keys": outputs.get("image_keys", []),
                 }
             )
 
@@ -616,6 +1048,7 @@ class PipelineExecutor:
             raise ValueError(f"Step is not in review (status: {step.status})")
 
         step.status = StepStatus.COMPLETED.value
+        sync_step_assets(db, step)
         db.commit()
 
         return step
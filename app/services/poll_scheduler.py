@@ -0,0 +1,474 @@
+"""Batched Fal status polling shared by every caller in the process.
+
+Instead of each caller running its own ``sleep(5)`` loop per request_id, a
+single scheduler owns every outstanding Fal request. It polls due requests
+with bounded concurrency and resolves an awaitable future per request_id
+when the job completes or fails.
+
+Poll intervals are adaptive: a request is polled quickly right after
+submission and then backs off exponentially, capped at a fraction of the
+model's typical runtime (its P50 in app.services.runtime_stats, which every
+completion here feeds). A bulk pipeline
+with hundreds of I2V jobs in flight therefore issues a fraction of the
+status GETs a fixed 5s loop would. When Fal webhooks are enabled, the
+webhook receiver resolves requests directly and polling drops to a slow
+sweep for missed callbacks.
+
+Usage:
+    from app.services.poll_scheduler import fal_poll_scheduler
+
+    request_id = await fal_client.submit_job(...)
+    result = await fal_poll_scheduler.wait(
+        request_id, "kling", kind="video", timeout=600, resolution="1080p", duration_sec=5
+    )
+    if result["status"] == "completed":
+        video_url = result["video_url"]
+
+    # Fire-and-forget tracking (worker loop) - read back later
+    fal_poll_scheduler.watch(request_id, "kling")
+    latest = fal_poll_scheduler.latest(request_id)  # None until first poll
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Dict, Optional, Set
+
+import structlog
+
+from app import fal_client
+from app import image_client
+from app.config import settings
+from app.services.runtime_stats import RuntimeStatsStore, runtime_stats as shared_runtime_stats
+
+logger = structlog.get_logger()
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Typical runtimes (seconds) used until real completions have been observed
+DEFAULT_TYPICAL_RUNTIME = {
+    "video": 120.0,
+    "image": 20.0,
+}
+
+
+@dataclass
+class PollEntry:
+    """A tracked Fal request."""
+
+    request_id: str
+    model: str
+    kind: str
+    future: asyncio.Future
+    registered_at: float
+    deadline: float
+    next_poll_at: float
+    polls: int = 0
+    consecutive_errors: int = 0
+    in_flight: bool = False
+    last_result: Optional[Dict[str, Any]] = None
+    resolution: Optional[str] = None
+    duration_sec: Optional[int] = None
+
+
+@dataclass
+class PollSchedulerStats:
+    """Counters for the poll scheduler."""
+
+    polls: int = 0
+    poll_errors: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    external_resolves: int = 0
+
+
+def _consume_exception(future: asyncio.Future):
+    """Mark a future's exception as retrieved so unawaited failures don't warn."""
+    if not future.cancelled():
+        future.exception()
+
+
+class FalPollScheduler:
+    """
+    Single owner of all outstanding Fal request_ids in this process.
+
+    Attributes:
+        max_concurrency: Maximum simultaneous status requests
+        min_interval: First/shortest gap between polls of one request
+        max_interval: Longest gap between polls of one request
+        backoff: Multiplier applied to the interval after each poll
+        runtime_stats: Where completions are recorded and typical runtimes read
+    """
+
+    DEFAULT_MAX_TRACK_SECONDS = 3600.0
+    MAX_CONSECUTIVE_ERRORS = 5
+    COMPLETED_CACHE_SIZE = 1000
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        runtime_stats: Optional[RuntimeStatsStore] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.max_concurrent_polls
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.runtime_stats = runtime_stats or shared_runtime_stats
+
+        self._entries: Dict[str, PollEntry] = {}
+        self._completed: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = PollSchedulerStats()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._poll_tasks: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ---- Public API ----
+
+    def watch(
+        self,
+        request_id: str,
+        model: str,
+        kind: str = "video",
+        max_age: Optional[float] = None,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> asyncio.Future:
+        """
+        Start tracking a request_id (idempotent) and return its future.
+
+        ``resolution`` and ``duration_sec`` refine the runtime statistics
+        the completion is recorded under (and its poll interval).
+
+        The future resolves to the final result dict from
+        ``fal_client.get_job_result`` / ``image_client.get_image_result``
+        (status "completed" or "failed"), or raises TimeoutError once the
+        request has been tracked for ``max_age`` seconds.
+        """
+        self._bind_loop()
+
+        entry = self._entries.get(request_id)
+        if entry is not None and not entry.future.done():
+            return entry.future
+
+        future = self._loop.create_future()
+        future.add_done_callback(_consume_exception)
+
+        if request_id in self._completed:
+            future.set_result(self._completed[request_id])
+            return future
+
+        now = monotonic()
+        self._entries[request_id] = PollEntry(
+            request_id=request_id,
+            model=model,
+            kind=kind,
+            future=future,
+            registered_at=now,
+            deadline=now + (max_age or self.DEFAULT_MAX_TRACK_SECONDS),
+            next_poll_at=now,
+            resolution=resolution,
+            duration_sec=duration_sec,
+        )
+        entry = self._entries[request_id]
+        entry.next_poll_at = now + self._next_interval(entry)
+        self._ensure_running()
+        return future
+
+    async def wait(
+        self,
+        request_id: str,
+        model: str,
+        kind: str = "video",
+        timeout: Optional[float] = None,
+        keep_tracking: bool = False,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Track a request_id and wait for its final result.
+
+        Args:
+            request_id: Fal request ID
+            model: Model key used for the submission
+            kind: "video" or "image"
+            timeout: Seconds to wait before raising TimeoutError
+            keep_tracking: Keep polling after a timeout (for callers that
+                wait in short windows and come back later)
+            resolution: Output resolution, for runtime statistics
+            duration_sec: Clip duration, for runtime statistics
+
+        Returns:
+            Final result dict with status "completed" or "failed"
+        """
+        future = self.watch(
+            request_id, model, kind=kind, resolution=resolution, duration_sec=duration_sec
+        )
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            if not keep_tracking:
+                self.forget(request_id)
+            raise TimeoutError(
+                f"Fal request {request_id} not finished after {timeout}s"
+            )
+
+    def tracked(self, kind: Optional[str] = None) -> Set[str]:
+        """Request IDs currently being tracked (optionally of one kind)."""
+        return {
+            request_id
+            for request_id, entry in self._entries.items()
+            if kind is None or entry.kind == kind
+        }
+
+    def latest(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Return the most recent status result for a request_id, if any."""
+        if request_id in self._completed:
+            return self._completed[request_id]
+        entry = self._entries.get(request_id)
+        return entry.last_result if entry else None
+
+    def resolve(self, request_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Resolve a request from outside the poll loop (e.g. a webhook).
+
+        Returns True if a tracked request was woken.
+        """
+        entry = self._entries.get(request_id)
+        self._remember(request_id, result)
+        self._stats.external_resolves += 1
+        if entry is None:
+            return False
+        self._finish(entry, result)
+        return True
+
+    def forget(self, request_id: str):
+        """Stop tracking a request_id."""
+        entry = self._entries.pop(request_id, None)
+        if entry and not entry.future.done():
+            entry.future.set_exception(
+                TimeoutError(f"Stopped tracking Fal request {request_id}")
+            )
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def shutdown(self):
+        """Stop the poll loop and fail any remaining waiters."""
+        for request_id in list(self._entries):
+            self.forget(request_id)
+        tasks = [t for t in (self._task, *self._poll_tasks) if t and not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def record_runtime(
+        self,
+        model: str,
+        seconds: float,
+        kind: str = "video",
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ):
+        """Record an observed runtime in the shared runtime statistics."""
+        self.runtime_stats.record(model, kind, seconds, resolution, duration_sec)
+
+    def typical_runtime(
+        self,
+        model: str,
+        kind: str = "video",
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> float:
+        """Median runtime for a model, falling back to the kind default."""
+        return self.runtime_stats.typical_runtime(
+            model,
+            kind,
+            default=DEFAULT_TYPICAL_RUNTIME.get(kind, DEFAULT_TYPICAL_RUNTIME["video"]),
+            resolution=resolution,
+            duration_sec=duration_sec,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        return {
+            "tracked": len(self._entries),
+            "in_flight": sum(1 for e in self._entries.values() if e.in_flight),
+            "max_concurrency": self.max_concurrency,
+            "polls": self._stats.polls,
+            "poll_errors": self._stats.poll_errors,
+            "completed": self._stats.completed,
+            "failed": self._stats.failed,
+            "timed_out": self._stats.timed_out,
+            "external_resolves": self._stats.external_resolves,
+        }
+
+    # ---- Scheduling ----
+
+    def _next_interval(self, entry: PollEntry) -> float:
+        """Fast early, then back off up to ~1/10th of the model's typical runtime.
+
+        With Fal webhooks configured, completions arrive by callback and
+        polling only sweeps for missed callbacks at a slow fixed interval.
+        """
+        if fal_client.get_webhook_url():
+            return float(settings.fal_webhook_sweep_interval_seconds)
+
+        cap = min(
+            self.max_interval,
+            max(
+                self.min_interval,
+                self.typical_runtime(entry.model, entry.kind, entry.resolution, entry.duration_sec)
+                / 10,
+            ),
+        )
+        interval = self.min_interval * (self.backoff ** entry.polls)
+        if entry.consecutive_errors:
+            interval *= 2 ** entry.consecutive_errors
+            cap = self.max_interval
+        return min(interval, cap)
+
+    def _bind_loop(self):
+        """(Re)bind to the running loop; state from a dead loop is discarded."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._entries.clear()
+        self._poll_tasks = set()
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _ensure_running(self):
+        """Start the poll loop if it isn't running, otherwise wake it."""
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        """Poll due requests until nothing is left to track."""
+        logger.debug("Fal poll scheduler started")
+        while self._entries:
+            self._wakeup.clear()
+            now = monotonic()
+
+            for entry in list(self._entries.values()):
+                if entry.in_flight:
+                    continue
+                if now >= entry.deadline:
+                    self._expire(entry)
+                elif now >= entry.next_poll_at:
+                    entry.in_flight = True
+                    task = self._loop.create_task(self._poll(entry))
+                    self._poll_tasks.add(task)
+                    task.add_done_callback(self._poll_tasks.discard)
+
+            pending = [e.next_poll_at for e in self._entries.values() if not e.in_flight]
+            sleep_for = min(pending) - monotonic() if pending else 1.0
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=max(0.05, min(sleep_for, 1.0))
+                )
+            except asyncio.TimeoutError:
+                pass
+        logger.debug("Fal poll scheduler idle")
+
+    async def _poll(self, entry: PollEntry):
+        """Poll one request and reschedule or resolve it."""
+        try:
+            async with self._semaphore:
+                if entry.kind == "image":
+                    result = await image_client.get_image_result(
+                        model=entry.model, request_id=entry.request_id
+                    )
+                else:
+                    result = await fal_client.get_job_result(
+                        model=entry.model, request_id=entry.request_id
+                    )
+        except Exception as e:
+            self._stats.poll_errors += 1
+            entry.consecutive_errors += 1
+            logger.warning(
+                "Fal status poll failed",
+                request_id=entry.request_id,
+                model=entry.model,
+                consecutive_errors=entry.consecutive_errors,
+                error=str(e),
+            )
+            if entry.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                self._entries.pop(entry.request_id, None)
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+            else:
+                entry.next_poll_at = monotonic() + self._next_interval(entry)
+            return
+        finally:
+            entry.in_flight = False
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        self._stats.polls += 1
+        entry.polls += 1
+        entry.consecutive_errors = 0
+        entry.last_result = result
+
+        if result.get("status") in TERMINAL_STATUSES:
+            self._remember(entry.request_id, result)
+            self._finish(entry, result)
+        else:
+            entry.next_poll_at = monotonic() + self._next_interval(entry)
+
+    def _finish(self, entry: PollEntry, result: Dict[str, Any]):
+        """Resolve a tracked request with its final result."""
+        self._entries.pop(entry.request_id, None)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if entry.future.done():
+            return
+        if result.get("status") == "completed":
+            self._stats.completed += 1
+            self.record_runtime(
+                entry.model,
+                monotonic() - entry.registered_at,
+                kind=entry.kind,
+                resolution=entry.resolution,
+                duration_sec=entry.duration_sec,
+            )
+        else:
+            self._stats.failed += 1
+        entry.future.set_result(result)
+
+    def _expire(self, entry: PollEntry):
+        """Drop a request that exceeded its tracking deadline."""
+        self._entries.pop(entry.request_id, None)
+        self._stats.timed_out += 1
+        logger.warning(
+            "Fal request exceeded tracking deadline",
+            request_id=entry.request_id,
+            model=entry.model,
+            polls=entry.polls,
+        )
+        if not entry.future.done():
+            entry.future.set_exception(
+                TimeoutError(f"Fal request {entry.request_id} exceeded tracking deadline")
+            )
+
+    def _remember(self, request_id: str, result: Dict[str, Any]):
+        """Keep recent final results so late watchers resolve immediately."""
+        self._completed[request_id] = result
+        self._completed.move_to_end(request_id)
+        while len(self._completed) > self.COMPLETED_CACHE_SIZE:
+            self._completed.popitem(last=False)
+
+
+# Singleton instance shared by generation_service, JobOrchestrator and the worker
+fal_poll_scheduler = FalPollScheduler()
@@ -1,18 +1,30 @@
-"""Prompt enhancement service using Claude API."""
-
+"""Prompt enhancement service using Claude API.
+
+Successful enhancements are stored in the prompt_enhancements table for
+PROMPT_ENHANCE_CACHE_TTL_SECONDS, with services/cache.py (in-process LRU,
+plus Redis when configured) in front of it. The key covers every input plus
+the model, a hash of the system prompt and CACHE_VERSION, so a change to the
+instructions or the request shape never serves old entries. Fallback
+variations are never cached. Pass ``use_cache=False`` for fresh variations
+(they replace the stored ones).
+"""
+
+import asyncio
 import json
 import hashlib
+from datetime import datetime, timedelta
 from typing import List, Literal, Optional
 import structlog
-import httpx
+from sqlalchemy import delete
 
 from app.config import settings
+from app.database import AsyncSessionLocal
+from app.http_client import get_http_client
+from app.models import PromptEnhancement
+from app.services.cache import response_cache
 
 logger = structlog.get_logger()
 
-# DISABLED: In-memory cache was causing stale prompt issues
-# _prompt_cache: dict[str, List[str]] = {}
-
 # Category definitions for enhancement
 I2V_CATEGORIES = {
     "camera_movement": "Add camera motion (slow pan, gentle zoom, tracking shot)",
@@ -35,9 +47,12 @@ class PromptEnhancer:
     """Service for enhancing prompts using Claude API."""
 
     ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+    MODEL = "claude-3-haiku-20240307"
+    CACHE_VERSION = 2  # Bump when response parsing or the request shape changes
 
-    def __init__(self):
+    def __init__(self, session_factory=None):
         self.api_key = settings.anthropic_api_key
+        self.session_factory = session_factory or AsyncSessionLocal
         if not self.api_key:
             logger.warning(
                 "No Anthropic API key configured - prompt enhancement will use fallback"
@@ -52,13 +67,27 @@ class PromptEnhancer:
         theme_focus: Optional[str],
         mode: str = "quick_improve",
         categories: Optional[List[str]] = None,
+        intensity: str = "moderate",
+        system_prompt: str = "",
     ) -> str:
         """Generate cache key for prompt enhancement request."""
-        cat_str = ",".join(sorted(categories)) if categories else ""
-        key_data = (
-            f"{prompt}:{target}:{count}:{style}:{theme_focus or ''}:{mode}:{cat_str}"
+        key_data = json.dumps(
+            [
+                self.CACHE_VERSION,
+                self.MODEL,
+                prompt,
+                target,
+                count,
+                style,
+                theme_focus,
+                mode,
+                sorted(categories) if categories else [],
+                intensity,
+                hashlib.sha256(system_prompt.encode()).hexdigest(),
+            ]
         )
-        return hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
+        digest = hashlib.sha256(key_data.encode()).hexdigest()
+        return f"prompt-enhance:{digest}"
 
     def _get_system_prompt(
         self,
@@ -202,6 +231,7 @@ Output format: Return ONLY a valid JSON array of {count} strings, no other text.
         mode: str = "quick_improve",
         categories: Optional[List[str]] = None,
         intensity: Literal["subtle", "moderate", "wild"] = "moderate",
+        use_cache: bool = True,
     ) -> List[str]:
         """
         Enhance a simple prompt into multiple detailed variations.
@@ -215,12 +245,11 @@ Output format: Return ONLY a valid JSON array of {count} strings, no other text.
             mode: Enhancement mode ("quick_improve" or "category_based")
             categories: List of categories to focus on
             intensity: Variation intensity ("subtle", "moderate", "wild")
+            use_cache: False to ask Claude for fresh variations
 
         Returns:
             List of enhanced prompt variations
         """
-        # Cache disabled - was causing stale prompt issues
-
         # If no API key, return fallback variations
         if not self.api_key:
             logger.warning("Using fallback prompt enhancement (no API key)")
@@ -232,56 +261,29 @@ Output format: Return ONLY a valid JSON array of {count} strings, no other text.
             system_prompt = self._get_system_prompt(
                 target, count, style, theme_focus, mode, categories, intensity
             )
+            cache_key = self._get_cache_key(
+                simple_prompt, target, count, style, theme_focus, mode, categories,
+                intensity, system_prompt,
+            )
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.ANTHROPIC_API_URL,
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-API-Key": self.api_key,
-                        "anthropic-version": "2023-06-01",
-                    },
-                    json={
-                        "model": "claude-3-haiku-20240307",
-                        "max_tokens": 1024,  # Reduced for concise outputs
-                        "system": system_prompt,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": f"Enhance this prompt: {simple_prompt}",
-                            }
-                        ],
-                    },
-                )
-
-                if response.status_code != 200:
-                    logger.error(
-                        "Claude API error",
-                        status=response.status_code,
-                        body=response.text,
-                    )
-                    return self._fallback_enhance(
-                        simple_prompt,
-                        target,
-                        count,
-                        style,
-                        theme_focus,
-                        mode,
-                        categories,
-                    )
-
-                data = response.json()
-                content = data["content"][0]["text"]
-
-                # Parse JSON response
-                enhanced = json.loads(content)
-                if not isinstance(enhanced, list):
-                    raise ValueError("Response is not a list")
+            ttl = settings.prompt_enhance_cache_ttl_seconds
 
-                # Cache disabled
-                logger.info("Prompt enhanced successfully", count=len(enhanced))
+            async def request() -> List[str]:
+                stored = await self._load_stored(cache_key) if use_cache else None
+                if stored is not None:
+                    return stored
+                enhanced = await self._request_enhancement(simple_prompt, system_prompt)
+                await self._store(cache_key, enhanced, ttl)
                 return enhanced
 
+            if use_cache:
+                return await response_cache.get_or_set(
+                    cache_key, request, ttl=ttl, tags=["prompt-enhance"]
+                )
+            return await response_cache.set(
+                cache_key, await request(), ttl=ttl, tags=["prompt-enhance"]
+            )
+
         except json.JSONDecodeError as e:
             logger.error("Failed to parse Claude response as JSON", error=str(e))
             return self._fallback_enhance(
@@ -293,6 +295,79 @@ Output format: Return ONLY a valid JSON array of {count} strings, no other text.
                 simple_prompt, target, count, style, theme_focus, mode, categories
             )
 
+    async def _load_stored(self, cache_key: str) -> Optional[List[str]]:
+        """Unexpired stored variations for the key; database errors count as a miss."""
+        try:
+            async with self.session_factory() as db:
+                row = await db.get(PromptEnhancement, cache_key)
+        except Exception as e:
+            logger.warning("Prompt enhancement lookup failed", error=str(e))
+            return None
+        if row is None or row.expires_at <= datetime.utcnow():
+            return None
+        return json.loads(row.variations)
+
+    async def _store(self, cache_key: str, enhanced: List[str], ttl: float) -> None:
+        """Upsert the variations and prune expired rows (best effort)."""
+        now = datetime.utcnow()
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    delete(PromptEnhancement).where(PromptEnhancement.expires_at <= now)
+                )
+                await db.merge(
+                    PromptEnhancement(
+                        cache_key=cache_key,
+                        variations=json.dumps(enhanced),
+                        expires_at=now + timedelta(seconds=ttl),
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("Failed to store prompt enhancement", error=str(e))
+
+    async def _request_enhancement(self, simple_prompt: str, system_prompt: str) -> List[str]:
+        """One Claude call; raises on API errors or unparseable output."""
+        client = get_http_client(self.ANTHROPIC_API_URL)
+        response = await client.post(
+            self.ANTHROPIC_API_URL,
+            headers={
+                "Content-Type": "application/json",
+                "X-API-Key": self.api_key,
+                "anthropic-version": "2023-06-01",
+            },
+            json={
+                "model": self.MODEL,
+                "max_tokens": 1024,  # Reduced for concise outputs
+                "system": system_prompt,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": f"Enhance this prompt: {simple_prompt}",
+                    }
+                ],
+            },
+        )
+
+        if response.status_code != 200:
+            logger.error(
+                "Claude API error",
+                status=response.status_code,
+                body=response.text,
+            )
+            raise ValueError(f"Claude API returned {response.status_code}")
+
+        data = response.json()
+        content = data["content"][0]["text"]
+
+        # Parse JSON response
+        enhanced = json.loads(content)
+        if not isinstance(enhanced, list):
+            raise ValueError("Response is not a list")
+
+        logger.info("Prompt enhanced successfully", count=len(enhanced))
+        return enhanced
+
     def _fallback_enhance(
         self,
         prompt: str,
@@ -375,9 +450,12 @@ Output format: Return ONLY a valid JSON array of {count} strings, no other text.
         mode: str = "quick_improve",
         categories: Optional[List[str]] = None,
         intensity: Literal["subtle", "moderate", "wild"] = "moderate",
+        use_cache: bool = True,
     ) -> List[List[str]]:
         """
-        Enhance multiple prompts.
+        Enhance multiple prompts concurrently (PROMPT_ENHANCE_CONCURRENCY at a time).
+
+        Each prompt falls back on its own if its request fails.
 
         Args:
             prompts: List of simple prompts to enhance
@@ -388,17 +466,21 @@ Output format: Return ONLY a valid JSON array of {count} strings, no other text.
             mode: Enhancement mode
             categories: Categories to focus on
             intensity: Variation intensity (subtle/moderate/wild)
+            use_cache: False to ask Claude for fresh variations
 
         Returns:
             List of enhanced prompt lists (one per input prompt)
         """
-        results = []
-        for prompt in prompts:
-            enhanced = await self.enhance_prompt(
-                prompt, target, count, style, theme_focus, mode, categories, intensity
-            )
-            results.append(enhanced)
-        return results
+        semaphore = asyncio.Semaphore(max(1, settings.prompt_enhance_concurrency))
+
+        async def enhance(prompt: str) -> List[str]:
+            async with semaphore:
+                return await self.enhance_prompt(
+                    prompt, target, count, style, theme_focus, mode, categories, intensity,
+                    use_cache=use_cache,
+                )
+
+        return list(await asyncio.gather(*[enhance(prompt) for prompt in prompts]))
 
 
 # Singleton instance
@@ -9,7 +9,7 @@ import re
 import random
 import anthropic
 import structlog
-from typing import Literal, Union, TypedDict
+from typing import AsyncIterator, Literal, Union, TypedDict
 
 logger = structlog.get_logger()
 
@@ -1312,42 +1312,18 @@ Examples: Attack on Titan, Sailor Moon, Evangelion, Chainsaw Man, Jujutsu Kaisen
 Don't repeat the same character."""
 
 
-async def generate_prompts(
-    api_key: str,
-    count: int,
-    style: Literal["cosplay", "cottagecore", "gym", "bookish", "nurse"],
-    location: Literal["outdoor", "indoor", "mixed"],
-    bust_size: Literal["none", "subtle", "moderate", "exaggerated"] = "none",
-    preserve_identity: bool = True,
-    framing: Literal["close", "medium", "full"] = "medium",
-    realism_preset: Literal["default", "phone_grainy", "harsh_flash", "film_aesthetic", "selfie", "candid"] = "default",
-    embed_caption: bool = True,
-) -> Union[list[str], list[PromptWithCaption]]:
-    """
-    Generate i2i prompts using Claude.
+PROMPT_SEPARATOR = "---"
+BODY_PRESERVE = "preserving her exact body structure and proportions,"
 
-    Args:
-        api_key: Anthropic API key
-        count: Number of prompts to generate (1-50)
-        style: "cosplay" or "cottagecore"
-        location: "outdoor", "indoor", or "mixed"
-        bust_size: Bust enhancement level - "none", "subtle", "moderate", or "exaggerated"
-        preserve_identity: If True, add "preserving her exact facial features" to prompts
-        framing: "close" (face/shoulders), "medium" (waist up), "full" (head to toe)
-        realism_preset: Style preset for realism injection (default, phone_grainy, harsh_flash, etc.)
-        embed_caption: If True (default), return prompts with embedded captions.
-                      If False, return list of {prompt, caption} dicts for post-processing.
-                      Use False for models like Wan 2.2 where captions drift.
-
-    Returns:
-        If embed_caption=True: List of prompt strings with embedded captions
-        If embed_caption=False: List of PromptWithCaption dicts with separate caption field
-    """
-    if count < 1 or count > 50:
-        raise ValueError("Count must be between 1 and 50")
-
-    client = anthropic.Anthropic(api_key=api_key)
 
+def build_generation_prompt(
+    count: int,
+    style: str,
+    location: str,
+    preserve_identity: bool = True,
+    framing: str = "medium",
+) -> str:
+    """Build the Claude request asking for ``count`` prompts separated by ---."""
     location_instructions = build_location_instructions(location, style)
     style_instructions = build_style_instructions(style)
     caption_instructions, category = get_random_caption_instructions(style)
@@ -1374,10 +1350,9 @@ async def generate_prompts(
         caption_category=category,
         preserve_identity=preserve_identity,
         framing=framing,
-        realism_preset=realism_preset,
     )
 
-    prompt = PROMPT_GENERATION_TEMPLATE.format(
+    return PROMPT_GENERATION_TEMPLATE.format(
         count=count,
         location_instructions=location_instructions,
         style_instructions=style_instructions,
@@ -1387,89 +1362,143 @@ async def generate_prompts(
         realism_suffix=realism_suffix,
     )
 
-    message = client.messages.create(
-        model=MODEL,
-        max_tokens=16000,
-        messages=[{
-            "role": "user",
-            "content": prompt
-        }]
-    )
 
-    raw_text = message.content[0].text.strip()
+def postprocess_prompt(
+    raw_prompt: str,
+    bust_size: str = "none",
+    realism_preset: str = "default",
+) -> str:
+    """
+    Clean one generated prompt and inject bust/body and realism text.
+
+    Returns "" for empty chunks (e.g. whitespace around a separator).
+    """
+    # Remove line breaks within prompt, collapse to single line
+    cleaned = " ".join(raw_prompt.strip().split())
+    if not cleaned:
+        return ""
 
     # Get realism preset settings
     preset = REALISM_PRESETS.get(realism_preset, REALISM_PRESETS["default"])
     REALISM_PREFIX = preset["prefix"]
     REALISM_SUFFIX = preset["suffix"]
-    BODY_PRESERVE = "preserving her exact body structure and proportions,"
-
-    # Parse prompts - split by --- and clean each one
-    raw_prompts = raw_text.split("---")
-    clean_prompts = []
-    for p in raw_prompts:
-        # Remove line breaks within prompt, collapse to single line
-        cleaned = " ".join(p.strip().split())
-        if cleaned:
-            # Inject bust size enhancement OR body preservation
-            bust_text = BUST_SIZE_PRESETS.get(bust_size)
-            if bust_text:
-                # Add bust enhancement based on selected level
-                if "the woman in the photo," in cleaned:
-                    cleaned = cleaned.replace(
-                        "the woman in the photo,",
-                        f"the woman in the photo, {bust_text}",
-                        1
-                    )
-                elif "the woman in the photo" in cleaned:
-                    cleaned = cleaned.replace(
-                        "the woman in the photo",
-                        f"the woman in the photo {bust_text}",
-                        1
-                    )
-                else:
-                    first_comma = cleaned.find(",")
-                    if first_comma > 0:
-                        cleaned = cleaned[:first_comma + 1] + f" {bust_text}" + cleaned[first_comma + 1:]
-                    else:
-                        cleaned = f"{bust_text} {cleaned}"
-            else:
-                # No bust enhancement - add body preservation to prevent changes
-                if "the woman in the photo," in cleaned:
-                    cleaned = cleaned.replace(
-                        "the woman in the photo,",
-                        f"the woman in the photo, {BODY_PRESERVE}",
-                        1
-                    )
-                elif "the woman in the photo" in cleaned:
-                    cleaned = cleaned.replace(
-                        "the woman in the photo",
-                        f"the woman in the photo {BODY_PRESERVE}",
-                        1
-                    )
-
-            # Inject realism prefix at start
-            cleaned = REALISM_PREFIX + cleaned
-
-            # Inject realism suffix before caption (if present) or at end
-            if "caption reads" in cleaned.lower():
-                # Find the caption part and insert suffix before it
-                caption_idx = cleaned.lower().find("caption reads")
-                # Go back to find the comma before the caption section
-                insert_point = cleaned.rfind(",", 0, caption_idx)
-                if insert_point > 0:
-                    cleaned = cleaned[:insert_point] + REALISM_SUFFIX + cleaned[insert_point:]
-                else:
-                    cleaned = cleaned[:caption_idx] + REALISM_SUFFIX + ", " + cleaned[caption_idx:]
+
+    # Inject bust size enhancement OR body preservation
+    bust_text = BUST_SIZE_PRESETS.get(bust_size)
+    if bust_text:
+        # Add bust enhancement based on selected level
+        if "the woman in the photo," in cleaned:
+            cleaned = cleaned.replace(
+                "the woman in the photo,",
+                f"the woman in the photo, {bust_text}",
+                1
+            )
+        elif "the woman in the photo" in cleaned:
+            cleaned = cleaned.replace(
+                "the woman in the photo",
+                f"the woman in the photo {bust_text}",
+                1
+            )
+        else:
+            first_comma = cleaned.find(",")
+            if first_comma > 0:
+                cleaned = cleaned[:first_comma + 1] + f" {bust_text}" + cleaned[first_comma + 1:]
             else:
-                cleaned = cleaned + REALISM_SUFFIX
+                cleaned = f"{bust_text} {cleaned}"
+    else:
+        # No bust enhancement - add body preservation to prevent changes
+        if "the woman in the photo," in cleaned:
+            cleaned = cleaned.replace(
+                "the woman in the photo,",
+                f"the woman in the photo, {BODY_PRESERVE}",
+                1
+            )
+        elif "the woman in the photo" in cleaned:
+            cleaned = cleaned.replace(
+                "the woman in the photo",
+                f"the woman in the photo {BODY_PRESERVE}",
+                1
+            )
+
+    # Inject realism prefix at start
+    cleaned = REALISM_PREFIX + cleaned
+
+    # Inject realism suffix before caption (if present) or at end
+    if "caption reads" in cleaned.lower():
+        # Find the caption part and insert suffix before it
+        caption_idx = cleaned.lower().find("caption reads")
+        # Go back to find the comma before the caption section
+        insert_point = cleaned.rfind(",", 0, caption_idx)
+        if insert_point > 0:
+            cleaned = cleaned[:insert_point] + REALISM_SUFFIX + cleaned[insert_point:]
+        else:
+            cleaned = cleaned[:caption_idx] + REALISM_SUFFIX + ", " + cleaned[caption_idx:]
+    else:
+        cleaned = cleaned + REALISM_SUFFIX
+
+    return cleaned
+
+
+async def split_prompts(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield each ---separated prompt from a text stream as soon as its separator arrives."""
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        while PROMPT_SEPARATOR in buffer:
+            prompt, buffer = buffer.split(PROMPT_SEPARATOR, 1)
+            yield prompt
+    yield buffer
 
-            clean_prompts.append(cleaned)
+
+async def stream_prompts(
+    api_key: str,
+    count: int,
+    style: Literal["cosplay", "cottagecore", "gym", "bookish", "nurse"],
+    location: Literal["outdoor", "indoor", "mixed"],
+    bust_size: Literal["none", "subtle", "moderate", "exaggerated"] = "none",
+    preserve_identity: bool = True,
+    framing: Literal["close", "medium", "full"] = "medium",
+    realism_preset: Literal["default", "phone_grainy", "harsh_flash", "film_aesthetic", "selfie", "candid"] = "default",
+    embed_caption: bool = True,
+) -> AsyncIterator[Union[str, PromptWithCaption]]:
+    """
+    Generate i2i prompts using Claude, yielding each one as soon as it is complete.
+
+    Streams Claude's response on the async client, so the event loop stays
+    free while the prompts generate. Arguments and items are as for
+    ``generate_prompts``.
+    """
+    if count < 1 or count > 50:
+        raise ValueError("Count must be between 1 and 50")
+
+    prompt = build_generation_prompt(count, style, location, preserve_identity, framing)
+
+    generated = 0
+    async with anthropic.AsyncAnthropic(api_key=api_key) as client:
+        async with client.messages.stream(
+            model=MODEL,
+            max_tokens=16000,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }]
+        ) as stream:
+            async for raw_prompt in split_prompts(stream.text_stream):
+                cleaned = postprocess_prompt(raw_prompt, bust_size, realism_preset)
+                if not cleaned:
+                    continue
+                generated += 1
+                if embed_caption:
+                    yield cleaned
+                else:
+                    # Extract captions for post-processing
+                    clean_prompt, caption = extract_caption(cleaned)
+                    yield PromptWithCaption(prompt=clean_prompt, caption=caption)
 
     logger.info(
         "Generated prompts",
         requested=count,
-        actual=len(clean_prompts),
+        actual=generated,
         bust_size=bust_size,
         preserve_identity=preserve_identity,
         framing=framing,
@@ -1477,12 +1506,49 @@ async def generate_prompts(
         embed_caption=embed_caption,
     )
 
-    # If embed_caption=False, extract captions for post-processing
-    if not embed_caption:
-        result: list[PromptWithCaption] = []
-        for prompt in clean_prompts:
-            clean_prompt, caption = extract_caption(prompt)
-            result.append(PromptWithCaption(prompt=clean_prompt, caption=caption))
-        return result
 
-    return clean_prompts
+async def generate_prompts(
+    api_key: str,
+    count: int,
+    style: Literal["cosplay", "cottagecore", "gym", "bookish", "nurse"],
+    location: Literal["outdoor", "indoor", "mixed"],
+    bust_size: Literal["none", "subtle", "moderate", "exaggerated"] = "none",
+    preserve_identity: bool = True,
+    framing: Literal["close", "medium", "full"] = "medium",
+    realism_preset: Literal["default", "phone_grainy", "harsh_flash", "film_aesthetic", "selfie", "candid"] = "default",
+    embed_caption: bool = True,
+) -> Union[list[str], list[PromptWithCaption]]:
+    """
+    Generate i2i prompts using Claude.
+
+    Args:
+        api_key: Anthropic API key
+        count: Number of prompts to generate (1-50)
+        style: "cosplay" or "cottagecore"
+        location: "outdoor", "indoor", or "mixed"
+        bust_size: Bust enhancement level - "none", "subtle", "moderate", or "exaggerated"
+        preserve_identity: If True, add "preserving her exact facial features" to prompts
+        framing: "close" (face/shoulders), "medium" (waist up), "full" (head to toe)
+        realism_preset: Style preset for realism injection (default, phone_grainy, harsh_flash, etc.)
+        embed_caption: If True (default), return prompts with embedded captions.
+                      If False, return list of {prompt, caption} dicts for post-processing.
+                      Use False for models like Wan 2.2 where captions drift.
+
+    Returns:
+        If embed_caption=True: List of prompt strings with embedded captions
+        If embed_caption=False: List of PromptWithCaption dicts with separate caption field
+    """
+    return [
+        prompt
+        async for prompt in stream_prompts(
+            api_key=api_key,
+            count=count,
+            style=style,
+            location=location,
+            bust_size=bust_size,
+            preserve_identity=preserve_identity,
+            framing=framing,
+            realism_preset=realism_preset,
+            embed_caption=embed_caption,
+        )
+    ]
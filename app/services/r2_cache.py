@@ -1,13 +1,52 @@
-"""Cloudflare R2 caching service for fast image/video loading."""
+"""Cloudflare R2 caching service for fast image/video loading.
+
+All R2 calls go through ``r2_storage``, a non-blocking wrapper that runs
+boto3 in a bounded thread pool so uploads never stall the event loop.
+Downloads from the source CDN are streamed straight into R2 multipart
+uploads, so memory per transfer is bounded by one part buffer.
+
+Generated media is content-addressed: objects live at ``media/<sha256>``
+(one key scheme for images and videos), the hash is computed while the bytes
+stream through, and a URL -> content-hash alias table makes repeat lookups by
+URL instant. Identical outputs fetched from different CDN URLs are stored
+once.
+
+Existence checks are answered by ``r2_key_index``, a local index of known
+keys (in-memory set backed by the ``r2_objects`` table) that is updated on
+every upload and periodically reconciled against a bucket listing, so cache
+hits cost no R2 round trip. The index and the alias table are database tables;
+async callers reach them through the R2 thread pool, never on the event
+loop.
+
+Usage:
+    from app.services.r2_cache import r2_storage, r2_key_index
+
+    if not await r2_key_index.contains(key):
+        size, content_type = await r2_storage.upload_from_url(source_url, key)
+        await r2_key_index.add_async(key, size, content_type)
+
+    # Content-addressed cache (dedups identical bytes across URLs)
+    cached_url = await cache_image(source_url)
+"""
 
 import os
+import asyncio
 import hashlib
-import httpx
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple
 import boto3
 from botocore.config import Config
 import structlog
 from dotenv import load_dotenv
 
+from app.config import settings
+from app.database import SessionLocal
+from app.http_client import get_http_client
+from app.models import R2ContentAlias, R2Object
+
 # Load .env file so os.getenv() can read R2 credentials
 load_dotenv()
 
@@ -53,8 +92,402 @@ def get_bucket():
     return os.getenv("R2_BUCKET_NAME", "i2v")
 
 
+CACHE_CONTROL = "public, max-age=31536000"
+
+
+class AsyncR2Storage:
+    """
+    Non-blocking R2 storage backend.
+
+    boto3 is synchronous, so every call is offloaded to a dedicated bounded
+    thread pool. Concurrent transfers are capped so the total memory held in
+    multipart part buffers stays bounded (transfers x part size).
+
+    Attributes:
+        max_workers: Threads available for boto3 calls
+        max_concurrent_transfers: Simultaneous uploads
+        part_size: Multipart part size in bytes
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_concurrent_transfers: Optional[int] = None,
+        part_size: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or settings.r2_max_workers
+        self.max_concurrent_transfers = (
+            max_concurrent_transfers or settings.r2_max_concurrent_transfers
+        )
+        self.part_size = part_size or settings.r2_multipart_part_size_mb * 1024 * 1024
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._transfer_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+    @property
+    def client(self):
+        """The shared boto3 client, or None if R2 is not configured."""
+        return get_s3_client()
+
+    @property
+    def bucket(self) -> str:
+        return get_bucket()
+
+    def public_url_for(self, key: str) -> Optional[str]:
+        """Public URL for a key, or None if no public domain is configured."""
+        public_url = get_public_url()
+        return f"{public_url}/{key}" if public_url else None
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking boto3 call in the R2 thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="r2"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def _slots(self) -> asyncio.Semaphore:
+        """Per-event-loop semaphore bounding concurrent transfers."""
+        loop = asyncio.get_running_loop()
+        if self._transfer_slots is None or self._transfer_slots[0] is not loop:
+            self._transfer_slots = (loop, asyncio.Semaphore(self.max_concurrent_transfers))
+        return self._transfer_slots[1]
+
+    async def exists(self, key: str) -> bool:
+        """Check whether an object exists (HEAD)."""
+        try:
+            await self._run(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except Exception:
+            return False
+
+    async def put_bytes(self, key: str, data: bytes, content_type: str) -> int:
+        """Upload an in-memory object. Returns the size in bytes."""
+        async with self._slots():
+            await self._run(
+                self.client.put_object,
+                Bucket=self.bucket,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+                CacheControl=CACHE_CONTROL,
+            )
+        return len(data)
+
+    async def upload_stream(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> int:
+        """
+        Stream chunks into R2, switching to a multipart upload once more than
+        one part of data has arrived. Returns the total size in bytes.
+
+        At most one part buffer is held in memory per transfer.
+        """
+        client = self.client
+        bucket = self.bucket
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+        total = 0
+
+        async def flush_part():
+            part_number = len(parts) + 1
+            response = await self._run(
+                client.upload_part,
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(buffer),
+            )
+            parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+            buffer.clear()
+
+        async with self._slots():
+            try:
+                async for chunk in chunks:
+                    buffer.extend(chunk)
+                    total += len(chunk)
+                    if len(buffer) >= self.part_size:
+                        if upload_id is None:
+                            response = await self._run(
+                                client.create_multipart_upload,
+                                Bucket=bucket,
+                                Key=key,
+                                ContentType=content_type,
+                                CacheControl=CACHE_CONTROL,
+                            )
+                            upload_id = response["UploadId"]
+                        await flush_part()
+
+                if upload_id is None:
+                    # Small object - single PUT
+                    await self._run(
+                        client.put_object,
+                        Bucket=bucket,
+                        Key=key,
+                        Body=bytes(buffer),
+                        ContentType=content_type,
+                        CacheControl=CACHE_CONTROL,
+                    )
+                    return total
+
+                if buffer:
+                    await flush_part()
+                await self._run(
+                    client.complete_multipart_upload,
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+                return total
+
+            except BaseException:
+                if upload_id is not None:
+                    try:
+                        await self._run(
+                            client.abort_multipart_upload,
+                            Bucket=bucket,
+                            Key=key,
+                            UploadId=upload_id,
+                        )
+                    except Exception as e:
+                        logger.warning("Failed to abort multipart upload", key=key, error=str(e))
+                raise
+
+    async def upload_from_url(
+        self,
+        source_url: str,
+        key: str,
+        timeout: float = 120.0,
+        default_content_type: str = "application/octet-stream",
+    ) -> Tuple[int, str]:
+        """
+        Stream a download from ``source_url`` directly into R2 at ``key``.
+
+        Returns (size_bytes, content_type). Raises on download/upload failure.
+        """
+        http = get_http_client(source_url)
+        async with http.stream("GET", source_url, timeout=timeout) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", default_content_type)
+            size = await self.upload_stream(
+                key, response.aiter_bytes(chunk_size=256 * 1024), content_type
+            )
+        return size, content_type
+
+    async def copy(self, source_key: str, dest_key: str, content_type: str):
+        """Server-side copy of an object within the bucket."""
+        await self._run(
+            self.client.copy_object,
+            Bucket=self.bucket,
+            Key=dest_key,
+            CopySource={"Bucket": self.bucket, "Key": source_key},
+            ContentType=content_type,
+            CacheControl=CACHE_CONTROL,
+            MetadataDirective="REPLACE",
+        )
+
+    async def delete(self, key: str):
+        """Delete an object."""
+        await self._run(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def list_objects(self, prefix: str = "") -> Dict[str, int]:
+        """List every object under a prefix. Returns {key: size_bytes}."""
+        client = self.client
+        bucket = self.bucket
+
+        def _list() -> Dict[str, int]:
+            objects = {}
+            paginator = client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    objects[obj["Key"]] = obj.get("Size", 0)
+            return objects
+
+        return await self._run(_list)
+
+    def shutdown(self):
+        """Release the R2 thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Singleton instance
+r2_storage = AsyncR2Storage()
+
+
+class R2KeyIndex:
+    """
+    Local index of keys that exist in the R2 bucket.
+
+    Lookups check an in-memory set, then the ``r2_objects`` table (shared
+    with other processes such as the worker). Until the index has been
+    reconciled against a full bucket listing, a miss falls back to a HEAD
+    request and the answer is recorded.
+    """
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory
+        self._keys: set = set()
+        self.hydrated = False
+        self.last_reconciled_at: Optional[float] = None
+        self._stats = {"hits": 0, "misses": 0, "head_fallbacks": 0}
+
+    def _session(self):
+        return (self._session_factory or SessionLocal)()
+
+    def contains_local(self, key: str) -> bool:
+        """Check the in-memory set and the index table (no network)."""
+        if key in self._keys:
+            return True
+        db = self._session()
+        try:
+            found = db.query(R2Object.key).filter(R2Object.key == key).first() is not None
+        finally:
+            db.close()
+        if found:
+            self._keys.add(key)
+        return found
+
+    async def contains_all_local(self, keys) -> bool:
+        """``contains_local`` for several keys, with one off-loop DB round trip."""
+        unknown = [key for key in keys if key not in self._keys]
+        if not unknown:
+            return True
+        return await r2_storage._run(lambda: all(self.contains_local(key) for key in unknown))
+
+    async def contains(self, key: str) -> bool:
+        """Check whether a key exists, hitting R2 only if the index can't answer."""
+        if key in self._keys or await r2_storage._run(self.contains_local, key):
+            self._stats["hits"] += 1
+            return True
+        if self.hydrated:
+            self._stats["misses"] += 1
+            return False
+
+        self._stats["head_fallbacks"] += 1
+        exists = await r2_storage.exists(key)
+        if exists:
+            await self.add_async(key)
+        return exists
+
+    def add(self, key: str, size_bytes: Optional[int] = None, content_type: Optional[str] = None):
+        """Record a key after a successful upload."""
+        self._keys.add(key)
+        db = self._session()
+        try:
+            db.merge(R2Object(key=key, size_bytes=size_bytes, content_type=content_type))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Failed to record R2 key in index", key=key, error=str(e))
+        finally:
+            db.close()
+
+    async def add_async(
+        self, key: str, size_bytes: Optional[int] = None, content_type: Optional[str] = None
+    ):
+        """``add`` with the DB write run in the R2 thread pool."""
+        self._keys.add(key)
+        await r2_storage._run(self.add, key, size_bytes, content_type)
+
+    def discard(self, key: str):
+        """Forget a key (e.g. after deleting the object)."""
+        self._keys.discard(key)
+        db = self._session()
+        try:
+            db.query(R2Object).filter(R2Object.key == key).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    async def reconcile(self) -> dict:
+        """
+        Sync the index with a full bucket listing.
+
+        Adds keys present in R2 but missing locally and drops keys that no
+        longer exist. Returns counts of listed/added/removed keys.
+        """
+        listing = await r2_storage.list_objects()
+        missing, stale = await r2_storage._run(self._apply_listing, listing)
+
+        self._keys = set(listing)
+        self.hydrated = True
+        self.last_reconciled_at = time.time()
+
+        logger.info(
+            "Reconciled R2 key index",
+            listed=len(listing),
+            added=len(missing),
+            removed=len(stale),
+        )
+        return {"listed": len(listing), "added": len(missing), "removed": len(stale)}
+
+    def _apply_listing(self, listing: Dict[str, int]) -> Tuple[list, list]:
+        """Make the table match a bucket listing; returns (added, removed) keys."""
+        db = self._session()
+        try:
+            known = {row[0] for row in db.query(R2Object.key).all()}
+            missing = [key for key in listing if key not in known]
+            stale = [key for key in known if key not in listing]
+
+            for key in missing:
+                db.add(R2Object(key=key, size_bytes=listing[key]))
+            for i in range(0, len(stale), 500):
+                db.query(R2Object).filter(R2Object.key.in_(stale[i:i + 500])).delete(
+                    synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+        return missing, stale
+
+    def get_stats(self) -> dict:
+        """Get index statistics."""
+        return {
+            "keys_in_memory": len(self._keys),
+            "hydrated": self.hydrated,
+            "last_reconciled_at": self.last_reconciled_at,
+            **self._stats,
+        }
+
+
+# Singleton instance
+r2_key_index = R2KeyIndex()
+
+
+async def run_r2_index_reconciliation(interval_seconds: Optional[float] = None):
+    """Background loop: reconcile the R2 key index now and then periodically."""
+    interval = interval_seconds or settings.r2_index_reconcile_interval_hours * 3600
+    while True:
+        if get_s3_client() is None:
+            return
+        try:
+            await r2_key_index.reconcile()
+        except Exception as e:
+            logger.error("R2 key index reconciliation failed", error=str(e))
+        await asyncio.sleep(interval)
+
+
+CONTENT_PREFIX = "media"
+STAGING_PREFIX = "staging"
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "video/mp4": ".mp4",
+    "video/webm": ".webm",
+    "video/quicktime": ".mov",
+}
+
+
 def url_to_key(url: str, prefix: str = "images") -> str:
-    """Convert URL to R2 object key using hash."""
+    """Convert URL to R2 object key using hash (legacy URL-addressed layout)."""
     url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
     ext = ".jpg"
     if ".png" in url.lower():
@@ -66,81 +499,199 @@ def url_to_key(url: str, prefix: str = "images") -> str:
     return f"{prefix}/{url_hash}{ext}"
 
 
-async def cache_image(
+def content_key(content_hash: str, content_type: str) -> str:
+    """R2 key for content-addressed media (shared by images and videos)."""
+    ext = CONTENT_TYPE_EXTENSIONS.get(content_type.split(";")[0].strip().lower(), "")
+    return f"{CONTENT_PREFIX}/{content_hash}{ext}"
+
+
+def _url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def lookup_alias(source_url: str) -> Optional[str]:
+    """Return the content key a source URL resolved to, if known."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(R2ContentAlias.content_key)
+            .filter(R2ContentAlias.url_hash == _url_hash(source_url))
+            .first()
+        )
+        return row[0] if row else None
+    finally:
+        db.close()
+
+
+def lookup_content_hash(content_hash: str) -> Optional[str]:
+    """Return the content key stored for a SHA-256 content hash, if known."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(R2ContentAlias.content_key)
+            .filter(R2ContentAlias.content_hash == content_hash)
+            .first()
+        )
+        return row[0] if row else None
+    finally:
+        db.close()
+
+
+def record_alias(
     source_url: str,
-    prefix: str = "images",
-    image_bytes: bytes | None = None,
-    content_type: str = "image/jpeg",
+    content_hash: str,
+    key: str,
+    size_bytes: Optional[int] = None,
+    content_type: Optional[str] = None,
+):
+    """Remember which content-addressed object a source URL maps to."""
+    db = SessionLocal()
+    try:
+        db.merge(
+            R2ContentAlias(
+                url_hash=_url_hash(source_url),
+                content_hash=content_hash,
+                content_key=key,
+                size_bytes=size_bytes,
+                content_type=content_type,
+            )
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Failed to record R2 content alias", key=key, error=str(e))
+    finally:
+        db.close()
+
+
+async def _store_bytes(data: bytes, content_type: str) -> Tuple[str, str, int]:
+    """Store in-memory bytes under their content key (skipped if present)."""
+    content_hash = hashlib.sha256(data).hexdigest()
+    key = content_key(content_hash, content_type)
+    if await r2_key_index.contains(key):
+        logger.debug("Content already stored, deduplicated", key=key)
+    else:
+        await r2_storage.put_bytes(key, data, content_type)
+        await r2_key_index.add_async(key, len(data), content_type)
+    return content_hash, key, len(data)
+
+
+async def _store_from_url(
+    source_url: str, timeout: float, default_content_type: str
+) -> Tuple[str, str, int, str]:
+    """
+    Stream a download into R2, hashing it on the way through.
+
+    The bytes land at a staging key first (the hash isn't known until the
+    stream ends), then are copied to their content key - or discarded if
+    that content is already stored.
+    """
+    staging_key = f"{STAGING_PREFIX}/{uuid.uuid4().hex}"
+    hasher = hashlib.sha256()
+
+    http = get_http_client(source_url)
+    async with http.stream("GET", source_url, timeout=timeout) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", default_content_type)
+
+        async def hashed_chunks():
+            async for chunk in response.aiter_bytes(chunk_size=256 * 1024):
+                hasher.update(chunk)
+                yield chunk
+
+        size = await r2_storage.upload_stream(staging_key, hashed_chunks(), content_type)
+
+    content_hash = hasher.hexdigest()
+    key = content_key(content_hash, content_type)
+    try:
+        if await r2_key_index.contains(key):
+            logger.debug("Content already stored, deduplicated", key=key)
+        else:
+            await r2_storage.copy(staging_key, key, content_type)
+            await r2_key_index.add_async(key, size, content_type)
+    finally:
+        try:
+            await r2_storage.delete(staging_key)
+        except Exception as e:
+            logger.warning("Failed to delete R2 staging object", key=staging_key, error=str(e))
+
+    return content_hash, key, size, content_type
+
+
+async def cache_media(
+    source_url: str,
+    data: bytes | None = None,
+    content_type: str = "application/octet-stream",
+    timeout: float = 120.0,
+    legacy_key: str | None = None,
 ) -> str | None:
-    """Cache an image to R2. Returns R2 public URL if successful.
+    """Cache media to content-addressed R2 storage. Returns R2 public URL if successful.
 
     Args:
-        source_url: URL for key generation (and download if image_bytes not provided)
-        prefix: R2 key prefix
-        image_bytes: Pre-downloaded image bytes (skips download if provided)
-        content_type: Content type for upload (used when image_bytes provided)
+        source_url: Source URL (alias key, and download URL if data not provided)
+        data: Pre-downloaded bytes (skips download if provided)
+        content_type: Content type (fallback when the download has none)
+        timeout: Download timeout in seconds
+        legacy_key: Pre-dedup URL-addressed key; reused if that object exists
     """
     client = get_s3_client()
     public_url = get_public_url()
-    bucket = get_bucket()
 
     if not client or not public_url:
         return None
 
-    key = url_to_key(source_url, prefix)
-
-    # Check if already cached
-    try:
-        client.head_object(Bucket=bucket, Key=key)
-        cached_url = f"{public_url}/{key}"
-        logger.debug("Image already cached", key=key)
-        return cached_url
-    except Exception:
-        pass  # Object doesn't exist, proceed to cache it
+    # Known URL - no download, no hashing (DB lookups run off the event loop)
+    key = await r2_storage._run(lookup_alias, source_url)
+    if key:
+        logger.debug("Media already cached", key=key)
+        return f"{public_url}/{key}"
 
-    # Use provided bytes or download from source
-    if image_bytes is not None:
-        image_data = image_bytes
-    else:
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as http:
-                response = await http.get(source_url)
-                if response.status_code != 200:
-                    logger.warning(
-                        "Failed to download image for caching",
-                        url=source_url[:60],
-                        status=response.status_code,
-                    )
-                    return None
-                image_data = response.content
-                content_type = response.headers.get("content-type", "image/jpeg")
-        except Exception as e:
-            logger.error("Failed to download image", url=source_url[:60], error=str(e))
-            return None
+    if legacy_key and await r2_key_index.contains_all_local([legacy_key]):
+        logger.debug("Media already cached (legacy key)", key=legacy_key)
+        return f"{public_url}/{legacy_key}"
 
-    # Upload to R2
     try:
-        client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=image_data,
-            ContentType=content_type,
-            CacheControl="public, max-age=31536000",
-        )
-        cached_url = f"{public_url}/{key}"
-        logger.info("Cached image to R2", key=key, size_kb=len(image_data) / 1024)
-        return cached_url
+        if data is not None:
+            content_hash, key, size = await _store_bytes(data, content_type)
+        else:
+            content_hash, key, size, content_type = await _store_from_url(
+                source_url, timeout, content_type
+            )
+        await r2_storage._run(record_alias, source_url, content_hash, key, size, content_type)
+        logger.info("Cached media to R2", key=key, size_kb=size / 1024)
+        return f"{public_url}/{key}"
     except Exception as e:
-        logger.error("Failed to upload to R2", key=key, error=str(e))
+        logger.error("Failed to cache media to R2", url=source_url[:60], error=str(e))
         return None
 
 
+async def cache_image(
+    source_url: str,
+    prefix: str = "images",
+    image_bytes: bytes | None = None,
+    content_type: str = "image/jpeg",
+) -> str | None:
+    """Cache an image to R2. Returns R2 public URL if successful.
+
+    Args:
+        source_url: URL for alias lookup (and download if image_bytes not provided)
+        prefix: Key prefix of the legacy URL-addressed layout
+        image_bytes: Pre-downloaded image bytes (skips download if provided)
+        content_type: Content type for upload (used when image_bytes provided)
+    """
+    return await cache_media(
+        source_url,
+        data=image_bytes,
+        content_type=content_type,
+        timeout=30.0,
+        legacy_key=url_to_key(source_url, prefix),
+    )
+
+
 async def cache_images_batch(
     urls: list[str], prefix: str = "images"
 ) -> list[str | None]:
     """Cache multiple images to R2. Returns list of cached URLs (or None for failures)."""
-    import asyncio
-
     tasks = [cache_image(url, prefix) for url in urls]
     return await asyncio.gather(*tasks, return_exceptions=False)
 
@@ -153,75 +704,21 @@ async def cache_video(
     """Cache a video to R2. Returns R2 public URL if successful.
 
     Args:
-        source_url: URL for key generation (and download if video_bytes not provided)
+        source_url: URL for alias lookup (and download if video_bytes not provided)
         video_bytes: Pre-downloaded video bytes (skips download if provided)
         content_type: Content type for upload
     """
-    client = get_s3_client()
-    public_url = get_public_url()
-    bucket = get_bucket()
-
-    if not client or not public_url:
-        logger.warning("R2 caching skipped - client or public_url not configured",
-                      has_client=client is not None, has_public_url=public_url is not None)
-        return None
-
-    logger.info("Starting R2 cache for video", url=source_url[:60])
-
-    url_hash = hashlib.sha256(source_url.encode()).hexdigest()[:16]
-    key = f"videos/{url_hash}.mp4"
-
-    # Check if already cached
-    try:
-        client.head_object(Bucket=bucket, Key=key)
-        cached_url = f"{public_url}/{key}"
-        logger.debug("Video already cached", key=key)
-        return cached_url
-    except Exception:
-        pass  # Object doesn't exist, proceed to cache it
-
-    # Use provided bytes or download from source
-    if video_bytes is not None:
-        video_data = video_bytes
-    else:
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as http:
-                response = await http.get(source_url)
-                if response.status_code != 200:
-                    logger.warning(
-                        "Failed to download video",
-                        url=source_url[:60],
-                        status=response.status_code,
-                    )
-                    return None
-                video_data = response.content
-        except Exception as e:
-            logger.error("Failed to download video", url=source_url[:60], error=str(e))
-            return None
-
-    # Upload to R2
-    try:
-        client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=video_data,
-            ContentType=content_type,
-            CacheControl="public, max-age=31536000",
-        )
-        cached_url = f"{public_url}/{key}"
-        logger.info(
-            "Cached video to R2", key=key, size_mb=len(video_data) / (1024 * 1024)
-        )
-        return cached_url
-    except Exception as e:
-        logger.error("Failed to upload video to R2", key=key, error=str(e))
-        return None
+    return await cache_media(
+        source_url,
+        data=video_bytes,
+        content_type=content_type,
+        timeout=120.0,
+        legacy_key=f"videos/{_url_hash(source_url)[:16]}.mp4",
+    )
 
 
 async def cache_videos_batch(urls: list[str]) -> list[str | None]:
     """Cache multiple videos to R2."""
-    import asyncio
-
     tasks = [cache_video(url) for url in urls]
     return await asyncio.gather(*tasks, return_exceptions=False)
 
@@ -235,14 +732,33 @@ def get_cached_url(source_url: str, prefix: str = "images") -> str | None:
     if not client or not public_url:
         return None
 
+    key = lookup_alias(source_url)
+    if key:
+        return f"{public_url}/{key}"
+
     key = url_to_key(source_url, prefix)
+    if r2_key_index.contains_local(key):
+        return f"{public_url}/{key}"
+    if r2_key_index.hydrated:
+        return None
+
     try:
         client.head_object(Bucket=bucket, Key=key)
+        r2_key_index.add(key)
         return f"{public_url}/{key}"
     except Exception:
         return None
 
 
+def get_cached_url_by_hash(content_hash: str) -> str | None:
+    """Get the R2 URL for media by its SHA-256 content hash, if stored."""
+    public_url = get_public_url()
+    key = lookup_content_hash(content_hash)
+    if not key or not public_url:
+        return None
+    return f"{public_url}/{key}"
+
+
 class UploadProgressCallback:
     """Progress callback for multipart uploads."""
 
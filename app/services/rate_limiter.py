@@ -7,6 +7,14 @@ Two algorithms provided:
 1. Sliding Window: Simple, counts requests in last N seconds
 2. Token Bucket: Smooth, allows bursts while maintaining average rate
 
+A ProviderGovernor combines both for upstream providers: a request rate
+for every call plus a cap on generations in flight, adapted to 429/5xx
+responses and shared with the other local processes.
+
+The Redis* variants keep their window/bucket in Redis (updated by atomic
+Lua scripts) so a limit holds for the whole deployment; they fall back to
+the in-memory limiters while Redis is unavailable.
+
 Usage:
     # Sliding window - simple and effective
     limiter = SlidingWindowRateLimiter(max_per_minute=60)
@@ -24,6 +32,15 @@ Usage:
     @rate_limit(max_per_minute=30)
     async def make_api_call():
         return await client.get("/data")
+
+    # Shared by every process/host (async API)
+    limiter = RedisTokenBucketRateLimiter("fal-submit", rate=10, burst=20)
+    await limiter.acquire()
+
+    # Provider governor - every Fal request, and each generation as a whole
+    response = await provider_governor.request("fal", client.post, url, json=payload)
+    async with provider_governor.slot("fal"):
+        urls = await generate_image(...)
 """
 
 import asyncio
@@ -31,10 +48,21 @@ import time
 import functools
 from collections import deque
 from dataclasses import dataclass
-from typing import Deque, Optional, Dict, Callable, Awaitable, TypeVar
-from threading import Lock
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Optional, Dict, Callable, Awaitable, TypeVar
+from threading import Lock, RLock
 import structlog
 
+from app.config import settings
+from app.services.error_classifier import ErrorType, error_classifier
+
 logger = structlog.get_logger()
 
 T = TypeVar("T")
@@ -100,7 +128,7 @@ class SlidingWindowRateLimiter:
             )
 
         self._timestamps: Deque[float] = deque()
-        self._lock = Lock()
+        self._lock = RLock()  # get_stats() calls time_until_available() while holding it
         self._async_lock = asyncio.Lock()
 
         # Stats
@@ -464,6 +492,318 @@ class MultiRateLimiter:
         return {i: limiter.current_usage() for i, limiter in enumerate(self.limiters)}
 
 
+# ============================================================
+# DISTRIBUTED (REDIS) LIMITERS
+# ============================================================
+
+# Redis is retried this long after it was unreachable (meanwhile: per-process limits)
+REDIS_RETRY_SECONDS = 30.0
+
+# KEYS[1] sorted set of grants; ARGV: window_ms, max_requests, member, acquire (1/0)
+# Returns {allowed, usage, wait_ms}. Uses the Redis clock so hosts can't disagree.
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local usage = redis.call('ZCARD', KEYS[1])
+if usage < limit then
+    if ARGV[4] == '1' then
+        redis.call('ZADD', KEYS[1], now, ARGV[3])
+        redis.call('PEXPIRE', KEYS[1], window)
+        usage = usage + 1
+    end
+    return {1, usage, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, usage, tonumber(oldest[2]) + window - now}
+"""
+
+# KEYS[1] hash {tokens, ts}; ARGV: rate per second, burst, tokens requested (0 = peek)
+# Returns {allowed, tokens, wait_seconds} (floats as strings: Lua numbers truncate)
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+elseif rate > 0 then
+    wait = (requested - tokens) / rate
+else
+    wait = -1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+if rate > 0 then
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+end
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+
+class _RedisScript:
+    """A Lua script run with EVALSHA, loading it on first use (or after a Redis restart)."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(self, redis, keys: list, args: list):
+        try:
+            return await redis.evalsha(self.sha, len(keys), *keys, *args)
+        except Exception as e:
+            # redis-py raises NoScriptError and strips the NOSCRIPT prefix from the message
+            if type(e).__name__ != "NoScriptError" and "NOSCRIPT" not in str(e):
+                raise
+            return await redis.eval(self.source, len(keys), *keys, *args)
+
+
+class _SharedState:
+    """
+    Limiter state kept in Redis so every process shares one budget.
+
+    While Redis is unreachable (or RATE_LIMIT_REDIS_ENABLED is off) each
+    process falls back to its own in-memory limiter and retries Redis every
+    REDIS_RETRY_SECONDS.
+    """
+
+    KEY_PREFIX = "ratelimit:"
+
+    def __init__(self, name: str, redis_factory: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.key = f"{self.KEY_PREFIX}{name}"
+        self._redis_factory = redis_factory
+        self._retry_at = 0.0
+
+    async def _redis(self):
+        if not settings.rate_limit_redis_enabled or time.monotonic() < self._retry_at:
+            return None
+        if self._redis_factory is None:
+            from app.services.cache import get_redis
+
+            self._redis_factory = get_redis
+        redis = await self._redis_factory()
+        if redis is None:
+            self._retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        return redis
+
+    async def run(self, script: _RedisScript, args: list) -> Optional[list]:
+        """Run ``script`` against this limiter's key; None means "use the local fallback"."""
+        redis = await self._redis()
+        if redis is None:
+            return None
+        try:
+            return await script(redis, [self.key], args)
+        except Exception as e:
+            logger.warning("Shared rate limit unavailable, limiting per process", key=self.key, error=str(e))
+            self._retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            return None
+
+    async def is_shared(self) -> bool:
+        return await self._redis() is not None
+
+
+class RedisSlidingWindowRateLimiter:
+    """
+    SlidingWindowRateLimiter whose window is shared through Redis.
+
+    Same rate arguments and methods as SlidingWindowRateLimiter, but async
+    (``await limiter.try_acquire()``). The limit applies to every process
+    using the same ``name``; without Redis it is per process.
+    """
+
+    _script = _RedisScript(SLIDING_WINDOW_SCRIPT)
+
+    def __init__(
+        self,
+        name: str,
+        max_per_minute: Optional[int] = None,
+        max_per_second: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        window_seconds: float = 60.0,
+        redis_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        self.local = SlidingWindowRateLimiter(
+            max_per_minute=max_per_minute,
+            max_per_second=max_per_second,
+            max_requests=max_requests,
+            window_seconds=window_seconds,
+        )
+        self.max_requests = self.local.max_requests
+        self.window_seconds = self.local.window_seconds
+        self._shared = _SharedState(f"sw:{name}", redis_factory)
+
+        # Stats (this process)
+        self._total_acquired = 0
+        self._total_waited = 0
+
+    async def _check(self, acquire: bool) -> Optional[tuple]:
+        reply = await self._shared.run(
+            self._script,
+            [int(self.window_seconds * 1000), self.max_requests, uuid.uuid4().hex, int(acquire)],
+        )
+        if reply is None:
+            return None
+        allowed, usage, wait_ms = reply
+        return bool(int(allowed)), int(usage), max(0.0, int(wait_ms) / 1000)
+
+    async def try_acquire(self) -> bool:
+        result = await self._check(acquire=True)
+        acquired = self.local.try_acquire() if result is None else result[0]
+        if acquired and result is not None:
+            self._total_acquired += 1
+        return acquired
+
+    async def time_until_available(self) -> float:
+        result = await self._check(acquire=False)
+        return self.local.time_until_available() if result is None else result[2]
+
+    async def current_usage(self) -> int:
+        result = await self._check(acquire=False)
+        return self.local.current_usage() if result is None else result[1]
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Acquire a slot, waiting for one; False if ``timeout`` passes first."""
+        start_time = time.time()
+        while True:
+            if await self.try_acquire():
+                return True
+
+            wait_time = await self.time_until_available()
+            if timeout is not None:
+                elapsed = time.time() - start_time
+                if elapsed + wait_time > timeout:
+                    return False
+                wait_time = min(wait_time, timeout - elapsed)
+
+            self._total_waited += 1
+            await asyncio.sleep(wait_time + 0.01)
+
+    async def get_stats(self) -> RateLimitStats:
+        result = await self._check(acquire=False)
+        if result is None:
+            return self.local.get_stats()
+        _, usage, wait = result
+        return RateLimitStats(
+            current_usage=usage,
+            max_allowed=self.max_requests,
+            window_seconds=self.window_seconds,
+            time_until_available=wait,
+            total_acquired=self._total_acquired + self.local._total_acquired,
+            total_waited=self._total_waited,
+        )
+
+    async def reset(self):
+        redis = await self._shared._redis()
+        if redis is not None:
+            await redis.delete(self._shared.key)
+        self.local.reset()
+
+
+class RedisTokenBucketRateLimiter:
+    """
+    TokenBucketRateLimiter whose bucket is shared through Redis.
+
+    Same arguments and methods as TokenBucketRateLimiter, but async. ``rate``
+    may be changed at any time (it is sent with every call).
+    """
+
+    _script = _RedisScript(TOKEN_BUCKET_SCRIPT)
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 10.0,
+        burst: int = 10,
+        redis_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        self.local = TokenBucketRateLimiter(rate=rate, burst=burst)
+        self._shared = _SharedState(f"tb:{name}", redis_factory)
+
+        # Stats (this process)
+        self._total_acquired = 0
+        self._total_waited = 0
+
+    @property
+    def rate(self) -> float:
+        return self.local.rate
+
+    @rate.setter
+    def rate(self, value: float):
+        self.local.rate = value
+
+    @property
+    def burst(self) -> int:
+        return self.local.burst
+
+    async def _take(self, tokens: int) -> Optional[tuple]:
+        reply = await self._shared.run(self._script, [repr(self.rate), self.burst, tokens])
+        if reply is None:
+            return None
+        allowed, available, wait = reply
+        wait = float(wait)
+        return bool(int(allowed)), float(available), float("inf") if wait < 0 else wait
+
+    async def try_acquire(self, tokens: int = 1) -> bool:
+        result = await self._take(tokens)
+        if result is None:
+            return self.local.try_acquire(tokens)
+        if result[0]:
+            self._total_acquired += tokens
+        return result[0]
+
+    async def time_until_tokens(self, tokens: int = 1) -> float:
+        result = await self._take(0)
+        if result is None:
+            return self.local.time_until_tokens(tokens)
+        available = result[1]
+        if available >= tokens:
+            return 0.0
+        return (tokens - available) / self.rate if self.rate > 0 else float("inf")
+
+    async def current_tokens(self) -> float:
+        result = await self._take(0)
+        return self.local.current_tokens() if result is None else result[1]
+
+    async def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """Acquire tokens, waiting for them; False if ``timeout`` passes first."""
+        start_time = time.time()
+        while True:
+            if await self.try_acquire(tokens):
+                return True
+
+            wait_time = await self.time_until_tokens(tokens)
+            if timeout is not None:
+                elapsed = time.time() - start_time
+                if elapsed + wait_time > timeout:
+                    return False
+                wait_time = min(wait_time, timeout - elapsed)
+
+            self._total_waited += 1
+            await asyncio.sleep(wait_time + 0.001)
+
+    async def get_stats(self) -> dict:
+        result = await self._take(0)
+        if result is None:
+            return {**self.local.get_stats(), "shared": False}
+        return {
+            "current_tokens": round(result[1], 2),
+            "max_tokens": self.burst,
+            "rate_per_second": self.rate,
+            "total_acquired": self._total_acquired + self.local._total_acquired,
+            "total_waited": self._total_waited,
+            "shared": True,
+        }
+
+
 class RateLimitExceeded(Exception):
     """Raised when rate limit is exceeded and timeout occurs."""
 
@@ -558,3 +898,346 @@ openai_rate_limiter = SlidingWindowRateLimiter(max_per_minute=60)
 
 # General API rate limiter
 api_rate_limiter = SlidingWindowRateLimiter(max_per_minute=120)
+
+
+# ============================================================
+# PROVIDER GOVERNOR
+# ============================================================
+
+
+@dataclass
+class GovernorLimits:
+    """Configured ceiling for one governed provider (or endpoint)."""
+
+    requests_per_second: float  # 0 = no request rate limit
+    max_in_flight: int
+    min_in_flight: int = 1
+
+
+def default_governor_limits(key: str) -> GovernorLimits:
+    """Limits from settings for a key ("fal", or "fal:<endpoint>" for a sub-budget)."""
+    provider = key.split(":", 1)[0]
+    if provider == "fal":
+        return GovernorLimits(
+            requests_per_second=settings.fal_requests_per_second,
+            max_in_flight=settings.fal_max_in_flight,
+            min_in_flight=min(settings.fal_min_in_flight, settings.fal_max_in_flight),
+        )
+    if provider == "vastai":
+        return GovernorLimits(requests_per_second=0, max_in_flight=settings.vastai_max_in_flight)
+    if provider == "pinokio":
+        return GovernorLimits(requests_per_second=0, max_in_flight=settings.pinokio_max_concurrent)
+    return GovernorLimits(requests_per_second=0, max_in_flight=settings.fal_max_in_flight)
+
+
+class EndpointGovernor:
+    """
+    Request rate and generations in flight for one provider, adapted AIMD-style.
+
+    A 429 or 5xx (as classified by ErrorClassifier) halves the in-flight
+    limit and the request rate, at most once per DECREASE_INTERVAL so one
+    burst of errors counts as one signal; a 429 also pauses new requests
+    for its Retry-After. Each success adds back 1/limit to the limit (about
+    one slot per limit's worth of completions) and RATE_STEP to the rate.
+    """
+
+    DECREASE_FACTOR = 0.5
+    DECREASE_INTERVAL = 1.0
+    MIN_RATE_FRACTION = 0.1
+    RATE_STEP = 0.02
+
+    def __init__(
+        self,
+        key: str,
+        limits: GovernorLimits,
+        on_back_off: Optional[Callable[[str, bool, Optional[float]], None]] = None,
+    ):
+        self.key = key
+        self.limits = limits
+        self.limit = float(limits.max_in_flight)
+        self.rate_fraction = 1.0
+        self.in_flight = 0
+        self._on_back_off = on_back_off
+        # The request rate is shared by every process (through Redis when available)
+        self._bucket: Optional[RedisTokenBucketRateLimiter] = None
+        if limits.requests_per_second > 0:
+            self._bucket = RedisTokenBucketRateLimiter(
+                name=f"governor:{key}",
+                rate=limits.requests_per_second,
+                burst=max(1, int(limits.requests_per_second)),
+            )
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+
+        # Stats
+        self.total_requests = 0
+        self.total_throttled = 0
+        self.total_back_offs = 0
+
+    @property
+    def capacity(self) -> int:
+        """Generations allowed in flight right now."""
+        return max(1, self.limits.min_in_flight, int(self.limit))
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.limits.requests_per_second * self.rate_fraction
+
+    # ---- Request rate ----
+
+    async def throttle(self):
+        """Wait for a request token (and out any 429 pause)."""
+        self.total_requests += 1
+        while True:
+            wait = self._blocked_until - time.monotonic()
+            if wait <= 0:
+                if self._bucket is None or await self._bucket.try_acquire():
+                    return
+                wait = await self._bucket.time_until_tokens()
+            self.total_throttled += 1
+            await asyncio.sleep(wait + 0.001)
+
+    # ---- Generations in flight ----
+
+    async def acquire(self):
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Granted just as we were cancelled
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if waiter.done() or waiter.get_loop().is_closed():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the provider's in-flight slots (e.g. for a whole generation)."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # ---- Feedback ----
+
+    def report(
+        self,
+        status_code: Optional[int] = None,
+        error: Optional[Exception] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """Adapt to a response status, or to an exception raised instead of one."""
+        if error is not None:
+            error_type = error_classifier.classify(error).error_type
+        elif status_code is not None:
+            error_type = error_classifier.classify_status(status_code)
+        else:
+            return
+
+        if error_type is None:
+            self._increase()
+        elif error_type in (ErrorType.RATE_LIMIT, ErrorType.TRANSIENT):
+            self.back_off(rate_limited=error_type == ErrorType.RATE_LIMIT, retry_after=retry_after)
+
+    def _increase(self):
+        self.limit = min(float(self.limits.max_in_flight), self.limit + 1.0 / max(self.limit, 1.0))
+        self.rate_fraction = min(1.0, self.rate_fraction + self.RATE_STEP)
+        self._apply_rate()
+        self._wake()
+
+    def back_off(self, rate_limited: bool = False, retry_after: Optional[float] = None, share: bool = True):
+        """Multiplicative decrease; ``share`` tells the other local processes too."""
+        now = time.monotonic()
+        if rate_limited:
+            pause = settings.governor_backoff_seconds if retry_after is None else retry_after
+            self._blocked_until = max(self._blocked_until, now + pause)
+
+        if now - self._last_decrease < self.DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.limits.min_in_flight), self.limit * self.DECREASE_FACTOR)
+        self.rate_fraction = max(self.MIN_RATE_FRACTION, self.rate_fraction * self.DECREASE_FACTOR)
+        self._apply_rate()
+        self.total_back_offs += 1
+
+        logger.warning(
+            "Provider backing off",
+            key=self.key,
+            rate_limited=rate_limited,
+            in_flight_limit=self.capacity,
+            requests_per_second=round(self.requests_per_second, 2),
+            shared=share,
+        )
+        if share and self._on_back_off is not None:
+            self._on_back_off(self.key, rate_limited, retry_after)
+
+    def _apply_rate(self):
+        if self._bucket is not None:
+            self._bucket.rate = self.requests_per_second
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_limit": self.capacity,
+            "max_in_flight": self.limits.max_in_flight,
+            "waiting": len(self._waiters),
+            "requests_per_second": round(self.requests_per_second, 2),
+            "paused_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            "total_requests": self.total_requests,
+            "total_throttled": self.total_throttled,
+            "total_back_offs": self.total_back_offs,
+        }
+
+
+def _retry_after(response: Any) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, if any."""
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to the default pause
+
+
+class _BackOffProtocol(asyncio.DatagramProtocol):
+    def __init__(self, governor: "ProviderGovernor"):
+        self.governor = governor
+
+    def datagram_received(self, data, addr):
+        try:
+            signal = json.loads(data)
+            self.governor.get(signal["key"]).back_off(
+                rate_limited=signal["rate_limited"],
+                retry_after=signal["retry_after"],
+                share=False,
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug("Ignoring malformed governor signal", error=str(e))
+
+
+class ProviderGovernor:
+    """
+    Shared request rate and in-flight limits per provider.
+
+    Every Fal call (submit, status, result) goes through ``request()`` and
+    every generation holds a ``slot()``. Back-offs are broadcast over Unix
+    datagram sockets (one per process, in a temp dir keyed by DB_PATH like
+    job notifications) so sibling API/worker processes slow down together
+    instead of each discovering the 429s on its own.
+
+    Usage:
+        response = await provider_governor.request("fal", client.get, url, headers=h)
+        async with provider_governor.slot("fal"):
+            ...
+    """
+
+    def __init__(self, limits: Optional[Dict[str, GovernorLimits]] = None):
+        self._limits = limits or {}
+        self._governors: Dict[str, EndpointGovernor] = {}
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._socket_path: Optional[Path] = None
+
+    def get(self, key: str) -> EndpointGovernor:
+        governor = self._governors.get(key)
+        if governor is None:
+            limits = self._limits.get(key) or default_governor_limits(key)
+            governor = EndpointGovernor(key, limits, on_back_off=self._broadcast)
+            self._governors[key] = governor
+        return governor
+
+    def slot(self, key: str):
+        """Context manager holding one in-flight slot of ``key``."""
+        return self.get(key).slot()
+
+    async def request(self, key: str, send: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Rate-limit ``send(*args, **kwargs)`` (an HTTP call) and learn from its response."""
+        governor = self.get(key)
+        await governor.throttle()
+        try:
+            response = await send(*args, **kwargs)
+        except Exception as e:
+            governor.report(error=e)
+            raise
+        governor.report(response.status_code, retry_after=_retry_after(response))
+        return response
+
+    def get_stats(self) -> Dict[str, dict]:
+        return {key: governor.get_stats() for key, governor in self._governors.items()}
+
+    # ---- Cross-process back-off signals ----
+
+    @staticmethod
+    def _signal_dir() -> Path:
+        key = hashlib.sha1(str(Path(settings.db_path).resolve()).encode()).hexdigest()[:12]
+        return Path(tempfile.gettempdir()) / f"i2v-governor-{key}"
+
+    async def start(self):
+        """Receive back-offs from sibling processes."""
+        if self._transport is not None or not settings.governor_share_signals:
+            return
+        if not hasattr(socket, "AF_UNIX"):
+            return
+        directory = self._signal_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}-{id(self)}.sock"
+        path.unlink(missing_ok=True)
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _BackOffProtocol(self), local_addr=str(path), family=socket.AF_UNIX
+        )
+        self._socket_path = path
+
+    async def stop(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._socket_path is not None:
+            self._socket_path.unlink(missing_ok=True)
+            self._socket_path = None
+
+    def _broadcast(self, key: str, rate_limited: bool, retry_after: Optional[float]):
+        if self._transport is None:
+            return
+        payload = json.dumps(
+            {"key": key, "rate_limited": rate_limited, "retry_after": retry_after}
+        ).encode()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        try:
+            for path in self._signal_dir().glob("*.sock"):
+                if path == self._socket_path:
+                    continue
+                try:
+                    sock.sendto(payload, str(path))
+                except BlockingIOError:
+                    pass  # Receiver is already flooded with signals
+                except (ConnectionRefusedError, FileNotFoundError):
+                    path.unlink(missing_ok=True)  # Process is gone
+                except OSError as e:
+                    logger.debug("Governor signal failed", path=str(path), error=str(e))
+        finally:
+            sock.close()
+
+
+# Shared by the Fal clients, pipelines and bulk runs in this process
+provider_governor = ProviderGovernor()
@@ -0,0 +1,383 @@
+"""Per-model runtime statistics shared by every completion path.
+
+Completions record their wall-clock runtime under a key of model, kind and
+(optionally) resolution and clip duration. Each key keeps a log-bucketed
+latency histogram, HDR-style: buckets grow by 5%, so any percentile is
+within ~2.5% of the true value. Once a histogram holds MAX_WEIGHT
+observations it is halved, so estimates follow drift in provider speed.
+
+Histograms are persisted in ``model_runtime_stats`` and shared across
+processes. Each process records in memory and every
+RUNTIME_STATS_FLUSH_INTERVAL_SECONDS folds its new observations into the
+stored rows, then reloads everyone's.
+
+Consumers:
+    FalPollScheduler    typical runtime (P50) caps poll intervals
+    generation_service  timeout budgets (P99 x RUNTIME_TIMEOUT_MULTIPLIER)
+    BatchQueue          item duration and ETA
+    GET /api/runtime-stats
+
+Usage:
+    from app.services.runtime_stats import runtime_stats
+
+    runtime_stats.record("kling", "video", 84.2, resolution="1080p", duration_sec=5)
+    runtime_stats.percentile("kling", "video", 0.95)  # seconds, or None without data
+    runtime_stats.typical_runtime("kling", "video", default=120.0)
+    runtime_stats.timeout_budget("kling", "video", default=600.0)
+"""
+
+import asyncio
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ModelRuntimeStat
+
+logger = structlog.get_logger()
+
+MIN_SECONDS = 0.01  # Smaller durations share the first bucket
+GROWTH = 1.05  # Bucket width ratio: percentiles are within ~2.5%
+MAX_WEIGHT = 2000.0  # Halve a histogram beyond this many (decayed) observations
+
+
+class LatencyHistogram:
+    """Mergeable, decaying log-bucketed histogram of durations in seconds."""
+
+    def __init__(self):
+        self.buckets: Dict[int, float] = {}
+        self.weight = 0.0  # Decayed observation count
+        self.total = 0.0  # Decayed sum of seconds, for the mean
+        self.samples = 0  # Observations ever recorded
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        return int(math.log(max(seconds, MIN_SECONDS) / MIN_SECONDS, GROWTH))
+
+    def record(self, seconds: float):
+        seconds = max(float(seconds), 0.0)
+        index = self._bucket(seconds)
+        self.buckets[index] = self.buckets.get(index, 0.0) + 1.0
+        self.weight += 1.0
+        self.total += seconds
+        self.samples += 1
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self._decay()
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, weight in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0.0) + weight
+        self.weight += other.weight
+        self.total += other.total
+        self.samples += other.samples
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        self._decay()
+
+    def _decay(self):
+        if self.weight <= MAX_WEIGHT:
+            return
+        self.buckets = {index: weight / 2 for index, weight in self.buckets.items()}
+        self.weight /= 2
+        self.total /= 2
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Duration below which a fraction ``q`` (0-1) of observations fall."""
+        if self.weight <= 0:
+            return None
+        if q >= 1:
+            return self.max
+        target = q * self.weight
+        seen = 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                value = MIN_SECONDS * GROWTH ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.weight if self.weight else None
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "buckets": {str(index): round(weight, 4) for index, weight in self.buckets.items()},
+                "weight": self.weight,
+                "total": self.total,
+                "samples": self.samples,
+                "min": self.min,
+                "max": self.max,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> "LatencyHistogram":
+        parsed = json.loads(data) if data else {}
+        histogram = cls()
+        histogram.buckets = {int(index): weight for index, weight in parsed.get("buckets", {}).items()}
+        histogram.weight = parsed.get("weight", 0.0)
+        histogram.total = parsed.get("total", 0.0)
+        histogram.samples = parsed.get("samples", 0)
+        histogram.min = parsed.get("min")
+        histogram.max = parsed.get("max")
+        return histogram
+
+
+@dataclass(frozen=True)
+class RuntimeKey:
+    """What a runtime is recorded under. Unset resolution/duration are "" and 0."""
+
+    model: str
+    kind: str
+    resolution: str = ""
+    duration_sec: int = 0
+
+
+def _key(model: str, kind: str, resolution: Optional[str] = None, duration_sec: Optional[int] = None) -> RuntimeKey:
+    return RuntimeKey(model, kind, resolution or "", int(duration_sec or 0))
+
+
+class RuntimeStatsStore:
+    """
+    Per-key latency histograms: recorded in memory, persisted and merged across processes.
+
+    Reads never touch the database. A key with fewer than
+    RUNTIME_STATS_MIN_SAMPLES observations falls back to everything
+    recorded for its model and kind.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory
+        self._histograms: Dict[RuntimeKey, LatencyHistogram] = {}  # Stored rows + local observations
+        self._unflushed: Dict[RuntimeKey, LatencyHistogram] = {}  # Local observations not yet stored
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- Recording and reads ----
+
+    def record(
+        self,
+        model: str,
+        kind: str,
+        seconds: float,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ):
+        """Record one observed runtime (cheap; persisted on the next flush)."""
+        key = _key(model, kind, resolution, duration_sec)
+        for table in (self._histograms, self._unflushed):
+            table.setdefault(key, LatencyHistogram()).record(seconds)
+
+    def histogram(
+        self,
+        model: str,
+        kind: str,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> Optional[LatencyHistogram]:
+        """The key's histogram, or the model/kind aggregate while the key has too few samples."""
+        exact = self._histograms.get(_key(model, kind, resolution, duration_sec))
+        if exact is not None and exact.samples >= settings.runtime_stats_min_samples:
+            return exact
+
+        merged = LatencyHistogram()
+        for key, histogram in self._histograms.items():
+            if key.model == model and key.kind == kind:
+                merged.merge(histogram)
+        return merged if merged.samples else None
+
+    def percentile(
+        self,
+        model: str,
+        kind: str,
+        q: float,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> Optional[float]:
+        histogram = self.histogram(model, kind, resolution, duration_sec)
+        return histogram.percentile(q) if histogram else None
+
+    def typical_runtime(
+        self,
+        model: str,
+        kind: str,
+        default: float,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> float:
+        """Median runtime, or ``default`` before anything has been observed."""
+        median = self.percentile(model, kind, 0.5, resolution, duration_sec)
+        return default if median is None else median
+
+    def timeout_budget(
+        self,
+        model: str,
+        kind: str,
+        default: float,
+        resolution: Optional[str] = None,
+        duration_sec: Optional[int] = None,
+    ) -> float:
+        """How long to wait for one request: P99 x RUNTIME_TIMEOUT_MULTIPLIER, within the configured bounds.
+
+        Returns ``default`` until the model has RUNTIME_STATS_MIN_SAMPLES observations.
+        """
+        histogram = self.histogram(model, kind, resolution, duration_sec)
+        if histogram is None or histogram.samples < settings.runtime_stats_min_samples:
+            return default
+        budget = histogram.percentile(0.99) * settings.runtime_timeout_multiplier
+        return min(
+            max(budget, float(settings.runtime_timeout_min_seconds)),
+            float(settings.runtime_timeout_max_seconds),
+        )
+
+    def snapshot(self, model: Optional[str] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Percentiles per key (for the API), sorted by model, kind, resolution, duration."""
+        rows = []
+        for key in sorted(self._histograms, key=lambda k: (k.model, k.kind, k.resolution, k.duration_sec)):
+            if (model and key.model != model) or (kind and key.kind != kind):
+                continue
+            histogram = self._histograms[key]
+            rows.append(
+                {
+                    "model": key.model,
+                    "kind": key.kind,
+                    "resolution": key.resolution or None,
+                    "duration_sec": key.duration_sec or None,
+                    "samples": histogram.samples,
+                    "mean_seconds": _round(histogram.mean),
+                    "p50_seconds": _round(histogram.percentile(0.5)),
+                    "p95_seconds": _round(histogram.percentile(0.95)),
+                    "p99_seconds": _round(histogram.percentile(0.99)),
+                    "min_seconds": _round(histogram.min),
+                    "max_seconds": _round(histogram.max),
+                }
+            )
+        return rows
+
+    # ---- Persistence ----
+
+    async def start(self):
+        """Load stored statistics and flush new observations periodically."""
+        try:
+            await self._reload()
+        except Exception as e:
+            logger.warning("Failed to load runtime statistics", error=str(e))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="runtime-stats")
+
+    async def stop(self):
+        """Stop flushing periodically and store what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.runtime_stats_flush_interval_seconds)
+            await self.flush()
+
+    async def flush(self):
+        """Fold local observations into the stored rows and reload everyone's."""
+        async with self._lock:
+            unflushed, self._unflushed = self._unflushed, {}
+            if not unflushed:
+                return
+            try:
+                stored = await asyncio.to_thread(self._store, unflushed)
+            except Exception as e:
+                logger.warning("Failed to store runtime statistics", keys=len(unflushed), error=str(e))
+                for key, histogram in unflushed.items():
+                    self._unflushed.setdefault(key, LatencyHistogram()).merge(histogram)
+                return
+            self._adopt(stored)
+
+    async def _reload(self):
+        async with self._lock:
+            self._adopt(await asyncio.to_thread(self._load))
+
+    def _adopt(self, stored: Dict[RuntimeKey, LatencyHistogram]):
+        # Observations recorded while the database was busy are not stored yet
+        for key, histogram in self._unflushed.items():
+            stored.setdefault(key, LatencyHistogram()).merge(histogram)
+        self._histograms = stored
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from app.database import SessionLocal
+
+            return SessionLocal()
+        return self.session_factory()
+
+    def _store(self, unflushed: Dict[RuntimeKey, LatencyHistogram]) -> Dict[RuntimeKey, LatencyHistogram]:
+        db = self._session()
+        try:
+            for key, delta in unflushed.items():
+                row = db.execute(
+                    select(ModelRuntimeStat)
+                    .where(
+                        ModelRuntimeStat.model == key.model,
+                        ModelRuntimeStat.kind == key.kind,
+                        ModelRuntimeStat.resolution == key.resolution,
+                        ModelRuntimeStat.duration_sec == key.duration_sec,
+                    )
+                    .with_for_update()
+                ).scalar_one_or_none()
+                if row is None:
+                    row = ModelRuntimeStat(
+                        model=key.model,
+                        kind=key.kind,
+                        resolution=key.resolution,
+                        duration_sec=key.duration_sec,
+                    )
+                    db.add(row)
+                    histogram = LatencyHistogram()
+                else:
+                    histogram = LatencyHistogram.from_json(row.histogram)
+                histogram.merge(delta)
+                row.samples = histogram.samples
+                row.histogram = histogram.to_json()
+            db.commit()
+            return self._read(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _load(self) -> Dict[RuntimeKey, LatencyHistogram]:
+        db = self._session()
+        try:
+            return self._read(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _read(db: Session) -> Dict[RuntimeKey, LatencyHistogram]:
+        return {
+            RuntimeKey(row.model, row.kind, row.resolution, row.duration_sec): LatencyHistogram.from_json(
+                row.histogram
+            )
+            for row in db.scalars(select(ModelRuntimeStat))
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+# Singleton shared by the poll scheduler, generation service and batch queue
+runtime_stats = RuntimeStatsStore()
@@ -14,6 +14,8 @@ from tenacity import (
     retry_if_exception_type,
 )
 
+from app.http_client import get_http_client
+
 logger = structlog.get_logger()
 
 
@@ -149,21 +151,21 @@ class SwarmUIClient:
         # Download image from URL
         logger.debug("Downloading image for SwarmUI", url=image_url[:80])
 
-        async with httpx.AsyncClient(timeout=60.0) as dl_client:
-            resp = await dl_client.get(image_url, follow_redirects=True)
-            resp.raise_for_status()
+        dl_client = get_http_client(image_url)
+        resp = await dl_client.get(image_url, timeout=60.0)
+        resp.raise_for_status()
 
-            content_type = resp.headers.get("Content-Type", "image/png")
-            content_type = content_type.split(";")[0].strip().lower()
+        content_type = resp.headers.get("Content-Type", "image/png")
+        content_type = content_type.split(";")[0].strip().lower()
 
-            if not content_type.startswith("image/"):
-                raise ValueError(f"URL does not point to an image: {content_type}")
+        if not content_type.startswith("image/"):
+            raise ValueError(f"URL does not point to an image: {content_type}")
 
-            image_bytes = resp.content
+        image_bytes = resp.content
 
-            # Limit to 50MB
-            if len(image_bytes) > 50 * 1024 * 1024:
-                raise ValueError(f"Image too large: {len(image_bytes) / 1024 / 1024:.1f}MB")
+        # Limit to 50MB
+        if len(image_bytes) > 50 * 1024 * 1024:
+            raise ValueError(f"Image too large: {len(image_bytes) / 1024 / 1024:.1f}MB")
 
         # Convert to base64 data URI
         b64_data = base64.b64encode(image_bytes).decode('utf-8')
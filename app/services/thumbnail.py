@@ -1,15 +1,41 @@
-"""Thumbnail generation service for fast image previews."""
+"""Thumbnail generation service for fast image previews.
+
+Pillow work (decode, alpha flatten, resize, encode) runs in a dedicated
+process pool so it never blocks the event loop, and each source image is
+decoded once to produce every output size/format (see
+``app.thumbnail_render``). The number of images in flight is bounded, so a
+large backfill can't saturate CPU, memory or R2 uploads.
+
+Outputs per image (R2 keys derive from the source URL hash):
+    grid        600px JPEG   thumbnails/<hash>.jpg       (returned as the thumbnail URL)
+    grid_webp   600px WebP   thumbnails/<hash>_grid_webp.webp
+    preview     1200px WebP  thumbnails/<hash>_preview.webp
+    grid_avif   600px AVIF   thumbnails/<hash>_grid_avif.avif  (opt-in, THUMBNAIL_AVIF_ENABLED)
+
+Usage:
+    from app.services.thumbnail import generate_thumbnail, thumbnail_engine
+
+    thumbnail_url = await generate_thumbnail(image_url)        # grid JPEG
+    urls = await thumbnail_engine.generate(image_url)          # every variant
+"""
 
 import os
-import io
+import asyncio
 import hashlib
-import httpx
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
 import structlog
-from PIL import Image
-import boto3
-from botocore.config import Config
+from PIL import features
 from dotenv import load_dotenv
 
+from app.config import settings
+from app.http_client import get_http_client
+from app.services.r2_cache import get_s3_client, r2_key_index, r2_storage
+from app.thumbnail_render import ThumbnailVariant, render_thumbnails
+
 # Load .env file so os.getenv() can read R2 credentials
 load_dotenv()
 
@@ -17,157 +43,219 @@ logger = structlog.get_logger()
 
 THUMBNAIL_WIDTH = 600  # High quality preview
 THUMBNAIL_QUALITY = 85  # Sharp quality
+PREVIEW_WIDTH = 1200
 DOWNLOAD_TIMEOUT = 15.0
 
-_s3_client = None
+GRID_VARIANT = "grid"
 
 
-def get_s3_client():
-    """Get or create S3 client for R2."""
-    global _s3_client
-    if _s3_client is not None:
-        return _s3_client
+def default_variants() -> Tuple[ThumbnailVariant, ...]:
+    """Output variants rendered for every image."""
+    variants = [
+        ThumbnailVariant(GRID_VARIANT, THUMBNAIL_WIDTH, "JPEG", THUMBNAIL_QUALITY),
+        ThumbnailVariant("grid_webp", THUMBNAIL_WIDTH, "WEBP", 80),
+        ThumbnailVariant("preview", PREVIEW_WIDTH, "WEBP", 82),
+    ]
+    if settings.thumbnail_avif_enabled and features.check("avif"):
+        variants.append(ThumbnailVariant("grid_avif", THUMBNAIL_WIDTH, "AVIF", 60))
+    return tuple(variants)
 
-    # Read env vars at runtime (after load_dotenv has run)
-    access_key = os.getenv("R2_ACCESS_KEY_ID")
-    secret_key = os.getenv("R2_SECRET_ACCESS_KEY")
-    endpoint = os.getenv("R2_ENDPOINT")
 
-    if all([access_key, secret_key, endpoint]):
-        _s3_client = boto3.client(
-            "s3",
-            endpoint_url=endpoint,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version="s3v4"),
-            region_name="auto",
-        )
-    return _s3_client
+def thumbnail_key(image_url: str, variant: ThumbnailVariant) -> str:
+    """R2 key for one variant of a source image."""
+    url_hash = hashlib.sha256(image_url.encode()).hexdigest()[:16]
+    if variant.name == GRID_VARIANT:
+        return f"thumbnails/{url_hash}.jpg"
+    return f"thumbnails/{url_hash}_{variant.name}{variant.extension}"
 
 
-async def generate_thumbnail(image_url: str) -> str | None:
-    """
-    Generate a thumbnail from an image URL and upload to R2.
+def _public_url(key: str) -> str:
+    url = r2_storage.public_url_for(key)
+    if not url:
+        # Fallback to endpoint-based URL (requires public access)
+        endpoint = os.getenv("R2_ENDPOINT")
+        url = f"{endpoint}/{r2_storage.bucket}/{key}"
+    return url
 
-    1. Downloads the image from URL
-    2. Resizes to 400px width (maintaining aspect ratio)
-    3. Converts to JPEG at 80% quality
-    4. Uploads to Cloudflare R2
-    5. Returns R2 public URL
 
-    Returns None if generation fails (caller should fallback to original URL).
+class ThumbnailEngine:
     """
-    try:
-        # Download the image
-        async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT) as client:
-            response = await client.get(image_url)
-            if response.status_code != 200:
-                logger.warning(
-                    "Failed to download image for thumbnail",
-                    url=image_url[:80],
-                    status=response.status_code,
-                )
-                return None
-            image_data = response.content
-
-        # Open and resize
-        img = Image.open(io.BytesIO(image_data))
-
-        # Convert to RGB if necessary (for PNG with transparency)
-        if img.mode in ("RGBA", "P", "LA"):
-            background = Image.new("RGB", img.size, (255, 255, 255))
-            if img.mode == "P":
-                img = img.convert("RGBA")
-            if img.mode in ("RGBA", "LA"):
-                background.paste(img, mask=img.split()[-1])
-            else:
-                background.paste(img)
-            img = background
-        elif img.mode != "RGB":
-            img = img.convert("RGB")
-
-        # Calculate new dimensions maintaining aspect ratio
-        original_width, original_height = img.size
-        ratio = THUMBNAIL_WIDTH / original_width
-        new_height = int(original_height * ratio)
-
-        # Resize using high-quality Lanczos resampling
-        img = img.resize((THUMBNAIL_WIDTH, new_height), Image.Resampling.LANCZOS)
-
-        # Save to bytes buffer
-        buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
-        thumb_data = buffer.getvalue()
-        thumb_size = len(thumb_data)
-
-        # Generate unique key from source URL
-        url_hash = hashlib.sha256(image_url.encode()).hexdigest()[:16]
-        key = f"thumbnails/{url_hash}.jpg"
-
-        # Upload to R2
-        s3 = get_s3_client()
-        if s3:
-            bucket = os.getenv("R2_BUCKET_NAME", "i2v")
-            public_domain = os.getenv("R2_PUBLIC_DOMAIN", "")
-
-            s3.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=thumb_data,
-                ContentType="image/jpeg",
-                CacheControl="public, max-age=31536000",
+    Bounded, process-pooled thumbnail renderer.
+
+    Attributes:
+        max_workers: Render processes (0 renders in a thread instead)
+        max_concurrent: Images downloaded/rendered/uploaded at once
+        variants: Output sizes/formats produced per image
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+        variants: Optional[Tuple[ThumbnailVariant, ...]] = None,
+    ):
+        self.max_workers = (
+            settings.thumbnail_process_workers if max_workers is None else max_workers
+        )
+        self.max_concurrent = max_concurrent or settings.thumbnail_max_concurrent
+        self._variants = variants
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots_by_loop: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+    @property
+    def variants(self) -> Tuple[ThumbnailVariant, ...]:
+        if self._variants is None:
+            self._variants = default_variants()
+        return self._variants
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            # spawn: never fork a process that holds event loop / DB / HTTP state
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
             )
-            # Return public URL
-            if public_domain:
-                thumbnail_url = f"https://{public_domain}/{key}"
-            else:
-                # Fallback to endpoint-based URL (requires public access)
-                endpoint = os.getenv("R2_ENDPOINT")
-                thumbnail_url = f"{endpoint}/{bucket}/{key}"
+        return self._executor
 
-            logger.info(
-                "Generated thumbnail to R2",
-                key=key,
-                thumb_size_kb=thumb_size / 1024,
-                dimensions=f"{THUMBNAIL_WIDTH}x{new_height}",
+    def _slots(self) -> asyncio.Semaphore:
+        """Per-event-loop semaphore bounding images in flight."""
+        loop = asyncio.get_running_loop()
+        if self._slots_by_loop is None or self._slots_by_loop[0] is not loop:
+            self._slots_by_loop = (loop, asyncio.Semaphore(self.max_concurrent))
+        return self._slots_by_loop[1]
+
+    async def render(self, image_data: bytes) -> Dict[str, Tuple[bytes, int, int]]:
+        """Render every variant off the event loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._pool(), render_thumbnails, image_data, self.variants
             )
-            return thumbnail_url
-        else:
-            # Fallback to Fal CDN if R2 not configured
-            import tempfile
-            from pathlib import Path
-            import fal_client
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
-                tmp.write(thumb_data)
-                tmp_path = Path(tmp.name)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge image) - replace the pool
+            logger.warning("Thumbnail process pool broken, restarting")
+            self.shutdown()
+            raise
+
+    async def generate(self, image_url: str) -> Optional[Dict[str, str]]:
+        """
+        Generate every variant for an image URL.
+
+        Returns {variant name: URL}, or None if generation fails (caller
+        should fall back to the original URL). Images already rendered to R2
+        are returned without downloading.
+        """
+        r2_enabled = get_s3_client() is not None
+        if r2_enabled:
+            keys = {v.name: thumbnail_key(image_url, v) for v in self.variants}
+            if await r2_key_index.contains_all_local(keys.values()):
+                return {name: _public_url(key) for name, key in keys.items()}
+
+        async with self._slots():
             try:
-                thumbnail_url = fal_client.upload_file(tmp_path)
-                logger.info(
-                    "Generated thumbnail to Fal (R2 not configured)",
-                    thumb_size_kb=thumb_size / 1024,
+                client = get_http_client(image_url)
+                response = await client.get(image_url, timeout=DOWNLOAD_TIMEOUT)
+                if response.status_code != 200:
+                    logger.warning(
+                        "Failed to download image for thumbnail",
+                        url=image_url[:80],
+                        status=response.status_code,
+                    )
+                    return None
+
+                outputs = await self.render(response.content)
+
+                if r2_enabled:
+                    return await self._upload_r2(image_url, outputs)
+                return await self._upload_fal(outputs)
+
+            except Exception as e:
+                logger.error(
+                    "Thumbnail generation failed",
+                    url=image_url[:80] if image_url else "None",
+                    error=str(e),
                 )
-                return thumbnail_url
-            finally:
-                tmp_path.unlink(missing_ok=True)
-
-    except Exception as e:
-        logger.error(
-            "Thumbnail generation failed",
-            url=image_url[:80] if image_url else "None",
-            error=str(e),
+                return None
+
+    async def _upload_r2(
+        self, image_url: str, outputs: Dict[str, Tuple[bytes, int, int]]
+    ) -> Dict[str, str]:
+        """Upload every rendered variant to R2 (non-blocking, in parallel)."""
+        variants = [v for v in self.variants if v.name in outputs]
+
+        async def upload(variant: ThumbnailVariant) -> str:
+            data = outputs[variant.name][0]
+            key = thumbnail_key(image_url, variant)
+            await r2_storage.put_bytes(key, data, variant.content_type)
+            await r2_key_index.add_async(key, len(data), variant.content_type)
+            return _public_url(key)
+
+        urls = await asyncio.gather(*(upload(v) for v in variants))
+
+        grid_data, width, height = outputs[GRID_VARIANT]
+        logger.info(
+            "Generated thumbnail to R2",
+            variants=len(urls),
+            thumb_size_kb=len(grid_data) / 1024,
+            dimensions=f"{width}x{height}",
         )
-        return None
+        return {v.name: url for v, url in zip(variants, urls)}
+
+    async def _upload_fal(self, outputs: Dict[str, Tuple[bytes, int, int]]) -> Dict[str, str]:
+        """Fallback to Fal CDN if R2 not configured (grid JPEG only)."""
+        import tempfile
+        from pathlib import Path
+        import fal_client
+
+        thumb_data = outputs[GRID_VARIANT][0]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp:
+            tmp.write(thumb_data)
+            tmp_path = Path(tmp.name)
+        try:
+            thumbnail_url = await asyncio.to_thread(fal_client.upload_file, tmp_path)
+            logger.info(
+                "Generated thumbnail to Fal (R2 not configured)",
+                thumb_size_kb=len(thumb_data) / 1024,
+            )
+            return {GRID_VARIANT: thumbnail_url}
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def shutdown(self):
+        """Stop the render processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+thumbnail_engine = ThumbnailEngine()
+
+
+async def generate_thumbnail(image_url: str) -> str | None:
+    """
+    Generate a thumbnail from an image URL and upload to R2.
+
+    Renders all variants (see module docstring) from a single decode and
+    returns the 600px grid JPEG URL.
+
+    Returns None if generation fails (caller should fallback to original URL).
+    """
+    urls = await thumbnail_engine.generate(image_url)
+    return urls.get(GRID_VARIANT) if urls else None
 
 
 async def generate_thumbnails_batch(image_urls: list[str]) -> list[str | None]:
     """
     Generate thumbnails for a batch of images.
 
+    Concurrency is bounded by the thumbnail engine, so large batches queue
+    instead of decoding everything at once.
+
     Returns list of thumbnail URLs (or None for failures) in same order as input.
     """
-    import asyncio
-
     tasks = [generate_thumbnail(url) for url in image_urls]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
@@ -0,0 +1,245 @@
+"""Resumable background backfill of thumbnails for completed i2i steps.
+
+Scans completed i2i ``PipelineStep`` rows in keyset-paginated chunks
+(``id > cursor ORDER BY id LIMIT n``), loading only ``id`` and ``outputs``
+so memory stays flat regardless of table size. After each chunk the cursor
+and counters are checkpointed with ``CheckpointManager``, so a restart
+resumes where the previous run stopped instead of rescanning from the
+start. Thumbnail generation is throttled by a token bucket (images per
+second) plus a pause between chunks so the backfill never competes with
+live generation traffic; its DB queries and checkpoint writes run in worker
+threads, off the event loop.
+
+Usage:
+    from app.services.thumbnail_backfill import thumbnail_backfill
+
+    thumbnail_backfill.start()           # resume (or begin) in the background
+    thumbnail_backfill.start(restart=True)  # rescan from the first step
+    progress = thumbnail_backfill.progress()
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import PipelineStep, StepStatus
+from app.services.checkpoint_manager import CheckpointManager
+from app.services.media_assets import sync_step_assets
+from app.services.rate_limiter import TokenBucketRateLimiter
+from app.services.thumbnail import generate_thumbnails_batch
+
+logger = structlog.get_logger()
+
+CHECKPOINT_ID = "i2i_thumbnails"
+COUNTERS = ("scanned", "processed", "skipped", "failed")
+
+
+class ThumbnailBackfill:
+    """
+    Checkpointed, throttled thumbnail backfill over completed i2i steps.
+
+    Attributes:
+        chunk_size: Steps fetched per keyset page
+        chunk_pause: Seconds to sleep between chunks
+        limiter: Token bucket bounding images rendered per second
+    """
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        images_per_second: Optional[float] = None,
+        chunk_pause: Optional[float] = None,
+        checkpoint: Optional[CheckpointManager] = None,
+        session_factory=None,
+    ):
+        self.chunk_size = chunk_size or settings.thumbnail_backfill_chunk_size
+        self.chunk_pause = (
+            settings.thumbnail_backfill_chunk_pause_seconds
+            if chunk_pause is None
+            else chunk_pause
+        )
+        rate = images_per_second or settings.thumbnail_backfill_images_per_second
+        self.limiter = TokenBucketRateLimiter(rate=rate, burst=max(1, int(rate * 2)))
+        self._checkpoint = checkpoint
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def checkpoint(self) -> CheckpointManager:
+        if self._checkpoint is None:
+            self._checkpoint = CheckpointManager("thumbnail_backfill")
+        return self._checkpoint
+
+    def _session(self):
+        return (self._session_factory or SessionLocal)()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, restart: bool = False) -> bool:
+        """
+        Start the backfill in the background (no-op if already running).
+
+        Returns True if a new run was started.
+        """
+        if self.running:
+            return False
+        self._task = asyncio.get_running_loop().create_task(self.run(restart=restart))
+        return True
+
+    async def stop(self):
+        """Cancel a running backfill; progress up to the last chunk is kept."""
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def progress(self) -> Dict[str, Any]:
+        """Current backfill progress from the checkpoint."""
+        entry = self.checkpoint.read(CHECKPOINT_ID)
+        context = entry.context if entry else {}
+        return {
+            "status": entry.status if entry else "never_run",
+            "running": self.running,
+            "last_step_id": context.get("last_step_id", 0),
+            "total": context.get("total", 0),
+            **{name: context.get(name, 0) for name in COUNTERS},
+            "started_at": context.get("started_at"),
+            "updated_at": entry.timestamp if entry else None,
+            "error": entry.error if entry else None,
+        }
+
+    async def run(self, restart: bool = False) -> Dict[str, Any]:
+        """Run (or resume) the backfill to completion. Returns final progress."""
+        entry = await asyncio.to_thread(self.checkpoint.read, CHECKPOINT_ID)
+        context = dict(entry.context) if entry and not restart else {}
+
+        cursor = context.get("last_step_id", 0)
+        counters = {name: context.get(name, 0) for name in COUNTERS}
+        if entry is not None and entry.status == "completed":
+            # Previous run finished: only scan steps created since, with fresh counters
+            counters = dict.fromkeys(COUNTERS, 0)
+
+        started_at = datetime.now(timezone.utc).isoformat()
+        total = counters["scanned"] + await asyncio.to_thread(self._count_remaining, cursor)
+        logger.info("Starting thumbnail backfill", cursor=cursor, total=total)
+
+        async def save(status: str, error: Optional[str] = None):
+            # fsync'd checkpoint write
+            await asyncio.to_thread(
+                self.checkpoint.write,
+                CHECKPOINT_ID,
+                status=status,
+                error=error,
+                last_step_id=cursor,
+                total=total,
+                started_at=started_at,
+                **dict(counters),
+            )
+
+        await save("running")
+        try:
+            while True:
+                rows = await asyncio.to_thread(self._fetch_chunk, cursor)
+                if not rows:
+                    break
+
+                for step_id, outputs_json in rows:
+                    counters["scanned"] += 1
+                    await self._process_step(step_id, outputs_json, counters)
+
+                cursor = rows[-1][0]
+                await save("running")
+
+                if counters["scanned"] % (self.chunk_size * 10) == 0:
+                    logger.info("Thumbnail backfill progress", **self.progress())
+                await asyncio.sleep(self.chunk_pause)
+
+        except asyncio.CancelledError:
+            await save("paused")
+            raise
+        except Exception as e:
+            logger.error("Thumbnail backfill failed", cursor=cursor, error=str(e))
+            await save("failed", error=str(e))
+            return self.progress()
+
+        await save("completed")
+        await asyncio.to_thread(self.checkpoint.compact)
+        logger.info("Thumbnail backfill complete", **counters)
+        return self.progress()
+
+    def _count_remaining(self, cursor: int) -> int:
+        db = self._session()
+        try:
+            return self._base_query(db, PipelineStep.id).filter(PipelineStep.id > cursor).count()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _base_query(db, *columns):
+        return (
+            db.query(*columns)
+            .filter(PipelineStep.step_type == "i2i")
+            .filter(PipelineStep.status == StepStatus.COMPLETED.value)
+        )
+
+    def _fetch_chunk(self, cursor: int):
+        """Next keyset page of (id, outputs) after the cursor."""
+        db = self._session()
+        try:
+            return (
+                self._base_query(db, PipelineStep.id, PipelineStep.outputs)
+                .filter(PipelineStep.id > cursor)
+                .order_by(PipelineStep.id)
+                .limit(self.chunk_size)
+                .all()
+            )
+        finally:
+            db.close()
+
+    async def _process_step(
+        self, step_id: int, outputs_json: Optional[str], counters: Dict[str, int]
+    ):
+        """Generate missing thumbnails for one step."""
+        outputs = json.loads(outputs_json) if outputs_json else {}
+        image_urls = outputs.get("image_urls") or []
+        existing_thumbs = outputs.get("thumbnail_urls") or []
+        if not image_urls or (existing_thumbs and len(existing_thumbs) == len(image_urls)):
+            counters["skipped"] += 1
+            return
+
+        await self.limiter.acquire(tokens=min(len(image_urls), self.limiter.burst))
+        try:
+            thumbnail_urls = await generate_thumbnails_batch(image_urls)
+        except Exception as e:
+            counters["failed"] += 1
+            logger.warning("Failed to generate thumbnails for step", step_id=step_id, error=str(e))
+            return
+
+        if await asyncio.to_thread(self._store_thumbnails, step_id, thumbnail_urls):
+            counters["processed"] += 1
+
+    def _store_thumbnails(self, step_id: int, thumbnail_urls) -> bool:
+        """Save thumbnail URLs on a step; False if the step is gone."""
+        db = self._session()
+        try:
+            step = db.query(PipelineStep).filter(PipelineStep.id == step_id).first()
+            if step is None:
+                return False
+            latest = step.get_outputs()
+            latest["thumbnail_urls"] = thumbnail_urls
+            step.set_outputs(latest)
+            sync_step_assets(db, step)
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+
+# Singleton instance
+thumbnail_backfill = ThumbnailBackfill()
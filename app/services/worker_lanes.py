@@ -0,0 +1,255 @@
+"""Supervised worker lanes: independent loops per provider.
+
+Each lane runs its own cycle on its own interval with its own concurrency
+limit, so a slow lane (a multi-minute SwarmUI generation) never delays
+another (dozens of Fal submissions). A cycle that raises is logged and the
+lane restarts after an exponential backoff; a lane task that dies outright
+is restarted by the supervisor. ``Lane.notify()`` starts the next cycle
+immediately, so with event-driven dispatch the interval is only a sweep.
+
+Lanes can run as asyncio tasks in one process (``LaneSupervisor``) or as
+one spawned process per lane (``ProcessSupervisor``), which also restarts
+crashed processes and forwards shutdown.
+
+Usage:
+    async def submit(lane: Lane):
+        async with lane.slots:
+            ...
+
+    supervisor = LaneSupervisor([Lane("fal-video", submit, interval=5, concurrency=20)])
+    await supervisor.run(stop_event)   # returns after stop_event is set and lanes drain
+"""
+
+import asyncio
+import multiprocessing
+import signal
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import structlog
+
+logger = structlog.get_logger()
+
+MAX_RESTART_BACKOFF = 60.0
+
+
+@dataclass
+class LaneStats:
+    """Counters for one lane."""
+
+    cycles: int = 0
+    errors: int = 0
+    restarts: int = 0
+    wakeups: int = 0
+    last_cycle_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class Lane:
+    """
+    One independently scheduled worker loop.
+
+    Attributes:
+        name: Lane name (e.g. "fal-video")
+        interval: Seconds between cycles
+        concurrency: Size of ``slots``, the lane's in-flight limit
+        stats: LaneStats counters
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cycle: Callable[["Lane"], Awaitable[Any]],
+        interval: float,
+        concurrency: int = 1,
+    ):
+        self.name = name
+        self.cycle = cycle
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.stats = LaneStats()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding this lane's concurrent work (created on the running loop)."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._slots
+
+    @property
+    def wake(self) -> asyncio.Event:
+        """Event that cuts the wait before the next cycle short."""
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    def notify(self):
+        """Run the next cycle now (coalesces: many notifies, one cycle)."""
+        self.stats.wakeups += 1
+        self.wake.set()
+
+    async def gather(self, *coros: Awaitable[Any]) -> List[Any]:
+        """Run coroutines concurrently, at most ``concurrency`` at a time."""
+
+        async def bounded(coro):
+            async with self.slots:
+                return await coro
+
+        return await asyncio.gather(*(bounded(c) for c in coros))
+
+    async def run(self, stop: asyncio.Event):
+        """Run cycles until ``stop`` is set; failing cycles back off and retry."""
+        backoff = 1.0
+        logger.info("Lane started", lane=self.name, concurrency=self.concurrency)
+        while not stop.is_set():
+            # Notifications arriving during the cycle trigger the next one
+            self.wake.clear()
+            try:
+                await self.cycle(self)
+                self.stats.cycles += 1
+                self.stats.last_cycle_at = datetime.now(timezone.utc).isoformat()
+                backoff = 1.0
+                waiters = [stop.wait(), self.wake.wait()]
+                delay = self.interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.errors += 1
+                self.stats.last_error = str(e)
+                logger.exception("Lane cycle failed", lane=self.name, retry_in=backoff)
+                waiters = [stop.wait()]  # Back off even if notified
+                delay = backoff
+                backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+            tasks = [asyncio.ensure_future(waiter) for waiter in waiters]
+            try:
+                await asyncio.wait(tasks, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+        logger.info("Lane stopped", lane=self.name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"concurrency": self.concurrency, "interval": self.interval, **self.stats.__dict__}
+
+
+class LaneSupervisor:
+    """
+    Runs lanes as asyncio tasks in this process.
+
+    Attributes:
+        lanes: Lanes by name
+        shutdown_timeout: Seconds to let lanes finish their cycle on shutdown
+    """
+
+    def __init__(self, lanes: Sequence[Lane], shutdown_timeout: float = 30.0):
+        self.lanes = {lane.name: lane for lane in lanes}
+        self.shutdown_timeout = shutdown_timeout
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _start(self, lane: Lane, stop: asyncio.Event):
+        self._tasks[lane.name] = asyncio.create_task(lane.run(stop), name=f"lane-{lane.name}")
+
+    async def run(self, stop: asyncio.Event):
+        """Run every lane until ``stop`` is set, restarting lanes that die."""
+        for lane in self.lanes.values():
+            self._start(lane, stop)
+
+        stop_waiter = asyncio.create_task(stop.wait())
+        try:
+            while not stop.is_set():
+                await asyncio.wait(
+                    [stop_waiter, *self._tasks.values()], return_when=asyncio.FIRST_COMPLETED
+                )
+                for name, task in list(self._tasks.items()):
+                    if task.done() and not stop.is_set():
+                        lane = self.lanes[name]
+                        lane.stats.restarts += 1
+                        logger.error(
+                            "Lane task exited, restarting",
+                            lane=name,
+                            error=str(task.exception()) if not task.cancelled() else "cancelled",
+                        )
+                        self._start(lane, stop)
+        finally:
+            stop_waiter.cancel()
+            await self._drain()
+
+    async def _drain(self):
+        """Give lanes ``shutdown_timeout`` to finish their cycle, then cancel."""
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if pending:
+            logger.warning("Cancelled lanes after shutdown timeout", lanes=len(pending))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: lane.get_stats() for name, lane in self.lanes.items()}
+
+
+@dataclass
+class ProcessSupervisor:
+    """
+    Runs each lane in its own spawned process and restarts crashed ones.
+
+    ``target(lane_name)`` is the process entry point; it must handle SIGTERM
+    by shutting its lane down gracefully.
+    """
+
+    lane_names: Sequence[str]
+    target: Callable[[str], None]
+    shutdown_timeout: float = 30.0
+    _processes: Dict[str, multiprocessing.Process] = field(default_factory=dict)
+    _stopping: bool = False
+
+    def _spawn(self, name: str):
+        process = multiprocessing.get_context("spawn").Process(
+            target=self.target, args=(name,), name=f"lane-{name}"
+        )
+        process.start()
+        self._processes[name] = process
+        logger.info("Lane process started", lane=name, pid=process.pid)
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def run(self):
+        """Block until SIGINT/SIGTERM, keeping one live process per lane."""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        backoff = {name: 1.0 for name in self.lane_names}
+        for name in self.lane_names:
+            self._spawn(name)
+
+        while not self._stopping:
+            for name, process in list(self._processes.items()):
+                if not process.is_alive() and not self._stopping:
+                    logger.error(
+                        "Lane process exited, restarting",
+                        lane=name,
+                        exitcode=process.exitcode,
+                        retry_in=backoff[name],
+                    )
+                    time.sleep(backoff[name])
+                    backoff[name] = min(backoff[name] * 2, MAX_RESTART_BACKOFF)
+                    self._spawn(name)
+            time.sleep(1.0)
+
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: graceful lane shutdown
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in self._processes.values():
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+        logger.info("All lane processes stopped")
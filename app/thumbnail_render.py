@@ -0,0 +1,118 @@
+"""CPU-bound thumbnail rendering, run in worker processes.
+
+Kept free of app imports (settings, database, services) so that spawned
+worker processes of the thumbnail engine import only Pillow.
+
+One decode produces every variant:
+    - JPEG sources are decoded with ``Image.draft`` at the smallest DCT scale
+      that still covers the largest variant, so a 4K JPEG is never fully
+      decoded for a 1200px preview.
+    - Resizes use ``reducing_gap`` so Pillow applies a fast integer
+      ``reduce`` before the final Lanczos pass.
+    - Variants are rendered largest first, each smaller one resized from the
+      previous result instead of the full-size image.
+
+Usage:
+    from app.thumbnail_render import ThumbnailVariant, render_thumbnails
+
+    variants = (ThumbnailVariant("grid", 600, "JPEG", 85),)
+    outputs = render_thumbnails(image_data, variants)
+    data, width, height = outputs["grid"]
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+from PIL import Image
+
+# Minimum ratio kept for the fast reduce step before Lanczos resampling
+REDUCING_GAP = 3.0
+
+FORMAT_INFO = {
+    "JPEG": (".jpg", "image/jpeg"),
+    "WEBP": (".webp", "image/webp"),
+    "AVIF": (".avif", "image/avif"),
+}
+
+
+@dataclass(frozen=True)
+class ThumbnailVariant:
+    """One output size/format of the thumbnail pipeline."""
+
+    name: str
+    width: int
+    format: str  # JPEG, WEBP or AVIF
+    quality: int
+
+    @property
+    def extension(self) -> str:
+        return FORMAT_INFO[self.format][0]
+
+    @property
+    def content_type(self) -> str:
+        return FORMAT_INFO[self.format][1]
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Flatten transparency onto white and convert to RGB."""
+    if img.mode in ("RGBA", "P", "LA"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        if img.mode in ("RGBA", "LA"):
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img)
+        return background
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def _encode(img: Image.Image, variant: ThumbnailVariant) -> bytes:
+    buffer = io.BytesIO()
+    if variant.format == "JPEG":
+        img.save(buffer, format="JPEG", quality=variant.quality, optimize=True)
+    elif variant.format == "WEBP":
+        img.save(buffer, format="WEBP", quality=variant.quality, method=4)
+    else:
+        img.save(buffer, format=variant.format, quality=variant.quality)
+    return buffer.getvalue()
+
+
+def render_thumbnails(
+    image_data: bytes, variants: Sequence[ThumbnailVariant]
+) -> Dict[str, Tuple[bytes, int, int]]:
+    """
+    Decode an image once and render every variant.
+
+    Images narrower than a variant's width are not upscaled.
+
+    Returns:
+        {variant name: (encoded bytes, width, height)}
+    """
+    img = Image.open(io.BytesIO(image_data))
+    source_width, source_height = img.size
+    largest = max(v.width for v in variants)
+
+    if img.format == "JPEG" and largest < source_width:
+        target_height = max(1, round(source_height * largest / source_width))
+        img.draft("RGB", (largest, target_height))
+
+    img = _to_rgb(img)
+    # draft() may have shrunk the decode; keep aspect from the source header
+    aspect = source_height / source_width
+
+    outputs: Dict[str, Tuple[bytes, int, int]] = {}
+    current = img
+    for variant in sorted(variants, key=lambda v: v.width, reverse=True):
+        width = min(variant.width, source_width)
+        height = max(1, int(width * aspect))
+        if current.size != (width, height):
+            current = current.resize(
+                (width, height), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP
+            )
+        outputs[variant.name] = (_encode(current, variant), width, height)
+
+    return outputs
@@ -1,25 +1,39 @@
+import argparse
 import asyncio
 import csv
 import json
+import os
 import re
 import signal
+import socket
 import sys
+import weakref
 from pathlib import Path
-import httpx
 import structlog
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.database import SessionLocal, init_db
+from app.http_client import get_http_client, close_http_clients
 from app.models import Job, ImageJob
-from app.fal_client import submit_job, get_job_result, FalAPIError
-from app.image_client import submit_image_job, get_image_result, ImageAPIError
-from app.schemas import is_vastai_model
+from app.fal_client import submit_job, FalAPIError
+from app.image_client import submit_image_job, ImageAPIError
 from app.services.vastai_orchestrator import get_vastai_orchestrator
 from app.services.r2_cache import cache_video
+from app.services.poll_scheduler import fal_poll_scheduler
+from app.services.runtime_stats import runtime_stats
+from app.services.rate_limiter import provider_governor
+from app.services.job_claims import claim_image_jobs, claim_jobs, hold_leases, renew_leases
+from app.services.worker_lanes import Lane, LaneSupervisor, ProcessSupervisor
+from app.services import job_notify
+from app.services.job_notify import JobNotificationListener, notify_jobs_sync
 
 logger = structlog.get_logger()
 
+# Identifies this process in Job.claimed_by
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
 
 def slugify_prompt(prompt: str, max_words: int = 5) -> str:
     """Convert prompt to filename-safe slug with first N words."""
@@ -67,12 +81,12 @@ async def download_video(
         return str(output_path)
 
     try:
-        async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-            async with client.stream("GET", video_url) as response:
-                response.raise_for_status()
-                with open(output_path, "wb") as f:
-                    async for chunk in response.aiter_bytes(chunk_size=8192):
-                        f.write(chunk)
+        client = get_http_client(video_url)
+        async with client.stream("GET", video_url, timeout=120.0) as response:
+            response.raise_for_status()
+            with open(output_path, "wb") as f:
+                async for chunk in response.aiter_bytes(chunk_size=8192):
+                    f.write(chunk)
         logger.info("Video downloaded", job_id=job_id, path=str(output_path))
 
         # Append to CSV index
@@ -127,8 +141,14 @@ async def process_vastai_job(job: Job, db: Session) -> bool:
     Process a single vastai job synchronously via SwarmUI WebSocket.
     Returns True on success, False on failure.
 
-    VastAI jobs are processed ONE AT A TIME to avoid multiple WebSocket connections.
+    The job's lease is renewed for the whole generation, so a crashed worker's
+    job becomes claimable again instead of staying "running" forever.
     """
+    async with hold_leases([job.id], WORKER_ID):
+        return await _run_vastai_job(job, db)
+
+
+async def _run_vastai_job(job: Job, db: Session) -> bool:
     logger.info("Processing vastai job", job_id=job.id, model=job.model)
     job.wan_status = "running"
     db.commit()
@@ -186,6 +206,7 @@ async def process_vastai_job(job: Job, db: Session) -> bool:
         job.wan_status = "completed"
         job.wan_video_url = video_url
         db.commit()
+        notify_jobs_sync("completed")
 
         logger.info("Vastai job completed", job_id=job.id, video_url=video_url[:50])
         return True
@@ -198,39 +219,44 @@ async def process_vastai_job(job: Job, db: Session) -> bool:
         return False
 
 
-async def submit_pending_jobs():
-    """Find pending jobs and route to appropriate provider."""
-    db = get_db_session()
-    try:
-        pending_jobs = (
-            db.query(Job)
-            .filter(Job.wan_status == "pending")
-            .limit(settings.max_concurrent_submits)
-            .all()
-        )
+# Poll futures already hooked to wake their lane (watch() is called every cycle)
+_wake_hooked: "weakref.WeakSet" = weakref.WeakSet()
 
-        if not pending_jobs:
-            return
 
-        # Separate vastai jobs from fal.ai jobs
-        vastai_jobs = [j for j in pending_jobs if is_vastai_model(j.model or "")]
-        fal_jobs = [j for j in pending_jobs if not is_vastai_model(j.model or "")]
+def _wake_when_done(lane: Lane | None, future: asyncio.Future):
+    """Run ``lane``'s next cycle as soon as the scheduler resolves ``future``."""
+    if lane is None or future in _wake_hooked:
+        return
+    _wake_hooked.add(future)
+    future.add_done_callback(lambda _: lane.notify())
 
-        logger.info(
-            "Submitting pending jobs",
-            total=len(pending_jobs),
-            vastai=len(vastai_jobs),
-            fal=len(fal_jobs),
+
+def _fal_job_filter():
+    return or_(Job.model.is_(None), Job.model.notlike("vastai-%"))
+
+
+def _vastai_job_filter():
+    return Job.model.like("vastai-%")
+
+
+async def submit_pending_jobs(lane: Lane):
+    """Claim pending Fal video jobs and submit them concurrently (fal-video lane)."""
+    db = get_db_session()
+    try:
+        # Atomic leased claim: safe with several worker processes/hosts
+        fal_jobs = claim_jobs(
+            db, WORKER_ID, limit=lane.concurrency, extra_filter=_fal_job_filter()
         )
+        if not fal_jobs:
+            return
+        if len(fal_jobs) == lane.concurrency:
+            lane.notify()  # Probably more pending: claim the next batch right away
 
-        # Process vastai jobs ONE AT A TIME (sequential, not concurrent)
-        # This avoids multiple WebSocket connections to SwarmUI
-        for job in vastai_jobs:
-            await process_vastai_job(job, db)
+        logger.info("Submitting pending jobs", fal=len(fal_jobs))
 
         # Submit fal.ai jobs concurrently (they handle queuing)
-        if fal_jobs:
-            tasks = [
+        results = await lane.gather(
+            *(
                 submit_single_job(
                     job.id,
                     job.image_url,
@@ -241,40 +267,94 @@ async def submit_pending_jobs():
                     job.negative_prompt,
                 )
                 for job in fal_jobs
-            ]
-            results = await asyncio.gather(*tasks)
-
-            # Update database with results
-            job_map = {job.id: job for job in fal_jobs}
-            for job_id, request_id, error in results:
-                job = job_map[job_id]
-                if request_id:
-                    job.wan_request_id = request_id
-                    job.wan_status = "submitted"
-                else:
-                    job.wan_status = "failed"
-                    job.error_message = error
+            )
+        )
 
-            db.commit()
+        # Update database with results
+        job_map = {job.id: job for job in fal_jobs}
+        for job_id, request_id, error in results:
+            job = job_map[job_id]
+            if request_id:
+                job.wan_request_id = request_id
+                job.wan_status = "submitted"
+                poll_single_job(
+                    job.id,
+                    job.model or "wan",
+                    request_id,
+                    lane,
+                    resolution=job.resolution,
+                    duration_sec=job.duration_sec,
+                )
+            else:
+                job.wan_status = "failed"
+                job.error_message = error
+
+        db.commit()
 
     finally:
         db.close()
 
 
-async def poll_single_job(job_id: int, model: str, request_id: str) -> tuple[int, dict]:
-    """Poll a single job and return (job_id, result)."""
+async def process_vastai_jobs(lane: Lane):
+    """Claim and run SwarmUI jobs (swarmui lane, one WebSocket per slot)."""
+    db = get_db_session()
     try:
-        result = await get_job_result(model, request_id)
-        return (job_id, result)
-    except FalAPIError as e:
-        logger.warning("Error polling job, will retry", job_id=job_id, error=str(e))
-        return (job_id, {"status": None, "video_url": None, "error_message": None})
-    except Exception:
-        logger.exception("Unexpected error polling job", job_id=job_id)
+        vastai_jobs = claim_jobs(
+            db, WORKER_ID, limit=lane.concurrency, extra_filter=_vastai_job_filter()
+        )
+        if not vastai_jobs:
+            return
+        if len(vastai_jobs) == lane.concurrency:
+            lane.notify()
+
+        logger.info("Processing vastai jobs", count=len(vastai_jobs))
+        if lane.concurrency == 1:
+            # Sequential on one session (avoids multiple SwarmUI WebSocket connections)
+            for job in vastai_jobs:
+                if renew_leases(db, [job.id], WORKER_ID):
+                    await process_vastai_job(job, db)
+        else:
+            await lane.gather(*(_process_vastai_job_in_session(job.id) for job in vastai_jobs))
+    finally:
+        db.close()
+
+
+async def _process_vastai_job_in_session(job_id: int) -> bool:
+    db = get_db_session()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        return bool(job) and await process_vastai_job(job, db)
+    finally:
+        db.close()
+
+
+def poll_single_job(
+    job_id: int,
+    model: str,
+    request_id: str,
+    lane: Lane | None = None,
+    resolution: str | None = None,
+    duration_sec: int | None = None,
+) -> tuple[int, dict]:
+    """Track a job in the shared poll scheduler and return (job_id, latest result).
+
+    The scheduler owns the status requests; a None status means no new
+    information yet (not polled, or the last polls errored). ``lane`` is
+    woken when the job finishes, to write the result back.
+    """
+    _wake_when_done(
+        lane,
+        fal_poll_scheduler.watch(
+            request_id, model, kind="video", resolution=resolution, duration_sec=duration_sec
+        ),
+    )
+    result = fal_poll_scheduler.latest(request_id)
+    if result is None:
         return (job_id, {"status": None, "video_url": None, "error_message": None})
+    return (job_id, result)
 
 
-async def poll_submitted_jobs():
+async def poll_submitted_jobs(lane: Lane | None = None):
     """Poll submitted/running jobs for completion concurrently."""
     db = get_db_session()
     try:
@@ -282,24 +362,36 @@ async def poll_submitted_jobs():
             db.query(Job)
             .filter(Job.wan_status.in_(["submitted", "running"]))
             .filter(Job.wan_request_id.isnot(None))
-            .limit(settings.max_concurrent_polls)
             .all()
         )
 
+        # Stop tracking jobs finished elsewhere (e.g. by the Fal webhook receiver)
+        active_ids = {job.wan_request_id for job in active_jobs}
+        for request_id in fal_poll_scheduler.tracked(kind="video") - active_ids:
+            fal_poll_scheduler.forget(request_id)
+
         if not active_jobs:
             return
 
-        logger.info("Polling active jobs", count=len(active_jobs))
+        logger.info("Tracking active jobs", count=len(active_jobs))
 
-        # Poll all jobs concurrently
-        tasks = [
-            poll_single_job(job.id, job.model or "wan", job.wan_request_id)
+        # The shared scheduler polls with bounded concurrency (max_concurrent_polls)
+        # and adaptive intervals; here we only register jobs and read back results.
+        results = [
+            poll_single_job(
+                job.id,
+                job.model or "wan",
+                job.wan_request_id,
+                lane,
+                resolution=job.resolution,
+                duration_sec=job.duration_sec,
+            )
             for job in active_jobs
         ]
-        results = await asyncio.gather(*tasks)
 
         # Update database with results
         job_map = {job.id: job for job in active_jobs}
+        completed = 0
         for job_id, result in results:
             if result["status"] is None:
                 continue  # Skip failed polls
@@ -311,17 +403,7 @@ async def poll_submitted_jobs():
             if result["video_url"]:
                 job.wan_video_url = result["video_url"]
                 logger.info("Job completed", job_id=job.id, video_url=job.wan_video_url)
-                # Auto-download if enabled
-                if settings.auto_download_dir:
-                    local_path = await download_video(
-                        job.id,
-                        job.model or "wan",
-                        result["video_url"],
-                        prompt=job.motion_prompt or "",
-                        resolution=job.resolution or "",
-                    )
-                    if local_path:
-                        job.local_video_path = local_path
+                completed += 1
 
             if result["error_message"]:
                 job.error_message = result["error_message"]
@@ -336,6 +418,8 @@ async def poll_submitted_jobs():
                 )
 
         db.commit()
+        if completed:
+            notify_jobs_sync("completed")  # Auto-download happens in the downloads lane
 
     finally:
         db.close()
@@ -362,12 +446,12 @@ async def download_image(
         return str(output_path)
 
     try:
-        async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-            async with client.stream("GET", image_url) as response:
-                response.raise_for_status()
-                with open(output_path, "wb") as f:
-                    async for chunk in response.aiter_bytes(chunk_size=8192):
-                        f.write(chunk)
+        client = get_http_client(image_url)
+        async with client.stream("GET", image_url, timeout=120.0) as response:
+            response.raise_for_status()
+            with open(output_path, "wb") as f:
+                async for chunk in response.aiter_bytes(chunk_size=8192):
+                    f.write(chunk)
         logger.info("Image downloaded", job_id=job_id, path=str(output_path))
         return str(output_path)
     except Exception as e:
@@ -410,36 +494,35 @@ async def submit_single_image_job(
         return (job_id, None, f"Unexpected error: {str(e)}")
 
 
-async def submit_pending_image_jobs():
-    """Find pending image jobs and submit them to Fal."""
+async def submit_pending_image_jobs(lane: Lane):
+    """Find pending image jobs and submit them to Fal (fal-image lane)."""
     db = get_db_session()
     try:
-        pending_jobs = (
-            db.query(ImageJob)
-            .filter(ImageJob.status == "pending")
-            .limit(settings.max_concurrent_submits)
-            .all()
-        )
+        # Same atomic leased claim as video jobs
+        pending_jobs = claim_image_jobs(db, WORKER_ID, limit=lane.concurrency)
 
         if not pending_jobs:
             return
+        if len(pending_jobs) == lane.concurrency:
+            lane.notify()
 
         logger.info("Submitting pending image jobs", count=len(pending_jobs))
 
-        tasks = [
-            submit_single_image_job(
-                job.id,
-                job.source_image_url,
-                job.prompt,
-                job.model,
-                job.negative_prompt,
-                job.num_images,
-                job.aspect_ratio,
-                job.quality,
+        results = await lane.gather(
+            *(
+                submit_single_image_job(
+                    job.id,
+                    job.source_image_url,
+                    job.prompt,
+                    job.model,
+                    job.negative_prompt,
+                    job.num_images,
+                    job.aspect_ratio,
+                    job.quality,
+                )
+                for job in pending_jobs
             )
-            for job in pending_jobs
-        ]
-        results = await asyncio.gather(*tasks)
+        )
 
         job_map = {job.id: job for job in pending_jobs}
         for job_id, request_id, error in results:
@@ -447,6 +530,7 @@ async def submit_pending_image_jobs():
             if request_id:
                 job.request_id = request_id
                 job.status = "submitted"
+                poll_single_image_job(job.id, job.model, request_id, lane)
             else:
                 job.status = "failed"
                 job.error_message = error
@@ -457,24 +541,18 @@ async def submit_pending_image_jobs():
         db.close()
 
 
-async def poll_single_image_job(
-    job_id: int, model: str, request_id: str
+def poll_single_image_job(
+    job_id: int, model: str, request_id: str, lane: Lane | None = None
 ) -> tuple[int, dict]:
-    """Poll a single image job and return (job_id, result)."""
-    try:
-        result = await get_image_result(model, request_id)
-        return (job_id, result)
-    except ImageAPIError as e:
-        logger.warning(
-            "Error polling image job, will retry", job_id=job_id, error=str(e)
-        )
-        return (job_id, {"status": None, "image_urls": None, "error_message": None})
-    except Exception:
-        logger.exception("Unexpected error polling image job", job_id=job_id)
+    """Track an image job in the shared poll scheduler and return (job_id, latest result)."""
+    _wake_when_done(lane, fal_poll_scheduler.watch(request_id, model, kind="image"))
+    result = fal_poll_scheduler.latest(request_id)
+    if result is None:
         return (job_id, {"status": None, "image_urls": None, "error_message": None})
+    return (job_id, result)
 
 
-async def poll_submitted_image_jobs():
+async def poll_submitted_image_jobs(lane: Lane | None = None):
     """Poll submitted/running image jobs for completion."""
     db = get_db_session()
     try:
@@ -482,22 +560,25 @@ async def poll_submitted_image_jobs():
             db.query(ImageJob)
             .filter(ImageJob.status.in_(["submitted", "running"]))
             .filter(ImageJob.request_id.isnot(None))
-            .limit(settings.max_concurrent_polls)
             .all()
         )
 
+        active_ids = {job.request_id for job in active_jobs}
+        for request_id in fal_poll_scheduler.tracked(kind="image") - active_ids:
+            fal_poll_scheduler.forget(request_id)
+
         if not active_jobs:
             return
 
-        logger.info("Polling active image jobs", count=len(active_jobs))
+        logger.info("Tracking active image jobs", count=len(active_jobs))
 
-        tasks = [
-            poll_single_image_job(job.id, job.model, job.request_id)
+        results = [
+            poll_single_image_job(job.id, job.model, job.request_id, lane)
             for job in active_jobs
         ]
-        results = await asyncio.gather(*tasks)
 
         job_map = {job.id: job for job in active_jobs}
+        completed = 0
         for job_id, result in results:
             if result["status"] is None:
                 continue
@@ -513,18 +594,7 @@ async def poll_submitted_image_jobs():
                     job_id=job.id,
                     num_images=len(result["image_urls"]),
                 )
-
-                # Auto-download images
-                if settings.auto_download_dir:
-                    local_paths = []
-                    for i, img_url in enumerate(result["image_urls"]):
-                        local_path = await download_image(
-                            job.id, job.model, img_url, i, job.prompt
-                        )
-                        if local_path:
-                            local_paths.append(local_path)
-                    if local_paths:
-                        job.local_image_paths = json.dumps(local_paths)
+                completed += 1
 
             if result["error_message"]:
                 job.error_message = result["error_message"]
@@ -539,44 +609,194 @@ async def poll_submitted_image_jobs():
                 )
 
         db.commit()
+        if completed:
+            notify_jobs_sync("completed")
 
     finally:
         db.close()
 
 
-async def worker_loop():
-    """Main worker loop."""
+# ============== Downloads ==============
+
+# Outputs that failed to download this many times are skipped until restart
+MAX_DOWNLOAD_ATTEMPTS = 3
+_download_attempts: dict[tuple[str, int], int] = {}
+
+
+def _should_download(kind: str, job_id: int) -> bool:
+    return _download_attempts.get((kind, job_id), 0) < MAX_DOWNLOAD_ATTEMPTS
+
+
+async def _download_job_video(job_id: int):
+    db = get_db_session()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job or job.local_video_path or not job.wan_video_url:
+            return
+        local_path = await download_video(
+            job.id,
+            job.model or "wan",
+            job.wan_video_url,
+            prompt=job.motion_prompt or "",
+            resolution=job.resolution or "",
+        )
+        if local_path:
+            job.local_video_path = local_path
+            db.commit()
+        else:
+            _download_attempts[("video", job_id)] = _download_attempts.get(("video", job_id), 0) + 1
+    finally:
+        db.close()
+
+
+async def _download_image_job(job_id: int):
+    db = get_db_session()
+    try:
+        job = db.query(ImageJob).filter(ImageJob.id == job_id).first()
+        if not job or job.local_image_paths or not job.result_image_urls:
+            return
+        local_paths = []
+        for i, img_url in enumerate(json.loads(job.result_image_urls)):
+            local_path = await download_image(job.id, job.model, img_url, i, job.prompt)
+            if local_path:
+                local_paths.append(local_path)
+        if local_paths:
+            job.local_image_paths = json.dumps(local_paths)
+            db.commit()
+        else:
+            _download_attempts[("image", job_id)] = _download_attempts.get(("image", job_id), 0) + 1
+    finally:
+        db.close()
+
+
+async def download_completed_outputs(lane: Lane):
+    """Download completed outputs not yet saved locally (downloads lane)."""
+    if not settings.auto_download_dir:
+        return
+
+    db = get_db_session()
+    try:
+        video_ids = [
+            job_id
+            for (job_id,) in db.query(Job.id)
+            .filter(Job.wan_status == "completed")
+            .filter(Job.wan_video_url.isnot(None))
+            .filter(Job.local_video_path.is_(None))
+            .order_by(Job.id)
+            .limit(lane.concurrency * 4)
+            .all()
+            if _should_download("video", job_id)
+        ]
+        image_ids = [
+            job_id
+            for (job_id,) in db.query(ImageJob.id)
+            .filter(ImageJob.status == "completed")
+            .filter(ImageJob.result_image_urls.isnot(None))
+            .filter(ImageJob.local_image_paths.is_(None))
+            .order_by(ImageJob.id)
+            .limit(lane.concurrency * 4)
+            .all()
+            if _should_download("image", job_id)
+        ]
+    finally:
+        db.close()
+
+    await lane.gather(
+        *(_download_job_video(job_id) for job_id in video_ids),
+        *(_download_image_job(job_id) for job_id in image_ids),
+    )
+
+
+# ============== Lanes ==============
+
+
+async def fal_video_cycle(lane: Lane):
+    await asyncio.gather(submit_pending_jobs(lane), poll_submitted_jobs(lane))
+
+
+async def fal_image_cycle(lane: Lane):
+    await asyncio.gather(submit_pending_image_jobs(lane), poll_submitted_image_jobs(lane))
+
+
+LANE_NAMES = ("fal-video", "fal-image", "swarmui", "downloads")
+
+# Job notification kinds that wake each lane
+LANE_NOTIFICATIONS = {
+    "fal-video": ("video",),
+    "fal-image": ("image",),
+    "swarmui": ("video",),
+    "downloads": ("completed",),
+}
+
+
+def build_lanes(names) -> list[Lane]:
+    """Lanes by name, each with its own interval and concurrency limit.
+
+    With job notifications on, lanes run when woken (new jobs, finished
+    polls) and the interval is only a safety sweep for missed signals.
+    """
+    if job_notify.is_enabled():
+        interval = settings.worker_sweep_interval_seconds
+    else:
+        interval = settings.worker_poll_interval_seconds
+    factories = {
+        "fal-video": lambda: Lane(
+            "fal-video", fal_video_cycle, interval, settings.max_concurrent_submits
+        ),
+        "fal-image": lambda: Lane(
+            "fal-image", fal_image_cycle, interval, settings.max_concurrent_submits
+        ),
+        "swarmui": lambda: Lane(
+            "swarmui", process_vastai_jobs, interval, settings.worker_swarmui_concurrency
+        ),
+        "downloads": lambda: Lane(
+            "downloads",
+            download_completed_outputs,
+            interval,
+            settings.worker_download_concurrency,
+        ),
+    }
+    unknown = set(names) - set(factories)
+    if unknown:
+        raise ValueError(f"Unknown worker lanes: {sorted(unknown)}. Choose from {LANE_NAMES}")
+    return [factories[name]() for name in names]
+
+
+async def worker_loop(lanes=LANE_NAMES):
+    """Run the given lanes until shutdown."""
     logger.info(
         "Starting worker",
+        lanes=list(lanes),
         poll_interval=settings.worker_poll_interval_seconds,
         max_submits=settings.max_concurrent_submits,
         max_polls=settings.max_concurrent_polls,
+        notify_backend=job_notify.get_backend(),
     )
 
     init_db()
 
-    while not shutdown_event.is_set():
-        try:
-            # Run submit and poll for both video and image jobs concurrently
-            await asyncio.gather(
-                submit_pending_jobs(),
-                poll_submitted_jobs(),
-                submit_pending_image_jobs(),
-                poll_submitted_image_jobs(),
-            )
-        except Exception as e:
-            logger.exception("Error in worker loop", error=str(e))
-
-        # Wait for interval or shutdown
-        try:
-            await asyncio.wait_for(
-                shutdown_event.wait(),
-                timeout=settings.worker_poll_interval_seconds,
-            )
-        except asyncio.TimeoutError:
-            pass  # Normal timeout, continue loop
+    supervisor = LaneSupervisor(build_lanes(lanes))
 
-    logger.info("Worker shutdown complete")
+    def on_notify(kind: str):
+        for name, lane in supervisor.lanes.items():
+            if kind in LANE_NOTIFICATIONS[name]:
+                lane.notify()
+
+    listener = JobNotificationListener(
+        {kind for name in supervisor.lanes for kind in LANE_NOTIFICATIONS[name]}, on_notify
+    )
+    try:
+        await runtime_stats.start()
+        await provider_governor.start()
+        await listener.start()
+        await supervisor.run(shutdown_event)
+    finally:
+        await listener.stop()
+        await fal_poll_scheduler.shutdown()
+        await runtime_stats.stop()
+        await provider_governor.stop()
+        await close_http_clients()
+    logger.info("Worker shutdown complete", lanes=supervisor.get_stats())
 
 
 def handle_shutdown(signum, frame):
@@ -585,13 +805,7 @@ def handle_shutdown(signum, frame):
     shutdown_event.set()
 
 
-def main():
-    """Entry point for the worker."""
-    # Set up signal handlers
-    signal.signal(signal.SIGINT, handle_shutdown)
-    signal.signal(signal.SIGTERM, handle_shutdown)
-
-    # Configure structlog
+def _configure_logging():
     structlog.configure(
         processors=[
             structlog.stdlib.add_log_level,
@@ -600,12 +814,53 @@ def main():
         ],
     )
 
+
+def run_lanes(lanes) -> None:
+    """Run lanes in this process (also the entry point of lane processes)."""
+    if isinstance(lanes, str):
+        lanes = [lanes]
+
+    # Set up signal handlers
+    signal.signal(signal.SIGINT, handle_shutdown)
+    signal.signal(signal.SIGTERM, handle_shutdown)
+    _configure_logging()
+
     try:
-        asyncio.run(worker_loop())
+        asyncio.run(worker_loop(lanes))
     except KeyboardInterrupt:
         logger.info("Worker interrupted")
         sys.exit(0)
 
 
+def main():
+    """Entry point for the worker.
+
+    python -m app.worker                          all lanes, one process
+    python -m app.worker --lanes fal-video,downloads
+    python -m app.worker --processes              one supervised process per lane
+    """
+    parser = argparse.ArgumentParser(description="i2v job worker")
+    parser.add_argument(
+        "--lanes",
+        default=settings.worker_lanes,
+        help=f"Comma-separated lanes to run ({', '.join(LANE_NAMES)})",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        default=settings.worker_lane_processes,
+        help="Run each lane in its own supervised process",
+    )
+    args = parser.parse_args()
+    lanes = [name.strip() for name in args.lanes.split(",") if name.strip()]
+    build_lanes(lanes)  # validate names before spawning anything
+
+    if args.processes:
+        _configure_logging()
+        ProcessSupervisor(lanes, target=run_lanes).run()
+    else:
+        run_lanes(lanes)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,30 @@
+"""Backfill the media_assets table from existing pipeline step outputs.
+
+Safe to rerun: each step's assets are replaced, not duplicated.
+
+Usage:
+    python scripts/backfill_media_assets.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import init_db
+from app.services.media_assets import backfill_media_assets
+
+
+def main():
+    init_db()  # Creates media_assets if it doesn't exist yet
+    written = backfill_media_assets()
+    print(f"Backfilled {written} media assets")
+
+
+if __name__ == "__main__":
+    main()
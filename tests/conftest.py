@@ -1,15 +1,27 @@
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
+
+# Startup backfills would scan the real database, not the test one
+os.environ.setdefault("THUMBNAIL_BACKFILL_ON_STARTUP", "false")
+# Keep a developer's Redis out of the suite: shared cache entries would leak
+# between tests (tests needing Redis use TEST_REDIS_URL)
+os.environ["REDIS_URL"] = ""
 
-from app.database import Base, get_db
+from app.database import Base, get_async_db, get_db
 from app.main import app
+from app.services.cache import response_cache
 
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# Temporary SQLite file shared by the sync and async test sessions
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="i2v-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -18,6 +30,12 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: each TestClient runs its own event loop, so connections can't be reused
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -40,7 +58,13 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    response_cache.clear()  # Each test starts from a fresh database
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
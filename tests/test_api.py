@@ -39,6 +39,18 @@ class TestStatusEndpoint:
         data = response.json()
         assert data["jobs"]["pending"] == 3
 
+    def test_api_status_counts_claimed_jobs(self, client, db_session):
+        """Test jobs leased by a worker are counted and filterable as claimed."""
+        from app.models import Job
+
+        db_session.add(Job(image_url="https://example.com/c.jpg", motion_prompt="c", wan_status="claimed"))
+        db_session.commit()
+
+        assert client.get("/api/status").json()["jobs"]["claimed"] == 1
+        response = client.get("/jobs?status=claimed")
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 1
+
 
 class TestCreateJob:
     def test_create_job_success(self, client):
@@ -201,3 +213,388 @@ class TestListJobs:
         # Get last 1
         response = client.get("/jobs?limit=2&offset=4")
         assert len(response.json()) == 1
+
+
+class TestFalWebhook:
+    def test_webhook_rejected_without_verification(self, client, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "fal_webhook_secret", "s3cret")
+        monkeypatch.setattr(settings, "fal_webhook_verify_signature", False)
+
+        response = client.post(
+            "/api/webhooks/fal?token=wrong",
+            json={"request_id": "req-1", "status": "OK", "payload": {}},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_webhook_completes_job(self, client, db_session, monkeypatch):
+        from app.config import settings
+        from app.models import Job
+
+        monkeypatch.setattr(settings, "fal_webhook_secret", "s3cret")
+        monkeypatch.setattr(settings, "fal_webhook_verify_signature", False)
+        from app.routers import webhooks
+
+        signals = []
+
+        async def fake_notify(kind):
+            signals.append(kind)
+
+        monkeypatch.setattr(webhooks, "notify_jobs", fake_notify)
+
+        job = Job(
+            image_url="https://example.com/test.jpg",
+            motion_prompt="Test",
+            model="kling",
+            wan_request_id="req-2",
+            wan_status="submitted",
+        )
+        db_session.add(job)
+        db_session.commit()
+
+        response = client.post(
+            "/api/webhooks/fal?token=s3cret",
+            json={
+                "request_id": "req-2",
+                "status": "OK",
+                "payload": {"video": {"url": "https://fal.media/out.mp4"}},
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["matched"] == [f"job:{job.id}"]
+
+        db_session.refresh(job)
+        assert job.wan_status == "completed"
+        assert job.wan_video_url == "https://fal.media/out.mp4"
+        # Downloading is left to the worker's downloads lane
+        assert job.local_video_path is None
+        assert signals == ["completed"]
+
+    def test_webhook_error_fails_job(self, client, db_session, monkeypatch):
+        from app.config import settings
+        from app.models import ImageJob
+
+        monkeypatch.setattr(settings, "fal_webhook_secret", "s3cret")
+        monkeypatch.setattr(settings, "fal_webhook_verify_signature", False)
+
+        image_job = ImageJob(
+            source_image_url="https://example.com/test.jpg",
+            prompt="Test",
+            request_id="req-3",
+            status="submitted",
+        )
+        db_session.add(image_job)
+        db_session.commit()
+
+        response = client.post(
+            "/api/webhooks/fal?token=s3cret",
+            json={"request_id": "req-3", "status": "ERROR", "error": "NSFW content"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        db_session.refresh(image_job)
+        assert image_job.status == "failed"
+        assert image_job.error_message == "NSFW content"
+
+    def test_webhook_leaves_finished_job_alone(self, client, db_session, monkeypatch):
+        from app.config import settings
+        from app.models import Job
+        from app.routers import webhooks
+
+        monkeypatch.setattr(settings, "fal_webhook_secret", "s3cret")
+        monkeypatch.setattr(settings, "fal_webhook_verify_signature", False)
+        signals = []
+
+        async def fake_notify(kind):
+            signals.append(kind)
+
+        monkeypatch.setattr(webhooks, "notify_jobs", fake_notify)
+
+        job = Job(
+            image_url="https://example.com/test.jpg",
+            motion_prompt="Test",
+            model="kling",
+            wan_request_id="req-4",
+            wan_status="completed",
+            wan_video_url="https://r2.test/kept.mp4",
+        )
+        db_session.add(job)
+        db_session.commit()
+
+        # A late redelivery reporting failure
+        response = client.post(
+            "/api/webhooks/fal?token=s3cret",
+            json={"request_id": "req-4", "status": "ERROR", "error": "timeout"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["matched"] == []
+        assert response.json()["skipped"] == [f"job:{job.id}"]
+
+        db_session.refresh(job)
+        assert (job.wan_status, job.wan_video_url) == ("completed", "https://r2.test/kept.mp4")
+        assert job.error_message is None
+        assert signals == []
+
+
+class TestImageLibrary:
+    @staticmethod
+    def _completed_i2i_step(db_session, image_count):
+        from app.models import Pipeline, PipelineStep
+        from app.services.media_assets import sync_step_assets
+
+        pipeline = Pipeline(name="library")
+        db_session.add(pipeline)
+        db_session.flush()
+        step = PipelineStep(
+            pipeline_id=pipeline.id, step_type="i2i", step_order=0, status="completed"
+        )
+        step.set_config({"model": "flux-2"})
+        step.set_inputs({"image_urls": ["https://x.test/src.png"], "prompts": ["a cat"]})
+        step.set_outputs(
+            {
+                "image_urls": [f"https://x.test/{i}.png" for i in range(image_count)],
+                "thumbnail_urls": [f"https://x.test/t{i}.jpg" for i in range(image_count)],
+            }
+        )
+        db_session.add(step)
+        sync_step_assets(db_session, step)
+        db_session.commit()
+        return pipeline, step
+
+    def test_library_paginates_per_image(self, client, db_session):
+        self._completed_i2i_step(db_session, image_count=3)
+
+        response = client.get("/api/pipelines/images/library?limit=2")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 3
+        assert len(data["images"]) == 2
+        image = data["images"][0]
+        assert image["model"] == "flux-2"
+        assert image["prompt"] == "a cat"
+        assert image["source_image"] == "https://x.test/src.png"
+        assert image["thumbnail_url"].startswith("https://x.test/t")
+
+    def test_backfill_populates_assets_from_steps(self, db_session):
+        from app.models import MediaAsset, Pipeline, PipelineStep
+        from app.services.media_assets import backfill_media_assets
+        from tests.conftest import TestingSessionLocal
+
+        pipeline = Pipeline(name="legacy")
+        db_session.add(pipeline)
+        db_session.flush()
+        step = PipelineStep(
+            pipeline_id=pipeline.id, step_type="i2v", step_order=1, status="completed"
+        )
+        step.set_outputs({"video_urls": ["https://x.test/v.mp4"]})
+        db_session.add(step)
+        db_session.commit()
+
+        assert backfill_media_assets(session_factory=TestingSessionLocal) == 1
+        # Rerunning replaces rather than duplicates
+        assert backfill_media_assets(session_factory=TestingSessionLocal) == 1
+        assets = db_session.query(MediaAsset).all()
+        assert [(a.kind, a.url) for a in assets] == [("video", "https://x.test/v.mp4")]
+
+    async def test_startup_backfill_resumes_partial_backfill(self, db_session):
+        from app.models import MediaAsset, Pipeline, PipelineStep
+        from app.services.media_assets import ensure_media_assets_backfilled, sync_step_assets
+        from tests.conftest import TestingSessionLocal
+
+        pipeline = Pipeline(name="half-migrated")
+        db_session.add(pipeline)
+        db_session.flush()
+        steps = []
+        for i in range(2):
+            step = PipelineStep(
+                pipeline_id=pipeline.id, step_type="i2v", step_order=i + 1, status="completed"
+            )
+            step.set_outputs({"video_urls": [f"https://x.test/v{i}.mp4"]})
+            db_session.add(step)
+            steps.append(step)
+        db_session.flush()
+        sync_step_assets(db_session, steps[0])  # Backfilled before the interruption
+        db_session.commit()
+
+        assert await ensure_media_assets_backfilled(session_factory=TestingSessionLocal) == 1
+        assert sorted(a.url for a in db_session.query(MediaAsset)) == [
+            "https://x.test/v0.mp4",
+            "https://x.test/v1.mp4",
+        ]
+        # Nothing left to do on the next start
+        assert await ensure_media_assets_backfilled(session_factory=TestingSessionLocal) == 0
+
+
+class TestKeysetPagination:
+    def test_jobs_cursor_walks_all_pages(self, client, db_session):
+        from app.models import Job
+
+        for i in range(5):
+            db_session.add(Job(image_url=f"https://x.test/{i}.jpg", motion_prompt="p"))
+        db_session.commit()
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "count": "exact"}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/jobs", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["X-Total-Count"] == "5"
+            seen.extend(job["id"] for job in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(set(seen))
+        assert len(seen) == 5
+        assert seen == sorted(seen, reverse=True)
+
+    def test_offset_pages_follow_sort_order(self, client, db_session):
+        from app.models import Job
+
+        for i in range(5):
+            db_session.add(Job(image_url=f"https://x.test/{i}.jpg", motion_prompt="p"))
+        db_session.commit()
+
+        everything = [job["id"] for job in client.get("/jobs", params={"limit": 5}).json()]
+        response = client.get("/jobs", params={"limit": 2, "offset": 1, "count": "exact"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [job["id"] for job in response.json()] == everything[1:3]
+        assert response.headers["X-Total-Count"] == "5"
+
+        response = client.get("/api/pipelines", params={"limit": 2, "offset": 1})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_invalid_cursor_rejected(self, client):
+        response = client.get("/jobs", params={"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_library_next_cursor(self, client, db_session):
+        TestImageLibrary._completed_i2i_step(db_session, image_count=3)
+
+        first = client.get("/api/pipelines/images/library?limit=2").json()
+        assert first["total"] == 3 and first["next_cursor"]
+
+        second = client.get(
+            f"/api/pipelines/images/library?limit=2&cursor={first['next_cursor']}"
+        ).json()
+        assert second["total"] is None
+        assert second["next_cursor"] is None
+        assert len(second["images"]) == 1
+        first_ids = {img["id"] for img in first["images"]}
+        assert second["images"][0]["id"] not in first_ids
+
+
+class TestAsyncPipelineEndpoints:
+    """Pipeline endpoints served from the async session."""
+
+    def test_get_toggle_and_delete_pipeline(self, client, db_session):
+        from app.models import MediaAsset, Pipeline
+
+        pipeline, step = TestImageLibrary._completed_i2i_step(db_session, image_count=2)
+
+        response = client.get(f"/api/pipelines/{pipeline.id}")
+        assert response.status_code == status.HTTP_200_OK
+        assert [s["id"] for s in response.json()["steps"]] == [step.id]
+
+        response = client.put(f"/api/pipelines/{pipeline.id}/favorite")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["is_favorite"] is True
+        assert len(response.json()["steps"]) == 1
+        # The cached detail was invalidated by the toggle
+        assert client.get(f"/api/pipelines/{pipeline.id}").json()["is_favorite"] is True
+
+        response = client.delete(f"/api/pipelines/{pipeline.id}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        db_session.expire_all()
+        assert db_session.query(Pipeline).count() == 0
+        assert db_session.query(MediaAsset).count() == 0
+
+    def test_missing_pipeline_returns_404(self, client):
+        response = client.get("/api/pipelines/999")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestRuntimeStatsEndpoint:
+    """Tests for the per-model runtime statistics API."""
+
+    def test_lists_percentiles_and_estimates(self, client, monkeypatch):
+        import pytest
+        from app.services import runtime_stats as module
+        from app.services.runtime_stats import RuntimeStatsStore
+
+        store = RuntimeStatsStore()
+        monkeypatch.setattr("app.routers.runtime_stats.runtime_stats", store)
+        for seconds in (80, 90, 100, 110, 120):
+            store.record("kling", "video", seconds, resolution="1080p", duration_sec=5)
+        store.record("flux-general", "image", 12)
+
+        response = client.get("/api/runtime-stats", params={"kind": "video"})
+        assert response.status_code == 200
+        (row,) = response.json()
+        assert (row["model"], row["resolution"], row["duration_sec"], row["samples"]) == (
+            "kling",
+            "1080p",
+            5,
+            5,
+        )
+        assert row["p50_seconds"] == pytest.approx(100, rel=0.03)
+        assert row["max_seconds"] == 120
+
+        response = client.get(
+            "/api/runtime-stats/estimate",
+            params={"model": "kling", "resolution": "1080p", "duration_sec": 5},
+        )
+        estimate = response.json()
+        assert estimate["samples"] == 5
+        assert estimate["timeout_seconds"] == pytest.approx(
+            store.timeout_budget("kling", "video", default=600, resolution="1080p", duration_sec=5)
+        )
+
+        estimate = client.get("/api/runtime-stats/estimate", params={"model": "veo2"}).json()
+        assert (estimate["samples"], estimate["p50_seconds"], estimate["timeout_seconds"]) == (
+            0,
+            None,
+            None,
+        )
+        assert module.runtime_stats is not store
+
+
+class TestPromptGeneratorStream:
+    """Tests for the server-sent events prompt generator endpoint."""
+
+    def test_streams_prompts_then_done(self, client, monkeypatch):
+        import json
+        from app.config import settings
+        from app.services import prompt_generator
+
+        async def fake_stream_prompts(**kwargs):
+            for i in range(kwargs["count"]):
+                yield f"prompt {i}"
+
+        monkeypatch.setattr(settings, "anthropic_api_key", "test")
+        monkeypatch.setattr(prompt_generator, "stream_prompts", fake_stream_prompts)
+
+        response = client.post("/api/generate-prompts/stream", json={"count": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in response.text.strip().split("\n\n")
+        ]
+        assert events[:2] == [
+            ("prompt", {"index": 0, "prompt": "prompt 0"}),
+            ("prompt", {"index": 1, "prompt": "prompt 1"}),
+        ]
+        assert events[2][0] == "done"
+        assert events[2][1]["count"] == 2
+
+    def test_rejects_invalid_count_before_streaming(self, client, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "anthropic_api_key", "test")
+        response = client.post("/api/generate-prompts/stream", json={"count": 0})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
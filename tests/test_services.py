@@ -1,5 +1,6 @@
 """Tests for core services."""
 
+import hashlib
 import pytest
 from unittest.mock import Mock
 from decimal import Decimal
@@ -8,6 +9,9 @@ from app.services.cost_calculator import CostCalculator, cost_calculator
 from app.services.error_classifier import ErrorClassifier, ErrorType, error_classifier
 from app.services.input_validator import InputValidator, ValidationError
 from app.services.rate_limiter import SlidingWindowRateLimiter
+from app.services.poll_scheduler import FalPollScheduler
+from app.services.r2_cache import AsyncR2Storage, R2KeyIndex
+from app.http_client import get_http_client, get_host_timeout, close_http_clients
 
 
 class TestCostCalculator:
@@ -258,17 +262,14 @@ class TestSlidingWindowRateLimiter:
         assert limiter.current_usage() == 2
 
     def test_get_stats(self):
-        """Test getting rate limiter stats.
-
-        Note: get_stats() has a known deadlock issue (calls time_until_available
-        while holding lock), so we test individual stat methods instead.
-        """
+        """Test getting rate limiter stats."""
         limiter = SlidingWindowRateLimiter(max_per_second=5)
         limiter.try_acquire()
-        # Test individual methods to avoid deadlock in get_stats()
-        assert limiter.current_usage() == 1
-        assert limiter.max_requests == 5
-        assert limiter._total_acquired == 1
+        stats = limiter.get_stats()
+        assert stats.current_usage == 1
+        assert stats.max_allowed == 5
+        assert stats.total_acquired == 1
+        assert stats.time_until_available == 0.0
 
     def test_reset(self):
         """Test resetting the rate limiter."""
@@ -280,6 +281,873 @@ class TestSlidingWindowRateLimiter:
         assert limiter.try_acquire()
 
 
+class TestProviderGovernor:
+    """Tests for the adaptive per-provider governor."""
+
+    @staticmethod
+    def _governor(rate=0.0, max_in_flight=8, min_in_flight=1):
+        from app.services.rate_limiter import GovernorLimits, ProviderGovernor
+
+        return ProviderGovernor({"fal": GovernorLimits(rate, max_in_flight, min_in_flight)})
+
+    async def test_aimd_on_rate_limits(self):
+        governor = self._governor(rate=10, max_in_flight=8, min_in_flight=2).get("fal")
+
+        governor.report(429, retry_after=0)
+        governor.report(429)  # Same burst: one decrease
+        assert governor.capacity == 4
+        assert governor.requests_per_second == pytest.approx(5)
+
+        governor._last_decrease -= governor.DECREASE_INTERVAL
+        governor.report(503)
+        governor._last_decrease -= governor.DECREASE_INTERVAL
+        governor.report(502)
+        assert governor.capacity == 2  # Floor
+
+        governor.report(404)  # Caller's problem, not congestion
+        assert governor.capacity == 2
+
+        for _ in range(20):
+            governor.report(200)
+        assert governor.capacity > 2
+        assert governor.requests_per_second > 5
+
+    async def test_slots_follow_the_adaptive_limit(self):
+        import asyncio
+
+        governor = self._governor(max_in_flight=4).get("fal")
+        running = 0
+        peak = 0
+
+        async def generation():
+            nonlocal running, peak
+            async with governor.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(generation() for _ in range(10)))
+        assert peak == 4
+
+        governor.back_off()
+        peak = 0
+        await asyncio.gather(*(generation() for _ in range(10)))
+        assert peak == 2
+        assert governor.in_flight == 0
+
+    async def test_request_pauses_after_429(self):
+        import httpx
+
+        provider = self._governor()
+        responses = iter([httpx.Response(429, headers={"Retry-After": "30"}), httpx.Response(200)])
+
+        async def send(url):
+            return next(responses)
+
+        response = await provider.request("fal", send, "https://queue.fal.run/x")
+        assert response.status_code == 429
+        stats = provider.get_stats()["fal"]
+        assert stats["paused_seconds"] > 25
+        assert stats["total_back_offs"] == 1
+
+        provider.get("fal")._blocked_until = 0  # Skip the pause
+        with pytest.raises(httpx.ConnectError):
+            async def unreachable(url):
+                raise httpx.ConnectError("down")
+
+            await provider.request("fal", unreachable, "https://queue.fal.run/x")
+        assert provider.get_stats()["fal"]["total_back_offs"] == 1  # Network errors aren't congestion
+
+    async def test_back_off_reaches_sibling_processes(self, tmp_path, monkeypatch):
+        import asyncio
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "db_path", str(tmp_path / "governor.db"))
+        api, worker = self._governor(), self._governor()
+        await api.start()
+        await worker.start()
+        try:
+            api.get("fal").back_off(rate_limited=True, retry_after=0)
+            for _ in range(50):
+                if worker.get("fal").total_back_offs:
+                    break
+                await asyncio.sleep(0.01)
+            assert worker.get("fal").capacity == 4
+            assert worker.get("fal").total_back_offs == 1
+            assert api.get("fal").total_back_offs == 1  # Not echoed back
+        finally:
+            await api.stop()
+            await worker.stop()
+
+
+class TestRedisRateLimiters:
+    """Tests for the Redis-shared limiters (Redis replaced by a stub)."""
+
+    class _Redis:
+        def __init__(self, reply=None, error=None, loaded=True):
+            self.reply = reply
+            self.error = error
+            self.loaded = loaded
+            self.calls = []
+
+        async def evalsha(self, sha, numkeys, *args):
+            self.calls.append(("evalsha", args))
+            if self.error is not None:
+                raise self.error
+            if not self.loaded:
+                raise Exception("NOSCRIPT No matching script")
+            return self.reply
+
+        async def eval(self, source, numkeys, *args):
+            self.calls.append(("eval", args))
+            self.loaded = True
+            return self.reply
+
+    @staticmethod
+    def _factory(redis):
+        async def get_redis():
+            return redis
+
+        return get_redis
+
+    async def test_sliding_window_uses_shared_reply(self):
+        from app.services.rate_limiter import RedisSlidingWindowRateLimiter
+
+        redis = self._Redis(reply=[0, 5, 1500], loaded=False)
+        limiter = RedisSlidingWindowRateLimiter("t", max_requests=5, window_seconds=10, redis_factory=self._factory(redis))
+
+        assert await limiter.try_acquire() is False
+        assert [call[0] for call in redis.calls] == ["evalsha", "eval"]  # Loaded on NOSCRIPT
+        keys, window_ms, limit = redis.calls[-1][1][:3]
+        assert (keys, window_ms, limit) == ("ratelimit:sw:t", 10000, 5)
+
+        stats = await limiter.get_stats()
+        assert stats.current_usage == 5
+        assert stats.time_until_available == pytest.approx(1.5)
+        assert limiter.local.current_usage() == 0  # Local window untouched
+
+    async def test_token_bucket_parses_string_floats(self):
+        from app.services.rate_limiter import RedisTokenBucketRateLimiter
+
+        redis = self._Redis(reply=[1, "2.5", "0"])
+        limiter = RedisTokenBucketRateLimiter("t", rate=2, burst=4, redis_factory=self._factory(redis))
+
+        assert await limiter.try_acquire() is True
+        assert await limiter.current_tokens() == pytest.approx(2.5)
+        assert await limiter.time_until_tokens(3) == pytest.approx(0.25)
+        assert (await limiter.get_stats())["shared"] is True
+
+    async def test_falls_back_to_local_limit_when_redis_fails(self):
+        from app.services.rate_limiter import RedisTokenBucketRateLimiter
+
+        redis = self._Redis(error=ConnectionError("down"))
+        limiter = RedisTokenBucketRateLimiter("t", rate=0.01, burst=2, redis_factory=self._factory(redis))
+
+        assert await limiter.try_acquire() is True
+        assert await limiter.try_acquire() is True
+        assert await limiter.try_acquire() is False  # Per-process bucket applies
+        assert len(redis.calls) == 1  # Redis not retried until REDIS_RETRY_SECONDS
+        assert (await limiter.get_stats())["shared"] is False
+
+    async def test_no_redis_configured(self):
+        from app.services.rate_limiter import RedisSlidingWindowRateLimiter
+
+        async def no_redis():
+            return None
+
+        limiter = RedisSlidingWindowRateLimiter("t", max_requests=1, redis_factory=no_redis)
+        assert await limiter.acquire(timeout=1) is True
+        assert await limiter.acquire(timeout=0.01) is False
+
+
+class TestRealRedis:
+    """Limiter Lua scripts and the shared cache tier on a real Redis (TEST_REDIS_URL, default localhost)."""
+
+    @pytest.fixture
+    async def redis(self):
+        import os
+
+        redis_asyncio = pytest.importorskip("redis.asyncio")
+        url = os.getenv("TEST_REDIS_URL", "redis://localhost:6379")
+        client = redis_asyncio.from_url(url, decode_responses=True)
+        try:
+            await client.ping()
+        except Exception as e:
+            await client.aclose()
+            pytest.skip(f"Redis not available at {url}: {e}")
+        yield client
+        await client.aclose()
+
+    @staticmethod
+    def _factory(client):
+        async def get_redis():
+            return client
+
+        return get_redis
+
+    async def test_get_redis_connects(self, redis, monkeypatch):
+        from app.services import cache
+
+        url = redis.get_connection_kwargs()
+        monkeypatch.setattr(cache, "REDIS_URL", f"redis://{url['host']}:{url['port']}")
+        monkeypatch.setattr(cache, "_redis_client", None)
+        monkeypatch.setattr(cache, "_redis_retry_at", 0.0)
+
+        client = await cache.get_redis()
+        assert client is not None
+        assert await client.ping()
+        assert cache.get_redis_status() == {"connected": True, "error": None}
+        await client.aclose()
+
+    async def test_shared_cache_tier_and_tag_invalidation(self, redis):
+        import uuid
+        from app.services.cache import ResponseCache
+
+        first = ResponseCache(max_entries=10, local_ttl=0, redis_factory=self._factory(redis))
+        second = ResponseCache(max_entries=10, local_ttl=0, redis_factory=self._factory(redis))
+        key, tag = f"test:{uuid.uuid4().hex}", f"test-tag-{uuid.uuid4().hex}"
+
+        async def load():
+            return {"rows": [1]}
+
+        async def unexpected():
+            raise AssertionError("should come from Redis")
+
+        assert await first.get_or_set(key, load, ttl=60, tags=[tag]) == {"rows": [1]}
+        assert await second.get_or_set(key, unexpected, ttl=60, tags=[tag]) == {"rows": [1]}
+        assert second.shared_hits == 1
+
+        assert await second.invalidate(tag) == 1
+        assert await redis.exists(key, f"cache-tag:{tag}") == 0
+
+    async def test_sliding_window_shared_between_instances(self, redis):
+        import uuid
+        from app.services.rate_limiter import RedisSlidingWindowRateLimiter
+
+        name = f"test-{uuid.uuid4().hex}"
+        first = RedisSlidingWindowRateLimiter(name, max_requests=2, window_seconds=5, redis_factory=self._factory(redis))
+        second = RedisSlidingWindowRateLimiter(name, max_requests=2, window_seconds=5, redis_factory=self._factory(redis))
+        try:
+            assert await first.try_acquire() is True
+            assert await second.try_acquire() is True
+            assert await first.try_acquire() is False  # Limit holds across instances
+            assert await second.current_usage() == 2
+            assert 0 < await second.time_until_available() <= 5
+            assert (await first.get_stats()).current_usage == 2
+            assert first.local.current_usage() == 0  # Redis, not the fallback, decided
+        finally:
+            await first.reset()
+
+    async def test_token_bucket_shared_between_instances(self, redis):
+        import uuid
+        from app.services.rate_limiter import RedisTokenBucketRateLimiter
+
+        name = f"test-{uuid.uuid4().hex}"
+        first = RedisTokenBucketRateLimiter(name, rate=0.5, burst=2, redis_factory=self._factory(redis))
+        second = RedisTokenBucketRateLimiter(name, rate=0.5, burst=2, redis_factory=self._factory(redis))
+        try:
+            assert await first.try_acquire() is True
+            assert await second.try_acquire() is True
+            assert await first.try_acquire() is False
+            assert await second.current_tokens() < 1
+            assert 0 < await first.time_until_tokens() <= 2
+            assert (await second.get_stats())["shared"] is True
+        finally:
+            await redis.delete(first._shared.key)
+
+    async def test_script_reloaded_after_flush(self, redis):
+        import uuid
+        from app.services.rate_limiter import RedisTokenBucketRateLimiter
+
+        limiter = RedisTokenBucketRateLimiter(f"test-{uuid.uuid4().hex}", rate=1, burst=1, redis_factory=self._factory(redis))
+        await redis.script_flush()  # EVALSHA now fails with NOSCRIPT
+        try:
+            assert await limiter.try_acquire() is True
+            assert (await limiter.get_stats())["shared"] is True
+        finally:
+            await redis.delete(limiter._shared.key)
+
+
+class TestResponseCache:
+    """Tests for the two-tier response cache (Redis replaced by a dict-backed stub)."""
+
+    class _Redis:
+        def __init__(self):
+            self.values = {}
+            self.sets = {}
+
+        async def get(self, key):
+            return self.values.get(key)
+
+        async def delete(self, *keys):
+            removed = sum(1 for key in keys if self.values.pop(key, None) is not None)
+            return removed + sum(1 for key in keys if self.sets.pop(key, None) is not None)
+
+        def pipeline(self, transaction=True):
+            redis = self
+
+            class Pipeline:
+                def __init__(self):
+                    self.ops = []
+
+                def setex(self, key, ttl, value):
+                    self.ops.append(lambda: redis.values.__setitem__(key, value))
+
+                def sadd(self, key, member):
+                    self.ops.append(lambda: redis.sets.setdefault(key, set()).add(member))
+
+                def expire(self, key, ttl):
+                    self.ops.append(lambda: None)
+
+                def smembers(self, key):
+                    self.ops.append(lambda: set(redis.sets.get(key, ())))
+
+                def delete(self, key):
+                    self.ops.append(lambda: redis.sets.pop(key, None))
+
+                async def execute(self):
+                    return [op() for op in self.ops]
+
+            return Pipeline()
+
+    @classmethod
+    def _cache(cls, redis=None, **kwargs):
+        from app.services.cache import ResponseCache
+
+        async def get_redis():
+            return redis
+
+        return ResponseCache(redis_factory=get_redis, **kwargs)
+
+    async def test_concurrent_misses_share_one_load(self):
+        import asyncio
+
+        cache = self._cache(max_entries=10, local_ttl=60)
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": calls}
+
+        results = await asyncio.gather(*[cache.get_or_set("k", load) for _ in range(10)])
+
+        assert calls == 1
+        assert results == [{"value": 1}] * 10
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 9
+
+    async def test_failed_load_is_not_cached(self):
+        cache = self._cache(max_entries=10, local_ttl=60)
+
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await cache.get_or_set("k", fail)
+
+        async def load():
+            return 1
+
+        assert await cache.get_or_set("k", load) == 1
+
+    async def test_shared_tier_and_tag_invalidation(self):
+        redis = self._Redis()
+        first = self._cache(redis, max_entries=10, local_ttl=60)
+        second = self._cache(redis, max_entries=10, local_ttl=60)
+
+        async def load():
+            return {"rows": [1, 2]}
+
+        await first.get_or_set("templates:a", load, tags=["templates"])
+        await first.get_or_set("pipelines:a", load, tags=["pipelines"])
+
+        async def unexpected():
+            raise AssertionError("should come from Redis")
+
+        assert await second.get_or_set("templates:a", unexpected) == {"rows": [1, 2]}
+        assert second.shared_hits == 1
+
+        assert await first.invalidate("templates") == 1
+        assert "templates:a" not in redis.values
+        assert "pipelines:a" in redis.values
+        assert (await first.get("templates:a", shared=False))[0] is False
+        assert (await first.get("pipelines:a", shared=False))[0] is True
+
+    async def test_stats_report_why_redis_is_off(self, monkeypatch):
+        from app.services import cache
+
+        monkeypatch.setattr(cache, "REDIS_URL", "")
+        monkeypatch.setattr(cache, "_redis_client", None)
+        monkeypatch.setattr(cache, "_redis_retry_at", 0.0)
+        monkeypatch.setattr(cache, "_redis_error", None)
+
+        assert await cache.get_redis() is None
+        assert cache.ResponseCache().get_stats()["redis"] == {
+            "connected": False,
+            "error": "REDIS_URL is empty",
+        }
+
+    async def test_local_tier_is_bounded(self):
+        cache = self._cache(max_entries=2, local_ttl=60)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key, shared=False)
+
+        assert len(cache.local) == 2
+        assert (await cache.get("a"))[0] is False
+        assert cache.get_stats()["evictions"] == 1
+
+
+class TestPromptEnhancer:
+    """Tests for cached, concurrent prompt enhancement (Claude call stubbed)."""
+
+    @staticmethod
+    def _enhancer(monkeypatch, request):
+        from app.services.cache import response_cache
+        from app.services.prompt_enhancer import PromptEnhancer
+        from tests.conftest import TestingAsyncSessionLocal
+
+        response_cache.clear()
+        enhancer = PromptEnhancer(session_factory=TestingAsyncSessionLocal)
+        enhancer.api_key = "test"
+        monkeypatch.setattr(enhancer, "_request_enhancement", request)
+        return enhancer
+
+    async def test_bulk_runs_concurrently_with_per_prompt_fallback(self, monkeypatch, db_session):
+        import asyncio
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "prompt_enhance_concurrency", 4)
+        running = 0
+        peak = 0
+
+        async def request(prompt, system_prompt):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if prompt == "bad":
+                raise ValueError("Claude API returned 529")
+            return [f"{prompt} enhanced"]
+
+        enhancer = self._enhancer(monkeypatch, request)
+        prompts = [f"concurrent {i}" for i in range(10)] + ["bad"]
+        results = await enhancer.enhance_bulk(prompts, count=1)
+
+        assert peak == 4
+        assert results[:10] == [[f"concurrent {i} enhanced"] for i in range(10)]
+        assert results[10] == enhancer._fallback_enhance("bad", "i2i", 1, "photorealistic", None)
+
+    async def test_results_cached_per_input_and_refreshable(self, monkeypatch, db_session):
+        calls = []
+
+        async def request(prompt, system_prompt):
+            calls.append(prompt)
+            return [f"{prompt} #{len(calls)}"]
+
+        enhancer = self._enhancer(monkeypatch, request)
+
+        first = await enhancer.enhance_prompt("cached beach", count=1)
+        assert await enhancer.enhance_prompt("cached beach", count=1) == first
+        assert len(calls) == 1
+
+        # Any input that changes the request (here via the system prompt) misses
+        await enhancer.enhance_prompt("cached beach", count=1, intensity="wild")
+        assert len(calls) == 2
+
+        fresh = await enhancer.enhance_prompt("cached beach", count=1, use_cache=False)
+        assert fresh != first
+        assert await enhancer.enhance_prompt("cached beach", count=1) == fresh
+        assert len(calls) == 3
+
+    async def test_stored_hit_outlives_local_cache(self, monkeypatch, db_session):
+        import asyncio
+        from datetime import datetime, timedelta
+        from app.models import PromptEnhancement
+        from app.services.cache import response_cache
+
+        calls = []
+
+        async def request(prompt, system_prompt):
+            calls.append(prompt)
+            return [f"{prompt} #{len(calls)}"]
+
+        monkeypatch.setattr(response_cache, "local_ttl", 0.01)
+        enhancer = self._enhancer(monkeypatch, request)
+
+        first = await enhancer.enhance_prompt("stored beach", count=1)
+        await asyncio.sleep(0.05)  # Past cache_local_ttl_seconds
+        assert await enhancer.enhance_prompt("stored beach", count=1) == first
+        response_cache.clear()  # As after a restart
+        assert await enhancer.enhance_prompt("stored beach", count=1) == first
+        assert len(calls) == 1
+        assert db_session.query(PromptEnhancement).count() == 1
+
+        # Expired rows are ignored
+        db_session.query(PromptEnhancement).update(
+            {PromptEnhancement.expires_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db_session.commit()
+        response_cache.clear()
+        assert await enhancer.enhance_prompt("stored beach", count=1) != first
+        assert len(calls) == 2
+
+    async def test_fallbacks_are_not_cached(self, monkeypatch):
+        calls = 0
+
+        async def request(prompt, system_prompt):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ValueError("Claude API returned 500")
+            return ["recovered"]
+
+        enhancer = self._enhancer(monkeypatch, request)
+        await enhancer.enhance_prompt("flaky prompt", count=1)
+        assert await enhancer.enhance_prompt("flaky prompt", count=1) == ["recovered"]
+
+
+class TestPromptGeneratorStreaming:
+    """Tests for incremental prompt generation (Claude stream stubbed)."""
+
+    @staticmethod
+    async def _chunks(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    async def test_split_matches_whole_text_split(self):
+        from app.services.prompt_generator import split_prompts
+
+        chunks = ["a -", "-- b", "--", "-c", " "]
+        split = [p async for p in split_prompts(self._chunks(chunks))]
+        assert split == "".join(chunks).split("---")
+
+    async def test_stream_yields_postprocessed_prompts(self, monkeypatch):
+        from contextlib import asynccontextmanager
+        from app.services import prompt_generator
+
+        chunks = [
+            "the woman in the photo, smiling, caption reads: hi",
+            "\n---\nthe woman in the photo",
+            ", waving\n---\n",
+        ]
+        outer = self
+
+        class FakeAsyncAnthropic:
+            def __init__(self, api_key):
+                self.messages = self
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            @asynccontextmanager
+            async def stream(self, **kwargs):
+                assert kwargs["max_tokens"] == 16000
+
+                class Stream:
+                    text_stream = outer._chunks(chunks)
+
+                yield Stream()
+
+        monkeypatch.setattr(prompt_generator.anthropic, "AsyncAnthropic", FakeAsyncAnthropic)
+
+        prompts = [
+            p async for p in prompt_generator.stream_prompts("key", 2, "cosplay", "mixed")
+        ]
+        assert prompts == [
+            prompt_generator.postprocess_prompt(raw)
+            for raw in "".join(chunks).split("---")
+            if raw.strip()
+        ]
+        assert prompt_generator.BODY_PRESERVE in prompts[0]
+
+        with pytest.raises(ValueError):
+            await prompt_generator.generate_prompts("key", 51, "cosplay", "mixed")
+
+
+class TestHttpClientRegistry:
+    """Tests for the shared pooled HTTP client registry."""
+
+    async def test_same_host_reuses_client(self):
+        """Test that requests to one host share a pooled client."""
+        a = get_http_client("https://queue.fal.run/fal-ai/kling/requests/1/status")
+        b = get_http_client("https://queue.fal.run/fal-ai/wan-i2v")
+        assert a is b
+        await close_http_clients()
+
+    async def test_different_hosts_get_different_clients(self):
+        """Test that each host gets its own pool."""
+        a = get_http_client("https://queue.fal.run/x")
+        b = get_http_client("https://v3.fal.media/files/y.png")
+        assert a is not b
+        await close_http_clients()
+
+    def test_host_timeouts(self):
+        """Test per-host timeout lookup by suffix."""
+        assert get_host_timeout("https://v3.fal.media/files/y.png") == 120.0
+        assert get_host_timeout("https://queue.fal.run/x") == 60.0
+        assert get_host_timeout("https://example.com/x") == 60.0
+
+    async def test_close_http_clients(self):
+        """Test closing the registry closes clients and recreates on demand."""
+        client = get_http_client("https://example.com")
+        await close_http_clients()
+        assert client.is_closed
+        assert get_http_client("https://example.com") is not client
+        await close_http_clients()
+
+    async def test_unlisted_hosts_share_the_fallback_client(self):
+        """Test that arbitrary hosts cannot grow the registry."""
+        from app.http_client import FALLBACK_KEY, _clients
+
+        provider = get_http_client("https://v3.fal.media/files/y.png")
+        shared = {id(get_http_client(f"https://host-{i}.example.com/a.png")) for i in range(50)}
+        assert len(shared) == 1
+        assert provider is not get_http_client("https://host-0.example.com/a.png")
+        assert FALLBACK_KEY in _clients
+        assert not any("example.com" in key for key in _clients)
+        await close_http_clients()
+
+    async def test_client_of_another_loop_is_closed_when_replaced(self):
+        """Test that replacing another running loop's client closes it there."""
+        import asyncio
+        import threading
+
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+        try:
+            async def build():
+                return get_http_client("https://queue.fal.run/x")
+
+            old = asyncio.run_coroutine_threadsafe(build(), other).result(timeout=2)
+            new = get_http_client("https://queue.fal.run/x")
+            assert new is not old
+            for _ in range(100):
+                if old.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+            assert old.is_closed
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join(timeout=2)
+            other.close()
+            await close_http_clients()
+
+
+class TestFalPollScheduler:
+    """Tests for the batched Fal poll scheduler."""
+
+    async def test_wait_resolves_on_completion(self, monkeypatch):
+        """Test that waiters receive the final result once Fal reports completion."""
+        from app import fal_client
+
+        statuses = iter(["pending", "running", "completed"])
+
+        async def fake_get_job_result(model, request_id):
+            status = next(statuses)
+            return {
+                "status": status,
+                "video_url": "https://fal.media/v.mp4" if status == "completed" else None,
+                "error_message": None,
+            }
+
+        monkeypatch.setattr(fal_client, "get_job_result", fake_get_job_result)
+        scheduler = FalPollScheduler(min_interval=0.01, max_interval=0.05)
+
+        result = await scheduler.wait("req-1", "kling", timeout=5)
+
+        assert result["status"] == "completed"
+        assert result["video_url"] == "https://fal.media/v.mp4"
+        assert scheduler.get_stats()["polls"] == 3
+        assert scheduler.get_stats()["tracked"] == 0
+
+    async def test_watch_is_idempotent(self, monkeypatch):
+        """Test that one request_id shares a single future across callers."""
+        from app import image_client
+
+        async def fake_get_image_result(model, request_id):
+            return {"status": "pending", "image_urls": None, "error_message": None}
+
+        monkeypatch.setattr(image_client, "get_image_result", fake_get_image_result)
+        scheduler = FalPollScheduler(min_interval=0.01)
+
+        first = scheduler.watch("req-2", "flux-general", kind="image")
+        second = scheduler.watch("req-2", "flux-general", kind="image")
+
+        assert first is second
+        await scheduler.shutdown()
+
+    async def test_resolve_wakes_waiter(self, monkeypatch):
+        """Test that an external resolve (webhook) wakes waiters without polling."""
+        scheduler = FalPollScheduler(min_interval=10.0)
+        future = scheduler.watch("req-3", "kling")
+
+        assert scheduler.resolve(
+            "req-3", {"status": "failed", "video_url": None, "error_message": "boom"}
+        )
+        result = await future
+
+        assert result["status"] == "failed"
+        assert scheduler.latest("req-3")["error_message"] == "boom"
+        await scheduler.shutdown()
+
+    async def test_wait_timeout(self, monkeypatch):
+        """Test that wait raises TimeoutError and stops tracking by default."""
+        scheduler = FalPollScheduler(min_interval=10.0)
+
+        with pytest.raises(TimeoutError):
+            await scheduler.wait("req-4", "kling", timeout=0.05)
+
+        assert scheduler.get_stats()["tracked"] == 0
+        await scheduler.shutdown()
+
+    def test_interval_backs_off_to_runtime_cap(self):
+        """Test adaptive intervals grow with polls and cap by typical runtime."""
+        from app.services.runtime_stats import RuntimeStatsStore
+
+        scheduler = FalPollScheduler(
+            min_interval=2.0, max_interval=30.0, runtime_stats=RuntimeStatsStore()
+        )
+        scheduler.record_runtime("kling", 100.0)
+        entry = Mock(
+            model="kling",
+            kind="video",
+            polls=0,
+            consecutive_errors=0,
+            resolution=None,
+            duration_sec=None,
+        )
+
+        assert scheduler._next_interval(entry) == 2.0
+        entry.polls = 20
+        assert scheduler._next_interval(entry) == 10.0
+
+
+class FakeS3Client:
+    """Minimal in-memory stand-in for the boto3 S3 client."""
+
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.calls.append("put_object")
+        self.objects[Key] = Body
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise KeyError(Key)
+        return {"ContentLength": len(self.objects[Key])}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.calls.append("create_multipart_upload")
+        self.parts[Key] = []
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        self.parts[Key].append(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        self.objects[Key] = b"".join(self.parts.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.parts.pop(Key, None)
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        self.calls.append("copy_object")
+        self.objects[Key] = self.objects[CopySource["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        self.calls.append("delete_object")
+        self.objects.pop(Key, None)
+
+    def get_paginator(self, operation):
+        objects = self.objects
+
+        class _Paginator:
+            def paginate(self, Bucket, Prefix=""):
+                yield {
+                    "Contents": [
+                        {"Key": k, "Size": len(v)}
+                        for k, v in objects.items()
+                        if k.startswith(Prefix)
+                    ]
+                }
+
+        return _Paginator()
+
+
+class TestAsyncR2Storage:
+    """Tests for the non-blocking R2 storage backend."""
+
+    @staticmethod
+    async def _chunks(*chunks):
+        for chunk in chunks:
+            yield chunk
+
+    def _storage(self, monkeypatch, fake):
+        from app.services import r2_cache
+
+        monkeypatch.setattr(r2_cache, "get_s3_client", lambda: fake)
+        return AsyncR2Storage(max_workers=2, max_concurrent_transfers=1, part_size=10)
+
+    async def test_small_stream_uses_single_put(self, monkeypatch):
+        """Test that objects smaller than one part skip multipart."""
+        fake = FakeS3Client()
+        storage = self._storage(monkeypatch, fake)
+
+        size = await storage.upload_stream("k", self._chunks(b"abc", b"def"), "image/png")
+
+        assert size == 6
+        assert fake.objects["k"] == b"abcdef"
+        assert fake.calls == ["put_object"]
+        assert await storage.exists("k")
+        storage.shutdown()
+
+    async def test_large_stream_uses_multipart(self, monkeypatch):
+        """Test that large streams are uploaded part by part."""
+        fake = FakeS3Client()
+        storage = self._storage(monkeypatch, fake)
+
+        data = [b"x" * 6, b"y" * 6, b"z" * 6, b"w" * 3]
+        size = await storage.upload_stream("v", self._chunks(*data), "video/mp4")
+
+        assert size == 21
+        assert fake.objects["v"] == b"".join(data)
+        assert fake.calls.count("upload_part") == 2
+        assert fake.calls[-1] == "complete_multipart_upload"
+        storage.shutdown()
+
+    async def test_failed_stream_aborts_multipart(self, monkeypatch):
+        """Test that a failing source aborts the multipart upload."""
+        fake = FakeS3Client()
+        storage = self._storage(monkeypatch, fake)
+
+        async def broken():
+            yield b"x" * 12
+            raise ConnectionError("source dropped")
+
+        with pytest.raises(ConnectionError):
+            await storage.upload_stream("v", broken(), "video/mp4")
+
+        assert "abort_multipart_upload" in fake.calls
+        assert "v" not in fake.objects
+        storage.shutdown()
+
+
 class TestSingletonInstances:
     """Test that singleton instances are properly initialized."""
 
@@ -292,3 +1160,1190 @@ class TestSingletonInstances:
         """Test error_classifier singleton."""
         assert error_classifier is not None
         assert isinstance(error_classifier, ErrorClassifier)
+
+
+class TestR2KeyIndex:
+    """Tests for the local R2 key existence index."""
+
+    def _index(self, monkeypatch, fake, db_session):
+        from app.services import r2_cache
+        from tests.conftest import TestingSessionLocal
+
+        monkeypatch.setattr(r2_cache, "get_s3_client", lambda: fake)
+        storage = AsyncR2Storage(max_workers=2)
+        monkeypatch.setattr(r2_cache, "r2_storage", storage)
+        return R2KeyIndex(session_factory=TestingSessionLocal), storage
+
+    async def test_reconcile_hydrates_and_skips_head(self, monkeypatch, db_session):
+        fake = FakeS3Client()
+        fake.objects = {"images/a.png": b"aa", "videos/b.mp4": b"bbb"}
+        index, storage = self._index(monkeypatch, fake, db_session)
+
+        result = await index.reconcile()
+        assert result == {"listed": 2, "added": 2, "removed": 0}
+
+        # After hydration, misses are answered locally (no HEAD fallback)
+        assert await index.contains("images/a.png") is True
+        assert await index.contains("images/missing.png") is False
+        assert index.get_stats()["head_fallbacks"] == 0
+        storage.shutdown()
+
+    async def test_reconcile_removes_stale_keys(self, monkeypatch, db_session):
+        fake = FakeS3Client()
+        index, storage = self._index(monkeypatch, fake, db_session)
+
+        index.add("images/gone.png", 10, "image/png")
+        assert index.contains_local("images/gone.png") is True
+
+        result = await index.reconcile()
+        assert result["removed"] == 1
+        assert index.contains_local("images/gone.png") is False
+        storage.shutdown()
+
+    async def test_unhydrated_miss_falls_back_to_head(self, monkeypatch, db_session):
+        fake = FakeS3Client()
+        fake.objects = {"images/a.png": b"aa"}
+        index, storage = self._index(monkeypatch, fake, db_session)
+
+        assert await index.contains("images/a.png") is True
+        assert index.get_stats()["head_fallbacks"] == 1
+
+        # Recorded, so the second lookup is a local hit
+        assert await index.contains("images/a.png") is True
+        assert index.get_stats()["hits"] == 1
+        storage.shutdown()
+
+    async def test_db_lookups_run_off_the_event_loop(self, monkeypatch, db_session):
+        import threading
+        from tests.conftest import TestingSessionLocal
+
+        fake = FakeS3Client()
+        index, storage = self._index(monkeypatch, fake, db_session)
+        threads = []
+
+        def session_factory():
+            threads.append(threading.current_thread().name)
+            return TestingSessionLocal()
+
+        index._session_factory = session_factory
+        await index.add_async("images/a.png", 2, "image/png")
+        index._keys.clear()  # Force the table lookup
+
+        assert await index.contains_all_local(["images/a.png"]) is True
+        assert await index.contains("images/a.png") is True
+        assert threads and all(name.startswith("r2") for name in threads)
+        storage.shutdown()
+
+
+class TestContentAddressedCache:
+    """Tests for content-addressed media dedup in R2."""
+
+    @pytest.fixture
+    def r2(self, monkeypatch, db_session):
+        import httpx
+        from app.services import r2_cache
+        from tests.conftest import TestingSessionLocal
+
+        fake = FakeS3Client()
+        storage = AsyncR2Storage(max_workers=2)
+        bodies = {
+            "https://v3.fal.media/a/out.mp4": b"same-video",
+            "https://v3.fal.media/b/out.mp4": b"same-video",
+        }
+
+        def handler(request):
+            return httpx.Response(
+                200, content=bodies[str(request.url)], headers={"content-type": "video/mp4"}
+            )
+
+        http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(r2_cache, "get_s3_client", lambda: fake)
+        monkeypatch.setattr(r2_cache, "get_public_url", lambda: "https://cdn.test")
+        monkeypatch.setattr(r2_cache, "get_http_client", lambda url: http)
+        monkeypatch.setattr(r2_cache, "SessionLocal", TestingSessionLocal)
+        monkeypatch.setattr(r2_cache, "r2_storage", storage)
+        monkeypatch.setattr(r2_cache, "r2_key_index", R2KeyIndex())
+        yield r2_cache, fake
+        storage.shutdown()
+
+    async def test_identical_bytes_from_different_urls_stored_once(self, r2):
+        r2_cache, fake = r2
+
+        first = await r2_cache.cache_video("https://v3.fal.media/a/out.mp4")
+        second = await r2_cache.cache_video("https://v3.fal.media/b/out.mp4")
+
+        assert first == second
+        assert first.startswith("https://cdn.test/media/") and first.endswith(".mp4")
+        # One content object; staging objects cleaned up
+        assert list(fake.objects) == [first[len("https://cdn.test/"):]]
+        assert fake.calls.count("copy_object") == 1
+
+    async def test_known_url_resolves_without_download(self, r2):
+        r2_cache, fake = r2
+
+        url = await r2_cache.cache_image(
+            "https://x.test/img.png", image_bytes=b"png", content_type="image/png"
+        )
+        fake.calls.clear()
+
+        assert await r2_cache.cache_image("https://x.test/img.png") == url
+        assert r2_cache.get_cached_url("https://x.test/img.png") == url
+        assert fake.calls == []
+        assert r2_cache.get_cached_url_by_hash(hashlib.sha256(b"png").hexdigest()) == url
+
+
+class TestThumbnailRendering:
+    """Tests for the process-pooled thumbnail pipeline."""
+
+    @staticmethod
+    def _image_bytes(fmt="JPEG", size=(2400, 1600), mode="RGB"):
+        import io
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new(mode, size, (200, 100, 50, 128)[: len(mode)]).save(buffer, format=fmt)
+        return buffer.getvalue()
+
+    def test_renders_all_variants_from_one_decode(self):
+        from app.thumbnail_render import ThumbnailVariant, render_thumbnails
+
+        variants = (
+            ThumbnailVariant("grid", 600, "JPEG", 85),
+            ThumbnailVariant("grid_webp", 600, "WEBP", 80),
+            ThumbnailVariant("preview", 1200, "WEBP", 82),
+        )
+        outputs = render_thumbnails(self._image_bytes(), variants)
+
+        assert outputs["grid"][1:] == (600, 400)
+        assert outputs["grid"][0][:2] == b"\xff\xd8"
+        assert outputs["grid_webp"][0][8:12] == b"WEBP"
+        assert outputs["preview"][1:] == (1200, 800)
+
+    def test_transparent_png_is_not_upscaled(self):
+        from app.thumbnail_render import ThumbnailVariant, render_thumbnails
+
+        outputs = render_thumbnails(
+            self._image_bytes("PNG", (300, 200), "RGBA"),
+            (ThumbnailVariant("grid", 600, "JPEG", 85),),
+        )
+        assert outputs["grid"][1:] == (300, 200)
+
+    async def test_engine_renders_in_process_pool(self):
+        from app.services.thumbnail import ThumbnailEngine
+        from app.thumbnail_render import ThumbnailVariant
+
+        engine = ThumbnailEngine(
+            max_workers=1,
+            max_concurrent=2,
+            variants=(ThumbnailVariant("grid", 600, "JPEG", 85),),
+        )
+        try:
+            outputs = await engine.render(self._image_bytes())
+            assert outputs["grid"][1:] == (600, 400)
+        finally:
+            engine.shutdown()
+
+
+class TestThumbnailBackfill:
+    """Tests for the checkpointed thumbnail backfill."""
+
+    @pytest.fixture
+    def backfill(self, monkeypatch, db_session, tmp_path):
+        import json
+        from app.models import Pipeline, PipelineStep
+        from app.services import thumbnail_backfill as module
+        from app.services.checkpoint_manager import CheckpointManager
+        from tests.conftest import TestingSessionLocal
+
+        pipeline = Pipeline(name="backfill")
+        db_session.add(pipeline)
+        db_session.flush()
+        for i in range(5):
+            outputs = {"image_urls": [f"https://x.test/{i}.png"]}
+            if i == 1:
+                outputs["thumbnail_urls"] = ["https://cdn.test/t1.jpg"]
+            db_session.add(
+                PipelineStep(
+                    pipeline_id=pipeline.id,
+                    step_type="i2i",
+                    step_order=i,
+                    status="completed",
+                    outputs=json.dumps(outputs),
+                )
+            )
+        db_session.commit()
+
+        rendered = []
+
+        async def fake_batch(urls):
+            rendered.extend(urls)
+            return [u.replace("x.test", "cdn.test") for u in urls]
+
+        monkeypatch.setattr(module, "generate_thumbnails_batch", fake_batch)
+
+        def make():
+            return module.ThumbnailBackfill(
+                chunk_size=2,
+                images_per_second=1000,
+                chunk_pause=0,
+                checkpoint=CheckpointManager(
+                    "thumbs", checkpoint_dir=str(tmp_path), use_locking=False
+                ),
+                session_factory=TestingSessionLocal,
+            )
+
+        return make, rendered
+
+    async def test_backfill_processes_in_chunks_and_checkpoints(self, backfill):
+        make, rendered = backfill
+
+        progress = await make().run()
+
+        assert progress["status"] == "completed"
+        assert progress["scanned"] == 5
+        assert progress["processed"] == 4
+        assert progress["skipped"] == 1
+        assert len(rendered) == 4
+
+    async def test_backfill_resumes_from_checkpoint(self, backfill, db_session):
+        from app.models import PipelineStep
+
+        make, rendered = backfill
+        first_ids = [s.id for s in db_session.query(PipelineStep).order_by(PipelineStep.id)][:2]
+
+        # Simulate a run interrupted after the first chunk
+        runner = make()
+        runner.checkpoint.write(
+            "i2i_thumbnails", status="running", last_step_id=first_ids[-1],
+            total=5, scanned=2, processed=1, skipped=1, failed=0,
+        )
+
+        progress = await make().run()
+
+        assert rendered == ["https://x.test/2.png", "https://x.test/3.png", "https://x.test/4.png"]
+        assert progress["scanned"] == 5
+        assert progress["processed"] == 4
+
+
+class TestDatabaseRouting:
+    """Tests for read/write session routing and SQLite connection tuning."""
+
+    def test_selects_use_read_pool_until_transaction_writes(self):
+        from sqlalchemy import insert, select
+        from app.database import SessionLocal, read_engine, write_engine
+        from app.models import Job
+
+        db = SessionLocal()
+        try:
+            db.begin()
+            assert db.get_bind(clause=select(Job)) is read_engine
+            assert db.get_bind(clause=select(Job).with_for_update()) is write_engine
+            assert db.get_bind(clause=insert(Job)) is write_engine
+            # Rest of the writing transaction stays on the writer
+            assert db.get_bind(clause=select(Job)) is write_engine
+            db.rollback()
+            assert db.get_bind(clause=select(Job)) is read_engine
+        finally:
+            db.close()
+
+    def test_connection_pragmas(self):
+        from sqlalchemy import text
+        from app.database import read_engine, write_engine, get_pool_stats
+
+        with write_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+        with read_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+
+        stats = get_pool_stats()
+        assert stats["writer"]["pool_size"] == 1
+        assert stats["writer"]["checkouts"] >= 1
+        assert stats["writer"]["checked_out"] == 0
+
+
+class TestJobClaims:
+    """Tests for atomic leased job claiming."""
+
+    @staticmethod
+    def _jobs(db_session, count):
+        from app.models import Job
+
+        jobs = [Job(image_url=f"https://x.test/{i}.png", motion_prompt="p") for i in range(count)]
+        db_session.add_all(jobs)
+        db_session.commit()
+        return [job.id for job in jobs]
+
+    def test_workers_claim_disjoint_jobs(self, db_session):
+        from app.services.job_claims import claim_jobs
+
+        ids = self._jobs(db_session, 3)
+
+        first = claim_jobs(db_session, "worker-a", limit=2)
+        second = claim_jobs(db_session, "worker-b", limit=2)
+
+        assert [job.id for job in first] == ids[:2]
+        assert [job.id for job in second] == ids[2:]
+        assert {job.claimed_by for job in first} == {"worker-a"}
+        assert all(job.wan_status == "claimed" and job.lease_expires_at for job in first)
+        assert claim_jobs(db_session, "worker-c", limit=2) == []
+
+    def test_expired_lease_is_reclaimed(self, db_session):
+        from app.services.job_claims import claim_jobs, renew_leases
+
+        (job_id,) = self._jobs(db_session, 1)
+        claim_jobs(db_session, "crashed", limit=1, lease_seconds=-1)
+
+        (job,) = claim_jobs(db_session, "healthy", limit=1)
+        assert job.id == job_id
+        assert job.claimed_by == "healthy"
+        assert job.claim_count == 2
+        # The original worker can no longer extend a lease it lost
+        assert renew_leases(db_session, [job_id], "crashed") == 0
+        assert renew_leases(db_session, [job_id], "healthy") == 1
+
+    def test_excluded_jobs_are_skipped(self, db_session):
+        from app.services.job_claims import claim_jobs
+
+        ids = self._jobs(db_session, 2)
+        claimed = claim_jobs(db_session, "worker-a", limit=2, exclude_ids=[str(ids[0])])
+        assert [job.id for job in claimed] == [ids[1]]
+
+    def test_expired_running_job_is_reclaimed_unless_submitted(self, db_session):
+        from app.services.job_claims import claim_jobs
+
+        ids = self._jobs(db_session, 2)
+        local, submitted = claim_jobs(db_session, "crashed", limit=2, lease_seconds=-1)
+        local.wan_status = "running"  # SwarmUI generation in progress
+        submitted.wan_status = "running"
+        submitted.wan_request_id = "fal-req-1"  # Owned by the poller
+        db_session.commit()
+
+        reclaimed = claim_jobs(db_session, "healthy", limit=2)
+        assert [job.id for job in reclaimed] == [ids[0]]
+
+    def test_image_jobs_are_claimed_once(self, db_session):
+        from app.models import ImageJob
+        from app.services.job_claims import claim_image_jobs
+
+        db_session.add_all(
+            [ImageJob(source_image_url=f"https://x.test/{i}.png", prompt="p") for i in range(3)]
+        )
+        db_session.commit()
+
+        first = claim_image_jobs(db_session, "worker-a", limit=2)
+        second = claim_image_jobs(db_session, "worker-b", limit=2)
+        assert len(first) == 2 and len(second) == 1
+        assert {job.id for job in first}.isdisjoint(job.id for job in second)
+        assert all(job.status == "claimed" for job in first + second)
+
+    async def test_hold_leases_renews_running_job(self, db_session):
+        import asyncio
+        from datetime import datetime
+        from app.services.job_claims import claim_jobs, hold_leases
+        from tests.conftest import TestingSessionLocal
+
+        self._jobs(db_session, 1)
+        (job,) = claim_jobs(db_session, "worker-a", limit=1, lease_seconds=3)
+        job.wan_status = "running"
+        db_session.commit()
+        first_lease = job.lease_expires_at
+
+        async with hold_leases(
+            [job.id], "worker-a", lease_seconds=3, session_factory=TestingSessionLocal
+        ):
+            await asyncio.sleep(1.2)
+
+        db_session.refresh(job)
+        assert job.lease_expires_at > first_lease
+        assert job.lease_expires_at > datetime.utcnow()
+
+
+class TestWorkerLanes:
+    """Tests for supervised worker lanes."""
+
+    async def test_slow_lane_does_not_block_fast_lane(self):
+        import asyncio
+        from app.services.worker_lanes import Lane, LaneSupervisor
+
+        stop = asyncio.Event()
+        fast_cycles = []
+
+        async def slow(lane):
+            await asyncio.sleep(10)
+
+        async def fast(lane):
+            fast_cycles.append(1)
+            if len(fast_cycles) >= 3:
+                stop.set()
+
+        supervisor = LaneSupervisor(
+            [Lane("slow", slow, interval=0), Lane("fast", fast, interval=0.01)],
+            shutdown_timeout=0.1,
+        )
+        await asyncio.wait_for(supervisor.run(stop), timeout=5)
+
+        assert len(fast_cycles) >= 3
+        assert supervisor.lanes["slow"].stats.cycles == 0
+
+    async def test_failing_cycle_is_retried(self):
+        import asyncio
+        from app.services.worker_lanes import Lane
+
+        stop = asyncio.Event()
+        calls = []
+
+        async def flaky(lane):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            stop.set()
+
+        lane = Lane("flaky", flaky, interval=0)
+        await asyncio.wait_for(lane.run(stop), timeout=5)
+
+        assert lane.stats.errors == 1
+        assert lane.stats.cycles == 1
+        assert lane.stats.last_error == "boom"
+
+    async def test_gather_respects_concurrency(self):
+        import asyncio
+        from app.services.worker_lanes import Lane
+
+        lane = Lane("bounded", Mock(), interval=1, concurrency=2)
+        active = peak = 0
+
+        async def work(i):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return i
+
+        assert await lane.gather(*(work(i) for i in range(6))) == list(range(6))
+        assert peak == 2
+
+    async def test_notify_wakes_lane_before_interval(self):
+        import asyncio
+        from app.services.worker_lanes import Lane
+
+        stop = asyncio.Event()
+        cycles = []
+
+        async def cycle(lane):
+            cycles.append(1)
+            if len(cycles) == 2:
+                stop.set()
+
+        lane = Lane("woken", cycle, interval=60)
+        task = asyncio.create_task(lane.run(stop))
+        await asyncio.sleep(0.01)
+        lane.notify()
+        await asyncio.wait_for(task, timeout=2)
+
+        assert len(cycles) == 2
+        assert lane.stats.wakeups == 1
+
+
+class TestJobNotify:
+    """Tests for cross-process job notifications."""
+
+    @staticmethod
+    def _use_backend(monkeypatch, tmp_path, backend):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "job_notify_backend", backend)
+        monkeypatch.setattr(settings, "db_path", str(tmp_path / "notify.db"))
+
+    def test_backend_selection(self, monkeypatch, tmp_path):
+        from app.config import settings
+        from app.services import job_notify
+
+        self._use_backend(monkeypatch, tmp_path, "auto")
+        assert job_notify.get_backend() == "socket"
+        monkeypatch.setattr(settings, "database_url", "postgresql://u:p@db/i2v")
+        assert job_notify.get_backend() == "postgres"
+        self._use_backend(monkeypatch, tmp_path, "none")
+        assert not job_notify.is_enabled()
+
+    async def test_socket_listener_receives_subscribed_kinds(self, monkeypatch, tmp_path):
+        import asyncio
+        from app.services.job_notify import JobNotificationListener, notify_jobs
+
+        self._use_backend(monkeypatch, tmp_path, "socket")
+        received = asyncio.Queue()
+        listener = JobNotificationListener(["video", "completed"], received.put_nowait)
+        await listener.start()
+        try:
+            await notify_jobs("image")  # Not subscribed
+            await notify_jobs("video")
+            assert await asyncio.wait_for(received.get(), timeout=2) == "video"
+            assert received.empty()
+        finally:
+            await listener.stop()
+
+        assert not list(listener._paths)
+        await notify_jobs("video")  # No listeners left: silently a no-op
+
+    async def test_every_listener_is_woken(self, monkeypatch, tmp_path):
+        import asyncio
+        from app.services.job_notify import JobNotificationListener, notify_jobs_sync
+
+        self._use_backend(monkeypatch, tmp_path, "socket")
+        events = [asyncio.Event(), asyncio.Event()]
+        listeners = [JobNotificationListener(["image"], lambda _, e=e: e.set()) for e in events]
+        for listener in listeners:
+            await listener.start()
+        try:
+            notify_jobs_sync("image")
+            await asyncio.wait_for(asyncio.gather(*(e.wait() for e in events)), timeout=2)
+        finally:
+            for listener in listeners:
+                await listener.stop()
+
+    async def test_disabled_backend_sends_nothing(self, monkeypatch, tmp_path):
+        from app.services import job_notify
+
+        self._use_backend(monkeypatch, tmp_path, "none")
+        calls = []
+        monkeypatch.setattr(job_notify, "_send_datagrams", calls.append)
+        await job_notify.notify_jobs("video")
+        assert calls == []
+
+    def test_unknown_kind_is_rejected(self):
+        from app.services.job_notify import notify_jobs_sync
+
+        with pytest.raises(ValueError):
+            notify_jobs_sync("audio")
+
+
+class TestBatchQueue:
+    """Tests for the durable, DB-backed batch queue."""
+
+    @pytest.fixture
+    def session_factory(self, db_session):
+        # One connection per session, like production: consumers claim from threads
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import NullPool
+        from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+        engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        engine.dispose()
+
+    @pytest.fixture(autouse=True)
+    def fast_queue(self, monkeypatch):
+        from app.config import settings
+        from app.services.error_classifier import error_classifier
+
+        monkeypatch.setattr(settings, "batch_queue_poll_interval_seconds", 0.05)
+        monkeypatch.setattr(settings, "batch_progress_flush_ms", 50)
+        monkeypatch.setattr(error_classifier, "get_retry_delay", lambda error, attempt=1: 0.0)
+
+    @staticmethod
+    def _batch(db_session, items, status="queued", item_status="pending"):
+        from app.models import BatchJob, BatchJobItem, User
+
+        user = User(email=f"batch-{items}-{status}@x.test", hashed_password="x", credits_balance=10_000)
+        db_session.add(user)
+        db_session.flush()
+        job = BatchJob(
+            job_id=f"job-{user.id}",
+            user_id=user.id,
+            quantity=items,
+            pending_items=items,
+            status=status,
+            config='{"model": "flux"}',
+        )
+        db_session.add(job)
+        db_session.flush()
+        db_session.add_all(
+            [BatchJobItem(batch_job_id=job.id, item_index=i, status=item_status) for i in range(items)]
+        )
+        db_session.commit()
+        return job
+
+    @staticmethod
+    async def _wait_for(db_session, job, statuses=("completed", "failed")):
+        import asyncio
+
+        for _ in range(200):
+            db_session.expire_all()
+            if db_session.get(type(job), job.id).status in statuses:
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError(f"job still {job.status}")
+
+    async def test_fixed_pool_drains_batch(self, db_session, session_factory):
+        import asyncio
+        from app.services.batch_queue import BatchQueue
+
+        job = self._batch(db_session, 6)
+        active = peak = 0
+
+        async def generate(item, config):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return f"https://cdn.test/{item.item_index}.png"
+
+        queue = BatchQueue(max_concurrency=2, generation_fn=generate, session_factory=session_factory)
+        await queue.start()
+        try:
+            await self._wait_for(db_session, job)
+        finally:
+            await queue.stop()
+
+        db_session.refresh(job)
+        assert job.status == "completed"
+        assert (job.completed_items, job.failed_items, job.pending_items) == (6, 0, 0)
+        assert all(item.status == "completed" and item.result_url for item in job.items)
+        assert len(queue._consumers) == 0 and peak == 2
+
+    async def test_progress_writes_are_coalesced_and_flushed_on_stop(
+        self, db_session, session_factory, monkeypatch
+    ):
+        import asyncio
+        from app.config import settings
+        from app.services.batch_queue import BatchQueue, JobState
+
+        monkeypatch.setattr(settings, "batch_progress_flush_items", 4)
+        monkeypatch.setattr(settings, "batch_progress_flush_ms", 60_000)
+        job = self._batch(db_session, 10)
+
+        async def generate(item, config):
+            return "https://cdn.test/x.png"
+
+        queue = BatchQueue(max_concurrency=3, generation_fn=generate, session_factory=session_factory)
+        state = queue._jobs[job.job_id] = JobState(
+            job_id=job.job_id, status="queued", quantity=10, pending=10
+        )
+        await queue.start()
+        try:
+            for _ in range(200):
+                if state.pending == 0:
+                    break
+                await asyncio.sleep(0.01)
+            # Fast reads see outcomes before they are flushed
+            assert (state.completed, state.pending) == (10, 0)
+        finally:
+            await queue.stop()  # Flushes the remainder exactly
+
+        db_session.refresh(job)
+        assert queue._progress.flushes <= 3  # Every 4 outcomes (or more), the rest on stop
+        assert (job.status, job.completed_items, job.pending_items) == ("completed", 10, 0)
+        assert all(item.status == "completed" for item in job.items)
+
+    async def test_retryable_failure_is_retried_until_attempts_run_out(
+        self, db_session, session_factory
+    ):
+        from app.services.batch_queue import BatchQueue
+
+        job = self._batch(db_session, 2)
+        calls = {}
+
+        async def generate(item, config):
+            calls[item.item_index] = calls.get(item.item_index, 0) + 1
+            if item.item_index == 0 and calls[0] == 1:
+                raise ConnectionError("upstream reset")
+            if item.item_index == 1:
+                raise ConnectionError("always down")
+            return "https://cdn.test/ok.png"
+
+        queue = BatchQueue(max_concurrency=1, generation_fn=generate, session_factory=session_factory)
+        await queue.start()
+        try:
+            await self._wait_for(db_session, job)
+        finally:
+            await queue.stop()
+
+        db_session.refresh(job)
+        first, second = sorted(job.items, key=lambda item: item.item_index)
+        assert calls == {0: 2, 1: 3}
+        assert first.status == "completed" and first.claim_count == 2
+        assert second.status == "failed" and second.error_message == "always down"
+        assert (job.status, job.completed_items, job.failed_items) == ("completed", 1, 1)
+
+    async def test_start_resumes_crashed_batches(self, db_session, session_factory):
+        from datetime import datetime, timedelta
+        from app.services.batch_queue import BatchQueue
+
+        # Crashed mid-item: running with an expired lease
+        interrupted = self._batch(db_session, 1, status="running", item_status="running")
+        (item,) = interrupted.items
+        item.claimed_by = "crashed"
+        item.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        # Crashed after its last item but before finalizing
+        finished = self._batch(db_session, 2, status="running", item_status="completed")
+        finished.completed_items, finished.pending_items = 2, 0
+        db_session.commit()
+
+        async def generate(item, config):
+            return "https://cdn.test/resumed.png"
+
+        queue = BatchQueue(max_concurrency=1, generation_fn=generate, session_factory=session_factory)
+        await queue.start()
+        try:
+            await self._wait_for(db_session, interrupted)
+        finally:
+            await queue.stop()
+
+        db_session.refresh(item)
+        db_session.refresh(finished)
+        assert item.result_url == "https://cdn.test/resumed.png"
+        assert item.claimed_by == queue.worker_id and item.claim_count == 1
+        assert finished.status == "completed"
+
+    async def test_stop_releases_in_flight_items(self, db_session, session_factory):
+        import asyncio
+        from app.services.batch_queue import BatchQueue
+
+        job = self._batch(db_session, 1)
+        started = asyncio.Event()
+
+        async def generate(item, config):
+            started.set()
+            await asyncio.sleep(60)
+
+        queue = BatchQueue(max_concurrency=1, generation_fn=generate, session_factory=session_factory)
+        await queue.start()
+        await asyncio.wait_for(started.wait(), timeout=2)
+        await queue.stop()
+
+        (item,) = job.items
+        db_session.refresh(item)
+        db_session.refresh(job)
+        assert item.status == "pending" and item.lease_expires_at is None
+        assert job.status == "running" and job.pending_items == 1
+
+    async def test_cancel_stops_claiming_and_in_flight_items(self, db_session, session_factory):
+        import asyncio
+        from app.services.batch_queue import BatchQueue
+
+        job = self._batch(db_session, 3)
+        started = asyncio.Event()
+
+        async def generate(item, config):
+            started.set()
+            await asyncio.sleep(60)
+
+        queue = BatchQueue(max_concurrency=1, generation_fn=generate, session_factory=session_factory)
+        await queue.start()
+        try:
+            await asyncio.wait_for(started.wait(), timeout=2)
+            assert await queue.cancel_job(job.job_id, job.user_id)
+            await asyncio.sleep(0.1)
+        finally:
+            await queue.stop()
+
+        db_session.expire_all()
+        assert db_session.get(type(job), job.id).status == "canceled"
+        assert [item.status for item in job.items] == ["canceled"] * 3
+
+    async def test_cancel_refunds_only_items_that_did_not_complete(
+        self, db_session, session_factory, monkeypatch
+    ):
+        import asyncio
+        from app.config import settings
+        from app.models import User
+        from app.services.batch_queue import BatchQueue
+
+        # Outcomes stay in the aggregator until cancel_job flushes them
+        monkeypatch.setattr(settings, "batch_progress_flush_ms", 60_000)
+        job = self._batch(db_session, 4)
+        job.credits_charged = 40
+        db_session.commit()
+        hanging = asyncio.Event()
+
+        async def generate(item, config):
+            if item.item_index == 0:
+                return "https://cdn.test/done.png"
+            hanging.set()
+            await asyncio.sleep(60)
+
+        queue = BatchQueue(max_concurrency=2, generation_fn=generate, session_factory=session_factory)
+        await queue.start()
+        try:
+            await asyncio.wait_for(hanging.wait(), timeout=2)
+            for _ in range(100):
+                if queue._progress.pending_for(job.job_id):
+                    break
+                await asyncio.sleep(0.01)
+            assert await queue.cancel_job(job.job_id, job.user_id)
+        finally:
+            await queue.stop()
+
+        db_session.expire_all()
+        job = db_session.get(type(job), job.id)
+        items = sorted(job.items, key=lambda item: item.item_index)
+        assert [item.status for item in items] == ["completed"] + ["canceled"] * 3
+        assert job.credits_refunded == 30
+        assert db_session.get(User, job.user_id).credits_balance == 10_000 + 30
+
+
+class TestRuntimeStats:
+    """Tests for persistent per-model latency statistics."""
+
+    @pytest.fixture
+    def store_factory(self, db_session):
+        from app.services.runtime_stats import RuntimeStatsStore
+        from tests.conftest import TestingSessionLocal
+
+        return lambda: RuntimeStatsStore(session_factory=TestingSessionLocal)
+
+    def test_histogram_percentiles_are_accurate(self):
+        from app.services.runtime_stats import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for seconds in range(1, 1001):
+            histogram.record(seconds)
+
+        assert histogram.percentile(0.5) == pytest.approx(500, rel=0.03)
+        assert histogram.percentile(0.95) == pytest.approx(950, rel=0.03)
+        assert histogram.percentile(0.99) == pytest.approx(990, rel=0.03)
+        assert histogram.percentile(1.0) == 1000
+        assert histogram.mean == pytest.approx(500.5)
+        restored = LatencyHistogram.from_json(histogram.to_json())
+        assert restored.percentile(0.95) == histogram.percentile(0.95)
+
+    def test_histogram_decays_towards_recent_runtimes(self):
+        from app.services.runtime_stats import MAX_WEIGHT, LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for _ in range(int(MAX_WEIGHT)):
+            histogram.record(100.0)
+        for _ in range(int(MAX_WEIGHT)):
+            histogram.record(10.0)  # Provider got faster
+
+        assert histogram.weight <= MAX_WEIGHT
+        assert histogram.samples == 2 * MAX_WEIGHT
+        assert histogram.percentile(0.5) == pytest.approx(10, rel=0.03)
+
+    def test_sparse_key_falls_back_to_model_aggregate(self, store_factory):
+        store = store_factory()
+        for seconds in (60, 70, 80, 90, 100):
+            store.record("kling", "video", seconds, resolution="1080p", duration_sec=5)
+        store.record("kling", "video", 200, resolution="720p", duration_sec=10)
+
+        assert store.percentile("kling", "video", 1.0, "1080p", 5) == 100
+        # One 720p sample: the estimate uses every kling video runtime
+        assert store.histogram("kling", "video", "720p", 10).samples == 6
+        assert store.percentile("veo2", "video", 0.5) is None
+        assert store.typical_runtime("veo2", "video", default=120.0) == 120.0
+
+    def test_timeout_budget_follows_p99_within_bounds(self, store_factory, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "runtime_stats_min_samples", 5)
+        monkeypatch.setattr(settings, "runtime_timeout_multiplier", 3.0)
+        monkeypatch.setattr(settings, "runtime_timeout_min_seconds", 120)
+        monkeypatch.setattr(settings, "runtime_timeout_max_seconds", 3600)
+        store = store_factory()
+
+        store.record("kling", "video", 100)
+        assert store.timeout_budget("kling", "video", default=600) == 600  # Too few samples
+        for _ in range(4):
+            store.record("kling", "video", 100)
+        assert store.timeout_budget("kling", "video", default=600) == pytest.approx(300)
+
+        for _ in range(5):
+            store.record("flux", "image", 5)
+            store.record("sora", "video", 2000)
+        assert store.timeout_budget("flux", "image", default=300) == 120
+        assert store.timeout_budget("sora", "video", default=600) == 3600
+
+    async def test_processes_share_statistics_through_the_database(self, store_factory):
+        api, worker = store_factory(), store_factory()
+
+        api.record("kling", "video", 100)
+        await api.flush()
+        for _ in range(3):
+            worker.record("kling", "video", 200)
+        await worker.flush()
+        await api.flush()  # Nothing new to store; reload happens on the next change or start
+
+        restarted = store_factory()
+        await restarted.start()
+        try:
+            histogram = restarted.histogram("kling", "video")
+            assert histogram.samples == 4
+            assert histogram.mean == pytest.approx(175)
+            assert worker.histogram("kling", "video").samples == 4  # Reloaded after its flush
+        finally:
+            await restarted.stop()
+
+    async def test_failed_flush_keeps_observations(self, store_factory, monkeypatch):
+        store = store_factory()
+        store.record("kling", "video", 100)
+
+        def broken(unflushed):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(store, "_store", broken)
+        await store.flush()
+        monkeypatch.undo()
+
+        await store.flush()
+        assert store_factory()._load()[next(iter(store._histograms))].samples == 1
+
+
+class TestPipelineFanOut:
+    """Tests for concurrent I2I/I2V step execution."""
+
+    @pytest.fixture(autouse=True)
+    def no_caching(self, monkeypatch):
+        from app.services import pipeline_executor as module
+
+        async def passthrough(urls, prefix="videos"):
+            return [None] * len(urls)
+
+        async def no_thumbnails(urls):
+            return list(urls)
+
+        monkeypatch.setattr(module, "cache_images_batch", passthrough)
+        monkeypatch.setattr(module, "cache_videos_batch", passthrough)
+        monkeypatch.setattr(module, "generate_thumbnails_batch", no_thumbnails)
+
+    @staticmethod
+    def _executor(**limits):
+        from app.services.pipeline_executor import PipelineExecutor
+        from app.services.rate_limiter import GovernorLimits, ProviderGovernor
+
+        return PipelineExecutor(
+            governor=ProviderGovernor(
+                {key: GovernorLimits(0, limit) for key, limit in limits.items()}
+            )
+        )
+
+    async def test_i2i_runs_concurrently_and_keeps_order(self):
+        import asyncio
+        import random
+
+        running = 0
+        peak = 0
+
+        async def generate(source_image_url, prompt, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(random.uniform(0, 0.02))
+            running -= 1
+            return [f"{source_image_url}/{prompt}"]
+
+        outputs = await self._executor(fal=100)._execute_i2i(
+            {"model": "flux-2-dev", "max_concurrency": 3},
+            {"image_urls": ["a", "b", "c"], "prompts": ["p1", "p2", "p3", "p4"]},
+            generate,
+        )
+
+        assert peak == 3
+        assert outputs["image_urls"] == [f"{i}/{p}" for i in "abc" for p in ("p1", "p2", "p3", "p4")]
+        assert "errors" not in outputs
+
+    async def test_provider_limit_spans_steps(self):
+        import asyncio
+
+        running = 0
+        peak = 0
+
+        async def generate(image_url, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return image_url
+
+        executor = self._executor(fal=2)
+        step = {"model": "kling", "max_concurrency": 10}
+        inputs = {"image_urls": [str(i) for i in range(5)]}
+        await asyncio.gather(
+            executor._execute_i2v(step, inputs, generate),
+            executor._execute_i2v(step, inputs, generate),
+        )
+        assert peak == 2
+
+    async def test_partial_failure_reports_errors(self):
+        async def generate(image_url, **kwargs):
+            if image_url == "bad":
+                raise RuntimeError("content policy")
+            return f"{image_url}.mp4"
+
+        outputs = await self._executor()._execute_i2v(
+            {"model": "kling", "videos_per_image": 2},
+            {"image_urls": ["a", "bad", "c"]},
+            generate,
+        )
+        assert outputs["video_urls"] == ["a.mp4", "a.mp4", "c.mp4", "c.mp4"]
+        assert outputs["count"] == 4
+        assert outputs["failed_count"] == 2
+        assert [e["unit"] for e in outputs["errors"]] == [[1, 0], [1, 1]]
+
+        async def always_fails(**kwargs):
+            raise RuntimeError("provider down")
+
+        with pytest.raises(RuntimeError, match="provider down"):
+            await self._executor()._execute_i2v({"model": "kling"}, {"image_urls": ["a"]}, always_fails)
+
+    async def test_retry_resumes_from_persisted_results(self, db_session):
+        import json
+        from app.models import Pipeline, PipelineStep
+        from app.services.pipeline_executor import StepProgress
+
+        pipeline = Pipeline(name="fan-out")
+        db_session.add(pipeline)
+        db_session.flush()
+        step = PipelineStep(pipeline_id=pipeline.id, step_type="i2v", step_order=0, status="running")
+        db_session.add(step)
+        db_session.commit()
+
+        async def broadcast(data):
+            pass
+
+        calls = []
+
+        async def flaky(image_url, **kwargs):
+            calls.append(image_url)
+            if image_url == "c":
+                raise RuntimeError("timeout")
+            return f"{image_url}.mp4"
+
+        config = {"model": "kling"}
+        inputs = {"image_urls": ["a", "b", "c"]}
+        progress = StepProgress(db_session, step, broadcast, flush_seconds=0)
+        await self._executor()._execute_i2v(config, inputs, flaky, progress)
+
+        db_session.expire_all()
+        persisted = json.loads(step.outputs)
+        assert persisted["completed_units"] == 2
+        assert persisted["failed_units"] == 1
+
+        calls.clear()
+
+        async def healthy(image_url, **kwargs):
+            calls.append(image_url)
+            return f"{image_url}.mp4"
+
+        progress = StepProgress(db_session, step, broadcast, flush_seconds=0)
+        outputs = await self._executor()._execute_i2v(config, inputs, healthy, progress)
+        assert calls == ["c"]
+        assert outputs["video_urls"] == ["a.mp4", "b.mp4", "c.mp4"]
+
+    async def test_i2v_streams_from_running_i2i(self, db_session):
+        import asyncio
+        import json
+        from app.models import Pipeline, PipelineStep
+
+        pipeline = Pipeline(name="streamed")
+        db_session.add(pipeline)
+        db_session.flush()
+        i2i = PipelineStep(
+            pipeline_id=pipeline.id,
+            step_type="i2i",
+            step_order=0,
+            config=json.dumps({"model": "flux-2-dev"}),
+            inputs=json.dumps({"image_urls": ["src"], "prompts": ["fast", "slow"]}),
+        )
+        i2v = PipelineStep(
+            pipeline_id=pipeline.id,
+            step_type="i2v",
+            step_order=1,
+            config=json.dumps({"model": "kling"}),
+            inputs=json.dumps({"prompts": ["pan"]}),
+        )
+        db_session.add_all([i2i, i2v])
+        db_session.commit()
+
+        slow_done = asyncio.Event()
+        videos_before_slow_image = []
+
+        async def images(source_image_url, prompt, **kwargs):
+            if prompt == "slow":
+                await asyncio.sleep(0.1)
+                slow_done.set()
+            return [f"{prompt}.png"]
+
+        async def videos(image_url, **kwargs):
+            if not slow_done.is_set():
+                videos_before_slow_image.append(image_url)
+            return f"{image_url}.mp4"
+
+        await self._executor().execute_pipeline(db_session, pipeline.id, images, videos)
+
+        db_session.expire_all()
+        assert videos_before_slow_image == ["fast.png"]
+        assert i2v.status == "completed"
+        assert i2v.get_outputs()["video_urls"] == ["fast.png.mp4", "slow.png.mp4"]
+        assert i2v.get_inputs()["image_urls"] == ["fast.png", "slow.png"]
+
+    async def test_streamed_i2v_resumes_without_streaming(self, db_session, monkeypatch):
+        import asyncio
+        import json
+        from app.config import settings
+        from app.models import Pipeline, PipelineStep
+        from app.services import pipeline_executor as module
+
+        async def to_r2(urls, prefix="videos"):
+            return [f"r2/{url}" for url in urls]
+
+        # Non-streamed I2V sees the R2 copies, the streamed one saw the provider URLs
+        monkeypatch.setattr(module, "cache_images_batch", to_r2)
+        monkeypatch.setattr(settings, "pipeline_progress_flush_seconds", 0)
+
+        pipeline = Pipeline(name="restarted")
+        db_session.add(pipeline)
+        db_session.flush()
+        i2i = PipelineStep(
+            pipeline_id=pipeline.id,
+            step_type="i2i",
+            step_order=0,
+            config=json.dumps({"model": "flux-2-dev"}),
+            inputs=json.dumps({"image_urls": ["src"], "prompts": ["fast", "slow"]}),
+        )
+        i2v = PipelineStep(
+            pipeline_id=pipeline.id,
+            step_type="i2v",
+            step_order=1,
+            config=json.dumps({"model": "kling"}),
+            inputs=json.dumps({"prompts": ["pan"]}),
+        )
+        db_session.add_all([i2i, i2v])
+        db_session.commit()
+
+        async def images(source_image_url, prompt, **kwargs):
+            return [f"{prompt}.png"]
+
+        async def hangs_on_slow(image_url, **kwargs):
+            if "slow" in image_url:
+                await asyncio.sleep(60)
+            return f"{image_url}.mp4"
+
+        # First run streams, then the process dies while the slow video renders
+        run = asyncio.create_task(
+            self._executor().execute_pipeline(db_session, pipeline.id, images, hangs_on_slow)
+        )
+        for _ in range(200):
+            db_session.expire_all()
+            if i2i.status == "completed" and i2v.get_outputs().get("completed_units") == 1:
+                break
+            await asyncio.sleep(0.01)
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+
+        calls = []
+
+        async def videos(image_url, **kwargs):
+            calls.append(image_url)
+            return f"{image_url}.mp4"
+
+        await self._executor().execute_pipeline(db_session, pipeline.id, images, videos)
+
+        db_session.expire_all()
+        assert calls == ["r2/slow.png"]
+        assert i2v.status == "completed"
+        assert i2v.get_outputs()["video_urls"] == ["fast.png.mp4", "r2/slow.png.mp4"]